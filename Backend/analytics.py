@@ -0,0 +1,339 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, Union
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; SalesAnalytics refuses to start without it
+    np = None
+
+
+def to_datetime64(value: Union[str, date, datetime]) -> Any:
+    """
+    @brief Converts a report bound to a NumPy timestamp comparable with the loaded order times.
+    A date without a time means midnight, as MySQL compares '2023-06-30' with a DATETIME column.
+    @param value: A datetime, a date, or text such as '2023-06-30' or '2023-06-30 12:00:00'.
+    @return The numpy.datetime64 value with a resolution of microseconds, as SQLite keeps them.
+    """
+
+    if isinstance(value, (date, datetime)):
+        return np.datetime64(value, 'us')
+    return np.datetime64(str(value).replace(' ', 'T'), 'us')
+
+
+def product_arrays(products: Iterable[tuple], categories: Iterable[tuple], detail_products: Any) -> tuple[Any, Any, Any]:
+    """
+    @brief Builds the product names and categories and the category names as arrays indexed by id.
+    @param products: The (product_id, name, category_id) rows; category_id may be None.
+    @param categories: The (category_id, category_name) rows.
+    @param detail_products: The product_id column of the order details; products it names that no longer exist get a None name and category -1.
+    @return The (product_names, product_categories, category_names) arrays.
+    """
+
+    products = list(products)
+    categories = list(categories)
+    highest_product = max(max((row[0] for row in products), default=-1), int(detail_products.max()) if len(detail_products) else -1)
+    product_names = np.full(highest_product + 1, None, dtype=object)
+    product_categories = np.full(highest_product + 1, -1, dtype=np.int64)
+    for product_id, name, category_id in products:
+        product_names[product_id] = name
+        product_categories[product_id] = category_id if category_id is not None else -1
+    category_names = np.full(max((row[0] for row in categories), default=-1) + 1, None, dtype=object)
+    for category_id, category_name in categories:
+        category_names[category_id] = category_name
+    return product_names, product_categories, category_names
+
+
+""" @ref R34_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class is one immutable load of the order data as NumPy columns; refreshes publish a new one.
+class SalesColumns:
+    def __init__(self, order_ids, order_times, order_totals, customer_names, detail_order_ids, detail_times,
+                 detail_products, detail_quantities, detail_prices, product_names, product_categories,
+                 category_names) -> None:
+        """
+        @brief Constructor for the SalesColumns class.
+        The order columns are sorted by order_id; the detail columns repeat the time of their order, so no join is needed at query time.
+        Product and category attributes are arrays indexed by id, with None names and -1 categories for ids that do not exist.
+        customer_names only needs to support indexing with a boolean mask, so it may decode the names of the selected orders lazily.
+        """
+
+        self.order_ids = order_ids
+        self.order_times = order_times
+        self.order_totals = order_totals
+        self.customer_names = customer_names
+        self.detail_order_ids = detail_order_ids
+        self.detail_times = detail_times
+        self.detail_products = detail_products
+        self.detail_quantities = detail_quantities
+        self.detail_prices = detail_prices
+        self.product_names = product_names
+        self.product_categories = product_categories
+        self.category_names = category_names
+
+
+""" @ref R34_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class answers the sales reports from NumPy columns with vectorized masks and bincount instead of SQL GROUP BY; subclasses provide the columns.
+class ColumnarReports(ABC):
+    # The number of products listed by the top selling products report
+    TOP_PRODUCTS = 5
+
+    @abstractmethod
+    def columns(self) -> SalesColumns:
+        """
+        @brief Returns the columns the reports are computed from.
+        @return The columns; callers must not modify the arrays.
+        """
+
+    @staticmethod
+    def _period_mask(times: Any, start_date: Union[str, date], end_date: Union[str, date]) -> Any:
+        """
+        @brief Selects the rows of a report period.
+        A missing or unparseable bound selects no rows, as the SQL comparison with it matches no orders.
+        @param times: The order times of the rows.
+        @param start_date: The start of the report period.
+        @param end_date: The end of the report period, included.
+        @return A boolean array over the rows.
+        """
+
+        try:
+            start, end = to_datetime64(start_date), to_datetime64(end_date)
+        except ValueError:
+            return np.zeros(len(times), dtype=bool)
+        return (times >= start) & (times <= end)
+
+    @classmethod
+    def _detail_mask(cls, columns: SalesColumns, start_date: Union[str, date], end_date: Union[str, date]) -> Any:
+        """
+        @brief Selects the order detail rows of a report period.
+        @param columns: The loaded columns.
+        @param start_date: The start of the report period.
+        @param end_date: The end of the report period, included.
+        @return A boolean array over the detail columns.
+        """
+
+        return cls._period_mask(columns.detail_times, start_date, end_date)
+
+    # @contract
+    # @post(lambda result: isinstance(result, list))
+    """ @ref R34_0"""
+    def total_sales(self, start_date: Union[str, date], end_date: Union[str, date]) -> list[dict[str, Any]]:
+        """
+        @brief Generates the total sales report, in the format and with the date semantics of Products.total_sales.
+        @param start_date: The start of the report period.
+        @param end_date: The end of the report period, included; a date means its midnight.
+        @return The orders of the period ordered by order_id, followed by a dictionary with 'total_sales'.
+        """
+
+        columns = self.columns()
+        mask = self._period_mask(columns.order_times, start_date, end_date)
+        totals = columns.order_totals[mask]
+        report = [{'order_id': int(order_id), 'customer_name': customer_name, 'datetime': order_time, 'total_amount': float(total)}
+                  for order_id, customer_name, order_time, total in zip(
+                      columns.order_ids[mask], columns.customer_names[mask], columns.order_times[mask].astype(datetime), totals)]
+        report.append({'total_sales': float(totals.sum())})
+        return report
+
+    # @contract
+    # @post(lambda result: isinstance(result, list))
+    """ @ref R34_0"""
+    def top_selling_products(self, start_date: Union[str, date], end_date: Union[str, date]) -> list[dict[str, Any]]:
+        """
+        @brief Lists the products sold in the largest quantities, in the format and with the date semantics of Products.top_selling_products.
+        Ties are broken by ascending product_id.
+        @param start_date: The start of the report period.
+        @param end_date: The end of the report period, included; a date means its midnight.
+        @return A list of dictionaries with 'product_id', 'products_name' and 'total_quantity'.
+        """
+
+        columns = self.columns()
+        mask = self._detail_mask(columns, start_date, end_date)
+        # Only products that still exist are reported, as the SQL joins the products table
+        products = columns.detail_products[mask]
+        existing = columns.product_names[products] != None  # noqa: E711 - elementwise comparison
+        products = products[existing]
+        quantities = np.bincount(products, weights=columns.detail_quantities[mask][existing], minlength=len(columns.product_names))
+        sold = np.flatnonzero(np.bincount(products, minlength=len(columns.product_names)))
+        if len(sold) > self.TOP_PRODUCTS:
+            # Partition out the candidates first, so only TOP_PRODUCTS of them are sorted
+            boundary = np.partition(-quantities[sold], self.TOP_PRODUCTS - 1)[self.TOP_PRODUCTS - 1]
+            sold = sold[-quantities[sold] <= boundary]
+        top = sold[np.lexsort((sold, -quantities[sold]))][:self.TOP_PRODUCTS]
+        return [{'product_id': int(product_id), 'products_name': columns.product_names[product_id],
+                 'total_quantity': float(quantities[product_id])} for product_id in top]
+
+    # @contract
+    # @post(lambda result: isinstance(result, list))
+    """ @ref R34_0"""
+    def sales_by_category(self, start_date: Union[str, date], end_date: Union[str, date]) -> list[dict[str, Any]]:
+        """
+        @brief Sums the sales of each category, in the format and with the date semantics of Products.sales_by_category.
+        @param start_date: The start of the report period.
+        @param end_date: The end of the report period, included; a date means its midnight.
+        @return A list of dictionaries with 'category_name' and 'total_sales', largest first.
+        """
+
+        columns = self.columns()
+        mask = self._detail_mask(columns, start_date, end_date)
+        categories = columns.product_categories[columns.detail_products[mask]]
+        # Products without a category, and categories that no longer exist, are not reported, as the SQL joins both tables
+        valid = (categories >= 0) & (categories < len(columns.category_names))
+        categories = categories[valid]
+        valid_categories = columns.category_names[categories] != None  # noqa: E711 - elementwise comparison
+        categories = categories[valid_categories]
+        prices = columns.detail_prices[mask][valid][valid_categories]
+        totals = np.bincount(categories, weights=prices, minlength=len(columns.category_names))
+        sold = np.flatnonzero(np.bincount(categories, minlength=len(columns.category_names)))
+        ranked = sold[np.lexsort((sold, -totals[sold]))]
+        return [{'category_name': columns.category_names[category_id], 'total_sales': round(float(totals[category_id]), 2)}
+                for category_id in ranked]
+
+
+""" @ref R34_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class keeps the orders of the live database as in-memory NumPy columns, refreshed incrementally, for the columnar reports.
+class SalesAnalytics(ColumnarReports):
+    # Orders below the highest loaded id that are read again on refresh, catching orders whose insert committed late
+    REFRESH_OVERLAP = 1000
+
+    def __init__(self, connection, refresh_interval: float = 5.0, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        @brief Constructor for the SalesAnalytics class.
+        @param connection: The database connection object.
+        @param refresh_interval: The number of seconds after which a report first loads the orders added since the last refresh, picking up orders written by other server processes.
+        @param clock: The time source, replaceable in tests.
+        """
+
+        if np is None:
+            raise ImportError("SalesAnalytics requires NumPy; install it with 'pip install numpy'")
+        self.connection = connection
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._columns = None
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+        # Set by order and product changes of this process, which are then visible to the next report
+        self._dirty = False
+        self._products_dirty = True
+        self._deleted_orders = set()
+        # The product and category rows, read again after a product change
+        self._products = []
+        self._categories = []
+
+    """ @ref R34_0"""
+    def on_order_changed(self, event: str, order: dict[str, Any]) -> None:
+        """
+        @brief Listener for Orders.subscribe(): makes the next report include an inserted order or exclude a deleted one.
+        @param event: 'inserted' or 'deleted'.
+        @param order: The changed order with its 'order_id'.
+        """
+
+        with self._lock:
+            if event == 'deleted':
+                self._deleted_orders.add(order['order_id'])
+            self._dirty = True
+
+    """ @ref R34_0"""
+    def on_product_changed(self, event: str, product: dict[str, Any]) -> None:
+        """
+        @brief Listener for Products.subscribe(): reloads the product names and categories before the next report.
+        @param event: 'inserted', 'updated' or 'deleted'.
+        @param product: The changed product.
+        """
+
+        with self._lock:
+            self._products_dirty = True
+            self._dirty = True
+
+    """ @ref R34_0"""
+    def columns(self) -> SalesColumns:
+        """
+        @brief Returns the current columns, loading or refreshing them first when needed.
+        @return The columns; callers must not modify the arrays.
+        """
+
+        with self._lock:
+            if (self._columns is None or self._dirty
+                    or self.clock() - self._refreshed_at >= self.refresh_interval):
+                self._refresh()
+            return self._columns
+
+    def reload(self) -> None:
+        """
+        @brief Discards the loaded columns, so the next report loads every order again, e.g. after orders were deleted by another process.
+        """
+
+        with self._lock:
+            self._columns = None
+            self._products_dirty = True
+
+    def _refresh(self) -> None:
+        """
+        @brief Loads the orders added since the last refresh and drops the deleted ones.
+        @pre The lock is held.
+        """
+
+        old = self._columns
+        # Read the orders above the highest loaded id, minus an overlap for late commits
+        since = int(old.order_ids[-1]) - self.REFRESH_OVERLAP if old is not None and len(old.order_ids) else 0
+        cursor = self.connection.cursor(prepared=True)
+        cursor.execute("SELECT order_id, customer_name, total_amount, datetime FROM orders WHERE order_id > %s ORDER BY order_id", (since,))
+        order_rows = cursor.fetchall()
+        cursor.execute(
+            "SELECT order_details.order_id, order_details.product_id, order_details.quantity, order_details.total_price, orders.datetime "
+            "FROM order_details JOIN orders ON order_details.order_id = orders.order_id WHERE orders.order_id > %s", (since,))
+        detail_rows = cursor.fetchall()
+        new_order_ids = np.array([row[0] for row in order_rows], dtype=np.int64)
+        new_detail_order_ids = np.array([row[0] for row in detail_rows], dtype=np.int64)
+        if old is not None:
+            # Keep only the rows not loaded before; the overlap returns known orders again
+            fresh_orders = ~np.isin(new_order_ids, old.order_ids)
+            fresh_details = ~np.isin(new_detail_order_ids, old.order_ids)
+        else:
+            fresh_orders = np.ones(len(order_rows), dtype=bool)
+            fresh_details = np.ones(len(detail_rows), dtype=bool)
+
+        def column(rows: list, index: int, dtype: Any, mask: Any) -> Any:
+            return np.array([row[index] for row in rows], dtype=dtype)[mask] if rows else np.empty(0, dtype=dtype)
+
+        parts = {
+            'order_ids': new_order_ids[fresh_orders],
+            'order_times': column(order_rows, 3, 'datetime64[us]', fresh_orders),
+            'order_totals': column(order_rows, 2, np.float64, fresh_orders),
+            'customer_names': column(order_rows, 1, object, fresh_orders),
+            'detail_order_ids': new_detail_order_ids[fresh_details],
+            'detail_times': column(detail_rows, 4, 'datetime64[us]', fresh_details),
+            'detail_products': column(detail_rows, 1, np.int64, fresh_details),
+            'detail_quantities': column(detail_rows, 2, np.float64, fresh_details),
+            'detail_prices': column(detail_rows, 3, np.float64, fresh_details),
+        }
+        if old is not None:
+            parts = {name: np.concatenate([getattr(old, name), part]) for name, part in parts.items()}
+        # The overlap may interleave late orders with known ones
+        order_sort = np.argsort(parts['order_ids'], kind='stable')
+        for name in ('order_ids', 'order_times', 'order_totals', 'customer_names'):
+            parts[name] = parts[name][order_sort]
+        if self._deleted_orders:
+            deleted = np.fromiter(self._deleted_orders, dtype=np.int64)
+            kept_orders = ~np.isin(parts['order_ids'], deleted)
+            kept_details = ~np.isin(parts['detail_order_ids'], deleted)
+            for name in ('order_ids', 'order_times', 'order_totals', 'customer_names'):
+                parts[name] = parts[name][kept_orders]
+            for name in ('detail_order_ids', 'detail_times', 'detail_products', 'detail_quantities', 'detail_prices'):
+                parts[name] = parts[name][kept_details]
+        if self._products_dirty or old is None:
+            cursor.execute("SELECT product_id, name, category_id FROM products")
+            self._products = cursor.fetchall()
+            cursor.execute("SELECT category_id, category_name FROM categories")
+            self._categories = cursor.fetchall()
+        # Detail rows may name products deleted since; they must index the product arrays as missing products
+        product_names, product_categories, category_names = product_arrays(self._products, self._categories, parts['detail_products'])
+        self._columns = SalesColumns(product_names=product_names, product_categories=product_categories,
+                                     category_names=category_names, **parts)
+        self._refreshed_at = self.clock()
+        self._dirty = False
+        self._products_dirty = False
+        self._deleted_orders = set()
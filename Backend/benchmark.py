@@ -0,0 +1,193 @@
+import argparse
+import cProfile
+import pstats
+import random
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.server import Server
+from Backend.sqlite_connection import SQLiteConnection
+from Backend.migrations import Migrator
+from Backend.products import Products
+from Backend.analytics import SalesAnalytics
+
+""" @ref R1_0"""
+# This module load-tests the Flask server against the local SQLite backend so performance changes can be measured without MySQL.
+
+
+def seed_orders(connection: SQLiteConnection, order_count: int, seed: int = 7) -> None:
+    """
+    @brief Inserts synthetic orders with random line items spread over the last year.
+    @param connection: The SQLite connection to seed.
+    @param order_count: The number of orders to generate.
+    @param seed: The random seed, so runs are reproducible.
+    @post The orders and order_details tables contain order_count additional orders.
+    """
+
+    rng = random.Random(seed)
+    cursor = connection.cursor()
+    cursor.execute("SELECT product_id, price_per_unit FROM products")
+    prices = cursor.fetchall()
+    start = datetime.now() - timedelta(days=365)
+    for _ in range(order_count):
+        lines = rng.sample(prices, rng.randint(1, 5))
+        details = [(product_id, rng.randint(1, 5), price) for product_id, price in lines]
+        total_amount = round(sum(quantity * price for _, quantity, price in details), 2)
+        order_datetime = start + timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+        cursor.execute("INSERT INTO orders (customer_name, total_amount, datetime) VALUES (%s, %s, %s)",
+                       ('Customer %d' % rng.randint(1, 500), total_amount, order_datetime))
+        order_id = cursor.lastrowid
+        cursor.executemany("INSERT INTO order_details (order_id, product_id, quantity, total_price) VALUES (%s, %s, %s, %s)",
+                           [(order_id, product_id, quantity, round(quantity * price, 2)) for product_id, quantity, price in details])
+    connection.commit()
+    connection.release()
+
+
+def run_load(server: Server, paths: list[str], threads: int, requests_per_thread: int,
+             profilers: Optional[list] = None) -> dict[str, float]:
+    """
+    @brief Issues GET requests against the server from several threads and measures latency.
+    @param server: The server with its routes set up.
+    @param paths: The request paths, used round robin.
+    @param threads: The number of concurrent client threads.
+    @param requests_per_thread: The number of requests each thread issues.
+    @param profilers: If given, every client thread runs under its own cProfile.Profile, which is appended to this list.
+    @return A dictionary with 'requests', 'errors', 'seconds', 'throughput' and the 'p50', 'p95', 'p99' latencies in milliseconds.
+    """
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(offset: int) -> None:
+        client = server.app.test_client()
+        local_latencies = []
+        local_errors = 0
+        profiler = cProfile.Profile() if profilers is not None else None
+        if profiler is not None:
+            profiler.enable()
+        for i in range(requests_per_thread):
+            started = time.perf_counter()
+            response = client.get(paths[(offset + i) % len(paths)])
+            # Read the whole body so streamed responses are timed to their last byte
+            response.get_data()
+            response.close()
+            local_latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                local_errors += 1
+        if profiler is not None:
+            profiler.disable()
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+            if profiler is not None:
+                profilers.append(profiler)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(fraction: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 3)
+
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'seconds': round(elapsed, 3),
+        'throughput': round(len(latencies) / elapsed, 1),
+        'p50': percentile(0.50),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+    }
+
+
+def compare_analytics(connection: SQLiteConnection, repeats: int) -> dict[str, dict[str, float]]:
+    """
+    @brief Times each sales report of the last 90 days computed by SQL and by the columnar analytics engine, and checks that both agree.
+    @param connection: The seeded SQLite connection.
+    @param repeats: The number of times each report is computed by each engine.
+    @return A dictionary mapping each report to its 'sql_ms' and 'analytics_ms' mean latencies and the 'load_ms' of the initial column load.
+    @post Raises AssertionError if the engines disagree.
+    """
+
+    end = datetime.now()
+    start = end - timedelta(days=90)
+    sql = Products(connection)
+    analytics = SalesAnalytics(connection, refresh_interval=float('inf'))
+    started = time.perf_counter()
+    analytics.columns()
+    load_ms = (time.perf_counter() - started) * 1000
+    results = {}
+    for report in ('total_sales', 'top_selling_products', 'sales_by_category'):
+        timings = {}
+        outputs = {}
+        for name, engine in (('sql', sql), ('analytics', analytics)):
+            started = time.perf_counter()
+            for _ in range(repeats):
+                outputs[name] = getattr(engine, report)(start, end)
+            timings[name + '_ms'] = round((time.perf_counter() - started) * 1000 / repeats, 3)
+        if report == 'top_selling_products':
+            # Products with equal quantities may be listed in either order
+            same = [row['total_quantity'] for row in outputs['sql']] == [row['total_quantity'] for row in outputs['analytics']]
+        elif report == 'total_sales':
+            same = (sorted(row['order_id'] for row in outputs['sql'][:-1]) == [row['order_id'] for row in outputs['analytics'][:-1]]
+                    and abs(outputs['sql'][-1]['total_sales'] - outputs['analytics'][-1]['total_sales']) < 0.01)
+        else:
+            same = outputs['sql'] == outputs['analytics']
+        assert same, 'SQL and analytics disagree on %s' % report
+        timings['load_ms'] = round(load_ms, 3)
+        results[report] = timings
+    connection.release()
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    @brief Command line entry point: python -m Backend.benchmark [--threads N] [--requests N] [--orders N] [--path P] [--no-migrate] [--profile] [--compare-analytics]
+    """
+
+    parser = argparse.ArgumentParser(description="Load-test the grocery store server on SQLite.")
+    parser.add_argument('--threads', type=int, default=4, help="number of concurrent client threads")
+    parser.add_argument('--requests', type=int, default=250, help="requests issued by each thread")
+    parser.add_argument('--orders', type=int, default=1000, help="synthetic orders added before the run")
+    parser.add_argument('--database', default=':memory:', help="SQLite database file")
+    parser.add_argument('--path', action='append', help="request path to load, may be repeated")
+    parser.add_argument('--no-migrate', action='store_true', help="skip the schema migrations, e.g. to measure without the indexes")
+    parser.add_argument('--profile', action='store_true', help="print the top functions by cumulative time")
+    parser.add_argument('--compare-analytics', action='store_true',
+                        help="only time the sales reports computed by SQL against the NumPy analytics engine")
+    args = parser.parse_args(argv)
+
+    connection = SQLiteConnection(args.database, pool_size=args.threads)
+    seed_orders(connection, args.orders)
+    if args.compare_analytics:
+        for report, timings in compare_analytics(connection, args.requests).items():
+            print('%-22s %s' % (report, '  '.join('%s %s' % item for item in timings.items())))
+        return
+    if not args.no_migrate:
+        # Migrating after seeding fills the sales rollups from the synthetic orders
+        Migrator(connection).migrate()
+        connection.release()
+    server = Server(connection=connection, sales_rollups=not args.no_migrate)
+    server.setup_routes()
+    paths = args.path or ['/getProducts', '/getOrders', '/getUnitOfMeasures']
+    profilers = [] if args.profile else None
+    results = run_load(server, paths, args.threads, args.requests, profilers)
+    for name, value in results.items():
+        print('%-10s %s' % (name, value))
+    if profilers:
+        pstats.Stats(*profilers).sort_stats('cumulative').print_stats(25)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+class PoolTimeoutError(Exception):
+    """
+    @brief Raised when no pooled connection becomes available within the configured wait timeout.
+    """
+
+
+""" @ref R1_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class implements a bounded, thread-safe pool of database connections that request threads check out and check back in.
+class ConnectionPool:
+    def __init__(self, factory: Callable[[], Any], max_size: int = 5, timeout: float = 10.0,
+                 validate: Optional[Callable[[Any], bool]] = None, ping_interval: float = 30.0) -> None:
+        """
+        @brief Constructor for the ConnectionPool class.
+        Connections are created lazily through the factory until max_size connections exist; after that callers wait for a checkin.
+        @param factory: A callable returning a new database connection.
+        @param max_size: The maximum number of connections the pool may hold (idle plus checked out).
+        @param timeout: The number of seconds acquire() waits for a free connection before raising PoolTimeoutError.
+        @param validate: An optional callable that returns False when a connection is no longer usable.
+        @param ping_interval: Idle connections older than this many seconds are validated before they are handed out.
+        """
+
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.validate = validate
+        self.ping_interval = ping_interval
+        # Idle (connection, released_at) pairs ready to be handed out, most recently returned last
+        self._idle = []
+        # Number of connections currently checked out by callers
+        self._in_use = 0
+        # Guards every field above and wakes up waiters on checkin
+        self._condition = threading.Condition()
+        # Counters reported by stats()
+        self._created = 0
+        self._acquired = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._replaced = 0
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """
+        @brief Checks a connection out of the pool.
+        An idle connection is reused when available, a new one is created while the pool is below max_size, otherwise the caller blocks until a connection is released.
+        @param timeout: Seconds to wait for a free connection; defaults to the pool timeout.
+        @pre The pool must have been constructed with a valid factory.
+        @return A database connection owned by the caller until it is released.
+        @post The returned connection is counted as in use.
+        """
+
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while not self._idle and self._in_use >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        "No database connection available after %.1f seconds" % timeout)
+                self._waits += 1
+                self._condition.wait(remaining)
+            self._in_use += 1
+            self._acquired += 1
+            idle_entry = self._idle.pop() if self._idle else None
+        if idle_entry is not None:
+            connection, released_at = idle_entry
+            # Connections idle for longer than ping_interval may have been dropped by the server
+            if self.validate is None or time.monotonic() - released_at < self.ping_interval \
+                    or self.validate(connection):
+                return connection
+            self._close_quietly(connection)
+            with self._condition:
+                self._replaced += 1
+        # Create the new connection outside the lock so slow connects do not block checkins
+        try:
+            connection = self.factory()
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._created += 1
+        return connection
+
+    def release(self, connection: Any) -> None:
+        """
+        @brief Returns a checked out connection to the pool so another caller can reuse it.
+        @param connection: The connection previously returned by acquire().
+        @post The connection is idle and one waiting caller, if any, is woken up.
+        """
+
+        with self._condition:
+            self._in_use -= 1
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def discard(self, connection: Any) -> None:
+        """
+        @brief Closes a checked out connection and frees its slot instead of returning it to the pool.
+        @param connection: The connection previously returned by acquire().
+        @post The pool may create a replacement connection on the next acquire().
+        """
+
+        with self._condition:
+            self._in_use = max(0, self._in_use - 1)
+            self._condition.notify()
+        self._close_quietly(connection)
+
+    def _close_quietly(self, connection: Any) -> None:
+        """
+        @brief Closes a connection that is being thrown away, ignoring errors from an already broken connection.
+        @param connection: The connection to close.
+        """
+
+        try:
+            connection.close()
+        except Exception:
+            # The connection is being thrown away, a failure to close it cleanly is not actionable
+            pass
+
+    def close_all(self) -> None:
+        """
+        @brief Closes every idle connection held by the pool.
+        Connections that are checked out are closed when they are discarded by their owner.
+        @post The pool holds no idle connections.
+        """
+
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            connection.close()
+
+    def stats(self) -> dict[str, int]:
+        """
+        @brief Reports the current pool usage and lifetime counters.
+        @return A dictionary with 'max_size', 'in_use', 'idle', 'created', 'acquired', 'waits', 'timeouts' and 'replaced' (stale connections reopened).
+        """
+
+        with self._condition:
+            return {
+                'max_size': self.max_size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'created': self._created,
+                'acquired': self._acquired,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'replaced': self._replaced,
+            }
@@ -0,0 +1,175 @@
+import argparse
+import os
+import sys
+from typing import Any, Optional
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.retry import retry_on_disconnect
+from Backend.storage import add_backend_arguments, connection_from_arguments
+
+
+""" @ref R57_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class answers per-customer lookups: a customer's lifetime aggregates and their order history, newest first.
+class Customers:
+    def __init__(self, connection, customer_stats: bool = False) -> None:
+        """
+        @brief Constructor for the Customers class.
+        @param connection: The database connection object; its 'dialect' selects the upsert syntax.
+        @param customer_stats: If True, the aggregates are read from the customer_stats table of migration 0004, which apply_order maintains;
+        otherwise they are computed from the customer's orders on every lookup.
+        """
+
+        self.connection = connection
+        self.customer_stats = customer_stats
+        if getattr(connection, 'dialect', 'mysql') == 'sqlite':
+            update = ("ON CONFLICT (customer_name) DO UPDATE SET order_count = order_count + 1, total_spent = total_spent + excluded.total_spent, "
+                      "first_order_at = MIN(first_order_at, excluded.first_order_at), last_order_at = MAX(last_order_at, excluded.last_order_at)")
+        else:
+            update = ("ON DUPLICATE KEY UPDATE order_count = order_count + 1, total_spent = total_spent + VALUES(total_spent), "
+                      "first_order_at = LEAST(first_order_at, VALUES(first_order_at)), last_order_at = GREATEST(last_order_at, VALUES(last_order_at))")
+        # Upsert adding one order to its customer's aggregates
+        self.stats_upsert = ("INSERT INTO customer_stats (customer_name, order_count, total_spent, first_order_at, last_order_at) "
+                             "VALUES (%s, 1, %s, %s, %s) " + update)
+
+    # @contract
+    # @pre(lambda order: isinstance(order, dict))
+    """ @ref R57_0"""
+    def apply_order(self, cursor: Any, order: dict[str, Any], sign: int = 1) -> None:
+        """
+        @brief Adds an order to its customer's aggregates, or removes it again; the Orders aggregate interface.
+        The statements run on the caller's cursor, so the aggregates change in the same transaction as the order itself; the caller commits.
+        @param cursor: The cursor of the transaction writing the order.
+        @param order: The order with 'customer_name', 'total_amount' and 'datetime'.
+        @param sign: 1 when the order is inserted, -1 when it is deleted, after its row was removed.
+        @post The customer's aggregates include the order if sign is 1 and exclude it if sign is -1; customers without orders have no row.
+        """
+
+        customer_name = order['customer_name']
+        if sign > 0:
+            cursor.execute(self.stats_upsert, (customer_name, float(order['total_amount']), order['datetime'], order['datetime']))
+            return
+        cursor.execute("UPDATE customer_stats SET order_count = order_count - 1, total_spent = total_spent - %s WHERE customer_name = %s",
+                       (float(order['total_amount']), customer_name))
+        cursor.execute("DELETE FROM customer_stats WHERE customer_name = %s AND order_count <= 0", (customer_name,))
+        # The deleted order may have been the first or last one; the index on the customer's orders keeps this to their own rows
+        cursor.execute(
+            "UPDATE customer_stats SET "
+            "first_order_at = (SELECT MIN(datetime) FROM orders WHERE customer_name = %s), "
+            "last_order_at = (SELECT MAX(datetime) FROM orders WHERE customer_name = %s) "
+            "WHERE customer_name = %s", (customer_name, customer_name, customer_name))
+
+    # @contract
+    # @post(lambda result: isinstance(result, int))
+    """ @ref R57_0"""
+    def backfill(self) -> int:
+        """
+        @brief Recomputes the customer_stats table from the orders, e.g. after orders were written around the Orders class.
+        Order writes during the backfill may be counted twice or not at all, so it should run while the shop does not take orders.
+        @return The number of customers with orders.
+        @post The customer_stats rows equal the aggregates of the orders.
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute("DELETE FROM customer_stats")
+        cursor.execute(
+            "INSERT INTO customer_stats (customer_name, order_count, total_spent, first_order_at, last_order_at) "
+            "SELECT customer_name, COUNT(*), SUM(total_amount), MIN(datetime), MAX(datetime) FROM orders GROUP BY customer_name")
+        customers = cursor.rowcount
+        self.connection.commit()
+        return customers
+
+    # @contract
+    # @pre(lambda customer_name: isinstance(customer_name, str))
+    # @post(lambda result: result is None or isinstance(result, dict))
+    """ @ref R57_0"""
+    @retry_on_disconnect()
+    def get_customer(self, customer_name: str) -> Optional[dict[str, Any]]:
+        """
+        @brief Retrieves a customer's lifetime aggregates.
+        With customer_stats this is one primary key lookup; otherwise the customer's orders are aggregated through their index.
+        @param customer_name: The name the orders were placed under.
+        @pre The database connection must be established and valid.
+        @return A dictionary with 'customer_name', 'order_count', 'total_spent', 'first_order_at' and 'last_order_at', or None if the customer has no orders.
+        """
+
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
+        if self.customer_stats:
+            # SQL query reading the maintained aggregates of the customer
+            cursor.execute("SELECT order_count, total_spent, first_order_at, last_order_at FROM customer_stats WHERE customer_name = %s",
+                           (customer_name,))
+        else:
+            # SQL query aggregating the customer's orders
+            cursor.execute("SELECT COUNT(*), SUM(total_amount), MIN(datetime), MAX(datetime) FROM orders WHERE customer_name = %s",
+                           (customer_name,))
+        row = cursor.fetchone()
+        if row is None or not row[0]:
+            # The customer has no orders
+            return None
+        order_count, total_spent, first_order_at, last_order_at = row
+        return {
+            'customer_name': customer_name,
+            'order_count': order_count,
+            'total_spent': round(float(total_spent), 2),
+            'first_order_at': first_order_at,
+            'last_order_at': last_order_at,
+        }
+
+    # @contract
+    # @pre(lambda limit: isinstance(limit, int) and limit > 0)
+    # @post(lambda result: isinstance(result, dict))
+    """ @ref R57_0"""
+    @retry_on_disconnect()
+    def get_customer_orders(self, customer_name: str, limit: int, after: Optional[int] = None) -> dict[str, Any]:
+        """
+        @brief Retrieves one page of a customer's orders, newest first, using keyset pagination on the (customer_name, order_id) index.
+        Each page seeks directly to its first order, so its cost depends only on the page size and not on how many orders the customer has.
+        @param customer_name: The name the orders were placed under.
+        @param limit: The maximum number of orders on the page.
+        @param after: The order_id of the last order of the previous page, or None for the first page.
+        @pre The database connection must be established and valid.
+        @return A dictionary with 'orders', the list of order dictionaries as returned by Orders.get_all_orders, and 'next_cursor', the value to pass as 'after' for the next page or None on the last page.
+        @post At most limit orders with an order_id smaller than after are returned in descending order_id order.
+        """
+
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
+        # SQL query walking the customer's index entries backwards from the previous page; one extra row tells whether another page follows
+        if after is None:
+            cursor.execute("SELECT order_id, customer_name, total_amount, datetime FROM orders "
+                           "WHERE customer_name = %s ORDER BY order_id DESC LIMIT %s", (customer_name, limit + 1))
+        else:
+            cursor.execute("SELECT order_id, customer_name, total_amount, datetime FROM orders "
+                           "WHERE customer_name = %s AND order_id < %s ORDER BY order_id DESC LIMIT %s", (customer_name, after, limit + 1))
+        rows = cursor.fetchall()
+        # Create a list of dictionaries for the rows of this page
+        orders_list = [{
+            'order_id': order_id,
+            'customer_name': name,
+            'total_amount': total_amount,
+            'datetime': dt,
+        } for (order_id, name, total_amount, dt) in rows[:limit]]
+        # The cursor of the next page is the last order_id of this page, if more rows exist
+        next_cursor = orders_list[-1]['order_id'] if len(rows) > limit else None
+        return {'orders': orders_list, 'next_cursor': next_cursor}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    @brief Command line entry point: python -m Backend.customers backfill [--backend B] [--database D]
+    """
+
+    parser = argparse.ArgumentParser(description="Maintain the grocery store customer aggregates.")
+    parser.add_argument('command', choices=['backfill'], help="recompute the customer_stats table from the orders")
+    add_backend_arguments(parser)
+    args = parser.parse_args(argv)
+
+    connection = connection_from_arguments(parser, args)
+    customers = Customers(connection, customer_stats=True).backfill()
+    print('Recomputed the aggregates of %d customers' % customers)
+    connection.release()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+import argparse
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Any, Optional
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.storage import add_backend_arguments, connection_from_arguments
+
+# Directory holding the NNNN_name.up.sql and NNNN_name.down.sql migration files
+DEFAULT_MIGRATIONS_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'database_files', 'migrations'))
+
+_MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.(up|down)\.sql$')
+
+
+""" @ref R1_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class reports migration files that are inconsistent, or a requested migration that cannot be performed.
+class MigrationError(Exception):
+    pass
+
+
+""" @ref R1_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class is one versioned schema change with the statements applying and reverting it.
+class Migration:
+    def __init__(self, version: int, name: str, up: list[str], down: list[str]) -> None:
+        """
+        @brief Constructor for the Migration class.
+        @param version: The migration number, which orders the migrations.
+        @param name: The descriptive part of the file name.
+        @param up: The statements applying the change.
+        @param down: The statements reverting the change.
+        """
+
+        self.version = version
+        self.name = name
+        self.up = up
+        self.down = down
+
+    def __repr__(self) -> str:
+        return 'Migration(%d, %r)' % (self.version, self.name)
+
+
+def split_statements(sql: str) -> list[str]:
+    """
+    @brief Splits the text of a migration file into its statements.
+    Statements end with ';' and lines starting with '--' are comments; semicolons inside string literals are not supported.
+    @param sql: The file contents.
+    @return The statements without their terminating ';'.
+    """
+
+    lines = [line for line in sql.splitlines() if not line.lstrip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+
+def load_migrations(directory: str = DEFAULT_MIGRATIONS_PATH) -> list[Migration]:
+    """
+    @brief Reads the migrations of a directory.
+    @param directory: The directory holding the NNNN_name.up.sql and NNNN_name.down.sql files.
+    @return The migrations ordered by version.
+    @post Every migration has both an up and a down file and every version is used once.
+    """
+
+    files = {}
+    for file_name in sorted(os.listdir(directory)):
+        match = _MIGRATION_FILE.match(file_name)
+        if match is None:
+            continue
+        version, name, direction = int(match.group(1)), match.group(2), match.group(3)
+        entry = files.setdefault(version, {'name': name})
+        if entry['name'] != name:
+            raise MigrationError('Migration %d has two names: %s and %s' % (version, entry['name'], name))
+        with open(os.path.join(directory, file_name)) as migration_file:
+            entry[direction] = split_statements(migration_file.read())
+    migrations = []
+    for version in sorted(files):
+        entry = files[version]
+        if 'up' not in entry or 'down' not in entry:
+            raise MigrationError('Migration %d_%s needs both an up and a down file' % (version, entry['name']))
+        migrations.append(Migration(version, entry['name'], entry['up'], entry['down']))
+    return migrations
+
+
+""" @ref R1_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class applies and reverts migrations and records the applied versions in the schema_migrations table.
+class Migrator:
+    def __init__(self, connection: Any, migrations: Optional[list[Migration]] = None) -> None:
+        """
+        @brief Constructor for the Migrator class.
+        @param connection: The database connection, MySQL or SQLite.
+        @param migrations: The known migrations; defaults to those in database_files/migrations.
+        """
+
+        self.connection = connection
+        self.migrations = migrations if migrations is not None else load_migrations()
+
+    def ensure_table(self) -> None:
+        """
+        @brief Creates the schema_migrations table if it does not exist yet.
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INT NOT NULL PRIMARY KEY, "
+            "name VARCHAR(255) NOT NULL, "
+            "applied_at DATETIME NOT NULL)")
+        self.connection.commit()
+
+    def applied_versions(self) -> list[int]:
+        """
+        @brief Reads the versions applied to the database.
+        @return The applied versions in ascending order.
+        """
+
+        self.ensure_table()
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT version FROM schema_migrations ORDER BY version")
+        return [row[0] for row in cursor.fetchall()]
+
+    def status(self) -> list[dict[str, Any]]:
+        """
+        @brief Reports every known migration and whether it is applied.
+        @return A list of dictionaries with 'version', 'name' and 'applied'.
+        """
+
+        applied = set(self.applied_versions())
+        return [{'version': migration.version, 'name': migration.name, 'applied': migration.version in applied}
+                for migration in self.migrations]
+
+    def migrate(self, target: Optional[int] = None, dry_run: bool = False) -> list[Migration]:
+        """
+        @brief Applies the pending migrations up to a target version, in ascending order.
+        MySQL commits every DDL statement implicitly, so a migration failing half way is not rolled back there; its version is recorded only once all its statements succeeded.
+        @param target: The highest version to apply, or None for all.
+        @param dry_run: If True, only reports the migrations that would be applied.
+        @return The migrations applied, or to be applied on a dry run.
+        @post Every known migration up to target is recorded in schema_migrations.
+        """
+
+        applied = set(self.applied_versions())
+        pending = [migration for migration in self.migrations
+                   if migration.version not in applied and (target is None or migration.version <= target)]
+        if not dry_run:
+            for migration in pending:
+                self._run(migration.up)
+                cursor = self.connection.cursor()
+                cursor.execute("INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, %s)",
+                               (migration.version, migration.name, datetime.now().replace(microsecond=0)))
+                self.connection.commit()
+        return pending
+
+    def rollback(self, target: int = 0, dry_run: bool = False) -> list[Migration]:
+        """
+        @brief Reverts the applied migrations above a target version, in descending order.
+        @param target: The highest version to keep applied; 0 reverts everything.
+        @param dry_run: If True, only reports the migrations that would be reverted.
+        @return The migrations reverted, or to be reverted on a dry run.
+        @post No migration above target is recorded in schema_migrations.
+        """
+
+        known = {migration.version: migration for migration in self.migrations}
+        reverting = [version for version in reversed(self.applied_versions()) if version > target]
+        unknown = [version for version in reverting if version not in known]
+        if unknown:
+            raise MigrationError('No migration files for applied versions %s' % unknown)
+        if not dry_run:
+            for version in reverting:
+                self._run(known[version].down)
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM schema_migrations WHERE version = %s", (version,))
+                self.connection.commit()
+        return [known[version] for version in reverting]
+
+    def _run(self, statements: list[str]) -> None:
+        """
+        @brief Executes the statements of one migration direction.
+        @param statements: The SQL statements.
+        """
+
+        cursor = self.connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    @brief Command line entry point: python -m Backend.migrations {status,up,down} [--target N] [--dry-run] [--backend B] [--database D]
+    """
+
+    parser = argparse.ArgumentParser(description="Apply or revert the grocery store schema migrations.")
+    parser.add_argument('command', choices=['status', 'up', 'down'], help="show the migrations, apply them or revert them")
+    parser.add_argument('--target', type=int, help="version to migrate up to (default: latest) or down to (default: the previous one)")
+    parser.add_argument('--dry-run', action='store_true', help="only print the migrations and statements that would run")
+    add_backend_arguments(parser)
+    args = parser.parse_args(argv)
+
+    # A new SQLite database file is created and seeded from the schema dump before it is migrated
+    connection = connection_from_arguments(parser, args)
+    migrator = Migrator(connection)
+    if args.command == 'status':
+        for entry in migrator.status():
+            print('%04d %-40s %s' % (entry['version'], entry['name'], 'applied' if entry['applied'] else 'pending'))
+    else:
+        if args.command == 'up':
+            migrations = migrator.migrate(args.target, args.dry_run)
+        else:
+            applied = migrator.applied_versions()
+            target = args.target if args.target is not None else (applied[-2] if len(applied) > 1 else 0)
+            migrations = migrator.rollback(target, args.dry_run)
+        for migration in migrations:
+            print('%s %04d %s' % ('Would run' if args.dry_run else 'Ran', migration.version, migration.name))
+            if args.dry_run:
+                for statement in (migration.up if args.command == 'up' else migration.down):
+                    print('    %s;' % statement)
+    connection.release()
+
+
+if __name__ == '__main__':
+    main()
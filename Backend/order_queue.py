@@ -0,0 +1,273 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Any, Optional
+import mysql.connector
+from Backend.orders import Orders
+
+# Errors caused by the orders of a batch rather than by the database being unreachable; they are not resolved by retrying
+ENTRY_ERRORS = (mysql.connector.errors.IntegrityError, mysql.connector.errors.DataError, sqlite3.IntegrityError, sqlite3.DataError,
+                KeyError, TypeError, ValueError)
+
+
+""" @ref R1_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class reports an order refused because the write-behind queue holds max_pending orders.
+class QueueFull(Exception):
+    pass
+
+
+""" @ref R59_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class acknowledges orders once they are appended to a local write-ahead log and commits them to the database in batches on a worker thread.
+class OrderQueue:
+    def __init__(self, orders: Orders, directory: str, name: str = 'orders', max_pending: int = 10000, batch_size: int = 500,
+                 fsync: bool = True, retry_delay: float = 0.5, compact_bytes: int = 16 * 1024 * 1024, max_results: int = 10000) -> None:
+        """
+        @brief Constructor for the OrderQueue class; start() recovers the log and starts the worker.
+        Each batch records its last log entry in the order_queue_checkpoints table of migration 0005 in the same transaction as its orders,
+        so after a crash exactly the entries that were not committed are replayed.
+        @param orders: The Orders model committing the batches; the queue registers itself as one of its aggregates.
+        @param directory: The directory of the write-ahead log, on a local disk.
+        @param name: The name of the queue, naming its log file and checkpoint row; each server process needs its own.
+        @param max_pending: The most orders waiting to be committed; further orders are refused with QueueFull.
+        @param batch_size: The most orders committed in one transaction.
+        @param fsync: If True, every order is forced to disk before it is acknowledged; if False, it only survives a crash of the process.
+        @param retry_delay: The seconds before a failed batch is retried; doubled per failure up to 30 seconds.
+        @param compact_bytes: The log size after which it is emptied once every entry is committed.
+        @param max_results: The number of committed or rejected orders whose outcome status() reports.
+        """
+
+        self.orders = orders
+        self.name = name
+        self.path = os.path.join(directory, name + '.wal')
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.retry_delay = retry_delay
+        self.compact_bytes = compact_bytes
+        self.max_results = max_results
+        os.makedirs(directory, exist_ok=True)
+        if getattr(orders.connection, 'dialect', 'mysql') == 'sqlite':
+            update = "ON CONFLICT (queue_name) DO UPDATE SET last_seq = MAX(last_seq, excluded.last_seq)"
+        else:
+            update = "ON DUPLICATE KEY UPDATE last_seq = GREATEST(last_seq, VALUES(last_seq))"
+        self.checkpoint_upsert = "INSERT INTO order_queue_checkpoints (queue_name, last_seq) VALUES (%s, %s) " + update
+        self._condition = threading.Condition()
+        # The (sequence number, order) entries of the log that are not committed yet, oldest first
+        self._pending = deque()
+        # The outcome of the latest committed or rejected orders by sequence number
+        self._results = OrderedDict()
+        self._next_seq = 1
+        self._log = None
+        self._thread = None
+        self._stopped = False
+        self._counts = {'enqueued': 0, 'committed': 0, 'rejected': 0, 'refused': 0, 'replayed': 0, 'batches': 0, 'failures': 0}
+        orders.aggregates.append(self)  # Records each batch's checkpoint in its transaction
+
+    """ @ref R59_0"""
+    def start(self) -> int:
+        """
+        @brief Replays the log entries that were not committed before the last shutdown or crash and starts the worker thread.
+        @pre Migration 0005 is applied.
+        @return The number of replayed orders.
+        @post A partly written last entry is cut off the log; the calling thread holds no pooled connection.
+        """
+
+        with self._condition:
+            cursor = self.orders.connection.cursor(prepared=True)
+            cursor.execute("SELECT last_seq FROM order_queue_checkpoints WHERE queue_name = %s", (self.name,))
+            row = cursor.fetchone()
+            self.orders.connection.release()  # The worker thread uses its own connection
+            committed_seq = row[0] if row is not None else 0
+            highest, valid_length = committed_seq, 0
+            if os.path.exists(self.path):
+                with open(self.path, 'rb') as log:
+                    for line in log:
+                        try:
+                            entry = json.loads(line) if line.endswith(b'\n') else None
+                        except ValueError:
+                            entry = None
+                        if entry is None:
+                            # The process stopped while writing this entry, so it was never acknowledged
+                            break
+                        valid_length += len(line)
+                        highest = max(highest, entry['seq'])
+                        if entry['seq'] > committed_seq:
+                            self._pending.append((entry['seq'], entry['order']))
+                if os.path.getsize(self.path) > valid_length:
+                    os.truncate(self.path, valid_length)
+            self._next_seq = highest + 1
+            self._counts['replayed'] = len(self._pending)
+            self._log = open(self.path, 'a', encoding='utf-8')
+            self._thread = threading.Thread(target=self._work, name='order-queue-' + self.name, daemon=True)
+            self._thread.start()
+            return len(self._pending)
+
+    """ @ref R59_0"""
+    def enqueue(self, order: dict[str, Any]) -> int:
+        """
+        @brief Appends an order to the log; once this returns, the order survives a crash and will be committed.
+        @param order: The order in the format accepted by Orders.insert_new_order.
+        @pre start() was called.
+        @return The sequence number of the order, to look its outcome up with status().
+        @post Raises QueueFull if max_pending orders are waiting to be committed.
+        """
+
+        with self._condition:
+            if len(self._pending) >= self.max_pending:
+                self._counts['refused'] += 1
+                raise QueueFull('%d orders are waiting to be committed' % len(self._pending))
+            seq = self._next_seq
+            line = json.dumps({'seq': seq, 'order': order}, separators=(',', ':')) + '\n'
+            self._log.write(line)
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+            self._next_seq += 1
+            self._pending.append((seq, order))
+            self._counts['enqueued'] += 1
+            self._condition.notify_all()
+            return seq
+
+    """ @ref R59_0"""
+    def status(self, seq: int) -> Optional[dict[str, Any]]:
+        """
+        @brief Reports what became of an enqueued order.
+        @param seq: The sequence number returned by enqueue().
+        @return A dictionary with 'queue_seq' and 'status': 'queued'; 'committed' with its 'order_id'; 'rejected' with a 'message';
+        or 'done' once the outcome is no longer retained. None if no order has the sequence number.
+        """
+
+        with self._condition:
+            if seq in self._results:
+                return dict(self._results[seq], queue_seq=seq)
+            if self._pending and self._pending[0][0] <= seq <= self._pending[-1][0]:
+                return {'queue_seq': seq, 'status': 'queued'}
+            if 0 < seq < self._next_seq:
+                return {'queue_seq': seq, 'status': 'done'}
+            return None
+
+    # @contract
+    # @pre(lambda order: isinstance(order, dict))
+    """ @ref R59_0"""
+    def apply_order(self, cursor: Any, order: dict[str, Any], sign: int = 1) -> None:
+        """
+        @brief Orders aggregate interface: records the log entry of an order committed by the worker in the same transaction.
+        Orders inserted by other threads are ignored, so clients cannot move the checkpoint.
+        @param cursor: The cursor of the transaction writing the order.
+        @param order: The order; orders of the worker carry their 'queue_seq'.
+        @param sign: 1 when the order is inserted, -1 when it is deleted.
+        """
+
+        if sign > 0 and threading.current_thread() is self._thread and 'queue_seq' in order:
+            cursor.execute(self.checkpoint_upsert, (self.name, order['queue_seq']))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        @brief Waits until every enqueued order is committed or rejected.
+        @param timeout: The most seconds to wait, or None to wait indefinitely.
+        @return True if no order is pending.
+        """
+
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending, timeout)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        @brief Reports the queue counters.
+        @return A dictionary with 'pending', 'max_pending', 'log_bytes' and the 'enqueued', 'committed', 'rejected', 'refused' (QueueFull),
+        'replayed', 'batches' and 'failures' totals.
+        """
+
+        with self._condition:
+            log_bytes = self._log.tell() if self._log is not None else 0
+            return dict(self._counts, pending=len(self._pending), max_pending=self.max_pending, log_bytes=log_bytes)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        @brief Stops the worker once its current batch is done; orders still pending stay in the log and are replayed by the next start().
+        @param wait: If True, waits for the worker to stop.
+        """
+
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if wait and self._thread is not None:
+            self._thread.join()
+            with self._condition:
+                if self._log is not None:
+                    self._log.close()
+                    self._log = None
+
+    def _work(self) -> None:
+        """
+        @brief Worker thread loop: commits the pending orders in batches until shutdown() is called.
+        Orders arriving while a batch is committed wait for the next batch, so batches grow with the load (group commit).
+        A batch failing because of one of its orders (ENTRY_ERRORS) is split and its orders are committed one by one, so only the offending order is rejected;
+        any other failure, e.g. a lost connection, is retried with exponential backoff.
+        """
+
+        delay = self.retry_delay
+        isolate_until = 0  # The entries up to this sequence number are committed one at a time
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._stopped)
+                if self._stopped:
+                    return
+                batch = list(islice(self._pending, 1 if self._pending[0][0] <= isolate_until else self.batch_size))
+            try:
+                results = self.orders.insert_new_orders([dict(order, queue_seq=seq) for seq, order in batch])
+            except ENTRY_ERRORS as error:
+                if len(batch) > 1:
+                    isolate_until = batch[-1][0]  # Retries the orders of the batch one at a time to find the offending one
+                    continue
+                results = [{'success': False, 'message': 'Invalid order: %s: %s' % (type(error).__name__, error)}]
+            except Exception:  # E.g. the database is unreachable; the batch stays queued and is retried
+                with self._condition:
+                    self._counts['failures'] += 1
+                    self._condition.wait_for(lambda: self._stopped, delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            finally:
+                self.orders.connection.release()  # The pool may hand the connection to requests between batches
+            if not results[-1]['success']:
+                self._write_checkpoint(batch[-1][0])  # Rejected entries are not replayed after a restart
+            delay = self.retry_delay
+            with self._condition:
+                for (seq, _), result in zip(batch, results):
+                    self._pending.popleft()
+                    if result['success']:
+                        self._results[seq] = {'status': 'committed', 'order_id': result['order_id']}
+                        self._counts['committed'] += 1
+                    else:
+                        self._results[seq] = {'status': 'rejected', 'message': result['message']}
+                        self._counts['rejected'] += 1
+                while len(self._results) > self.max_results:
+                    self._results.popitem(last=False)
+                self._counts['batches'] += 1
+                if not self._pending and self._log.tell() >= self.compact_bytes:
+                    # Every entry is committed or rejected, so the log can start over; the checkpoint keeps the numbering
+                    self._log.truncate(0)
+                    self._log.seek(0)
+                    if self.fsync:
+                        os.fsync(self._log.fileno())
+                self._condition.notify_all()
+
+    def _write_checkpoint(self, seq: int) -> None:
+        """
+        @brief Records that the log entries up to seq are done when the last of them was rejected, so no committed order carried the checkpoint.
+        @param seq: The sequence number of the last entry of the batch.
+        """
+
+        try:
+            cursor = self.orders.connection.cursor(prepared=True)
+            cursor.execute(self.checkpoint_upsert, (self.name, seq))
+            self.orders.connection.commit()
+        except Exception:  # The batch is settled either way; at worst its rejected entries are rejected again after a restart
+            pass
+        finally:
+            self.orders.connection.release()
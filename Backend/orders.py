@@ -1,23 +1,63 @@
+import math
 from datetime import datetime
-from typing import Any
+from typing import Any, Callable, Iterator, Optional
+from Backend.retry import retry_on_disconnect
 #from contracts import contract, pre, post
 
 """ @ref R57_0"""
 # This Class is part of the @ref Model within the overall @ref ModelViewController Design.
 # This class implements the methods related to orders.
 class Orders:
-    def __init__(self, connection) -> None:
+    # Most bound parameters per multi-row statement, within the limit of older SQLite versions
+    MAX_INSERT_PARAMS = 999
+    MAX_CUSTOMER_NAME_LENGTH = 100  # Length of the orders.customer_name column
+    # Joins an order header to its line items and their product names; a LEFT JOIN keeps orders without details and details of deleted products
+    ORDER_WITH_DETAILS_QUERY = (
+        "SELECT o.order_id, o.customer_name, o.total_amount, o.datetime, od.product_id, p.name, od.quantity, od.total_price "
+        "FROM orders o "
+        "LEFT JOIN order_details od ON od.order_id = o.order_id "
+        "LEFT JOIN products p ON p.product_id = od.product_id "
+    )
+
+    def __init__(self, connection, aggregates: Optional[list] = None, pricing: Optional[Any] = None) -> None:
         """
         @brief Constructor for the Orders class.   
         Initializes an instance of the Orders class with the provided database connection object.
         @param connection: The database connection object.
+        @param aggregates: Optional objects maintaining derived tables such as the sales rollups; each has an apply_order(cursor, order, sign) method, called in the transaction inserting (sign 1) or deleting (sign -1) an order.
+        @param pricing: An optional PriceTable; if given, the line totals and the order total of new orders are computed from the product prices instead of taken from the client.
         """
 
         self.connection = connection
+        self.aggregates = aggregates or []
+        self.pricing = pricing
+        # Callables notified after an order change is committed
+        self.listeners = []
+
+    """ @ref R57_0"""
+    def subscribe(self, listener: Callable[[str, dict[str, Any]], None]) -> None:
+        """
+        @brief Registers a callable notified after every committed order insert or delete, e.g. to invalidate caches.
+        @param listener: Called with the event, 'inserted' or 'deleted', and the order as a dictionary with 'order_id', 'customer_name', 'total_amount', 'datetime' and 'order_details'.
+        """
+
+        self.listeners.append(listener)
+
+    """ @ref R57_0"""
+    def _notify(self, event: str, order: dict[str, Any]) -> None:
+        """
+        @brief Calls the registered listeners with a committed order change.
+        @param event: 'inserted' or 'deleted'.
+        @param order: The changed order.
+        """
+
+        for listener in self.listeners:
+            listener(event, order)
 
     #@contract
     #@post(lambda result: isinstance(result, list))
     """ @ref R57_0"""
+    @retry_on_disconnect()
     def get_all_orders(self) -> list:
         """
         @brief Retrieves all orders from the database.
@@ -27,26 +67,72 @@ class Orders:
         @post The orders_list list is populated with dictionaries representing all orders from the "orders" table.
         """
 
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor()
+        # Collect the streamed orders into the response list
+        return list(self.iter_all_orders())
+
+    """ @ref R57_0"""
+    def iter_all_orders(self) -> Iterator[dict[str, Any]]:
+        """
+        @brief Streams all orders from the database one row at a time.
+        Rows are read from an unbuffered cursor as the caller consumes them, so memory use does not grow with the order history.
+        @pre The database connection must be established and valid.
+        @return An iterator of dictionaries with 'order_id', 'customer_name', 'total_amount', and 'datetime'.
+        @post The cursor holds no unread rows once the iterator is exhausted.
+        """
+
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
         # SQL query to retrieve all columns and rows from the "orders" table.
         query = (
             "SELECT * FROM orders")
         # Execute the SQL query using the cursor
         cursor.execute(query)
-        # Initialize an empty list to store the query response
-        orders_list = []
-        # Iterate over the result set returned by the query and append each row to the response list as a dictionary
+        # Yield each row of the result set as a dictionary while it is read from the server
         for (order_id, customer_name, total_amount, dt) in cursor:
-            orders_list.append({
+            yield {
                 'order_id': order_id,
                 'customer_name': customer_name,
                 'total_amount': total_amount,
                 'datetime': dt,
-            })
-        # Return the response list
-        return orders_list
+            }
     
+    #@contract
+    #@pre(lambda limit: isinstance(limit, int) and limit > 0)
+    #@post(lambda result: isinstance(result, dict))
+    """ @ref R57_0"""
+    @retry_on_disconnect()
+    def get_orders_page(self, limit: int, after: Optional[int] = None) -> dict[str, Any]:
+        """
+        @brief Retrieves one page of orders ordered by order_id using keyset pagination.
+        The page starts right after the given order_id, so its cost depends only on the page size and not on how deep the client has paged, unlike OFFSET.
+        @param limit: The maximum number of orders on the page.
+        @param after: The order_id of the last order of the previous page, or None for the first page.
+        @pre The database connection must be established and valid.
+        @return A dictionary with 'orders', the list of order dictionaries as returned by get_all_orders, and 'next_cursor', the value to pass as 'after' for the next page or None on the last page.
+        @post At most limit orders with an order_id greater than after are returned in ascending order_id order.
+        """
+
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
+        # SQL query seeking past the previous page on the primary key; one extra row tells whether another page follows
+        query = (
+            "SELECT order_id, customer_name, total_amount, datetime FROM orders "
+            "WHERE order_id > %s ORDER BY order_id LIMIT %s"
+        )
+        # Execute the SQL query starting after the given cursor
+        cursor.execute(query, (after if after is not None else 0, limit + 1))
+        rows = cursor.fetchall()
+        # Create a list of dictionaries for the rows of this page
+        orders_list = [{
+            'order_id': order_id,
+            'customer_name': customer_name,
+            'total_amount': total_amount,
+            'datetime': dt,
+        } for (order_id, customer_name, total_amount, dt) in rows[:limit]]
+        # The cursor of the next page is the last order_id of this page, if more rows exist
+        next_cursor = orders_list[-1]['order_id'] if len(rows) > limit else None
+        return {'orders': orders_list, 'next_cursor': next_cursor}
+
     #@contract
     #@pre(lambda order: isinstance(order, dict))
     #@post(lambda result: isinstance(result, int))
@@ -59,16 +145,21 @@ class Orders:
         @pre The database connection must be established and valid.
         @return The ID of the newly inserted order.
         @post A new order and its associated order details are inserted into the "orders" and "order_details" tables respectively. The 'order_id' of the new order is returned.
+        With server-side pricing, 'total_amount' and 'total_price' are computed and ValueError is raised for unknown products or invalid quantities.
         """
 
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor()
+        if self.pricing is not None:
+            # Replace the client's totals with the ones of the current prices
+            order = self.pricing.price_order(order)
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
         # SQL query to insert data into the 'orders' table
         query = ("INSERT INTO orders "
                  "(customer_name, total_amount, datetime)"
                  "VALUES (%s, %s, %s)")
         # Data to be inserted into the table
-        data = (order['customer_name'], order['total_amount'], datetime.now())
+        order_datetime = datetime.now()
+        data = (order['customer_name'], order['total_amount'], order_datetime)
 
         # Execute the SQL query with the provided data
         cursor.execute(query, data)
@@ -90,16 +181,146 @@ class Orders:
         ])
         # Execute the SQL query 'order_details_query' using the 'cursor' object's 'executemany' method.
         cursor.executemany(order_details_query, order_details_data)
+        inserted_order = dict(order, order_id=order_id, datetime=order_datetime)
+        # Update the derived tables in the same transaction
+        for aggregate in self.aggregates:
+            aggregate.apply_order(cursor, inserted_order, 1)
         # Commit the changes to the database
         self.connection.commit()
-        # Return the last inserted row ID
-        #return order_id
-        return cursor.lastrowid
+        self._notify('inserted', inserted_order)
+        # Return the ID of the inserted order; lastrowid now refers to the statements executed after the order insert
+        return order_id
     
+    #@contract
+    #@pre(lambda orders: isinstance(orders, list))
+    #@post(lambda result: isinstance(result, list))
+    """ @ref R59_0"""
+    def insert_new_orders(self, orders: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        @brief Inserts a batch of orders, e.g. synchronized by a terminal that was offline, in one transaction.
+        The orders and their order details are written with multi-row INSERT statements and committed once, instead of one round trip and commit per row and order.
+        Orders that are malformed or reference unknown products are rejected individually; the other orders are inserted.
+        With server-side pricing, each order is priced before it is checked.
+        @param orders: A list of order dictionaries in the format accepted by insert_new_order.
+        @pre The database connection must be established and valid.
+        @return One result per order, in the order given: a dictionary with 'index', 'success' and either 'order_id' or 'message'.
+        @post Either all accepted orders with their order details are committed, or, if a statement fails, none are and the error is raised.
+        """
+
+        results = [None] * len(orders)
+        accepted = []
+        for index, order in enumerate(orders):
+            try:
+                accepted.append((index, self.validate_order(order)))
+            except (KeyError, TypeError, ValueError) as error:
+                results[index] = {'index': index, 'success': False, 'message': 'Invalid order: %s' % error}
+        # Create a cursor object; the statements vary with the batch size, so they are not cached as prepared statements
+        cursor = self.connection.cursor()
+        product_ids = sorted({detail['product_id'] for _, order in accepted for detail in order['order_details']})
+        known_products = set()
+        for chunk in self._chunks(product_ids, self.MAX_INSERT_PARAMS):
+            # Look the referenced products up at once, so one unknown product rejects only its own order
+            cursor.execute("SELECT product_id FROM products WHERE product_id IN (%s)" % ', '.join(['%s'] * len(chunk)), tuple(chunk))
+            known_products.update(product_id for (product_id,) in cursor.fetchall())
+        valid = []
+        for index, order in accepted:
+            unknown = sorted({detail['product_id'] for detail in order['order_details']} - known_products)
+            if unknown:
+                results[index] = {'index': index, 'success': False, 'message': 'Unknown product_id %s.' % ', '.join(map(str, unknown))}
+            else:
+                valid.append((index, order))
+
+        order_datetime = datetime.now()
+        inserted_orders = []
+        try:
+            for chunk in self._chunks(valid, self.MAX_INSERT_PARAMS // 3):
+                # One INSERT for the orders of the chunk
+                cursor.execute("INSERT INTO orders (customer_name, total_amount, datetime) VALUES " + ', '.join(['(%s, %s, %s)'] * len(chunk)),
+                               tuple(value for _, order in chunk for value in (order['customer_name'], order['total_amount'], order_datetime)))
+                first_id = self.connection.first_insert_id(cursor, len(chunk))
+                for offset, (index, order) in enumerate(chunk):
+                    inserted_orders.append(dict(order, order_id=first_id + offset, datetime=order_datetime))
+                    results[index] = {'index': index, 'success': True, 'order_id': first_id + offset}
+            details = [(order['order_id'], detail['product_id'], detail['quantity'], detail['total_price'])
+                       for order in inserted_orders for detail in order['order_details']]
+            for chunk in self._chunks(details, self.MAX_INSERT_PARAMS // 4):
+                # One INSERT for the order details of many orders
+                cursor.execute("INSERT INTO order_details (order_id, product_id, quantity, total_price) VALUES "
+                               + ', '.join(['(%s, %s, %s, %s)'] * len(chunk)), tuple(value for row in chunk for value in row))
+            # Update the derived tables in the same transaction
+            for aggregate in self.aggregates:
+                for inserted_order in inserted_orders:
+                    aggregate.apply_order(cursor, inserted_order, 1)
+            # Commit the whole batch at once
+            self.connection.commit()
+        except Exception:
+            # Leave no partial batch behind
+            self.connection.rollback()
+            raise
+        for inserted_order in inserted_orders:
+            self._notify('inserted', inserted_order)
+        return results
+
+    """ @ref R59_0"""
+    def validate_order(self, order: Any) -> dict[str, Any]:
+        """
+        @brief Checks an order without the database, pricing it first when server-side pricing is enabled; e.g. before an order is queued.
+        @param order: The order in the format accepted by insert_new_order.
+        @return The order as insert_new_orders writes it, see _normalize_order.
+        @post Raises KeyError, TypeError or ValueError if the order is malformed; unknown products are only detected when it is inserted.
+        """
+
+        if not isinstance(order, dict):
+            raise TypeError('an order must be a JSON object')
+        return self._normalize_order(self.pricing.price_order(order) if self.pricing is not None else order)
+
+    @staticmethod
+    def _normalize_order(order: dict[str, Any]) -> dict[str, Any]:
+        """
+        @brief Checks an order of a batch and converts its values to the column types.
+        Everything the database would refuse is rejected here, so a bad order fails on its own instead of rolling back its batch.
+        @param order: The order in the format accepted by insert_new_order.
+        @return A copy of the order with a non-empty 'customer_name', a float 'total_amount' and 'order_details' with int 'product_id' and float 'quantity' and 'total_price'.
+        @post Raises KeyError, TypeError or ValueError if the order is malformed, including non-finite numbers and a product_id listed twice.
+        """
+
+        customer_name = order['customer_name']
+        if not isinstance(customer_name, str) or not customer_name.strip():
+            raise ValueError('customer_name must be a non-empty string')
+        if len(customer_name) > Orders.MAX_CUSTOMER_NAME_LENGTH:
+            raise ValueError('customer_name must be at most %d characters' % Orders.MAX_CUSTOMER_NAME_LENGTH)
+        details = order['order_details']
+        if not isinstance(details, list):
+            raise TypeError('order_details must be a list')
+        normalized_details = [{
+            'product_id': int(detail['product_id']),
+            'quantity': float(detail['quantity']),
+            'total_price': float(detail['total_price']),
+        } for detail in details]
+        total_amount = float(order['total_amount'])
+        # json.loads accepts NaN and Infinity, which the database refuses
+        if not all(math.isfinite(value) for value in [total_amount] + [detail[column] for detail in normalized_details for column in ('quantity', 'total_price')]):
+            raise ValueError('total_amount, quantity and total_price must be finite numbers')
+        product_ids = [detail['product_id'] for detail in normalized_details]
+        if len(set(product_ids)) < len(product_ids):
+            # order_details is keyed by (order_id, product_id)
+            raise ValueError('each product_id may appear only once per order')
+        return dict(order, customer_name=customer_name, total_amount=total_amount, order_details=normalized_details)
+
+    @staticmethod
+    def _chunks(items: list, size: int) -> Iterator[list]:
+        """
+        @brief Splits a list into consecutive slices of at most size items.
+        """
+
+        for start in range(0, len(items), size):
+            yield items[start:start + size]
+
     #@contract
     #@pre(lambda order: isinstance(order, dict))
     #@post(lambda result: isinstance(result, dict))
     """ @ref R58_0"""
+    @retry_on_disconnect()
     def get_order_by_id(self, order_id: int) -> dict[str, Any]:
         """
         @brief Retrieves an order from the database by its order ID.
@@ -110,8 +331,8 @@ class Orders:
         @post The order dictionary is populated with the details of the order retrieved from the "orders" table based on the provided order_id.
         """
 
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor()
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
         # SQL query to retrieve a specific order by its ID
         query = (
             "SELECT * FROM orders WHERE order_id = %s"
@@ -129,7 +350,69 @@ class Orders:
             'datetime': result[3],
         }
         return order
-    
+
+    #@contract
+    #@pre(lambda order_id: isinstance(order_id, int))
+    """ @ref R58_0"""
+    @retry_on_disconnect()
+    def get_order_with_details(self, order_id: int) -> Optional[dict[str, Any]]:
+        """
+        @brief Retrieves an order with its order details and their product names in one query.
+        @param order_id: The ID of the order to retrieve.
+        @pre The database connection must be established and valid.
+        @return A dictionary with 'order_id', 'customer_name', 'total_amount', 'datetime' and 'order_details', a list of dictionaries with
+        'product_id', 'product_name', 'quantity' and 'total_price' ordered by product_id; None if the order does not exist.
+        """
+
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
+        cursor.execute(self.ORDER_WITH_DETAILS_QUERY + "WHERE o.order_id = %s ORDER BY od.product_id", (order_id,))
+        orders = self._group_order_rows(cursor.fetchall())
+        return orders[0] if orders else None
+
+    #@contract
+    #@pre(lambda order_ids: isinstance(order_ids, list))
+    #@post(lambda result: isinstance(result, list))
+    """ @ref R58_0"""
+    @retry_on_disconnect()
+    def get_orders_by_ids(self, order_ids: list[int]) -> list[dict[str, Any]]:
+        """
+        @brief Retrieves many orders with their order details at once, instead of one query per order.
+        The orders are read with one IN (...) query per MAX_INSERT_PARAMS ids and their order details are grouped in memory.
+        @param order_ids: The IDs of the orders to retrieve; duplicates are read once.
+        @pre The database connection must be established and valid.
+        @return The orders in the format of get_order_with_details, in the order of their first ID in order_ids; IDs of missing orders are skipped.
+        """
+
+        unique_ids = list(dict.fromkeys(int(order_id) for order_id in order_ids))
+        # Create a cursor object; the statements vary with the number of ids, so they are not cached as prepared statements
+        cursor = self.connection.cursor()
+        orders_by_id = {}
+        for chunk in self._chunks(unique_ids, self.MAX_INSERT_PARAMS):
+            cursor.execute(self.ORDER_WITH_DETAILS_QUERY + "WHERE o.order_id IN (%s) ORDER BY o.order_id, od.product_id"
+                           % ', '.join(['%s'] * len(chunk)), tuple(chunk))
+            for order in self._group_order_rows(cursor.fetchall()):
+                orders_by_id[order['order_id']] = order
+        return [orders_by_id[order_id] for order_id in unique_ids if order_id in orders_by_id]
+
+    @staticmethod
+    def _group_order_rows(rows: list[tuple]) -> list[dict[str, Any]]:
+        """
+        @brief Groups the joined rows of ORDER_WITH_DETAILS_QUERY, sorted by order_id, into one dictionary per order.
+        @param rows: Rows of order_id, customer_name, total_amount, datetime, product_id, product name, quantity and total_price.
+        @return The orders in the order of the rows, each with its 'order_details'.
+        """
+
+        orders = []
+        for (order_id, customer_name, total_amount, dt, product_id, product_name, quantity, total_price) in rows:
+            if not orders or orders[-1]['order_id'] != order_id:
+                orders.append({'order_id': order_id, 'customer_name': customer_name, 'total_amount': total_amount,
+                               'datetime': dt, 'order_details': []})
+            if product_id is not None:  # An order without details joins to one row of NULLs
+                orders[-1]['order_details'].append({'product_id': product_id, 'product_name': product_name,
+                                                    'quantity': quantity, 'total_price': total_price})
+        return orders
+
     #@contract
     #@pre(lambda order: isinstance(order, dict))
     #@post(lambda result: isinstance(result, int))
@@ -144,8 +427,11 @@ class Orders:
         @post The order with the given order_id is deleted from the "orders" table. If the order exists and is deleted successfully, the method returns True. Otherwise, it returns False.
         """
         
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor()
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
+
+        # Read the order before it is deleted, so the derived tables can subtract it and listeners learn its date
+        deleted_order = self._read_order_with_details(cursor, order_id) if self.aggregates or self.listeners else None
 
         # Disable foreign key checks
         disable_fk_query = "SET FOREIGN_KEY_CHECKS = 0"
@@ -165,10 +451,35 @@ class Orders:
         enable_fk_query = "SET FOREIGN_KEY_CHECKS = 1"
         cursor.execute(enable_fk_query)
 
+        # Update the derived tables in the same transaction, once per actually deleted order
+        if is_order_deleted and deleted_order is not None:
+            for aggregate in self.aggregates:
+                aggregate.apply_order(cursor, deleted_order, -1)
+
         # Commit the changes to the database
         self.connection.commit()
+        if is_order_deleted and deleted_order is not None:
+            self._notify('deleted', deleted_order)
 
         return is_order_deleted
+
+    """ @ref R69_0"""
+    def _read_order_with_details(self, cursor: Any, order_id: int) -> Optional[dict[str, Any]]:
+        """
+        @brief Reads an order and its order details in the format accepted by insert_new_order.
+        @param cursor: The cursor of the current transaction.
+        @param order_id: The ID of the order.
+        @return A dictionary with 'order_id', 'customer_name', 'total_amount', 'datetime' and 'order_details', or None if the order does not exist.
+        """
+
+        cursor.execute("SELECT customer_name, total_amount, datetime FROM orders WHERE order_id = %s", (order_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        cursor.execute("SELECT product_id, quantity, total_price FROM order_details WHERE order_id = %s", (order_id,))
+        details = [{'product_id': product_id, 'quantity': quantity, 'total_price': total_price}
+                   for (product_id, quantity, total_price) in cursor.fetchall()]
+        return {'order_id': order_id, 'customer_name': row[0], 'total_amount': row[1], 'datetime': row[2], 'order_details': details}
     
     #@contract
     #@pre(lambda order: isinstance(order, dict))
@@ -185,8 +496,8 @@ class Orders:
         @post The amount of the order with the given order_id is updated in the "orders" table. If the order with the specified order_id exists and the amount is successfully updated, the method returns True. Otherwise, it returns False.
         """
         
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor()
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
 
         # SQL query to update the amount into the 'orders' table
         query = "UPDATE orders SET amount = %s WHERE order_id = %s"
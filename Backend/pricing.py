@@ -0,0 +1,136 @@
+import math
+import threading
+import time
+from typing import Any, Callable
+from Backend.analytics import np
+
+
+""" @ref R59_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class keeps the price_per_unit of every product in memory and prices orders from it, so clients need not send line totals.
+class PriceTable:
+    def __init__(self, connection, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        @brief Constructor for the PriceTable class; the prices are loaded on first use.
+        With NumPy the prices are held in an array indexed by product_id and a basket is priced in one vectorized pass; without it, line by line.
+        @param connection: The database connection object.
+        @param ttl: The number of seconds after which the prices are reloaded, which picks up changes made by other server processes.
+        @param clock: The time source, replaceable in tests.
+        """
+
+        self.connection = connection
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        # price_per_unit by product_id: a float array with NaN for missing products, or a dictionary without NumPy
+        self._prices = None
+        self._loaded_at = None
+        self._loads = 0
+        self._updates = 0
+
+    """ @ref R8_0"""
+    def on_product_changed(self, event: str, product: dict[str, Any]) -> None:
+        """
+        @brief Listener for Products.subscribe(): applies inserted and updated prices and forgets deleted products.
+        @param event: 'inserted', 'updated' or 'deleted'.
+        @param product: The changed product with its 'product_id' and, unless deleted, usually its 'price_per_unit'.
+        """
+
+        with self._lock:
+            if self._prices is None:
+                return
+            product_id = int(product['product_id'])
+            price = float(product['price_per_unit']) if event != 'deleted' and 'price_per_unit' in product else None
+            if event != 'deleted' and price is None:
+                return
+            self._updates += 1
+            if np is None:
+                if price is None:
+                    self._prices.pop(product_id, None)
+                else:
+                    self._prices[product_id] = price
+                return
+            if product_id >= len(self._prices):
+                if price is None:
+                    return
+                # Grow the array, keeping room for the products inserted next
+                grown = np.full(max(product_id + 1, 2 * len(self._prices)), np.nan)
+                grown[:len(self._prices)] = self._prices
+                self._prices = grown
+            self._prices[product_id] = np.nan if price is None else price
+
+    """ @ref R59_0"""
+    def price_order(self, order: dict[str, Any]) -> dict[str, Any]:
+        """
+        @brief Computes the line totals and the order total of an order from the current prices.
+        @param order: The order with 'order_details', a list of dictionaries with 'product_id' and 'quantity'; any client totals are replaced.
+        @return A copy of the order whose order details carry 'total_price' = quantity * price_per_unit and whose 'total_amount' is their sum, both rounded to cents.
+        @post Raises ValueError for unknown products or quantities that are not positive numbers, KeyError or TypeError for malformed orders.
+        """
+
+        details = order['order_details']
+        if not isinstance(details, list):
+            raise TypeError('order_details must be a list')
+        product_ids = [int(detail['product_id']) for detail in details]
+        quantities = [float(detail['quantity']) for detail in details]
+        if not all(math.isfinite(quantity) and quantity > 0 for quantity in quantities):
+            raise ValueError('quantities must be positive numbers')
+        prices = self._current_prices()
+        if np is None:
+            unknown = sorted({product_id for product_id in product_ids if product_id not in prices})
+            line_totals = [] if unknown else [round(quantity * prices[product_id], 2) for product_id, quantity in zip(product_ids, quantities)]
+        else:
+            ids = np.array(product_ids, dtype=np.int64)
+            in_range = (ids >= 0) & (ids < len(prices))
+            unit_prices = np.full(len(ids), np.nan)
+            unit_prices[in_range] = prices[ids[in_range]]
+            unknown = sorted(set(ids[np.isnan(unit_prices)].tolist()))
+            line_totals = np.round(unit_prices * np.array(quantities), 2).tolist()
+        if unknown:
+            raise ValueError('Unknown product_id %s.' % ', '.join(map(str, unknown)))
+        return dict(order, total_amount=round(sum(line_totals), 2), order_details=[
+            dict(detail, total_price=line_total) for detail, line_total in zip(details, line_totals)])
+
+    def invalidate(self) -> None:
+        """
+        @brief Drops the prices so the next order reloads them from the database.
+        """
+
+        with self._lock:
+            self._prices = None
+
+    def stats(self) -> dict[str, Any]:
+        """
+        @brief Reports the price table counters.
+        @return A dictionary with the number of priced 'products', 'loads', applied 'updates' and whether pricing is 'vectorized'.
+        """
+
+        with self._lock:
+            if self._prices is None:
+                products = 0
+            else:
+                products = len(self._prices) if np is None else int(np.count_nonzero(~np.isnan(self._prices)))
+            return {'products': products, 'loads': self._loads, 'updates': self._updates, 'vectorized': np is not None}
+
+    def _current_prices(self) -> Any:
+        """
+        @brief Returns the price table, loading it when it is missing or older than the time to live.
+        @return The price array or dictionary; listeners only set single entries or swap in a grown array, so the caller may read it without the lock.
+        """
+
+        with self._lock:
+            if self._prices is not None and self.clock() - self._loaded_at < self.ttl:
+                return self._prices
+            cursor = self.connection.cursor(prepared=True)
+            cursor.execute("SELECT product_id, price_per_unit FROM products")
+            rows = cursor.fetchall()
+            if np is None:
+                self._prices = {product_id: float(price) for product_id, price in rows}
+            else:
+                prices = np.full(2 * (max((row[0] for row in rows), default=0) + 1), np.nan)
+                for product_id, price in rows:
+                    prices[product_id] = price
+                self._prices = prices
+            self._loaded_at = self.clock()
+            self._loads += 1
+            return self._prices
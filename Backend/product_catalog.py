@@ -0,0 +1,191 @@
+import bisect
+import threading
+import time
+import uuid
+from typing import Any, Callable, Iterable, Optional
+from Backend.search_index import ProductSearchIndex
+
+
+""" @ref R6_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class is one immutable state of the product catalog; readers keep using it while writers publish a new one.
+class CatalogSnapshot:
+    def __init__(self, products: Iterable[dict[str, Any]], version: int, loaded_at: float) -> None:
+        """
+        @brief Constructor for the CatalogSnapshot class.
+        @param products: The product dictionaries in the format returned by Products.get_all_products.
+        @param version: The catalog version this state belongs to.
+        @param loaded_at: The clock time the products were read from the database.
+        """
+
+        self.by_id = {product['product_id']: product for product in products}
+        # Sorted product ids, so listings keep the primary key order and pages are found by bisection
+        self.ids = sorted(self.by_id)
+        self.products = [self.by_id[product_id] for product_id in self.ids]
+        # Maps each name to the product with the lowest id carrying it, matching the first row the database returns
+        self.by_name = {}
+        for product in reversed(self.products):
+            self.by_name[product['name']] = product
+        self.version = version
+        self.loaded_at = loaded_at
+        self._search_index = None
+
+    @property
+    def search_index(self) -> ProductSearchIndex:
+        """
+        @brief Returns the name search index of this snapshot, building it on first use.
+        A write publishes a new snapshot, so the index always matches the products it is served with.
+        Two threads may build it concurrently; both results are equal and the last one is kept.
+        @return The search index over the products of this snapshot.
+        """
+
+        if self._search_index is None:
+            self._search_index = ProductSearchIndex(self.products)
+        return self._search_index
+
+    def page(self, limit: int, after: Optional[int] = None) -> dict[str, Any]:
+        """
+        @brief Returns one keyset page of products, in the format of Products.get_products_page.
+        @param limit: The maximum number of products on the page.
+        @param after: The product_id of the last product of the previous page, or None for the first page.
+        @return A dictionary with 'products' and 'next_cursor'.
+        """
+
+        start = bisect.bisect_right(self.ids, after) if after is not None else 0
+        page = self.products[start:start + limit]
+        next_cursor = page[-1]['product_id'] if start + limit < len(self.products) else None
+        return {'products': page, 'next_cursor': next_cursor}
+
+
+""" @ref R6_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class keeps the whole product catalog in memory, indexed by id and name, and versions every change to it.
+class ProductCatalog:
+    def __init__(self, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        @brief Constructor for the ProductCatalog class.
+        @param ttl: The number of seconds the catalog is served before it is reloaded, which picks up changes made by other server processes.
+        @param clock: The time source, replaceable in tests.
+        """
+
+        self.ttl = ttl
+        self.clock = clock
+        # Distinguishes the versions of this process from those of a previous run, which also started counting at zero
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._loads = 0
+
+    def snapshot(self, loader: Callable[[], Iterable[dict[str, Any]]]) -> CatalogSnapshot:
+        """
+        @brief Returns the current catalog, loading it when it is missing or older than the time to live.
+        The loader runs outside the lock; if a write happens meanwhile the loaded rows are served once but not kept, since they may predate the write.
+        @param loader: A callable returning all products from the database.
+        @return The catalog snapshot; callers must not modify it or its product dictionaries.
+        """
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and self.clock() - snapshot.loaded_at < self.ttl:
+                self._hits += 1
+                return snapshot
+            self._loads += 1
+            started_version = self.version
+        loaded_at = self.clock()
+        rows = list(loader())
+        snapshot = CatalogSnapshot(rows, started_version, loaded_at)
+        with self._lock:
+            if self.version != started_version:
+                return snapshot
+            # A reload returning unchanged products keeps the version, so clients need not fetch them again
+            if self._snapshot is None or self._snapshot.products != snapshot.products:
+                self.version += 1
+                snapshot.version = self.version
+            self._snapshot = snapshot
+            return snapshot
+
+    def etag(self) -> Optional[str]:
+        """
+        @brief Returns an entity tag identifying the catalog contents, for conditional requests.
+        @return The tag, or None when the catalog is not loaded or has expired and its contents are therefore unknown.
+        """
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or self.clock() - snapshot.loaded_at >= self.ttl:
+                return None
+            return '%s-%d' % (self.epoch, snapshot.version)
+
+    def put(self, product: dict[str, Any]) -> None:
+        """
+        @brief Adds or replaces a product after it was written to the database.
+        @param product: The product dictionary, including its 'product_id'.
+        @post The catalog version is incremented.
+        """
+
+        self._apply(lambda by_id: by_id.__setitem__(product['product_id'], product))
+
+    def update_price(self, product_id: int, price_per_unit: float) -> None:
+        """
+        @brief Changes the price of a cached product after it was updated in the database.
+        @param product_id: The ID of the updated product.
+        @param price_per_unit: The new price.
+        @post The catalog version is incremented.
+        """
+
+        def update(by_id: dict[int, dict[str, Any]]) -> None:
+            if product_id in by_id:
+                # Copy the dictionary, as readers of the previous snapshot may still hold the old one
+                by_id[product_id] = dict(by_id[product_id], price_per_unit=price_per_unit)
+
+        self._apply(update)
+
+    def remove(self, product_id: int) -> None:
+        """
+        @brief Drops a product after it was deleted from the database.
+        @param product_id: The ID of the deleted product.
+        @post The catalog version is incremented.
+        """
+
+        self._apply(lambda by_id: by_id.pop(product_id, None))
+
+    def invalidate(self) -> None:
+        """
+        @brief Drops the whole catalog, e.g. when a change cannot be applied in memory.
+        @post The catalog version is incremented and the next read reloads all products.
+        """
+
+        with self._lock:
+            self.version += 1
+            self._snapshot = None
+
+    def _apply(self, change: Callable[[dict[int, dict[str, Any]]], Any]) -> None:
+        """
+        @brief Publishes a new snapshot with a change applied to a copy of the product index.
+        @param change: A callable modifying the product_id -> product dictionary in place.
+        """
+
+        with self._lock:
+            self.version += 1
+            if self._snapshot is None:
+                # Nothing is cached; the version bump alone makes in-flight loads discard their rows
+                return
+            by_id = dict(self._snapshot.by_id)
+            change(by_id)
+            self._snapshot = CatalogSnapshot(by_id.values(), self.version, self._snapshot.loaded_at)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        @brief Reports the catalog counters.
+        @return A dictionary with 'version', 'products', 'hits' and 'loads'.
+        """
+
+        with self._lock:
+            return {
+                'version': self.version,
+                'products': len(self._snapshot.products) if self._snapshot is not None else 0,
+                'hits': self._hits,
+                'loads': self._loads,
+            }
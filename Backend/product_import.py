@@ -0,0 +1,177 @@
+import argparse
+import csv
+import math
+import os
+import sys
+from typing import Any, Iterable, Optional
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.products import Products
+from Backend.storage import add_backend_arguments, connection_from_arguments
+from Backend.unit_of_measures import UnitOfMeasures
+
+
+""" @ref R7_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class loads a supplier catalog from CSV: it validates the rows as they are read and upserts them in chunks of one transaction each.
+class ProductImport:
+    REQUIRED_COLUMNS = ('name', 'unit_of_measure_id', 'price_per_unit')  # The optional column is category_id
+    MAX_NAME_LENGTH = 100  # Length of the products.name column
+    MAX_REPORTED_ERRORS = 1000  # Most rejected rows listed in the report; all of them are counted
+
+    def __init__(self, products: Products, unit_of_measures: UnitOfMeasures, chunk_size: int = 1000) -> None:
+        """
+        @brief Constructor for the ProductImport class.
+        @param products: The Products model writing the chunks.
+        @param unit_of_measures: The unit of measures the rows are validated against.
+        @param chunk_size: The number of valid rows upserted and committed together.
+        """
+
+        self.products = products
+        self.unit_of_measures = unit_of_measures
+        self.chunk_size = chunk_size
+
+    # @contract
+    # @post(lambda result: isinstance(result, dict))
+    """ @ref R7_0"""
+    def import_csv(self, lines: Iterable[str]) -> dict[str, Any]:
+        """
+        @brief Imports the products of a CSV file; the file is read one row at a time, so memory use depends on the chunk size only.
+        A chunk whose statements fail is rolled back and its rows are reported as rejected; the chunks before it stay committed.
+        @param lines: The lines of the CSV file, e.g. an open text file; the header row names the columns.
+        @pre The database connection must be established and valid.
+        @return A dictionary with the number of data 'rows', 'inserted', 'updated' and 'rejected' products,
+        and 'errors', a list of dictionaries with the 'line' and 'message' of the first MAX_REPORTED_ERRORS rejected rows.
+        @post Raises ValueError if a required column is missing.
+        """
+
+        reader = csv.DictReader(lines)
+        missing = [column for column in self.REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError('The CSV header lacks the column(s) %s.' % ', '.join(missing))
+        unit_ids = set(self.unit_of_measures.get_unit_of_measure_names())
+        category_ids = self._category_ids() if 'category_id' in reader.fieldnames else set()
+        report = {'rows': 0, 'inserted': 0, 'updated': 0, 'rejected': 0, 'errors': []}
+        first_lines = {}  # The line of each product name seen by Products.name_key, to reject duplicates within the file
+        chunk = []
+        for row in reader:
+            report['rows'] += 1
+            try:
+                product = self._parse_row(row, unit_ids, category_ids)
+                name_key = Products.name_key(product['name'])
+                if name_key in first_lines:
+                    raise ValueError('Duplicate of the product on line %d.' % first_lines[name_key])
+            except ValueError as error:
+                self._reject(report, reader.line_num, str(error))
+                continue
+            first_lines[name_key] = reader.line_num
+            chunk.append((reader.line_num, product))
+            if len(chunk) >= self.chunk_size:
+                self._write_chunk(chunk, report)
+                chunk = []
+        if chunk:
+            self._write_chunk(chunk, report)
+        return report
+
+    def _write_chunk(self, chunk: list[tuple[int, dict[str, Any]]], report: dict[str, Any]) -> None:
+        """
+        @brief Upserts one chunk of valid rows in one transaction and counts the outcome.
+        @param chunk: The (line, product) pairs of the chunk.
+        @param report: The import report to update.
+        """
+
+        try:
+            results = self.products.upsert_products([product for _, product in chunk])
+        except Exception as error:  # The chunk was rolled back; its rows are reported instead of aborting the import
+            for line, _ in chunk:
+                self._reject(report, line, 'Not imported: %s: %s' % (type(error).__name__, error))
+            return
+        for result in results:
+            report[result['action']] += 1
+
+    def _reject(self, report: dict[str, Any], line: int, message: str) -> None:
+        """
+        @brief Counts a rejected row and lists it while the report has room.
+        """
+
+        report['rejected'] += 1
+        if len(report['errors']) < self.MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line, 'message': message})
+
+    def _parse_row(self, row: dict[str, Optional[str]], unit_ids: set[int], category_ids: set[int]) -> dict[str, Any]:
+        """
+        @brief Validates one CSV row and converts it into a product.
+        @param row: The row as read by csv.DictReader.
+        @param unit_ids: The ids of the existing unit of measures.
+        @param category_ids: The ids of the existing categories.
+        @return A dictionary with 'name', 'unit_of_measure_id', 'price_per_unit' and 'category_id' (None if empty).
+        @post Raises ValueError with a message for the client if the row is invalid.
+        """
+
+        if None in row:
+            raise ValueError('The row has more fields than the header.')
+        name = (row['name'] or '').strip()
+        if not name or len(name) > self.MAX_NAME_LENGTH:
+            raise ValueError('name must be between 1 and %d characters.' % self.MAX_NAME_LENGTH)
+        unit_of_measure_id = self._parse_id(row, 'unit_of_measure_id')
+        if unit_of_measure_id not in unit_ids:
+            raise ValueError('Unknown unit_of_measure_id %d.' % unit_of_measure_id)
+        try:
+            price_per_unit = float(row['price_per_unit'] or '')
+        except ValueError:
+            raise ValueError('price_per_unit must be a number.')
+        if not math.isfinite(price_per_unit) or price_per_unit < 0:
+            raise ValueError('price_per_unit must not be negative.')
+        category_id = None
+        if (row.get('category_id') or '').strip():
+            category_id = self._parse_id(row, 'category_id')
+            if category_id not in category_ids:
+                raise ValueError('Unknown category_id %d.' % category_id)
+        return {'name': name, 'unit_of_measure_id': unit_of_measure_id, 'price_per_unit': price_per_unit, 'category_id': category_id}
+
+    @staticmethod
+    def _parse_id(row: dict[str, Optional[str]], column: str) -> int:
+        """
+        @brief Reads an integer id column of a row.
+        @post Raises ValueError if the value is not an integer.
+        """
+
+        try:
+            return int((row[column] or '').strip())
+        except ValueError:
+            raise ValueError('%s must be an integer.' % column)
+
+    def _category_ids(self) -> set[int]:
+        """
+        @brief Reads the ids of the existing categories.
+        """
+
+        cursor = self.products.connection.cursor(prepared=True)
+        cursor.execute("SELECT category_id FROM categories")
+        return {category_id for (category_id,) in cursor.fetchall()}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    @brief Command line entry point: python -m Backend.product_import FILE [--chunk-size N] [--backend B] [--database D]
+    """
+
+    parser = argparse.ArgumentParser(description="Import a product catalog from a CSV file with the columns "
+                                                 "name, unit_of_measure_id, price_per_unit and optionally category_id.")
+    parser.add_argument('file', help="CSV file to import")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="rows committed per transaction")
+    add_backend_arguments(parser)
+    args = parser.parse_args(argv)
+
+    connection = connection_from_arguments(parser, args)
+    importer = ProductImport(Products(connection), UnitOfMeasures(connection), args.chunk_size)
+    with open(args.file, encoding='utf-8-sig', newline='') as csv_file:
+        report = importer.import_csv(csv_file)
+    print('%(rows)d rows: %(inserted)d inserted, %(updated)d updated, %(rejected)d rejected' % report)
+    for error in report['errors']:
+        print('line %(line)d: %(message)s' % error)
+    connection.release()
+
+
+if __name__ == '__main__':
+    main()
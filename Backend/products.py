@@ -3,23 +3,67 @@
 """ @ref R6_0"""
 # This Class is part of the @ref Model within the overall @ref ModelViewController Design.
 # This class implements the methods related to products.
-from datetime import date
-from typing import Any
+import heapq
+import unicodedata
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Callable, Iterator, Optional
+from Backend.analytics import ColumnarReports
+from Backend.product_catalog import CatalogSnapshot, ProductCatalog
+from Backend.retry import retry_on_disconnect
+from Backend.sales_rollup import SalesRollup, day_bounds, sales_date
+from Backend.unit_of_measures import UnitOfMeasures
 
 
 class Products:
-    def __init__(self, connection) -> None:
+    BUCKETS = ('hour', 'day', 'week', 'month')  # Period lengths of the bucketed sales report
+    MAX_INSERT_PARAMS = 999  # Most bound parameters per multi-row statement, within the limit of older SQLite versions
+
+    def __init__(self, connection, unit_of_measures: Optional[UnitOfMeasures] = None,
+                 catalog: Optional[ProductCatalog] = None, sales_rollup: Optional[SalesRollup] = None,
+                 analytics: Optional[ColumnarReports] = None) -> None:
         """
         @brief Constructor for the Products class.   
         Initializes an instance of the Products class with the provided database connection object.
         @param connection: The database connection object.
+        @param unit_of_measures: Optional UnitOfMeasures backed by the reference data cache; when given, product queries resolve 'unit_of_measure_name' from it instead of joining the unit_of_measures table.
+        @param catalog: Optional in-memory product catalog; when given, product reads are served from it and product writes update it.
+        @param sales_rollup: Optional sales rollups; when given, the sales reports aggregate the daily rollup rows instead of the raw orders, and their end date is included as a whole day.
+        @param analytics: Optional columnar report engine, the live SalesAnalytics or an on-disk OrderSnapshot; when given, the sales reports are computed from its NumPy columns with the date semantics of the SQL reports, taking precedence over the rollups.
         """
         
         self.connection = connection
+        self.unit_of_measures = unit_of_measures
+        self.catalog = catalog
+        self.sales_rollup = sales_rollup
+        self.analytics = analytics
+        # Callables notified after a product change is committed
+        self.listeners = []
+
+    """ @ref R6_0"""
+    def subscribe(self, listener: Callable[[str, dict[str, Any]], None]) -> None:
+        """
+        @brief Registers a callable notified after every committed product insert, price update or delete, e.g. to invalidate caches.
+        @param listener: Called with the event, 'inserted', 'updated' or 'deleted', and a dictionary with the 'product_id' and the changed fields.
+        """
+
+        self.listeners.append(listener)
+
+    """ @ref R6_0"""
+    def _notify(self, event: str, product: dict[str, Any]) -> None:
+        """
+        @brief Calls the registered listeners with a committed product change.
+        @param event: 'inserted', 'updated' or 'deleted'.
+        @param product: The 'product_id' and the changed fields of the product.
+        """
+
+        for listener in self.listeners:
+            listener(event, product)
 
     # @contract
     # @post(lambda result: isinstance(result, list), "The return value must be a list.")
     """ @ref R6_0"""
+    @retry_on_disconnect()
     def get_all_products(self) -> list:
         """
         @brief Retrieves all products from the database.
@@ -29,26 +73,151 @@ class Products:
         @post The response_list is populated with dictionaries representing products, each containing product details.
         """
 
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor()
+        # Collect the streamed products into the response list
+        return list(self.iter_all_products())
+
+    """ @ref R6_0"""
+    def iter_all_products(self) -> Iterator[dict[str, Any]]:
+        """
+        @brief Streams all products from the database one row at a time.
+        Rows are read from an unbuffered cursor as the caller consumes them, so memory use does not grow with the size of the catalog.
+        @pre The database connection must be established and valid.
+        @return An iterator of dictionaries with 'product_id', 'name', 'unit_of_measure_id', 'price_per_unit', and 'unit_of_measure_name'.
+        @post The cursor holds no unread rows once the iterator is exhausted.
+        """
+
+        if self.catalog is not None:
+            # Serve the products from the in-memory catalog
+            yield from self._catalog_snapshot().products
+            return
+        yield from self._iter_products_from_database()
+
+    """ @ref R6_0"""
+    def _iter_products_from_database(self) -> Iterator[dict[str, Any]]:
+        """
+        @brief Streams all products from the database, bypassing the catalog.
+        @return An iterator of product dictionaries in the same format as iter_all_products.
+        """
+
+        if self.unit_of_measures is not None:
+            # Resolve the unit of measure names from the reference data cache instead of joining
+            yield from self._iter_products_with_cached_units("", ())
+            return
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
         # SQL query to select specific columns from two tables using an INNER JOIN
         query = (
             "SELECT products.product_id, products.name, products.unit_of_measure_id, products.price_per_unit, unit_of_measures.unit_of_measure_name FROM products INNER JOIN unit_of_measures ON products.unit_of_measure_id=unit_of_measures.unit_of_measure_id")
         # Execute the SQL query using the cursor
         cursor.execute(query)
-        # Initialize an empty list to store the query response
-        product_list = []
-        # Iterate over the result set returned by the query and append each row to the response list as a dictionary
+        # Yield each row of the result set as a dictionary while it is read from the server
         for (product_id, name, unit_of_measure_id, price_per_unit, unit_of_measure_name) in cursor:
-            product_list.append({
+            yield {
                 'product_id': product_id,
                 'name': name,
                 'unit_of_measure_id': unit_of_measure_id,
                 'price_per_unit': price_per_unit,
                 'unit_of_measure_name': unit_of_measure_name
-            })
-        # Return the response list
-        return product_list
+            }
+
+    # @contract
+    # @pre(lambda limit: isinstance(limit, int) and limit > 0, "The limit must be a positive integer.")
+    # @post(lambda result: isinstance(result, dict), "The return value must be a dictionary.")
+    """ @ref R6_0"""
+    @retry_on_disconnect()
+    def get_products_page(self, limit: int, after: Optional[int] = None) -> dict[str, Any]:
+        """
+        @brief Retrieves one page of products ordered by product_id using keyset pagination.
+        The page starts right after the given product_id, so its cost depends only on the page size and not on how deep the client has paged.
+        @param limit: The maximum number of products on the page.
+        @param after: The product_id of the last product of the previous page, or None for the first page.
+        @pre The database connection must be established and valid.
+        @return A dictionary with 'products', the list of product dictionaries as returned by get_all_products, and 'next_cursor', the value to pass as 'after' for the next page or None on the last page.
+        @post At most limit products with a product_id greater than after are returned in ascending product_id order.
+        """
+
+        if self.catalog is not None:
+            # Find the page in the in-memory catalog
+            return self._catalog_snapshot().page(limit, after)
+        # Query parameters seeking past the previous page; one extra row tells whether another page follows
+        params = (after if after is not None else 0, limit + 1)
+        if self.unit_of_measures is not None:
+            # Resolve the unit of measure names from the reference data cache instead of joining
+            product_list = list(self._iter_products_with_cached_units(
+                "WHERE product_id > %s ORDER BY product_id LIMIT %s", params))
+        else:
+            # Create a cursor object that runs the SQL queries as cached prepared statements
+            cursor = self.connection.cursor(prepared=True)
+            # SQL query seeking past the previous page on the primary key
+            query = (
+                "SELECT products.product_id, products.name, products.unit_of_measure_id, products.price_per_unit, unit_of_measures.unit_of_measure_name "
+                "FROM products "
+                "INNER JOIN unit_of_measures ON products.unit_of_measure_id = unit_of_measures.unit_of_measure_id "
+                "WHERE products.product_id > %s "
+                "ORDER BY products.product_id "
+                "LIMIT %s"
+            )
+            # Execute the SQL query starting after the given cursor
+            cursor.execute(query, params)
+            # Create a list of dictionaries for the rows of this page
+            product_list = [{
+                'product_id': product_id,
+                'name': name,
+                'unit_of_measure_id': unit_of_measure_id,
+                'price_per_unit': price_per_unit,
+                'unit_of_measure_name': unit_of_measure_name
+            } for (product_id, name, unit_of_measure_id, price_per_unit, unit_of_measure_name) in cursor.fetchall()]
+        # The cursor of the next page is the last product_id of this page, if more rows exist
+        next_cursor = product_list[limit - 1]['product_id'] if len(product_list) > limit else None
+        return {'products': product_list[:limit], 'next_cursor': next_cursor}
+
+    """ @ref R6_0"""
+    def _catalog_snapshot(self) -> CatalogSnapshot:
+        """
+        @brief Returns the current product catalog, loading it from the database when needed.
+        @pre A catalog was passed to the constructor.
+        @return The catalog snapshot; its product dictionaries must not be modified.
+        """
+
+        return self.catalog.snapshot(self._iter_products_from_database)
+
+    """ @ref R6_0"""
+    def catalog_etag(self) -> Optional[str]:
+        """
+        @brief Returns the entity tag of the cached product catalog, which changes whenever a product changes.
+        @return The tag, or None without a catalog or while the catalog is not loaded.
+        """
+
+        return self.catalog.etag() if self.catalog is not None else None
+
+    """ @ref R71_0"""
+    def _iter_products_with_cached_units(self, condition: str, params: tuple) -> Iterator[dict[str, Any]]:
+        """
+        @brief Streams products without joining unit_of_measures, taking 'unit_of_measure_name' from the reference data cache.
+        @param condition: The SQL text following 'FROM products', e.g. a WHERE clause; may be empty.
+        @param params: The parameters of the condition.
+        @return An iterator of product dictionaries in the same format as iter_all_products.
+        """
+
+        # Read the names before running the product query, so no second statement runs while product rows are unread
+        unit_names = self.unit_of_measures.get_unit_of_measure_names()
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
+        # SQL query reading only the products table
+        query = "SELECT product_id, name, unit_of_measure_id, price_per_unit FROM products " + condition
+        cursor.execute(query.rstrip(), params)
+        for (product_id, name, unit_of_measure_id, price_per_unit) in cursor:
+            unit_of_measure_name = unit_names.get(unit_of_measure_id)
+            if unit_of_measure_name is None:
+                # A unit of measure added after the cache was filled; reload it on the next request
+                self.unit_of_measures.invalidate()
+            yield {
+                'product_id': product_id,
+                'name': name,
+                'unit_of_measure_id': unit_of_measure_id,
+                'price_per_unit': price_per_unit,
+                'unit_of_measure_name': unit_of_measure_name
+            }
 
     # @contract
     # @pre(lambda product: isinstance(product, dict), "The product must be a dictionary.")
@@ -64,8 +233,8 @@ class Products:
         @post The product information is successfully inserted into the 'products' table.
         """
 
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor()
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
         # SQL query to insert data into the 'products' table
         query = ("INSERT INTO products "
                  "(name, unit_of_measure_id, price_per_unit)"
@@ -77,8 +246,138 @@ class Products:
         cursor.execute(query, data)
         # Commit the changes to the database
         self.connection.commit()
-        # Return the last inserted row ID
-        return cursor.lastrowid
+        # Get the last inserted row ID
+        product_id = cursor.lastrowid
+        if self.catalog is not None:
+            # Write the new product through to the catalog
+            self._put_in_catalog(product_id, product)
+        self._notify('inserted', dict(product, product_id=product_id))
+        return product_id
+
+    @staticmethod
+    def name_key(name: str) -> str:
+        """
+        @brief Folds a product name the way the utf8mb4_0900_ai_ci collation of the products.name column compares it, ignoring case and accents.
+        @param name: The product name.
+        @return The key under which equal names collide, e.g. 'creme brulee' for 'Crème Brûlée'.
+        """
+
+        return ''.join(char for char in unicodedata.normalize('NFKD', name) if not unicodedata.combining(char)).casefold()
+
+    # @contract
+    # @pre(lambda products: isinstance(products, list), "The products must be a list.")
+    # @post(lambda result: isinstance(result, list), "The return value must be a list.")
+    """ @ref R7_0"""
+    def upsert_products(self, products: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        @brief Inserts or updates a batch of products in one transaction, e.g. one chunk of a supplier catalog import.
+        Products are matched by name: existing products get the unit of measure, price and category of the batch, the others are inserted.
+        An existing product keeps its category when the batch gives none, so a catalog without the category_id column does not clear the categories.
+        All rows are written with multi-row statements and committed once.
+        @param products: Dictionaries with 'name', 'unit_of_measure_id', 'price_per_unit' and optionally 'category_id', already validated; names must be unique within the batch by name_key.
+        @pre The database connection must be established and valid.
+        @return One dictionary per product, in the order given, with 'product_id' and 'action', 'inserted' or 'updated'.
+        @post Either the whole batch is committed or, if a statement fails, none of it is and the error is raised; the catalog is reloaded on its next use.
+        """
+
+        # Create a cursor object; the statements vary with the batch size, so they are not cached as prepared statements
+        cursor = self.connection.cursor()
+        names = [product['name'] for product in products]
+        keys = {self.name_key(name) for name in names}
+        existing = defaultdict(list)
+        categories = {}
+        # MySQL compares the names with the column's case and accent insensitive collation; SQLite only ignores ASCII case with NOCASE
+        collate = " COLLATE NOCASE" if getattr(self.connection, 'dialect', 'mysql') == 'sqlite' else ""
+        for start in range(0, len(names), self.MAX_INSERT_PARAMS):
+            chunk = names[start:start + self.MAX_INSERT_PARAMS]
+            # Find the products already in the catalog through the name index
+            cursor.execute("SELECT product_id, name, category_id FROM products WHERE name%s IN (%s)" % (collate, ', '.join(['%s'] * len(chunk))), tuple(chunk))
+            for product_id, name, category_id in cursor.fetchall():
+                # The batch's spelling may differ from the stored one, so the candidates are matched by their key
+                if self.name_key(name) in keys:
+                    existing[self.name_key(name)].append(product_id)
+                    categories[product_id] = category_id
+        if getattr(self.connection, 'dialect', 'mysql') == 'sqlite':
+            update = ("ON CONFLICT (product_id) DO UPDATE SET unit_of_measure_id = excluded.unit_of_measure_id, "
+                      "price_per_unit = excluded.price_per_unit, category_id = COALESCE(excluded.category_id, category_id)")
+        else:
+            update = ("ON DUPLICATE KEY UPDATE unit_of_measure_id = VALUES(unit_of_measure_id), "
+                      "price_per_unit = VALUES(price_per_unit), category_id = COALESCE(VALUES(category_id), category_id)")
+        new_products = [product for product in products if self.name_key(product['name']) not in existing]
+        updated_rows = [(product_id, product['name'], product['unit_of_measure_id'], product['price_per_unit'], product.get('category_id'))
+                        for product in products for product_id in existing.get(self.name_key(product['name']), ())]
+        # The category rollups hold the sales of a product under its category, so they must follow a category change
+        moved_ids = [row[0] for row in updated_rows if row[4] is not None and row[4] != categories[row[0]]]
+        if self.sales_rollup is None:
+            moved_ids = []
+        inserted_ids = {}
+        try:
+            if moved_ids:
+                self.sales_rollup.move_products(cursor, moved_ids, -1)
+            rows_per_insert = self.MAX_INSERT_PARAMS // 4
+            for start in range(0, len(new_products), rows_per_insert):
+                chunk = new_products[start:start + rows_per_insert]
+                cursor.execute("INSERT INTO products (name, unit_of_measure_id, price_per_unit, category_id) VALUES "
+                               + ', '.join(['(%s, %s, %s, %s)'] * len(chunk)),
+                               tuple(value for product in chunk for value in (product['name'], product['unit_of_measure_id'],
+                                                                             product['price_per_unit'], product.get('category_id'))))
+                first_id = self.connection.first_insert_id(cursor, len(chunk))
+                for offset, product in enumerate(chunk):
+                    inserted_ids[product['name']] = first_id + offset
+            rows_per_update = self.MAX_INSERT_PARAMS // 5
+            for start in range(0, len(updated_rows), rows_per_update):
+                chunk = updated_rows[start:start + rows_per_update]
+                # Update the existing products by primary key with one upsert
+                cursor.execute("INSERT INTO products (product_id, name, unit_of_measure_id, price_per_unit, category_id) VALUES "
+                               + ', '.join(['(%s, %s, %s, %s, %s)'] * len(chunk)) + " " + update,
+                               tuple(value for row in chunk for value in row))
+            if moved_ids:
+                self.sales_rollup.move_products(cursor, moved_ids, 1)
+            # Commit the whole batch at once
+            self.connection.commit()
+        except Exception:
+            # Leave no partial batch behind
+            self.connection.rollback()
+            raise
+        if self.catalog is not None and products:
+            # Writing every product through would copy the catalog once per product, so it is reloaded instead
+            self.catalog.invalidate()
+        results = []
+        for product in products:
+            if product['name'] in inserted_ids:
+                results.append({'product_id': inserted_ids[product['name']], 'action': 'inserted'})
+                self._notify('inserted', dict(product, product_id=inserted_ids[product['name']]))
+            else:
+                product_ids = existing[self.name_key(product['name'])]
+                results.append({'product_id': product_ids[0], 'action': 'updated'})
+                # Without a category the product kept its own, so listeners must not see the category change
+                updated = {key: value for key, value in product.items() if key != 'category_id' or value is not None}
+                for product_id in product_ids:
+                    self._notify('updated', dict(updated, product_id=product_id))
+        return results
+
+    """ @ref R7_0"""
+    def _put_in_catalog(self, product_id: int, product: dict[str, Any]) -> None:
+        """
+        @brief Adds a product just inserted into the database to the catalog.
+        Without a cached unit of measure name the catalog entry cannot be completed, so the catalog is invalidated instead.
+        @param product_id: The ID of the inserted product.
+        @param product: The inserted product information.
+        """
+
+        unit_of_measure_id = int(product['unit_of_measure_id'])
+        unit_names = self.unit_of_measures.get_unit_of_measure_names() if self.unit_of_measures is not None else {}
+        unit_of_measure_name = unit_names.get(unit_of_measure_id)
+        if unit_of_measure_name is None:
+            self.catalog.invalidate()
+            return
+        self.catalog.put({
+            'product_id': product_id,
+            'name': product['name'],
+            'unit_of_measure_id': unit_of_measure_id,
+            'price_per_unit': float(product['price_per_unit']),
+            'unit_of_measure_name': unit_of_measure_name
+        })
 
     # @contract
     # @pre(lambda product_id: isinstance(product_id, int), "The product_id must be an integer.")
@@ -94,8 +393,8 @@ class Products:
         @post The product with the specified product_id is deleted from the 'products' table.
         """
 
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor()
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
         # Disable foreign key checks
         disable_fk_query = "SET FOREIGN_KEY_CHECKS = 0"
         cursor.execute(disable_fk_query)
@@ -115,6 +414,11 @@ class Products:
         cursor.execute(enable_fk_query)
         # Commit the changes to the database
         self.connection.commit()
+        if self.catalog is not None and is_product_deleted:
+            # Remove the deleted product from the catalog
+            self.catalog.remove(product_id)
+        if is_product_deleted:
+            self._notify('deleted', {'product_id': product_id})
         return is_product_deleted
 
     # @contract
@@ -133,8 +437,8 @@ class Products:
         @post The price of the product with the specified product_id is updated in the 'products' table if the update is successful.
         """
         
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor()
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
         # SQL query to update price into the 'products' table
         query = (
             "UPDATE products SET price_per_unit = %s WHERE product_id = %s"
@@ -148,6 +452,11 @@ class Products:
         row_count = cursor.rowcount
         # Assign the boolean result indicating whether the update is successful
         is_update_successful = True if row_count > 0 else False
+        if self.catalog is not None and is_update_successful:
+            # Write the new price through to the catalog
+            self.catalog.update_price(product_id, float(updated_price))
+        if is_update_successful:
+            self._notify('updated', {'product_id': product_id, 'price_per_unit': updated_price})
         # Returns True if successful else False
         return is_update_successful
 
@@ -155,6 +464,7 @@ class Products:
     # @pre: start_date and end_date must be strings.
     # @post: The return value must be a dictionary containing the total sales report.
     """ @ref R34_0"""
+    @retry_on_disconnect()
     def total_sales(self, start_date: date, end_date: date) -> list[dict[str, Any]]:
         """
         @brief Generate a total sales report between the specified dates.
@@ -166,8 +476,12 @@ class Products:
         @post The response list is populated with order details and the 'total_sales' value representing the overall total sales amount for the specified period.
         """
 
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor()
+        if self.analytics is not None:
+            return self.analytics.total_sales(start_date, end_date)
+        if self.sales_rollup is not None:
+            return self._total_sales_from_rollup(start_date, end_date)
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
         # Empty List to hold the final response
         sales_report_list = []
         # Query to get total sales
@@ -188,10 +502,61 @@ class Products:
         sales_report_list.append({'total_sales': total_sales})
         return sales_report_list
 
+    """ @ref R34_0"""
+    def iter_total_sales(self, start_date: date, end_date: date) -> Iterator[dict[str, Any]]:
+        """
+        @brief Streams the total sales report between the specified dates, for exports of any size.
+        Orders are read from an unbuffered cursor as the caller consumes them and the total is kept as a running sum, so memory use does not grow with the number of orders.
+        The orders are always read from the orders table, with the date semantics of total_sales without rollups.
+        @param start_date: The start date of the report period.
+        @param end_date: The end date of the report period.
+        @pre The database connection must be established and valid.
+        @return An iterator of the entries of total_sales: the orders ordered by order_id, followed by a dictionary with 'total_sales'.
+        @post The cursor holds no unread rows once the iterator is exhausted.
+        """
+
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
+        query = (
+                "SELECT order_id, customer_name, datetime, total_amount " +
+                "FROM orders " +
+                "WHERE datetime BETWEEN %s AND %s ORDER BY order_id")
+        cursor.execute(query, (start_date, end_date))
+        total_sales = 0
+        # Yield each order while it is read from the server, adding it to the running total
+        for (order_id, customer_name, order_datetime, total_amount) in cursor:
+            total_sales += total_amount
+            yield {'order_id': order_id, 'customer_name': customer_name, 'datetime': order_datetime, 'total_amount': total_amount}
+        yield {'total_sales': total_sales}
+
+    """ @ref R34_0"""
+    def _total_sales_from_rollup(self, start_date: date, end_date: date) -> list[dict[str, Any]]:
+        """
+        @brief Generates the total sales report with its total taken from the daily rollup.
+        The report lists every order by definition, so the orders of the range are still read; only the total comes from the rollup.
+        @param start_date: The first day of the report period.
+        @param end_date: The last day of the report period, included.
+        @return The report in the format of total_sales.
+        """
+
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
+        # Query listing the orders of whole days, the same range the rollup total covers
+        query = (
+                "SELECT order_id, customer_name, datetime, total_amount " +
+                "FROM orders " +
+                "WHERE datetime >= %s AND datetime < %s ORDER BY order_id")
+        cursor.execute(query, day_bounds(start_date, end_date))
+        sales_report_list = [{'order_id': row[0], 'customer_name': row[1], 'datetime': row[2], 'total_amount': row[3]}
+                             for row in cursor.fetchall()]
+        sales_report_list.append({'total_sales': self.sales_rollup.total_sales(start_date, end_date)})
+        return sales_report_list
+
     # @contract
     # @pre: start_date and end_date must be strings.
     # @post: The return value must be a dictionary containing the top selling products.
     """ @ref R34_0"""
+    @retry_on_disconnect()
     def top_selling_products(self, start_date: date, end_date: date) -> list[dict[str, Any]]:
         """
         @brief Generate a list of top selling products between the specified dates.
@@ -203,8 +568,13 @@ class Products:
         @post The top_selling_products list is populated with the top selling products based on the quantity of products sold between the specified start_date and end_date.
         """
 
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor()
+        if self.analytics is not None:
+            return self.analytics.top_selling_products(start_date, end_date)
+        if self.sales_rollup is not None:
+            # Aggregate the per-product rollup rows of the period
+            return self.sales_rollup.top_selling_products(start_date, end_date)
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
         # Empty List to hold the final response
         top_selling_products_list = []
         # Query to get top selling products
@@ -231,6 +601,7 @@ class Products:
     # @pre: start_date and end_date must be strings.
     # @post: The return value must be a dictionary containing the sales by category.
     """ @ref R34_0"""
+    @retry_on_disconnect()
     def sales_by_category(self, start_date: date, end_date: date) -> list[dict[str, Any]]:
         """
         @brief Generate a sales report by category between the specified dates.
@@ -242,13 +613,18 @@ class Products:
         @post The sales_by_category list is populated with the sales report by category based on the total sales (total_price) of products in each category between the specified start_date and end_date.
         """
 
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor()
+        if self.analytics is not None:
+            return self.analytics.sales_by_category(start_date, end_date)
+        if self.sales_rollup is not None:
+            # Aggregate the per-category rollup rows of the period
+            return self.sales_rollup.sales_by_category(start_date, end_date)
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
         # Empty List to hold the final response
         sales_by_category_list = []
         # Query to get sales report by category
         query = (
-                "SELECT categories.category_name, SUM(order_details.total_price) AS total_sales" +
+                "SELECT categories.category_name, SUM(order_details.total_price) AS total_sales " +
                 "FROM categories " +
                 "JOIN products ON categories.category_id = products.category_id " +
                 "JOIN order_details ON products.product_id = order_details.product_id " +
@@ -265,11 +641,105 @@ class Products:
         sales_by_category_list = [{'category_name': row[0], 'total_sales': round(row[1], 2)} for row in results]
         # Returns the sales report by category as response list
         return sales_by_category_list
+
+    # @contract
+    # @pre(lambda bucket, top_n: bucket in Products.BUCKETS and top_n >= 0)
+    # @post(lambda result: isinstance(result, list))
+    """ @ref R34_0"""
+    @retry_on_disconnect()
+    def sales_by_bucket(self, start_date: date, end_date: date, bucket: str = 'day', top_n: int = 5) -> list[dict[str, Any]]:
+        """
+        @brief Breaks the sales between the specified dates down by hour, day, week or month, with the top selling products of each period.
+        Two grouped queries read the orders and the order details of the whole range once, grouped by day (and hour); weeks and months are merged from the days in memory.
+        With sales rollups, days, weeks and months are read from the rollup tables and the end date is included as a whole day.
+        @param start_date: The start date of the report period.
+        @param end_date: The end date of the report period.
+        @param bucket: The period length: 'hour', 'day', 'week' (starting on Monday) or 'month'.
+        @param top_n: The number of top selling products listed for each period.
+        @pre The database connection must be established and valid.
+        @return A list of dictionaries with 'bucket', the ISO start of the period, 'order_count', 'total_sales' and 'top_products', a list in the format of top_selling_products; periods without orders are left out.
+        """
+
+        if self.sales_rollup is not None and bucket != 'hour':
+            # Merge the per-day rollup rows of the period
+            day_rows, product_rows = self.sales_rollup.daily_breakdown(start_date, end_date)
+            return self._merge_buckets(day_rows, product_rows, bucket, top_n)
+        if bucket == 'hour':
+            hour = "CAST(strftime('%%H', orders.datetime) AS INTEGER)" if getattr(self.connection, 'dialect', 'mysql') == 'sqlite' else "HOUR(orders.datetime)"
+            group = "DATE(orders.datetime), " + hour
+        else:
+            hour = "0"
+            group = "DATE(orders.datetime)"
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
+        # Query summing the orders of each day or hour, answered from the covering datetime index
+        cursor.execute(
+            "SELECT DATE(orders.datetime), " + hour + ", COUNT(*), SUM(orders.total_amount) " +
+            "FROM orders " +
+            "WHERE orders.datetime BETWEEN %s AND %s " +
+            "GROUP BY " + group, (start_date, end_date))
+        day_rows = cursor.fetchall()
+        # Query summing the quantity of each product sold on each day or hour
+        cursor.execute(
+            "SELECT DATE(orders.datetime), " + hour + ", products.product_id, products.name, SUM(order_details.quantity) " +
+            "FROM products " +
+            "JOIN order_details ON products.product_id = order_details.product_id " +
+            "JOIN orders ON order_details.order_id = orders.order_id " +
+            "WHERE orders.datetime BETWEEN %s AND %s " +
+            "GROUP BY " + group + ", products.product_id, products.name", (start_date, end_date))
+        return self._merge_buckets(day_rows, cursor.fetchall(), bucket, top_n)
+
+    """ @ref R34_0"""
+    @staticmethod
+    def _merge_buckets(day_rows: list[tuple], product_rows: list[tuple], bucket: str, top_n: int) -> list[dict[str, Any]]:
+        """
+        @brief Merges per-day (or per-hour) sales into periods and selects the top selling products of each.
+        @param day_rows: The (day, hour, order_count, total_amount) rows.
+        @param product_rows: The (day, hour, product_id, name, quantity) rows.
+        @param bucket: 'hour', 'day', 'week' or 'month'.
+        @param top_n: The number of top selling products listed for each period.
+        @return The report in the format of sales_by_bucket, ordered by period.
+        """
+
+        def bucket_start(day: Any, hour: int) -> str:
+            day = sales_date(day)
+            if bucket == 'hour':
+                return '%s %02d:00:00' % (day.isoformat(), hour)
+            if bucket == 'week':
+                day = day - timedelta(days=day.weekday())
+            elif bucket == 'month':
+                day = day.replace(day=1)
+            return day.isoformat()
+
+        totals = {}
+        for day, hour, order_count, total_amount in day_rows:
+            key = bucket_start(day, hour)
+            count, total = totals.get(key, (0, 0))
+            totals[key] = (count + order_count, total + total_amount)
+        # Maps each period to the quantity and name of every product sold in it
+        quantities = defaultdict(dict)
+        for day, hour, product_id, name, quantity in product_rows:
+            sold = quantities[bucket_start(day, hour)]
+            sold[product_id] = (sold[product_id][0] + quantity if product_id in sold else quantity, name)
+        report = []
+        for key in sorted(totals):
+            sold = quantities.get(key, {})
+            # Largest quantity first, ties broken by product_id, without sorting every product of the period
+            top = heapq.nsmallest(top_n, sold.items(), key=lambda item: (-item[1][0], item[0]))
+            report.append({
+                'bucket': key,
+                'order_count': totals[key][0],
+                'total_sales': round(totals[key][1], 2),
+                'top_products': [{'product_id': product_id, 'products_name': name, 'total_quantity': quantity}
+                                 for product_id, (quantity, name) in top],
+            })
+        return report
     
     # @contract
     # @pre: product_name must be a string.
     # @post: The return value must be a dictionary representing the product found, or None if not found.
     """ @ref R10_0"""
+    @retry_on_disconnect()
     def search_products(self, product_name: str) -> dict[str, Any]:
         """
         @brief Retrieves a specific product from the database based on the provided product name.
@@ -280,8 +750,15 @@ class Products:
         @post If the product with the specified product_name exists in the 'products' table, the method returns a dictionary containing product details. Otherwise, it returns None.
         """
 
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor()
+        if self.catalog is not None:
+            # Look the name up in the in-memory catalog
+            return self._catalog_snapshot().by_name.get(product_name)
+        if self.unit_of_measures is not None:
+            # Resolve the unit of measure name from the reference data cache instead of joining
+            matches = list(self._iter_products_with_cached_units("WHERE name = %s LIMIT 1", (product_name,)))
+            return matches[0] if matches else None
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
         # SQL query to select specific columns from two tables using an INNER JOIN, with a WHERE clause to filter by product name
         query = (
             "SELECT products.product_id, products.name, products.unit_of_measure_id, products.price_per_unit, unit_of_measures.unit_of_measure_name "
@@ -293,6 +770,9 @@ class Products:
         cursor.execute(query, (product_name,))
         # Fetch the first row from the result set
         product_data = cursor.fetchone()
+        if product_data is None:
+            # No product has the given name
+            return None
         # return result as a dictionary
         product_id, name, unit_of_measure_id, price_per_unit, unit_of_measure_name = product_data
         return {
@@ -302,3 +782,78 @@ class Products:
             'price_per_unit': price_per_unit,
             'unit_of_measure_name': unit_of_measure_name
         }
+
+    # @contract
+    # @pre(lambda query: isinstance(query, str), "The query must be a string.")
+    # @pre(lambda limit: isinstance(limit, int) and limit > 0, "The limit must be a positive integer.")
+    # @post(lambda result: isinstance(result, list), "The return value must be a list.")
+    """ @ref R10_0"""
+    @retry_on_disconnect()
+    def search_products_ranked(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        @brief Retrieves the products best matching a partial product name, for as-you-type search.
+        With a catalog, the products are ranked by the in-memory search index: exact names first, then prefix, substring and typo-tolerant matches.
+        Without a catalog, the products containing the query are read from the database, shortest names first.
+        @param query: The text typed by the user.
+        @param limit: The maximum number of products returned.
+        @pre The database connection must be established and valid.
+        @return A list of product dictionaries in the format returned by get_all_products, best match first; an empty list if nothing matches.
+        @post At most limit products are returned.
+        """
+
+        if self.catalog is not None:
+            # Rank the products with the search index of the current catalog
+            return self._catalog_snapshot().search_index.search(query, limit)
+        # Escape the LIKE wildcards typed by the user, so they match literally
+        pattern = '%' + query.replace('!', '!!').replace('%', '!%').replace('_', '!_') + '%'
+        if self.unit_of_measures is not None:
+            # Resolve the unit of measure names from the reference data cache instead of joining
+            return list(self._iter_products_with_cached_units(
+                "WHERE name LIKE %s ESCAPE '!' ORDER BY LENGTH(name), product_id LIMIT %s", (pattern, limit)))
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True)
+        # SQL query selecting the products whose name contains the query
+        query_text = (
+            "SELECT products.product_id, products.name, products.unit_of_measure_id, products.price_per_unit, unit_of_measures.unit_of_measure_name "
+            "FROM products "
+            "INNER JOIN unit_of_measures ON products.unit_of_measure_id = unit_of_measures.unit_of_measure_id "
+            "WHERE products.name LIKE %s ESCAPE '!' "
+            "ORDER BY LENGTH(products.name), products.product_id "
+            "LIMIT %s"
+        )
+        # Execute the SQL query using the cursor
+        cursor.execute(query_text, (pattern, limit))
+        # Create a list of dictionaries for the matching products
+        return [{
+            'product_id': product_id,
+            'name': name,
+            'unit_of_measure_id': unit_of_measure_id,
+            'price_per_unit': price_per_unit,
+            'unit_of_measure_name': unit_of_measure_name
+        } for (product_id, name, unit_of_measure_id, price_per_unit, unit_of_measure_name) in cursor.fetchall()]
+
+    # @contract
+    # @pre(lambda product_ids: all(isinstance(product_id, int) for product_id in product_ids), "The product ids must be integers.")
+    # @post(lambda result: isinstance(result, dict), "The return value must be a dictionary.")
+    """ @ref R34_0"""
+    @retry_on_disconnect()
+    def get_product_names(self, product_ids: list[int]) -> dict[int, str]:
+        """
+        @brief Retrieves the names of several products at once, e.g. to label a ranking of product ids.
+        @param product_ids: The ids of the products.
+        @pre The database connection must be established and valid.
+        @return A dictionary mapping each id of an existing product to its name; ids of deleted products are missing.
+        """
+
+        if not product_ids:
+            return {}
+        if self.catalog is not None:
+            # Look the ids up in the in-memory catalog
+            by_id = self._catalog_snapshot().by_id
+            return {product_id: by_id[product_id]['name'] for product_id in product_ids if product_id in by_id}
+        # Create a cursor object; the statement varies with the number of ids, so it is not cached as a prepared statement
+        cursor = self.connection.cursor()
+        # SQL query selecting the names of all requested products in one round trip
+        query = "SELECT product_id, name FROM products WHERE product_id IN (%s)" % ', '.join(['%s'] * len(product_ids))
+        cursor.execute(query, tuple(product_ids))
+        return {product_id: name for product_id, name in cursor.fetchall()}
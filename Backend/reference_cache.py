@@ -0,0 +1,72 @@
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+
+""" @ref R71_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class implements an in-process read-through cache with a time to live for rarely changing reference data such as unit of measures.
+class ReferenceCache:
+    def __init__(self, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        @brief Constructor for the ReferenceCache class.
+        @param ttl: The number of seconds a loaded value is served before it is loaded again.
+        @param clock: The time source, replaceable in tests.
+        """
+
+        self.ttl = ttl
+        self.clock = clock
+        # Maps each key to a (value, expires_at) pair
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        @brief Returns the cached value of a key, calling the loader when it is missing or expired.
+        The loader runs outside the cache lock, so a slow database never blocks readers of other keys; concurrent misses may load twice.
+        @param key: The cache key.
+        @param loader: A callable returning the current value from the database.
+        @return The cached or freshly loaded value; callers must not modify it.
+        """
+
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+        value = loader()
+        with self._lock:
+            self._entries[key] = (value, self.clock() + self.ttl)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        @brief Drops one cached key, or every key when no key is given, so the next get() reloads it.
+        @param key: The key to drop, or None for all keys.
+        """
+
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._invalidations += 1
+
+    def stats(self) -> dict[str, int]:
+        """
+        @brief Reports the cache counters.
+        @return A dictionary with 'hits', 'misses', 'invalidations' and 'entries'.
+        """
+
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'invalidations': self._invalidations,
+                'entries': len(self._entries),
+            }
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Hashable, Optional
+
+
+""" @ref R34_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class caches computed sales reports by report type and date range and drops only the reports a changed order falls into.
+class ReportCache:
+    def __init__(self, max_entries: int = 128, ttl: float = 60.0, historical_ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, today: Callable[[], date] = date.today) -> None:
+        """
+        @brief Constructor for the ReportCache class.
+        @param max_entries: The maximum number of cached reports; the least recently used one is evicted beyond that.
+        @param ttl: The number of seconds a report whose range reaches today or later is cached, bounding how long orders written by other server processes go unseen.
+        @param historical_ttl: The number of seconds a report of a range ending before today is cached, or None to keep it until it is evicted or invalidated.
+        @param clock: The time source, replaceable in tests.
+        @param today: The calendar source, replaceable in tests.
+        """
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.historical_ttl = historical_ttl
+        self.clock = clock
+        self.today = today
+        # Maps each key to a (report, first_day, last_day, expires_at) tuple, least recently used first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Incremented by every invalidation, so a report computed while an order changed is not cached
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def get(self, key: Hashable, first_day: date, last_day: date, loader: Callable[[], Any]) -> Any:
+        """
+        @brief Returns the cached report of a key, calling the loader when it is missing or expired.
+        @param key: The cache key, e.g. (report_type, start_date, end_date).
+        @param first_day: The first day of the orders the report covers.
+        @param last_day: The last day of the orders the report covers, included.
+        @param loader: A callable computing the report.
+        @return The cached or freshly computed report; callers must not modify it.
+        """
+
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[3] is None or entry[3] > now:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[0]
+                del self._entries[key]
+                self._expirations += 1
+            self._misses += 1
+            generation = self._generation
+        report = loader()
+        ttl = self.ttl if last_day >= self.today() else self.historical_ttl
+        with self._lock:
+            if self._generation == generation:
+                self._entries[key] = (report, first_day, last_day, self.clock() + ttl if ttl is not None else None)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+        return report
+
+    def invalidate_day(self, day: date) -> int:
+        """
+        @brief Drops the cached reports whose range includes a day, after an order of that day changed.
+        @param day: The day of the inserted or deleted order.
+        @return The number of reports dropped.
+        """
+
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, entry in self._entries.items() if entry[1] <= day <= entry[2]]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += len(stale)
+            return len(stale)
+
+    def invalidate(self) -> None:
+        """
+        @brief Drops every cached report, e.g. after a product was deleted.
+        """
+
+        with self._lock:
+            self._generation += 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """
+        @brief Reports the cache counters.
+        @return A dictionary with 'hits', 'misses', 'evictions', 'expirations', 'invalidations' and 'entries'.
+        """
+
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'invalidations': self._invalidations,
+                'entries': len(self._entries),
+            }
@@ -0,0 +1,233 @@
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Optional
+
+
+""" @ref R1_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class reports a job submitted while the job queue is full.
+class JobQueueFull(Exception):
+    pass
+
+
+""" @ref R34_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class is one submitted report job with its state, progress and result.
+class ReportJob:
+    QUEUED, RUNNING, SUCCEEDED, FAILED = 'queued', 'running', 'succeeded', 'failed'
+
+    def __init__(self, name: str, task: Callable[[Callable[[float], None]], Any], heavy: bool, submitted_at: float,
+                 tracks_progress: bool = True) -> None:
+        """
+        @brief Constructor for the ReportJob class.
+        @param name: The name reported to clients, e.g. the report type.
+        @param task: The callable computing the result; it is passed a callable reporting its progress as a fraction.
+        @param heavy: Whether the job counts against the limit of concurrent heavy jobs.
+        @param submitted_at: The clock time of the submission.
+        @param tracks_progress: Whether the task reports its progress; if not, the progress stays None.
+        """
+
+        self.job_id = uuid.uuid4().hex
+        self.name = name
+        self.task = task
+        self.heavy = heavy
+        self.status = self.QUEUED
+        self.progress = 0.0 if tracks_progress else None
+        self.result = None
+        self.error = None
+        self.submitted_at = submitted_at
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+
+""" @ref R34_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class runs report jobs on a bounded pool of worker threads, at most max_heavy heavy ones at a time, and keeps their results until they expire.
+class ReportJobs:
+    def __init__(self, workers: int = 2, max_heavy: int = 1, max_queued: int = 100, retention: float = 600.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        @brief Constructor for the ReportJobs class; starts the worker threads.
+        @param workers: The number of worker threads, i.e. the maximum number of jobs running at once.
+        @param max_heavy: The maximum number of heavy jobs running at once; light jobs overtake queued heavy jobs beyond it.
+        @param max_queued: The maximum number of jobs waiting to run; further submissions are rejected.
+        @param retention: The number of seconds a finished job and its result are kept.
+        @param clock: The time source, replaceable in tests.
+        """
+
+        self.max_heavy = max_heavy
+        self.max_queued = max_queued
+        self.retention = retention
+        self.clock = clock
+        self._jobs = {}
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._heavy_running = 0
+        self._running = 0
+        self._stopped = False
+        self._counts = {'submitted': 0, 'succeeded': 0, 'failed': 0, 'rejected': 0, 'expired': 0}
+        self._threads = [threading.Thread(target=self._work, name='report-job-%d' % i, daemon=True) for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    """ @ref R34_0"""
+    def submit(self, name: str, task: Callable[[Callable[[float], None]], Any], heavy: bool = False,
+               tracks_progress: bool = True) -> ReportJob:
+        """
+        @brief Queues a job.
+        @param name: The name reported to clients.
+        @param task: The callable computing the result, passed a progress callable.
+        @param heavy: Whether the job counts against max_heavy.
+        @param tracks_progress: Whether the task reports meaningful progress; jobs that do not are described with a progress of None.
+        @return The queued job.
+        @post Raises JobQueueFull if max_queued jobs are already waiting.
+        """
+
+        with self._condition:
+            self._expire()
+            if len(self._queue) >= self.max_queued:
+                self._counts['rejected'] += 1
+                raise JobQueueFull('%d report jobs are already queued' % len(self._queue))
+            job = ReportJob(name, task, heavy, self.clock(), tracks_progress)
+            self._jobs[job.job_id] = job
+            self._queue.append(job)
+            self._counts['submitted'] += 1
+            self._condition.notify_all()
+            return job
+
+    """ @ref R34_0"""
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        """
+        @brief Looks up a job.
+        @param job_id: The id returned on submission.
+        @return The job, or None if it is unknown or expired.
+        """
+
+        with self._condition:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    """ @ref R34_0"""
+    def describe(self, job: ReportJob) -> dict[str, Any]:
+        """
+        @brief Reports the state of a job for clients polling it.
+        @param job: The job.
+        @return A dictionary with 'job_id', 'name', 'status', 'progress' (None for jobs not tracking it), 'queue_position' (0 for the next job to run, None unless queued),
+        'elapsed_ms' (the time running so far or taken), 'expires_in' (seconds until a finished job is dropped, None before) and 'error'.
+        """
+
+        with self._condition:
+            now = self.clock()
+            queue_position = list(self._queue).index(job) if job.status == ReportJob.QUEUED else None
+            if job.started_at is None:
+                elapsed = None
+            else:
+                elapsed = round(((job.finished_at if job.finished else now) - job.started_at) * 1000, 3)
+            return {
+                'job_id': job.job_id,
+                'name': job.name,
+                'status': job.status,
+                'progress': round(job.progress, 3) if job.progress is not None else None,
+                'queue_position': queue_position,
+                'elapsed_ms': elapsed,
+                'expires_in': round(job.finished_at + self.retention - now, 3) if job.finished else None,
+                'error': job.error,
+            }
+
+    def stats(self) -> dict[str, int]:
+        """
+        @brief Reports the job counters.
+        @return A dictionary with 'queued', 'running', 'heavy_running', 'retained' and the 'submitted', 'succeeded', 'failed', 'rejected' and 'expired' totals.
+        """
+
+        with self._condition:
+            self._expire()
+            return dict(self._counts, queued=len(self._queue), running=self._running, heavy_running=self._heavy_running,
+                        retained=len(self._jobs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        @brief Stops the worker threads once they finished their current job; queued jobs are not run.
+        @param wait: If True, waits for the threads to stop.
+        """
+
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _next_job(self) -> Optional[ReportJob]:
+        """
+        @brief Removes the oldest queued job that may start now from the queue.
+        @pre The condition's lock is held.
+        @return The job, or None if every queued job is heavy and max_heavy heavy jobs are running.
+        """
+
+        for job in self._queue:
+            if not job.heavy or self._heavy_running < self.max_heavy:
+                self._queue.remove(job)
+                return job
+        return None
+
+    def _work(self) -> None:
+        """
+        @brief Worker thread loop: runs queued jobs until shutdown() is called.
+        """
+
+        while True:
+            with self._condition:
+                job = None
+                while not self._stopped:
+                    job = self._next_job()
+                    if job is not None:
+                        break
+                    self._condition.wait()
+                if job is None:
+                    return
+                self._running += 1
+                if job.heavy:
+                    self._heavy_running += 1
+                job.status = ReportJob.RUNNING
+                job.started_at = self.clock()
+
+            def report_progress(fraction: float, job: ReportJob = job) -> None:
+                if job.progress is not None:
+                    job.progress = min(max(fraction, 0.0), 1.0)
+
+            try:
+                result, error = job.task(report_progress), None
+            except Exception as exception:  # The error is reported to the client polling the job
+                result, error = None, '%s: %s' % (type(exception).__name__, exception)
+            with self._condition:
+                job.result = result
+                job.error = error
+                job.status = ReportJob.SUCCEEDED if error is None else ReportJob.FAILED
+                job.progress = 1.0 if error is None and job.progress is not None else job.progress
+                job.finished_at = self.clock()
+                job.task = None  # Drops the references the task holds
+                self._counts['succeeded' if error is None else 'failed'] += 1
+                self._running -= 1
+                if job.heavy:
+                    self._heavy_running -= 1
+                # A queued heavy job may start now
+                self._condition.notify_all()
+
+    def _expire(self) -> None:
+        """
+        @brief Drops the finished jobs whose retention has passed.
+        @pre The condition's lock is held.
+        """
+
+        deadline = self.clock() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at <= deadline]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self._counts['expired'] += len(expired)
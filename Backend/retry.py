@@ -0,0 +1,39 @@
+import functools
+import random
+import time
+from typing import Any, Callable
+import mysql.connector
+
+# Errors raised by mysql.connector when the server connection is lost or cannot be reached
+RETRYABLE_ERRORS = (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError)
+
+
+""" @ref R1_0"""
+# This function is part of the @ref Model within the overall @ref ModelViewController Design.
+# This function implements a decorator that retries idempotent read methods of the model classes when the database connection drops.
+def retry_on_disconnect(attempts: int = 3, base_delay: float = 0.05, max_delay: float = 1.0) -> Callable:
+    """
+    @brief Decorator retrying a model method with jittered exponential backoff after a lost database connection.
+    Only apply it to idempotent reads: a write may have reached the server before the connection dropped.
+    Before each retry the broken connection is closed so the next attempt checks a fresh one out of the pool.
+    @param attempts: The total number of attempts, including the first call.
+    @param base_delay: The backoff ceiling in seconds before the first retry; it doubles on every further retry.
+    @param max_delay: The upper bound in seconds for a single backoff.
+    @return The decorator to apply to a method of a class holding a 'connection' attribute.
+    """
+
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            for attempt in range(attempts):
+                try:
+                    return method(self, *args, **kwargs)
+                except RETRYABLE_ERRORS:
+                    if attempt == attempts - 1:
+                        raise
+                    # Drop the broken connection so the retry reconnects
+                    self.connection.close()
+                    # Full jitter keeps many request threads from reconnecting in lockstep
+                    time.sleep(random.uniform(0, min(max_delay, base_delay * (2 ** attempt))))
+        return wrapper
+    return decorator
@@ -0,0 +1,282 @@
+import argparse
+import os
+import sys
+from datetime import date, datetime, timedelta
+from typing import Any, Optional, Union
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.retry import retry_on_disconnect
+from Backend.storage import add_backend_arguments, connection_from_arguments
+
+
+def sales_date(value: Union[str, date, datetime]) -> date:
+    """
+    @brief Returns the calendar day of an order timestamp or report bound.
+    @param value: A datetime, a date, or text starting with 'YYYY-MM-DD' as stored by SQLite or sent by clients.
+    @return The day.
+    """
+
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def day_bounds(start_date: Union[str, date], end_date: Union[str, date]) -> tuple[date, date]:
+    """
+    @brief Converts an inclusive range of days into the half-open timestamp range [first day, day after the last day).
+    @param start_date: The first day of the range.
+    @param end_date: The last day of the range.
+    @return The (first day, day after the last day) pair, for 'datetime >= %s AND datetime < %s' conditions.
+    """
+
+    return sales_date(start_date), sales_date(end_date) + timedelta(days=1)
+
+
+""" @ref R34_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class maintains the per-day, per-product and per-category sales rollups and answers the sales reports from them.
+class SalesRollup:
+    # The number of products listed by the top selling products report
+    TOP_PRODUCTS = 5
+
+    def __init__(self, connection) -> None:
+        """
+        @brief Constructor for the SalesRollup class.
+        @param connection: The database connection object; its 'dialect' selects the upsert syntax.
+        @pre The sales rollup tables of migration 0003 exist.
+        """
+
+        self.connection = connection
+        if getattr(connection, 'dialect', 'mysql') == 'sqlite':
+            daily_update = "ON CONFLICT (sales_date) DO UPDATE SET order_count = order_count + excluded.order_count, total_amount = total_amount + excluded.total_amount"
+            product_update = ("ON CONFLICT (sales_date, product_id) DO UPDATE SET quantity = quantity + excluded.quantity, "
+                              "total_price = total_price + excluded.total_price, line_count = line_count + excluded.line_count")
+            category_update = ("ON CONFLICT (sales_date, category_id) DO UPDATE SET total_price = total_price + excluded.total_price, "
+                               "line_count = line_count + excluded.line_count")
+        else:
+            daily_update = "ON DUPLICATE KEY UPDATE order_count = order_count + VALUES(order_count), total_amount = total_amount + VALUES(total_amount)"
+            product_update = ("ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity), "
+                              "total_price = total_price + VALUES(total_price), line_count = line_count + VALUES(line_count)")
+            category_update = "ON DUPLICATE KEY UPDATE total_price = total_price + VALUES(total_price), line_count = line_count + VALUES(line_count)"
+        # Upserts adding an order's contribution, or subtracting it with negative values
+        self.daily_upsert = ("INSERT INTO sales_daily (sales_date, order_count, total_amount) VALUES (%s, %s, %s) " + daily_update)
+        self.product_upsert = ("INSERT INTO sales_daily_product (sales_date, product_id, quantity, total_price, line_count) "
+                               "VALUES (%s, %s, %s, %s, %s) " + product_update)
+        # The category is looked up in the same statement; products without a category are not rolled up, as in the raw report
+        self.category_upsert = ("INSERT INTO sales_daily_category (sales_date, category_id, total_price, line_count) "
+                                "SELECT %s, category_id, %s, %s FROM products WHERE product_id = %s AND category_id IS NOT NULL " + category_update)
+        self.category_update = category_update
+
+    # @contract
+    # @pre(lambda order: isinstance(order, dict))
+    """ @ref R34_0"""
+    def apply_order(self, cursor: Any, order: dict[str, Any], sign: int = 1) -> None:
+        """
+        @brief Adds an order to the rollups, or removes it again.
+        The statements run on the caller's cursor, so the rollups change in the same transaction as the order itself; the caller commits.
+        @param cursor: The cursor of the transaction writing the order.
+        @param order: The order with 'datetime', 'total_amount' and 'order_details', a list of dictionaries with 'product_id', 'quantity' and 'total_price'.
+        @param sign: 1 when the order is inserted, -1 when it is deleted.
+        @post The rollup rows of the order's day include the order if sign is 1 and exclude it if sign is -1.
+        """
+
+        day = sales_date(order['datetime'])
+        cursor.execute(self.daily_upsert, (day, sign, sign * float(order['total_amount'])))
+        details = order['order_details']
+        if details:
+            cursor.executemany(self.product_upsert, [
+                (day, int(detail['product_id']), sign * float(detail['quantity']), sign * float(detail['total_price']), sign)
+                for detail in details])
+            cursor.executemany(self.category_upsert, [
+                (day, sign * float(detail['total_price']), sign, int(detail['product_id']))
+                for detail in details])
+        if sign < 0:
+            # Drop the rows no order contributes to any more, instead of keeping zero totals
+            cursor.execute("DELETE FROM sales_daily WHERE sales_date = %s AND order_count = 0", (day,))
+            cursor.execute("DELETE FROM sales_daily_product WHERE sales_date = %s AND line_count = 0", (day,))
+            cursor.execute("DELETE FROM sales_daily_category WHERE sales_date = %s AND line_count = 0", (day,))
+
+    # @contract
+    # @pre(lambda product_ids: len(product_ids) > 0)
+    """ @ref R34_0"""
+    def move_products(self, cursor: Any, product_ids: list[int], sign: int) -> None:
+        """
+        @brief Adds the sales of some products to the category rollups of their current categories, or removes them again.
+        A product-scoped variant of backfill for changing the category of products: the caller removes their sales before updating the products and adds them after, on the cursor of the same transaction; the caller commits.
+        @param cursor: The cursor of the transaction changing the products.
+        @param product_ids: The ids of the products whose category changes.
+        @param sign: -1 before the products are updated, 1 after.
+        @post The category rollup rows include the sales of the products under their current categories if sign is 1 and exclude them if sign is -1.
+        """
+
+        cursor.execute(
+            "INSERT INTO sales_daily_category (sales_date, category_id, total_price, line_count) "
+            "SELECT DATE(orders.datetime), products.category_id, %s * SUM(order_details.total_price), %s * COUNT(*) "
+            "FROM order_details JOIN orders ON order_details.order_id = orders.order_id "
+            "JOIN products ON order_details.product_id = products.product_id "
+            "WHERE products.category_id IS NOT NULL AND order_details.product_id IN (" + ', '.join(['%s'] * len(product_ids)) + ") "
+            "GROUP BY DATE(orders.datetime), products.category_id " + self.category_update,
+            (sign, sign) + tuple(product_ids))
+        if sign < 0:
+            # Drop the rows of categories left without sales
+            cursor.execute("DELETE FROM sales_daily_category WHERE line_count = 0")
+
+    # @contract
+    # @post(lambda result: isinstance(result, int))
+    """ @ref R34_0"""
+    def backfill(self, start_date: Optional[Union[str, date]] = None, end_date: Optional[Union[str, date]] = None) -> int:
+        """
+        @brief Recomputes the rollups of a range of days from the raw orders, e.g. after orders were written around the Orders class.
+        Order writes during the backfill may be counted twice or not at all, so it should run while the shop does not take orders.
+        @param start_date: The first day to recompute, or None for the whole history.
+        @param end_date: The last day to recompute, or None for the whole history.
+        @return The number of days with sales in the range.
+        @post The rollup rows of the range equal the aggregates of the orders in the range.
+        """
+
+        cursor = self.connection.cursor()
+        if start_date is not None and end_date is not None:
+            first_day, after_last_day = day_bounds(start_date, end_date)
+            rollup_condition, order_condition = " WHERE sales_date >= %s AND sales_date < %s", " AND orders.datetime >= %s AND orders.datetime < %s"
+            params = (first_day, after_last_day)
+        else:
+            rollup_condition, order_condition, params = "", "", ()
+        for table in ('sales_daily', 'sales_daily_product', 'sales_daily_category'):
+            cursor.execute("DELETE FROM " + table + rollup_condition, params)
+        cursor.execute(
+            "INSERT INTO sales_daily (sales_date, order_count, total_amount) "
+            "SELECT DATE(orders.datetime), COUNT(*), SUM(orders.total_amount) FROM orders "
+            "WHERE 1 = 1" + order_condition + " GROUP BY DATE(orders.datetime)", params)
+        days = cursor.rowcount
+        cursor.execute(
+            "INSERT INTO sales_daily_product (sales_date, product_id, quantity, total_price, line_count) "
+            "SELECT DATE(orders.datetime), order_details.product_id, SUM(order_details.quantity), SUM(order_details.total_price), COUNT(*) "
+            "FROM order_details JOIN orders ON order_details.order_id = orders.order_id "
+            "WHERE 1 = 1" + order_condition + " GROUP BY DATE(orders.datetime), order_details.product_id", params)
+        cursor.execute(
+            "INSERT INTO sales_daily_category (sales_date, category_id, total_price, line_count) "
+            "SELECT DATE(orders.datetime), products.category_id, SUM(order_details.total_price), COUNT(*) "
+            "FROM order_details JOIN orders ON order_details.order_id = orders.order_id "
+            "JOIN products ON order_details.product_id = products.product_id "
+            "WHERE products.category_id IS NOT NULL" + order_condition + " GROUP BY DATE(orders.datetime), products.category_id", params)
+        self.connection.commit()
+        return days
+
+    # @contract
+    # @post(lambda result: isinstance(result, float))
+    """ @ref R34_0"""
+    @retry_on_disconnect()
+    def total_sales(self, start_date: Union[str, date], end_date: Union[str, date]) -> float:
+        """
+        @brief Sums the order totals of a range of days from the daily rollup.
+        @param start_date: The first day of the report.
+        @param end_date: The last day of the report, included.
+        @pre The database connection must be established and valid.
+        @return The total amount of the orders placed in the range.
+        """
+
+        cursor = self.connection.cursor(prepared=True)
+        cursor.execute("SELECT SUM(total_amount) FROM sales_daily WHERE sales_date >= %s AND sales_date < %s",
+                       day_bounds(start_date, end_date))
+        total = cursor.fetchone()[0]
+        return float(total) if total is not None else 0.0
+
+    # @contract
+    # @post(lambda result: isinstance(result, list))
+    """ @ref R34_0"""
+    @retry_on_disconnect()
+    def top_selling_products(self, start_date: Union[str, date], end_date: Union[str, date]) -> list[dict[str, Any]]:
+        """
+        @brief Lists the products sold in the largest quantities in a range of days, from the per-product rollup.
+        @param start_date: The first day of the report.
+        @param end_date: The last day of the report, included.
+        @pre The database connection must be established and valid.
+        @return A list of dictionaries with 'product_id', 'products_name' and 'total_quantity', as returned by Products.top_selling_products.
+        """
+
+        cursor = self.connection.cursor(prepared=True)
+        query = (
+            "SELECT products.product_id, products.name, SUM(sales_daily_product.quantity) AS total_quantity "
+            "FROM sales_daily_product "
+            "JOIN products ON sales_daily_product.product_id = products.product_id "
+            "WHERE sales_daily_product.sales_date >= %s AND sales_daily_product.sales_date < %s "
+            "GROUP BY products.product_id "
+            "ORDER BY total_quantity DESC "
+            "LIMIT %s")
+        cursor.execute(query, day_bounds(start_date, end_date) + (self.TOP_PRODUCTS,))
+        return [{'product_id': row[0], 'products_name': row[1], 'total_quantity': row[2]} for row in cursor.fetchall()]
+
+    # @contract
+    # @post(lambda result: isinstance(result, list))
+    """ @ref R34_0"""
+    @retry_on_disconnect()
+    def sales_by_category(self, start_date: Union[str, date], end_date: Union[str, date]) -> list[dict[str, Any]]:
+        """
+        @brief Sums the sales of each category in a range of days, from the per-category rollup.
+        @param start_date: The first day of the report.
+        @param end_date: The last day of the report, included.
+        @pre The database connection must be established and valid.
+        @return A list of dictionaries with 'category_name' and 'total_sales', as returned by Products.sales_by_category.
+        """
+
+        cursor = self.connection.cursor(prepared=True)
+        query = (
+            "SELECT categories.category_name, SUM(sales_daily_category.total_price) AS total_sales "
+            "FROM sales_daily_category "
+            "JOIN categories ON sales_daily_category.category_id = categories.category_id "
+            "WHERE sales_daily_category.sales_date >= %s AND sales_daily_category.sales_date < %s "
+            "GROUP BY categories.category_id "
+            "ORDER BY total_sales DESC")
+        cursor.execute(query, day_bounds(start_date, end_date))
+        return [{'category_name': row[0], 'total_sales': round(row[1], 2)} for row in cursor.fetchall()]
+
+    # @contract
+    # @post(lambda result: isinstance(result, tuple))
+    """ @ref R34_0"""
+    @retry_on_disconnect()
+    def daily_breakdown(self, start_date: Union[str, date], end_date: Union[str, date]) -> tuple[list[tuple], list[tuple]]:
+        """
+        @brief Reads the per-day totals and per-day product quantities of a range of days, for the bucketed sales report.
+        @param start_date: The first day of the report.
+        @param end_date: The last day of the report, included.
+        @pre The database connection must be established and valid.
+        @return A pair of lists: (day, hour, order_count, total_amount) rows and (day, hour, product_id, name, quantity) rows, with hour always 0.
+        """
+
+        cursor = self.connection.cursor(prepared=True)
+        cursor.execute("SELECT sales_date, 0, order_count, total_amount FROM sales_daily WHERE sales_date >= %s AND sales_date < %s",
+                       day_bounds(start_date, end_date))
+        day_rows = cursor.fetchall()
+        cursor.execute(
+            "SELECT sales_daily_product.sales_date, 0, products.product_id, products.name, sales_daily_product.quantity "
+            "FROM sales_daily_product "
+            "JOIN products ON sales_daily_product.product_id = products.product_id "
+            "WHERE sales_daily_product.sales_date >= %s AND sales_daily_product.sales_date < %s",
+            day_bounds(start_date, end_date))
+        return day_rows, cursor.fetchall()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    @brief Command line entry point: python -m Backend.sales_rollup backfill [--start-date D] [--end-date D] [--backend B] [--database D]
+    """
+
+    parser = argparse.ArgumentParser(description="Maintain the grocery store sales rollups.")
+    parser.add_argument('command', choices=['backfill'], help="recompute the rollups from the raw orders")
+    parser.add_argument('--start-date', help="first day to recompute, YYYY-MM-DD (default: whole history)")
+    parser.add_argument('--end-date', help="last day to recompute, YYYY-MM-DD (default: whole history)")
+    add_backend_arguments(parser)
+    args = parser.parse_args(argv)
+    if (args.start_date is None) != (args.end_date is None):
+        parser.error("--start-date and --end-date must be given together")
+
+    connection = connection_from_arguments(parser, args)
+    days = SalesRollup(connection).backfill(args.start_date, args.end_date)
+    print('Recomputed the sales rollups of %d days with sales' % days)
+    connection.release()
+
+
+if __name__ == '__main__':
+    main()
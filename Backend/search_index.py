@@ -0,0 +1,200 @@
+import re
+from collections import defaultdict
+from typing import Any, Iterable
+
+
+""" @ref R10_0"""
+# This function is part of the @ref Model within the overall @ref ModelViewController Design.
+# This function brings product names and search queries to one comparable form.
+def normalize(text: str) -> str:
+    """
+    @brief Lowercases a text and collapses its whitespace.
+    @param text: The product name or query.
+    @return The normalized text.
+    """
+
+    return ' '.join(text.lower().split())
+
+
+""" @ref R10_0"""
+# This function is part of the @ref Model within the overall @ref ModelViewController Design.
+# This function splits a text into the trigrams used for substring and typo-tolerant matching.
+def trigrams(text: str) -> set[str]:
+    """
+    @brief Returns the set of three-character substrings of a text.
+    @param text: The text, usually a normalized word padded with '$' on both ends.
+    @return The trigrams; empty if the text is shorter than three characters.
+    """
+
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+""" @ref R10_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class is one node of the word prefix trie; it holds the ids of every product having a word with this prefix.
+class _TrieNode:
+    __slots__ = ('children', 'ids')
+
+    def __init__(self) -> None:
+        self.children = {}
+        self.ids = set()
+
+
+""" @ref R10_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class indexes product names in memory for ranked prefix, substring and typo-tolerant search.
+class ProductSearchIndex:
+    # Matches are ranked by how they were found, best first
+    EXACT, NAME_PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(5)
+    # The minimum Dice similarity between the trigrams of a query word and a product word to count as a typo
+    MIN_SIMILARITY = 0.5
+    _WORD = re.compile(r'\w+')
+
+    def __init__(self, products: Iterable[dict[str, Any]]) -> None:
+        """
+        @brief Constructor for the ProductSearchIndex class; indexes the given products.
+        @param products: The product dictionaries in the format returned by Products.get_all_products.
+        """
+
+        self.products = {}
+        self._names = {}
+        self._exact = defaultdict(set)
+        self._trie = _TrieNode()
+        # Trigrams of whole names, for substring matches spanning several words
+        self._name_grams = defaultdict(set)
+        # Words by the trigrams of their padded form, and products by word, for typo-tolerant matches
+        self._word_grams = defaultdict(set)
+        self._word_ids = defaultdict(set)
+        self._word_gram_counts = {}
+        for product in products:
+            self.add(product)
+
+    def add(self, product: dict[str, Any]) -> None:
+        """
+        @brief Adds a product to the index.
+        @param product: The product dictionary, with at least 'product_id' and 'name'.
+        """
+
+        product_id = product['product_id']
+        name = normalize(product['name'])
+        self.products[product_id] = product
+        self._names[product_id] = name
+        self._exact[name].add(product_id)
+        for gram in trigrams(name):
+            self._name_grams[gram].add(product_id)
+        for word in self._WORD.findall(name):
+            node = self._trie
+            for char in word:
+                node = node.children.setdefault(char, _TrieNode())
+                node.ids.add(product_id)
+            if word not in self._word_ids:
+                grams = trigrams('$' + word + '$')
+                for gram in grams:
+                    self._word_grams[gram].add(word)
+                self._word_gram_counts[word] = len(grams)
+            self._word_ids[word].add(product_id)
+
+    def search(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        @brief Finds the products whose names best match a query.
+        Exact names rank first, then names starting with the query, names with words starting with every query word,
+        names containing the query, and finally names with words within a typo of every query word.
+        Within a rank, closer typos and shorter names come first.
+        @param query: The text typed by the user.
+        @param limit: The maximum number of products returned.
+        @return The matching product dictionaries, best match first; an empty list if nothing matches.
+        """
+
+        text = normalize(query)
+        words = self._WORD.findall(text)
+        if not words or limit <= 0:
+            return []
+        # Maps each matching product_id to its (rank, -similarity) pair
+        ranks = {}
+
+        def found(ids: Iterable[int], rank: int, similarity: float = 1.0) -> None:
+            for product_id in ids:
+                if product_id not in ranks:
+                    ranks[product_id] = (rank, -similarity)
+
+        found(self._exact.get(text, ()), self.EXACT)
+        word_matches = [self._prefix_ids(word) for word in words]
+        candidates = set.intersection(*word_matches)
+        found(sorted(product_id for product_id in candidates if self._names[product_id].startswith(text)), self.NAME_PREFIX)
+        found(candidates, self.WORD_PREFIX)
+        if len(text) >= 3:
+            found(self._substring_ids(text), self.SUBSTRING)
+        if len(ranks) < limit:
+            for product_id, similarity in self._fuzzy_ids(words, word_matches).items():
+                found((product_id,), self.FUZZY, similarity)
+        ranked = sorted(ranks, key=lambda product_id: (ranks[product_id], len(self._names[product_id]), product_id))
+        return [self.products[product_id] for product_id in ranked[:limit]]
+
+    def _prefix_ids(self, prefix: str) -> set[int]:
+        """
+        @brief Looks up the products having a word starting with a prefix.
+        @param prefix: The normalized prefix.
+        @return The set of product ids, which must not be modified.
+        """
+
+        node = self._trie
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.ids
+
+    def _substring_ids(self, text: str) -> set[int]:
+        """
+        @brief Looks up the products whose name contains a text of at least three characters.
+        @param text: The normalized text.
+        @return The set of product ids.
+        """
+
+        # Start from the rarest trigram, so few candidates remain to be verified
+        postings = sorted((self._name_grams.get(gram, set()) for gram in trigrams(text)), key=len)
+        candidates = set.intersection(*postings)
+        return {product_id for product_id in candidates if text in self._names[product_id]}
+
+    def _fuzzy_ids(self, words: list[str], word_matches: list[set[int]]) -> dict[int, float]:
+        """
+        @brief Looks up the products matching every query word by prefix or within a typo.
+        @param words: The normalized query words.
+        @param word_matches: The ids of the products matching each query word by prefix.
+        @return A dictionary mapping product ids to their mean word similarity.
+        """
+
+        totals = None
+        for word, prefix_ids in zip(words, word_matches):
+            # Similarity of each product to this query word: 1 for a prefix match, the best typo similarity otherwise
+            scores = dict.fromkeys(prefix_ids, 1.0)
+            for similar, similarity in self._similar_words(word).items():
+                for product_id in self._word_ids[similar]:
+                    if scores.get(product_id, 0.0) < similarity:
+                        scores[product_id] = similarity
+            if totals is None:
+                totals = scores
+            else:
+                totals = {product_id: totals[product_id] + score for product_id, score in scores.items() if product_id in totals}
+            if not totals:
+                return {}
+        return {product_id: total / len(words) for product_id, total in totals.items()}
+
+    def _similar_words(self, word: str) -> dict[str, float]:
+        """
+        @brief Finds the indexed words within a typo of a query word.
+        @param word: The normalized query word.
+        @return A dictionary mapping similar words to their Dice similarity to the query word.
+        """
+
+        grams = trigrams('$' + word + '$')
+        shared = defaultdict(int)
+        for gram in grams:
+            for candidate in self._word_grams.get(gram, ()):
+                shared[candidate] += 1
+        similar = {}
+        for candidate, count in shared.items():
+            similarity = 2.0 * count / (len(grams) + self._word_gram_counts[candidate])
+            if similarity >= self.MIN_SIMILARITY:
+                similar[candidate] = similarity
+        return similar
@@ -1,29 +1,109 @@
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, stream_with_context
 import sys
 import os
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(parent_dir)
 from Backend.sql_connection import SQLConnection
+from Backend.storage import create_connection
+import io
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional
 from Backend.products import Products
 from Backend.orders import Orders
+from Backend.order_queue import OrderQueue, QueueFull
+from Backend.customers import Customers
+from Backend.product_import import ProductImport
+from Backend.analytics import SalesAnalytics
 from Backend.unit_of_measures import UnitOfMeasures
+from Backend.reference_cache import ReferenceCache
+from Backend.product_catalog import ProductCatalog
+from Backend.sales_rollup import SalesRollup, sales_date
+from Backend.report_cache import ReportCache
+from Backend.report_jobs import JobQueueFull, ReportJob, ReportJobs
+from Backend.trending import TrendingProducts
+from Backend.pricing import PriceTable
+from Backend.migrations import Migrator
+from Backend.streaming import csv_stream, json_array_stream, ndjson_stream
 # from contracts import contract, pre, post
 
 """ @ref R6_0"""
 # This Class is part of the @ref Controller within the overall @ref ModelViewController Design.
 # This class implements API endpoints for methods related to orders, products, unit_of_measures.
 class Server:
+    MAX_PAGE_SIZE = 1000  # Largest page a client may request from the paginated listings
+    SALES_REPORT_TYPES = ('total_sales', 'top_selling_products', 'sales_by_category')  # Reports served by /salesReport
+    MAX_BATCH_ORDERS = 1000  # Most orders a client may send to /insertOrders at once
+    MAX_TOP_N = 100  # Most top selling products a client may request per period of /salesTrend
+    HEAVY_REPORT_DAYS = 92  # Report jobs spanning more days count against the limit of concurrent heavy jobs
+    EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}  # Streamed export formats of the total sales report
+
     """ @ref R6_0"""
-    def __init__(self) -> None:
+    def __init__(self, pool_size: int = 5, pool_timeout: float = 10.0, backend: str = 'mysql',
+                 connection: Optional[SQLConnection] = None, reference_ttl: float = 300.0,
+                 catalog_ttl: float = 300.0, sales_rollups: bool = False, report_cache_size: int = 128,
+                 report_ttl: float = 60.0, report_workers: int = 3, analytics: bool = False,
+                 analytics_refresh: float = 5.0, job_workers: int = 2, heavy_jobs: int = 1,
+                 job_retention: float = 600.0, trending_capacity: int = 100,
+                 customer_stats: bool = False, order_queue_path: Optional[str] = None, order_queue_depth: int = 10000,
+                 server_pricing: bool = False) -> None:
         """
         @brief Initializes the Server class.
+        @param pool_size: The maximum number of database connections shared by the request threads.
+        @param pool_timeout: The number of seconds a request waits for a free database connection.
+        @param backend: The storage backend to use, 'mysql' or 'sqlite'.
+        @param connection: An already configured connection object; overrides backend and the pool settings.
+        @param reference_ttl: The number of seconds unit of measures are served from memory before they are reloaded.
+        @param catalog_ttl: The number of seconds the product catalog is served from memory before it is reloaded.
+        @param sales_rollups: If True, orders maintain the sales rollup tables of migration 0003 and the sales reports read them.
+        @param report_cache_size: The maximum number of sales reports kept in memory.
+        @param report_ttl: The number of seconds a sales report whose range reaches today is cached; reports of past ranges are kept until an order of their range changes.
+        @param report_workers: The number of threads running the reports of /salesDashboard concurrently; each holds one pooled connection while it runs.
+        @param analytics: If True, the sales reports are computed in memory from NumPy columns of the orders instead of by SQL; requires NumPy.
+        @param analytics_refresh: The number of seconds after which the analytics engine loads the orders written by other server processes.
+        @param job_workers: The number of threads running submitted report jobs; each holds one pooled connection while it runs.
+        @param heavy_jobs: The maximum number of report jobs spanning more than HEAVY_REPORT_DAYS running at once.
+        @param job_retention: The number of seconds the result of a finished report job can be fetched.
+        @param trending_capacity: The number of products tracked per pane of the /trendingProducts windows; estimates overstate by at most the window's total quantity / trending_capacity.
+        @param customer_stats: If True, orders maintain the customer_stats table of migration 0004 and customer lookups read it.
+        @param order_queue_path: A local directory for the write-ahead log of the write-behind order queue; if given, /insertOrder acknowledges orders once they are logged
+        and a worker commits them in batches. The queue replays its log once order_queue.start() is called and requires migration 0005.
+        @param order_queue_depth: The most orders waiting to be committed before /insertOrder answers 503.
+        @param server_pricing: If True, the line totals and order totals of new orders are computed from an in-memory price table instead of taken from the client;
+        the table follows the product writes of this process and is reloaded after catalog_ttl seconds.
         """
         self.app = Flask(__name__)  # Creates a Flask application
-        self.connection = SQLConnection()  # Establishes a SQL connection
-        self.products = Products(self.connection)  # Creates an instance of the Products class with the SQL connection
-        self.orders = Orders(self.connection)  # Creates an instance of the Orders class with the SQL connection
-        self.unit_of_measures = UnitOfMeasures(self.connection) # Creates an instance of the unit_of_measure class with the SQL connection
+        if connection is None:
+            connection = create_connection(backend, pool_size=pool_size, pool_timeout=pool_timeout)  # Creates the pooled SQL connection
+        self.connection = connection
+        self.reference_cache = ReferenceCache(reference_ttl)  # Caches rarely changing lookup tables in memory
+        self.unit_of_measures = UnitOfMeasures(self.connection, self.reference_cache) # Creates an instance of the unit_of_measure class with the SQL connection
+        self.product_catalog = ProductCatalog(catalog_ttl)  # Keeps all products in memory, updated by every product write
+        self.sales_rollup = SalesRollup(self.connection) if sales_rollups else None  # Maintains the daily sales aggregates
+        self.analytics = SalesAnalytics(self.connection, analytics_refresh) if analytics else None  # Holds the orders as columns for vectorized reports
+        self.products = Products(self.connection, self.unit_of_measures, self.product_catalog, self.sales_rollup,
+                                 self.analytics)  # Creates an instance of the Products class with the SQL connection
+        self.product_import = ProductImport(self.products, self.unit_of_measures)  # Loads supplier catalogs in chunked transactions
+        self.customers = Customers(self.connection, customer_stats)  # Looks up the orders and aggregates of one customer
+        aggregates = [self.sales_rollup] if self.sales_rollup is not None else []  # Derived tables updated with every order
+        if customer_stats:
+            aggregates.append(self.customers)  # Keeps each customer's order count, spend and order times current
+        self.price_table = PriceTable(self.connection, catalog_ttl) if server_pricing else None  # Prices orders from the product prices in memory
+        if self.price_table is not None:
+            self.products.subscribe(self.price_table.on_product_changed)  # Applies every price change as it is committed
+        self.orders = Orders(self.connection, aggregates, self.price_table)  # Creates an instance of the Orders class with the SQL connection
+        self.order_queue = OrderQueue(self.orders, order_queue_path, max_pending=order_queue_depth) if order_queue_path else None  # Commits logged orders in batches
+        self.report_cache = ReportCache(report_cache_size, report_ttl)  # Caches computed sales reports by type and date range
+        self.orders.subscribe(self.invalidate_reports_for_order)  # Drops the reports a changed order falls into
+        self.products.subscribe(self.invalidate_reports_for_product)  # Drops the reports a deleted product appeared in
+        if self.analytics is not None:
+            self.orders.subscribe(self.analytics.on_order_changed)  # Loads new orders and drops deleted ones before the next report
+            self.products.subscribe(self.analytics.on_product_changed)  # Reloads the product names and categories
+        self.trending = TrendingProducts(trending_capacity)  # Counts the products sold in the last hour and day in bounded memory
+        self.orders.subscribe(self.trending.on_order_changed)  # Counts every inserted order as it is committed
+        self.report_executor = ThreadPoolExecutor(report_workers, thread_name_prefix='report')  # Runs dashboard reports in parallel
+        self.report_jobs = ReportJobs(job_workers, heavy_jobs, retention=job_retention)  # Runs long reports outside the request threads
 
     """ @ref R6_0"""
     def run(self) -> None:
@@ -41,13 +121,99 @@ class Server:
         @pre The database connection must be established and valid.
         @return Flask Response: JSON response containing all products.
         @post The method retrieves all products from the database, converts the response to a JSON object, and adds the necessary header to allow cross-origin requests before returning the response.
+        With the 'stream' request parameter set to 'true', the products are streamed from the database as chunked JSON instead.
+        With a 'limit' request parameter, one page of products after the optional 'after' cursor is returned with its 'next_cursor'.
+        The response carries the catalog version as ETag; a request whose If-None-Match matches it is answered with 304 Not Modified.
         """
         
+        return self.catalog_response(self.get_products_listing)
+
+    """ @ref R6_0"""
+    def get_products_listing(self) -> Response:
+        """
+        @brief Builds the /getProducts response for the full, streamed or paginated listing requested.
+        @return Flask Response: JSON response containing the products.
+        """
+
+        if 'limit' in request.args:
+            return self.get_page(self.products.get_products_page)  # Returns one keyset page of products
+        if self.is_streaming_requested():
+            return self.stream_json_array(self.products.iter_all_products())  # Streams the products as they are read
         products_data = self.products.get_all_products()  # Retrieves all products from the database
         json_response = jsonify(products_data)  # Converts the response to a JSON object
         json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
         return json_response
 
+    """ @ref R6_0"""
+    def catalog_response(self, build_response: Callable[[], Response]) -> Response:
+        """
+        @brief Answers a product read conditionally on the product catalog version.
+        The tag is read before the products, so a product written meanwhile only makes the tag older than the body and the client refetches later.
+        @param build_response: A callable building the full response.
+        @return Flask Response: 304 Not Modified if the client's If-None-Match holds the current catalog tag, the full response with an ETag header otherwise.
+        """
+
+        etag = self.products.catalog_etag()  # Gets the tag of the loaded catalog, if any
+        if etag is not None and request.if_none_match.contains(etag):
+            response = Response(status=304)  # The client's copy is current
+        else:
+            response = build_response()
+            if etag is None or response.status_code != 200:
+                return response
+        response.set_etag(etag)  # Lets the client revalidate its copy
+        response.headers['Access-Control-Allow-Origin'] = '*'  # Allows cross-origin requests
+        response.headers['Access-Control-Expose-Headers'] = 'ETag'  # Lets browser clients read the tag
+        return response
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R6_0"""
+    def get_page(self, fetch_page: Callable[[int, Optional[int]], dict[str, Any]]) -> Response:
+        """
+        @brief Retrieves one keyset page using the 'limit' and 'after' request parameters.
+        @param fetch_page: The model method returning the page, e.g. Products.get_products_page.
+        @return Flask Response: JSON response containing the page and its 'next_cursor', or a 400 response if the parameters are invalid.
+        """
+
+        try:
+            limit = int(request.args.get('limit', ''))  # Get the page size from request.
+            after = request.args.get('after')  # Get the cursor of the previous page from request.
+            after = int(after) if after else None
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= self.MAX_PAGE_SIZE:
+            json_response = jsonify({'success': False, 'message': 'limit must be an integer between 1 and %d and after an integer id.' % self.MAX_PAGE_SIZE})
+            json_response.status_code = 400  # Rejects the malformed request
+        else:
+            json_response = jsonify(fetch_page(limit, after))  # Converts the page to a JSON object
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
+    """ @ref R6_0"""
+    def is_streaming_requested(self) -> bool:
+        """
+        @brief Checks whether the client asked for a streamed response.
+        @return True if the 'stream' request parameter is 'true' or '1'.
+        """
+
+        return request.args.get('stream', '').lower() in ('true', '1')
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R6_0"""
+    def stream_json_array(self, rows: Iterable[Any]) -> Response:
+        """
+        @brief Sends rows as a JSON array that is encoded while the rows are read from the database.
+        @param rows: An iterator of rows, typically reading from an unbuffered cursor.
+        @return Flask Response: chunked JSON response; memory use stays constant regardless of the number of rows.
+        @post The request context, and with it the pooled connection, is kept until the last row has been sent.
+        """
+
+        chunks = json_array_stream(rows, self.app.json.dumps)  # Encodes the rows in the same format as jsonify
+        streamed_response = Response(stream_with_context(chunks), mimetype='application/json')  # Sends each chunk as soon as it is ready
+        streamed_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return streamed_response
+
     # @contract
     # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
     """ @ref R7_0"""
@@ -65,6 +231,30 @@ class Server:
         json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
         return json_response
 
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R7_0"""
+    def import_products(self) -> Response:
+        """
+        @brief Inserts or updates the products of a CSV catalog, sent as the 'file' upload or as the request body.
+        The columns are name, unit_of_measure_id, price_per_unit and optionally category_id; products are matched by name.
+        @pre The database connection must be established and valid.
+        @return Flask Response: JSON response with the report of ProductImport.import_csv, or a 400 response if the file is not UTF-8 CSV with the required columns.
+        @post The valid rows are committed in chunks. The response includes the necessary header to allow cross-origin requests.
+        """
+
+        upload = request.files.get('file')  # Get the uploaded file from request.
+        stream = upload.stream if upload is not None else request.stream  # Reads the CSV while it is received
+        try:
+            report = self.product_import.import_csv(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))  # Imports the rows chunk by chunk
+        except ValueError as error:  # A missing column or bytes that are not UTF-8
+            json_response = jsonify({'success': False, 'message': str(error)})
+            json_response.status_code = 400  # Rejects the malformed file
+        else:
+            json_response = jsonify(report)  # Converts the import report to a JSON object
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
     # @contract
     # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
     """ @ref R57_0"""
@@ -74,13 +264,54 @@ class Server:
         @pre The database connection must be established and valid.
         @return Flask Response: JSON response containing all orders.
         @post The method retrieves all orders from the database, converts the response to a JSON object, and adds the necessary header to allow cross-origin requests before returning the response.
+        With the 'stream' request parameter set to 'true', the orders are streamed from the database as chunked JSON instead.
+        With a 'limit' request parameter, one page of orders after the optional 'after' cursor is returned with its 'next_cursor'.
         """
 
+        if 'limit' in request.args:
+            return self.get_page(self.orders.get_orders_page)  # Returns one keyset page of orders
+        if self.is_streaming_requested():
+            return self.stream_json_array(self.orders.iter_all_orders())  # Streams the orders as they are read
         orders_data = self.orders.get_all_orders()  # Retrieves all orders from the database
         json_response = jsonify(orders_data )  # Converts the response to a JSON object
         json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
         return json_response
 
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R57_0"""
+    def get_customer(self, customer_name: str) -> Response:
+        """
+        @brief Retrieves a customer's order count, total spend and first and last order times.
+        @param customer_name: The name the orders were placed under.
+        @pre The database connection must be established and valid.
+        @return Flask Response: JSON response with the aggregates of Customers.get_customer, or 404 if the customer has no orders.
+        @post The response includes the necessary header to allow cross-origin requests.
+        """
+
+        customer = self.customers.get_customer(customer_name)  # Looks up the customer's aggregates
+        if customer is None:
+            json_response = jsonify({'success': False, 'message': 'No orders for this customer.'})
+            json_response.status_code = 404
+        else:
+            json_response = jsonify(customer)  # Converts the response to a JSON object
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R57_0"""
+    def get_customer_orders(self, customer_name: str) -> Response:
+        """
+        @brief Retrieves one page of a customer's orders, newest first, using the 'limit' and 'after' request parameters.
+        @param customer_name: The name the orders were placed under.
+        @pre The database connection must be established and valid.
+        @return Flask Response: JSON response containing the page and its 'next_cursor', or a 400 response if the parameters are invalid.
+        @post The response includes the necessary header to allow cross-origin requests.
+        """
+
+        return self.get_page(lambda limit, after: self.customers.get_customer_orders(customer_name, limit, after))  # Returns one keyset page of the customer's orders
+
     # @contract
     # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
     """ @ref R59_0"""
@@ -88,16 +319,100 @@ class Server:
         """
         @brief Inserts a new order into the database.
         @pre The database connection must be established and valid.
-        @return Flask Response: JSON response containing the inserted order ID.
+        @return Flask Response: JSON response containing the inserted order ID, or a 400 response if server-side pricing rejects the order.
         @post The method inserts the new order into the database and returns a JSON response containing the inserted order ID. The response includes the necessary header to allow cross-origin requests.
         """
 
         request_payload = json.loads(request.form['data'])  # Parses the request payload as JSON
-        order_id = self.orders.insert_new_order(request_payload)  # Inserts the new order into the database
+        if self.order_queue is not None:
+            return self.enqueue_order(request_payload)  # Acknowledges the order once it is logged
+        try:
+            order_id = self.orders.insert_new_order(request_payload)  # Inserts the new order into the database
+        except ValueError as error:
+            # Server-side pricing found an unknown product or an invalid quantity
+            json_response = jsonify({'success': False, 'message': str(error)})
+            json_response.status_code = 400
+            json_response.headers.add('Access-Control-Allow-Origin', '*')
+            return json_response
         json_response = jsonify({'order_id': order_id})  # Creates a JSON response with the inserted order ID
         json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
         return json_response
 
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R59_0"""
+    def enqueue_order(self, order: dict[str, Any]) -> Response:
+        """
+        @brief Appends an order to the write-behind queue instead of committing it during the request.
+        @param order: The order in the format accepted by Orders.insert_new_order.
+        @return Flask Response: 202 JSON response with the 'queue_seq' and a Location header to look up the order_id; 400 if the order is malformed; 503 when the queue is full.
+        @post The order survives a crash once the response is sent. The response includes the necessary header to allow cross-origin requests.
+        """
+
+        try:
+            self.orders.validate_order(order)  # Keeps orders the worker could never commit out of the log
+            queue_seq = self.order_queue.enqueue(order)  # Logs the order durably
+        except (KeyError, TypeError, ValueError) as error:
+            json_response = jsonify({'success': False, 'message': 'Invalid order: %s' % error})
+            json_response.status_code = 400  # Rejects the malformed order
+        except QueueFull as error:
+            json_response = jsonify({'success': False, 'message': str(error)})
+            json_response.status_code = 503  # Asks the terminal to retry later
+            json_response.headers['Retry-After'] = '1'
+        else:
+            json_response = jsonify({'queue_seq': queue_seq, 'status': 'queued'})  # Creates a JSON response with the queue ticket
+            json_response.status_code = 202  # The order is committed later
+            json_response.headers['Location'] = '/orderQueue/%d' % queue_seq  # Tells the client where to look up the order_id
+            json_response.headers['Access-Control-Expose-Headers'] = 'Location'  # Lets browser clients read the location
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R59_0"""
+    def get_queued_order(self, queue_seq: int) -> Response:
+        """
+        @brief Retrieves what became of an order acknowledged by the write-behind queue.
+        @param queue_seq: The sequence number returned by /insertOrder.
+        @return Flask Response: JSON response with the status of OrderQueue.status, including the 'order_id' once committed; 404 if the sequence number or the queue is unknown.
+        @post The response includes the necessary header to allow cross-origin requests.
+        """
+
+        status = self.order_queue.status(queue_seq) if self.order_queue is not None else None  # Looks up the queued order
+        if status is None:
+            json_response = jsonify({'success': False, 'message': 'Unknown queued order.'})
+            json_response.status_code = 404
+        else:
+            json_response = jsonify(status)  # Converts the status to a JSON object
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R59_0"""
+    def insert_new_orders(self) -> Response:
+        """
+        @brief Inserts a batch of orders in one transaction, e.g. the orders a terminal took while it was offline.
+        The 'data' form field holds a JSON list of orders in the format accepted by /insertOrder.
+        @pre The database connection must be established and valid.
+        @return Flask Response: JSON response with 'inserted', the number of inserted orders, and 'results', one dictionary per order with 'index', 'success' and 'order_id' or 'message';
+        or a 400 response if the payload is not a list of at most MAX_BATCH_ORDERS orders.
+        @post The accepted orders are committed together. The response includes the necessary header to allow cross-origin requests.
+        """
+
+        try:
+            request_payload = json.loads(request.form.get('data', ''))  # Parses the request payload as JSON
+        except ValueError:
+            request_payload = None
+        if not isinstance(request_payload, list) or len(request_payload) > self.MAX_BATCH_ORDERS:
+            json_response = jsonify({'success': False, 'message': 'data must be a JSON list of at most %d orders.' % self.MAX_BATCH_ORDERS})
+            json_response.status_code = 400  # Rejects the malformed request
+        else:
+            results = self.orders.insert_new_orders(request_payload)  # Inserts the valid orders with one commit
+            json_response = jsonify({'inserted': sum(result['success'] for result in results), 'results': results})  # Creates a JSON response with the per-order results
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
     # @contract
     # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
     """ @ref R9_0"""
@@ -149,21 +464,288 @@ class Server:
         @pre The database connection must be established and valid.
         @return Flask Response: JSON response containing the sales report by the specified report type.
         @post The method generates the sales report based on the provided report_type, start_date, and end_date. It returns a JSON response containing the sales report by the specified report type. The response includes the necessary header to allow cross-origin requests.
+        With the 'format' request parameter set to 'csv' or 'ndjson', the total_sales report is streamed as a file download instead.
         """
         
         report_type = request.args.get('report_type')  # Get report_type from request.
         start_date = request.args.get('start_date')  # Get start_date from request.
         end_date = request.args.get('end_date')  # Get end_date from request.
-        if report_type == 'total_sales':
-            sales_report = self.products.total_sales(start_date, end_date)  # Generates total sales report.
-        elif report_type == 'top_selling_products':
-            sales_report = self.products.top_selling_products(start_date, end_date)  # Generates sales report by top five
-            # selling products.
-        elif report_type == 'sales_by_category':
-            sales_report = self.products.sales_by_category(start_date, end_date)  # Generates sales report by category.
+        export_format = request.args.get('format', 'json')  # Get the response format from request.
+        message = None
+        if report_type not in self.SALES_REPORT_TYPES:
+            message = 'Unknown report_type.'
+        elif export_format != 'json' and (export_format not in self.EXPORT_FORMATS or report_type != 'total_sales'):
+            message = 'format must be json, or csv or ndjson for the total_sales report.'
+        if message is not None:
+            json_response = jsonify({'success': False, 'message': message})
+            json_response.status_code = 400  # Rejects the malformed request
+            json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+            return json_response
+        if export_format != 'json':
+            return self.export_total_sales(export_format, start_date, end_date)  # Streams the orders as they are read
+        sales_report = self.generate_sales_report(report_type, start_date, end_date)  # Generates the requested report
         json_response = jsonify(sales_report)  # Converts the response to a JSON object
         json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
         return json_response
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R34_0"""
+    def export_total_sales(self, export_format: str, start_date: Optional[str], end_date: Optional[str]) -> Response:
+        """
+        @brief Streams the total sales report as a CSV or NDJSON download, bypassing the report cache.
+        Each order becomes one line; the last line carries the running 'total_sales'. In CSV, order lines leave the total_sales column empty and the total line leaves the order columns empty.
+        @param export_format: 'csv' or 'ndjson'.
+        @param start_date: The start date of the report period.
+        @param end_date: The end date of the report period.
+        @return Flask Response: chunked response; memory use stays constant regardless of the number of orders.
+        @post The request context, and with it the pooled connection, is kept until the last line has been sent.
+        """
+
+        rows = self.products.iter_total_sales(start_date, end_date)  # Reads the orders lazily with a running total
+        if export_format == 'csv':
+            chunks = csv_stream(rows, ['order_id', 'customer_name', 'datetime', 'total_amount', 'total_sales'])
+        else:
+            chunks = ndjson_stream(rows, self.app.json.dumps)  # Encodes each line in the same format as jsonify
+        streamed_response = Response(stream_with_context(chunks), mimetype=self.EXPORT_FORMATS[export_format])  # Sends each chunk as soon as it is ready
+        streamed_response.headers['Content-Disposition'] = 'attachment; filename="total_sales.%s"' % export_format  # Saves the export as a file
+        streamed_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return streamed_response
+
+    """ @ref R34_0"""
+    def generate_sales_report(self, report_type: str, start_date: Optional[str], end_date: Optional[str]) -> Any:
+        """
+        @brief Generates one sales report, reusing a cached result when available.
+        @param report_type: One of SALES_REPORT_TYPES, naming the Products method generating the report.
+        @param start_date: The start date of the report period.
+        @param end_date: The end date of the report period.
+        @return The report as returned by the Products method.
+        """
+
+        generate_report = getattr(self.products, report_type)  # Products.total_sales, top_selling_products or sales_by_category
+        try:
+            first_day, last_day = sales_date(start_date), sales_date(end_date)  # Days of the orders the report covers
+        except (TypeError, ValueError):
+            return generate_report(start_date, end_date)  # Dates the cache cannot place are not cached
+        return self.report_cache.get((report_type, start_date, end_date), first_day, last_day,
+                                     lambda: generate_report(start_date, end_date))  # Reuses a cached report
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R34_0"""
+    def get_sales_dashboard(self) -> Response:
+        """
+        @brief Retrieves all sales reports between the specified dates in one response.
+        The reports run concurrently on the report worker pool, each on its own pooled connection, so the response takes as long as the slowest report rather than their sum.
+        @pre The database connection must be established and valid.
+        @return Flask Response: JSON response with 'reports', mapping each report type to its report, and 'timings_ms', mapping each report type and 'total' to the milliseconds taken.
+        @post The response includes the necessary header to allow cross-origin requests.
+        """
+
+        start_date = request.args.get('start_date')  # Get start_date from request.
+        end_date = request.args.get('end_date')  # Get end_date from request.
+        started = time.perf_counter()
+        futures = {report_type: self.report_executor.submit(self.run_timed_report, report_type, start_date, end_date)
+                   for report_type in self.SALES_REPORT_TYPES}  # Starts every report at once
+        reports = {}
+        timings = {}
+        for report_type, future in futures.items():
+            reports[report_type], timings[report_type] = future.result()  # Waits for each report, re-raising its error
+        timings['total'] = round((time.perf_counter() - started) * 1000, 3)
+        json_response = jsonify({'reports': reports, 'timings_ms': timings})  # Converts the response to a JSON object
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R34_0"""
+    def submit_report_job(self) -> Response:
+        """
+        @brief Queues a sales report to run in the background instead of inside the request.
+        Uses the 'report_type' (one of SALES_REPORT_TYPES, or 'sales_dashboard' for all of them), 'start_date' and 'end_date' request parameters.
+        The job's progress counts the finished reports of a dashboard job; a single report runs as one query, so its progress is None.
+        @return Flask Response: 202 JSON response with the 'job_id' and the job status, and a Location header to poll; 400 for an unknown report type, 503 when the job queue is full.
+        @post The response includes the necessary header to allow cross-origin requests.
+        """
+
+        report_type = request.values.get('report_type')  # Get report_type from request.
+        start_date = request.values.get('start_date')  # Get start_date from request.
+        end_date = request.values.get('end_date')  # Get end_date from request.
+        if report_type not in self.SALES_REPORT_TYPES + ('sales_dashboard',):
+            json_response = jsonify({'success': False, 'message': 'Unknown report_type.'})
+            json_response.status_code = 400  # Rejects the malformed request
+        else:
+            report_types = self.SALES_REPORT_TYPES if report_type == 'sales_dashboard' else (report_type,)
+            try:
+                heavy = (sales_date(end_date) - sales_date(start_date)).days > self.HEAVY_REPORT_DAYS  # Long ranges are heavy
+            except (TypeError, ValueError):
+                heavy = True  # Ranges that cannot be measured are treated as heavy
+            try:
+                job = self.report_jobs.submit(report_type, lambda progress: self.run_report_job(report_types, start_date, end_date, progress), heavy,
+                                              len(report_types) > 1)  # Only a dashboard job has intermediate progress
+            except JobQueueFull as error:
+                json_response = jsonify({'success': False, 'message': str(error)})
+                json_response.status_code = 503  # Asks the client to retry later
+                json_response.headers['Retry-After'] = '5'
+            else:
+                json_response = jsonify(self.report_jobs.describe(job))  # Converts the job status to a JSON object
+                json_response.status_code = 202  # The report is computed later
+                json_response.headers['Location'] = '/reportJobs/%s' % job.job_id  # Tells the client where to poll
+                json_response.headers['Access-Control-Expose-Headers'] = 'Location'  # Lets browser clients read the location
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
+    """ @ref R34_0"""
+    def run_report_job(self, report_types: tuple, start_date: Optional[str], end_date: Optional[str],
+                       progress: Callable[[float], None]) -> Any:
+        """
+        @brief Generates the reports of a job on a job worker thread.
+        @param report_types: The report types to generate.
+        @param start_date: The start date of the report period.
+        @param end_date: The end date of the report period.
+        @param progress: Called with the fraction of the reports done after each report; only tracked for dashboard jobs.
+        @return The report of a single report type, or a dictionary mapping each report type to its report.
+        @post The worker thread holds no database connection.
+        """
+
+        reports = {}
+        try:
+            for done, report_type in enumerate(report_types, 1):
+                reports[report_type] = self.generate_sales_report(report_type, start_date, end_date)
+                progress(done / len(report_types))
+        finally:
+            self.connection.release()  # Job threads outlive the request, so their connection is returned here
+        return reports[report_types[0]] if len(report_types) == 1 else reports
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R34_0"""
+    def get_report_job(self, job_id: str) -> Response:
+        """
+        @brief Retrieves the status and progress of a report job.
+        @param job_id: The id returned when the job was submitted.
+        @return Flask Response: JSON response with the job status, or 404 if the job is unknown or its result expired.
+        @post The response includes the necessary header to allow cross-origin requests.
+        """
+
+        job = self.report_jobs.get(job_id)  # Looks up the job
+        if job is None:
+            json_response = jsonify({'success': False, 'message': 'Unknown or expired report job.'})
+            json_response.status_code = 404
+        else:
+            json_response = jsonify(self.report_jobs.describe(job))  # Converts the job status to a JSON object
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R34_0"""
+    def get_report_job_result(self, job_id: str) -> Response:
+        """
+        @brief Retrieves the report computed by a finished report job.
+        @param job_id: The id returned when the job was submitted.
+        @return Flask Response: JSON response with the report; the job status with 202 while it is queued or running, with 500 if it failed, and 404 if the job is unknown or expired.
+        @post The response includes the necessary header to allow cross-origin requests.
+        """
+
+        job = self.report_jobs.get(job_id)  # Looks up the job
+        if job is None:
+            json_response = jsonify({'success': False, 'message': 'Unknown or expired report job.'})
+            json_response.status_code = 404
+        elif job.status == ReportJob.SUCCEEDED:
+            json_response = jsonify(job.result)  # Converts the report to a JSON object
+        else:
+            json_response = jsonify(self.report_jobs.describe(job))  # Converts the job status to a JSON object
+            json_response.status_code = 500 if job.status == ReportJob.FAILED else 202
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R34_0"""
+    def get_sales_trend(self) -> Response:
+        """
+        @brief Retrieves the sales between the specified dates broken down by period, with the top selling products of each period, in one response.
+        Uses the 'start_date', 'end_date', 'bucket' ('hour', 'day', 'week' or 'month', default 'day') and 'top_n' (default 5) request parameters.
+        @pre The database connection must be established and valid.
+        @return Flask Response: JSON response containing the report of Products.sales_by_bucket, or a 400 response if bucket or top_n is invalid.
+        @post The response includes the necessary header to allow cross-origin requests.
+        """
+
+        start_date = request.args.get('start_date')  # Get start_date from request.
+        end_date = request.args.get('end_date')  # Get end_date from request.
+        bucket = request.args.get('bucket', 'day')  # Get the period length from request.
+        try:
+            top_n = int(request.args.get('top_n', 5))  # Get the number of products per period from request.
+        except ValueError:
+            top_n = -1
+        if bucket not in self.products.BUCKETS or not 0 <= top_n <= self.MAX_TOP_N:
+            json_response = jsonify({'success': False, 'message': 'bucket must be one of %s and top_n an integer between 0 and %d.'
+                                     % (', '.join(self.products.BUCKETS), self.MAX_TOP_N)})
+            json_response.status_code = 400  # Rejects the malformed request
+        else:
+            generate_report = lambda: self.products.sales_by_bucket(start_date, end_date, bucket, top_n)
+            try:
+                first_day, last_day = sales_date(start_date), sales_date(end_date)  # Days of the orders the report covers
+            except (TypeError, ValueError):
+                report = generate_report()  # Dates the cache cannot place are not cached
+            else:
+                report = self.report_cache.get(('sales_by_bucket', start_date, end_date, bucket, top_n), first_day, last_day,
+                                               generate_report)  # Reuses a cached report
+            json_response = jsonify(report)  # Converts the response to a JSON object
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R34_0"""
+    def get_trending_products(self) -> Response:
+        """
+        @brief Retrieves the products estimated to sell most in the last hour or day, from streaming summaries updated by every inserted order.
+        Uses the 'window' ('hour' or 'day', default 'hour') and 'limit' (default 10) request parameters.
+        @pre The database connection must be established and valid.
+        @return Flask Response: JSON response with 'window', 'products' (each with 'product_id', 'product_name', 'estimated_quantity' and 'max_error'),
+        'total_quantity' and 'error_bound', or a 400 response if window or limit is invalid.
+        @post The response includes the necessary header to allow cross-origin requests.
+        """
+
+        window = request.args.get('window', 'hour')  # Get the window from request.
+        try:
+            limit = int(request.args.get('limit', 10))  # Get the number of products from request.
+        except ValueError:
+            limit = 0
+        if window not in self.trending.WINDOWS or not 1 <= limit <= self.trending.capacity:
+            json_response = jsonify({'success': False, 'message': 'window must be one of %s and limit an integer between 1 and %d.'
+                                     % (', '.join(self.trending.WINDOWS), self.trending.capacity)})
+            json_response.status_code = 400  # Rejects the malformed request
+        else:
+            self.trending.warm(self.connection)  # Loads the last day of orders once after a restart
+            trending = self.trending.top(window, limit)  # Reads the ranking without touching the orders
+            names = self.products.get_product_names([product['product_id'] for product in trending['products']])  # Labels the ranking
+            # Deleted products are left out of the ranking
+            trending['products'] = [dict(product, product_name=names[product['product_id']])
+                                    for product in trending['products'] if product['product_id'] in names]
+            json_response = jsonify(dict(trending, window=window))  # Converts the response to a JSON object
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
+    """ @ref R34_0"""
+    def run_timed_report(self, report_type: str, start_date: Optional[str], end_date: Optional[str]) -> tuple[Any, float]:
+        """
+        @brief Generates one sales report on a report worker thread and measures it.
+        @param report_type: One of SALES_REPORT_TYPES.
+        @param start_date: The start date of the report period.
+        @param end_date: The end date of the report period.
+        @return The report and the milliseconds it took.
+        @post The worker thread holds no database connection.
+        """
+
+        started = time.perf_counter()
+        try:
+            report = self.generate_sales_report(report_type, start_date, end_date)
+        finally:
+            self.connection.release()  # Worker threads outlive the request, so their connection is returned here
+        return report, round((time.perf_counter() - started) * 1000, 3)
     
     # @contract
     # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
@@ -174,8 +756,33 @@ class Server:
         @pre The database connection must be established and valid.
         @return Flask Response: JSON response containing the product information if found.
         @post The method searches for the product name in the database and returns a JSON response containing the product information if found. The response includes the necessary header to allow cross-origin requests.
+        With a 'query' request parameter instead, a ranked list of up to 'limit' (default 10) products matching the partial name is returned.
+        The response carries the catalog version as ETag, like /getProducts.
         """
         
+        return self.catalog_response(self.get_search_result)
+
+    """ @ref R10_0"""
+    def get_search_result(self) -> Response:
+        """
+        @brief Builds the /searchProduct response for the requested product name.
+        @return Flask Response: JSON response containing the product information if found, or the ranked matches of a partial name.
+        """
+
+        if 'query' in request.args:
+            try:
+                limit = int(request.args.get('limit', 10))  # Get the maximum number of matches from request.
+            except ValueError:
+                limit = 0
+            if not 0 < limit <= self.MAX_PAGE_SIZE:
+                json_response = jsonify({'success': False, 'message': 'limit must be an integer between 1 and %d.' % self.MAX_PAGE_SIZE})
+                json_response.status_code = 400  # Rejects the malformed request
+                json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+                return json_response
+            search_product_result = self.products.search_products_ranked(request.args['query'], limit)  # Ranks the products matching the partial name
+            json_response = jsonify(search_product_result)  # Converts the response to a JSON object
+            json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+            return json_response
         product_name = request.args.get('product_name', '')  # Get the 'product_name' parameter from the request
         search_product_result = self.products.search_products(product_name)  # Call the search_products method with the provided product name
         json_response = jsonify(search_product_result)  # Converts the response to a JSON object
@@ -198,6 +805,55 @@ class Server:
         json_response = jsonify(order)  # Converts the order to a JSON object
         json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
         return json_response
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R58_0"""
+    def get_order_with_details(self, order_id: int) -> Response:
+        """
+        @brief Retrieves an order with its order details and their product names.
+        @param order_id: The ID of the order to retrieve.
+        @pre The database connection must be established and valid.
+        @return Flask Response: JSON response with the order of Orders.get_order_with_details, or 404 if the order does not exist.
+        @post The response includes the necessary header to allow cross-origin requests.
+        """
+
+        order = self.orders.get_order_with_details(order_id)  # Reads the order and its line items with one query
+        if order is None:
+            json_response = jsonify({'success': False, 'message': 'Unknown order.'})
+            json_response.status_code = 404
+        else:
+            json_response = jsonify(order)  # Converts the order to a JSON object
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R58_0"""
+    def get_orders_by_ids(self) -> Response:
+        """
+        @brief Retrieves many orders with their order details at once.
+        The 'ids' query parameter holds comma-separated order IDs, e.g. /getOrdersByIds?ids=3,7,12.
+        @pre The database connection must be established and valid.
+        @return Flask Response: JSON response with 'orders', in the format of /getOrderWithDetails and the order of the IDs, and 'missing', the IDs of unknown orders;
+        or a 400 response if ids is not a list of 1 to MAX_BATCH_ORDERS integers.
+        @post The response includes the necessary header to allow cross-origin requests.
+        """
+
+        try:
+            order_ids = [int(order_id) for order_id in request.args.get('ids', '').split(',')]  # Parses the requested IDs
+        except ValueError:
+            order_ids = []
+        if not 0 < len(order_ids) <= self.MAX_BATCH_ORDERS:
+            json_response = jsonify({'success': False, 'message': 'ids must be 1 to %d comma-separated order IDs.' % self.MAX_BATCH_ORDERS})
+            json_response.status_code = 400  # Rejects the malformed request
+        else:
+            orders = self.orders.get_orders_by_ids(order_ids)  # Reads all requested orders and their line items in one round trip
+            found = {order['order_id'] for order in orders}
+            missing = [order_id for order_id in dict.fromkeys(order_ids) if order_id not in found]  # Reports the unknown IDs once each
+            json_response = jsonify({'orders': orders, 'missing': missing})  # Converts the orders to a JSON object
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
     
     # @contract
     # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
@@ -256,6 +912,84 @@ class Server:
         json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
         return json_response
     
+    """ @ref R34_0"""
+    def invalidate_reports_for_order(self, event: str, order: dict[str, Any]) -> None:
+        """
+        @brief Drops the cached sales reports whose date range includes an inserted or deleted order.
+        @param event: 'inserted' or 'deleted'.
+        @param order: The changed order with its 'datetime'.
+        """
+
+        self.report_cache.invalidate_day(sales_date(order['datetime']))  # Reports of other days stay cached
+
+    """ @ref R34_0"""
+    def invalidate_reports_for_product(self, event: str, product: dict[str, Any]) -> None:
+        """
+        @brief Drops every cached sales report after a product was deleted or moved to another category, since the reports only list existing products by category.
+        @param event: 'inserted', 'updated' or 'deleted'.
+        @param product: The changed product.
+        """
+
+        if event == 'deleted' or (event == 'updated' and 'category_id' in product):
+            self.report_cache.invalidate()  # Any report may have listed the product
+
+    """ @ref R1_0"""
+    def release_connection(self, exception: Optional[BaseException] = None) -> None:
+        """
+        @brief Returns the database connection used by the finished request to the connection pool.
+        @param exception: The exception that ended the request, if any.
+        @post The request thread holds no database connection.
+        """
+
+        self.connection.release()  # Checks the request's connection back into the pool
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R1_0"""
+    def get_metrics(self) -> Response:
+        """
+        @brief Retrieves runtime metrics of the server.
+        @return Flask Response: JSON response containing the connection pool, prepared statement cache, reference data cache, product catalog, report cache, report job and trending product statistics.
+        @post The method returns the current metrics as a JSON object and adds the necessary header to allow cross-origin requests.
+        """
+
+        metrics = {
+            'connection_pool': self.connection.stats(),  # Collects the connection pool statistics
+            'statement_cache': self.connection.statement_cache_stats(),  # Collects the prepared statement cache statistics
+            'reference_cache': self.reference_cache.stats(),  # Collects the reference data cache statistics
+            'product_catalog': self.product_catalog.stats(),  # Collects the product catalog statistics
+            'report_cache': self.report_cache.stats(),  # Collects the sales report cache statistics
+            'report_jobs': self.report_jobs.stats(),  # Collects the report job statistics
+            'trending_products': self.trending.stats(),  # Collects the counters used by the trending product windows
+        }
+        if self.order_queue is not None:
+            metrics['order_queue'] = self.order_queue.stats()  # Collects the write-behind queue depth and batch counters
+        if self.price_table is not None:
+            metrics['price_table'] = self.price_table.stats()  # Collects the number of priced products and price updates
+        json_response = jsonify(metrics)  # Converts the response to a JSON object
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
+    # @contract
+    # @post(lambda result: isinstance(result, Flask.Response), "The return value must be a Flask Response object.")
+    """ @ref R71_0"""
+    def refresh_reference_data(self) -> Response:
+        """
+        @brief Drops the cached reference data so the next requests reload it from the database.
+        @return Flask Response: JSON response containing a success message.
+        @post The reference data cache and the product catalog are empty.
+        """
+
+        self.reference_cache.invalidate()  # Invalidates every cached lookup table
+        self.product_catalog.invalidate()  # Reloads the products too, which carry the unit of measure names
+        if self.analytics is not None:
+            self.analytics.reload()  # Reloads every order column, picking up changes made around the server
+        if self.price_table is not None:
+            self.price_table.invalidate()  # Reloads the prices with the next order
+        json_response = jsonify({'success': True, 'message': 'Reference Data Cache Cleared.'})  # Creates a JSON response with a message.
+        json_response.headers.add('Access-Control-Allow-Origin', '*')  # Adds a header to allow cross-origin requests
+        return json_response
+
     """ @ref R6_0"""
     def setup_routes(self) -> None:
         """
@@ -265,11 +999,33 @@ class Server:
             self.get_all_products)  # Sets up a route for getting all products
         self.app.route('/insertProduct', methods=['POST'])(
             self.insert_new_product)  # Sets up a route for inserting a new product
+        self.app.route('/importProducts', methods=['POST'])(
+            self.import_products)  # Sets up a route for importing a product catalog from CSV
         self.app.route('/getOrders', methods=['GET'])(self.get_all_orders)  # Sets up a route for getting all orders
         self.app.route('/insertOrder', methods=['POST'])(
             self.insert_new_order)  # Sets up a route for inserting a new order
+        self.app.route('/insertOrders', methods=['POST'])(
+            self.insert_new_orders)  # Sets up a route for inserting a batch of orders in one transaction
+        self.app.route('/orderQueue/<int:queue_seq>', methods=['GET'])(
+            self.get_queued_order)  # Sets up a route to look up an order acknowledged by the write-behind queue
         self.app.route('/salesReport', methods=['GET'])(
             self.get_sales_report)  # Sets up a route for generating sales report
+        self.app.route('/salesDashboard', methods=['GET'])(
+            self.get_sales_dashboard)  # Sets up a route for generating all sales reports at once
+        self.app.route('/salesTrend', methods=['GET'])(
+            self.get_sales_trend)  # Sets up a route for the sales broken down by period
+        self.app.route('/trendingProducts', methods=['GET'])(
+            self.get_trending_products)  # Sets up a route for the products selling most in the last hour or day
+        self.app.route('/reportJobs', methods=['POST'])(
+            self.submit_report_job)  # Sets up a route to queue a sales report in the background
+        self.app.route('/reportJobs/<job_id>', methods=['GET'])(
+            self.get_report_job)  # Sets up a route to poll a report job
+        self.app.route('/reportJobs/<job_id>/result', methods=['GET'])(
+            self.get_report_job_result)  # Sets up a route to fetch the report of a finished job
+        self.app.route('/customers/<customer_name>', methods=['GET'])(
+            self.get_customer)  # Sets up a route for a customer's order count and spend
+        self.app.route('/customers/<customer_name>/orders', methods=['GET'])(
+            self.get_customer_orders)  # Sets up a route for a customer's order history
         self.app.route('/searchProduct', methods=['GET'])(
             self.search_products) # Sets up a route to search product from the database
         self.app.route('/updateProductInformation/<int:product_id>', methods=['POST'])(
@@ -278,18 +1034,39 @@ class Server:
             self.remove_product)  # Sets up a route to remove product from the database
         self.app.route('/getOrderById', methods=['GET'])(
             self.get_order_by_id) # Sets up a route to get order by id from the database
+        self.app.route('/getOrderWithDetails/<int:order_id>', methods=['GET'])(
+            self.get_order_with_details) # Sets up a route to get an order with its line items
+        self.app.route('/getOrdersByIds', methods=['GET'])(
+            self.get_orders_by_ids) # Sets up a route to get many orders with their line items at once
         self.app.route('/removeOrder/<int:order_id>', methods=['POST'])(
             self.remove_order) # Sets up a route to remove order from the database
         self.app.route('/updateOrderInformation/<int:order_id>', methods=['POST'])(
             self.update_order_information) # Sets up a route to update order from the database
         self.app.route('/getUnitOfMeasures', methods=['GET'])(
             self.get_unit_of_measures) # Sets up a route to update order from the database
+        self.app.route('/refreshReferenceData', methods=['POST'])(
+            self.refresh_reference_data) # Sets up a route to clear the reference data cache
+        self.app.route('/getMetrics', methods=['GET'])(
+            self.get_metrics) # Sets up a route to get the server metrics
+        self.app.teardown_appcontext(self.release_connection) # Returns each request's connection to the pool
 
 if __name__ == '__main__':
     """
     this section is typically executed when the script is run directly, it is challenging to write test cases to cover this part of the code as 
     it starts the Flask application, which runs indefinitely and blocks further code execution.
     """
-    app = Server()  # Creates an instance of the Server class
+    backend = os.environ.get('GROCERY_STORE_BACKEND', 'mysql')  # Selects the storage backend
+    sales_rollups = os.environ.get('GROCERY_STORE_SALES_ROLLUPS', '0') in ('1', 'true')  # Reports read the rollups when enabled
+    analytics = os.environ.get('GROCERY_STORE_ANALYTICS', '0') in ('1', 'true')  # Reports run on in-memory columns when enabled
+    customer_stats = os.environ.get('GROCERY_STORE_CUSTOMER_STATS', '0') in ('1', 'true')  # Customer lookups read the aggregates when enabled
+    order_queue_path = os.environ.get('GROCERY_STORE_ORDER_QUEUE')  # Orders are logged and committed in batches when set
+    server_pricing = os.environ.get('GROCERY_STORE_SERVER_PRICING', '0') in ('1', 'true')  # Order totals are computed from the product prices when enabled
+    app = Server(backend=backend, sales_rollups=sales_rollups, analytics=analytics, customer_stats=customer_stats,
+                 order_queue_path=order_queue_path, server_pricing=server_pricing)  # Creates an instance of the Server class
+    if backend == 'sqlite':
+        Migrator(app.connection).migrate()  # Brings the fresh local database to the latest schema
+        app.connection.release()
+    if app.order_queue is not None:
+        app.order_queue.start()  # Replays the orders logged but not committed before the last stop
     app.setup_routes()  # Sets up the routes for the Flask application
     app.run()  # Starts the Flask application
@@ -0,0 +1,319 @@
+import argparse
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import Any, Optional
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.analytics import ColumnarReports, SalesColumns, np, product_arrays
+from Backend.products import Products
+from Backend.storage import add_backend_arguments, connection_from_arguments
+
+# Version of the on-disk layout, checked by the writer and the reader
+FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+REFERENCE_FILE = 'reference.json'
+# Fixed-width columns of each table as little-endian NumPy dtypes; order_details repeats the time of its order
+COLUMNS = {
+    'orders': {'order_id': '<i8', 'datetime': '<M8[us]', 'total_amount': '<f8'},
+    'order_details': {'order_id': '<i8', 'product_id': '<i8', 'quantity': '<f8', 'total_price': '<f8', 'datetime': '<M8[us]'},
+}
+
+
+def column_file(table: str, column: str) -> str:
+    """
+    @brief Returns the file name of a column.
+    @param table: 'orders' or 'order_details'.
+    @param column: The column name; 'customer_name' has a UTF-8 data file and an '.offsets' file of end offsets.
+    @return The file name relative to the snapshot directory.
+    """
+
+    return '%s.%s.bin' % (table, column)
+
+
+def _write_json(path: str, data: dict[str, Any]) -> None:
+    """
+    @brief Replaces a JSON file atomically, so readers see either the old or the new contents.
+    @param path: The file to write.
+    @param data: The contents.
+    """
+
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as json_file:
+        json.dump(data, json_file, indent=1)
+    os.replace(temporary, path)
+
+
+""" @ref R1_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class reports a snapshot directory that is missing, of another format version, or inconsistent.
+class SnapshotError(Exception):
+    pass
+
+
+""" @ref R34_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class appends the orders and order details of the database to a columnar snapshot directory.
+class SnapshotWriter:
+    def __init__(self, connection, directory: str, batch_size: int = 10000) -> None:
+        """
+        @brief Constructor for the SnapshotWriter class.
+        @param connection: The database connection object.
+        @param directory: The snapshot directory; created on the first export.
+        @param batch_size: The number of orders read and appended at a time, bounding the memory used by an export.
+        """
+
+        self.connection = connection
+        self.directory = directory
+        self.batch_size = batch_size
+
+    # @contract
+    # @post(lambda result: isinstance(result, int))
+    """ @ref R34_0"""
+    def export(self, rebuild: bool = False) -> int:
+        """
+        @brief Appends the orders added since the previous export, with their details, and rewrites the product reference data.
+        The snapshot is append-only: orders deleted or changed after they were exported, and orders committed with an id below the last exported one, stay as exported until a rebuild.
+        The manifest is replaced after every batch and only counts complete rows, so a reader never sees a partial batch and an interrupted export resumes where it stopped.
+        @param rebuild: If True, discards the snapshot and exports every order again; readers must not have the snapshot mapped meanwhile, as its files shrink.
+        @return The number of orders appended.
+        @post The manifest lists every order up to its 'last_order_id'.
+        """
+
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = None if rebuild else self._read_manifest()
+        if manifest is None:
+            manifest = {'format': FORMAT_VERSION, 'last_order_id': 0, 'rows': {'orders': 0, 'order_details': 0}, 'customer_name_bytes': 0}
+        self._truncate(manifest)
+        cursor = self.connection.cursor(prepared=True)
+        appended = 0
+        while True:
+            cursor.execute("SELECT order_id, customer_name, total_amount, datetime FROM orders WHERE order_id > %s ORDER BY order_id LIMIT %s",
+                           (manifest['last_order_id'], self.batch_size))
+            orders = cursor.fetchall()
+            if not orders:
+                break
+            cursor.execute(
+                "SELECT order_details.order_id, order_details.product_id, order_details.quantity, order_details.total_price, orders.datetime "
+                "FROM order_details JOIN orders ON order_details.order_id = orders.order_id "
+                "WHERE orders.order_id > %s AND orders.order_id <= %s",
+                (manifest['last_order_id'], orders[-1][0]))
+            details = cursor.fetchall()
+            self._append('orders', {'order_id': [row[0] for row in orders], 'datetime': [row[3] for row in orders],
+                                    'total_amount': [row[2] for row in orders]})
+            self._append('order_details', {'order_id': [row[0] for row in details], 'product_id': [row[1] for row in details],
+                                           'quantity': [row[2] for row in details], 'total_price': [row[3] for row in details],
+                                           'datetime': [row[4] for row in details]})
+            manifest['customer_name_bytes'] = self._append_strings([row[1] for row in orders], manifest['customer_name_bytes'])
+            manifest['rows']['orders'] += len(orders)
+            manifest['rows']['order_details'] += len(details)
+            manifest['last_order_id'] = orders[-1][0]
+            manifest['exported_at'] = datetime.now().replace(microsecond=0).isoformat()
+            _write_json(os.path.join(self.directory, MANIFEST_FILE), manifest)
+            appended += len(orders)
+        cursor.execute("SELECT product_id, name, category_id FROM products")
+        products = [list(row) for row in cursor.fetchall()]
+        cursor.execute("SELECT category_id, category_name FROM categories")
+        categories = [list(row) for row in cursor.fetchall()]
+        _write_json(os.path.join(self.directory, REFERENCE_FILE), {'products': products, 'categories': categories})
+        if appended == 0:
+            # Write the manifest of an empty or unchanged snapshot too, so it can be opened
+            _write_json(os.path.join(self.directory, MANIFEST_FILE), manifest)
+        return appended
+
+    def _read_manifest(self) -> Optional[dict[str, Any]]:
+        """
+        @brief Reads the manifest of the snapshot directory.
+        @return The manifest, or None if the directory holds no snapshot yet.
+        """
+
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest.get('format') != FORMAT_VERSION:
+            raise SnapshotError('Snapshot %s has format %s, expected %d; export it again with rebuild' % (self.directory, manifest.get('format'), FORMAT_VERSION))
+        return manifest
+
+    def _truncate(self, manifest: dict[str, Any]) -> None:
+        """
+        @brief Cuts every column file to the rows counted by the manifest, dropping rows of an interrupted export.
+        @param manifest: The manifest the files must match.
+        """
+
+        sizes = {column_file(table, column): manifest['rows'][table] * np.dtype(dtype).itemsize
+                 for table, columns in COLUMNS.items() for column, dtype in columns.items()}
+        sizes[column_file('orders', 'customer_name.offsets')] = manifest['rows']['orders'] * 8
+        sizes[column_file('orders', 'customer_name')] = manifest['customer_name_bytes']
+        for name, size in sizes.items():
+            with open(os.path.join(self.directory, name), 'ab') as column:
+                column.truncate(size)
+
+    def _append(self, table: str, values: dict[str, list]) -> None:
+        """
+        @brief Appends rows to the fixed-width column files of a table.
+        @param table: 'orders' or 'order_details'.
+        @param values: The values of each column of COLUMNS[table].
+        """
+
+        for column, dtype in COLUMNS[table].items():
+            with open(os.path.join(self.directory, column_file(table, column)), 'ab') as column_data:
+                column_data.write(np.array(values[column], dtype=dtype).tobytes())
+
+    def _append_strings(self, names: list[str], size: int) -> int:
+        """
+        @brief Appends customer names to the UTF-8 data file and their end offsets to the offsets file.
+        @param names: The names to append.
+        @param size: The current size of the data file.
+        @return The new size of the data file.
+        """
+
+        encoded = [(name or '').encode('utf-8') for name in names]
+        ends = size + np.cumsum([len(name) for name in encoded], dtype=np.int64)
+        with open(os.path.join(self.directory, column_file('orders', 'customer_name')), 'ab') as data:
+            data.write(b''.join(encoded))
+        with open(os.path.join(self.directory, column_file('orders', 'customer_name.offsets')), 'ab') as offsets:
+            offsets.write(ends.astype('<i8').tobytes())
+        return int(ends[-1]) if len(ends) else size
+
+
+""" @ref R34_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class is a variable-width string column decoded row by row from memory-mapped UTF-8 data and end offsets.
+class StringColumn:
+    def __init__(self, offsets: Any, data: Any) -> None:
+        """
+        @brief Constructor for the StringColumn class.
+        @param offsets: The end offset of every string in data.
+        @param data: The concatenated UTF-8 bytes.
+        """
+
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, key: Any) -> Any:
+        """
+        @brief Decodes one string, or the strings selected by a boolean mask or an index array.
+        @param key: A row index, a boolean mask or an array of row indexes.
+        @return The string, or an object array of strings.
+        """
+
+        if isinstance(key, (int, np.integer)):
+            start = int(self.offsets[key - 1]) if key > 0 else 0
+            return bytes(self.data[start:int(self.offsets[key])]).decode('utf-8')
+        indexes = np.flatnonzero(key) if np.asarray(key).dtype == bool else np.asarray(key)
+        strings = np.empty(len(indexes), dtype=object)
+        for position, index in enumerate(indexes):
+            strings[position] = self[int(index)]
+        return strings
+
+
+""" @ref R34_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class memory-maps a snapshot directory and answers the sales reports from it without touching the database.
+class OrderSnapshot(ColumnarReports):
+    def __init__(self, directory: str) -> None:
+        """
+        @brief Constructor for the OrderSnapshot class.
+        @param directory: The snapshot directory written by SnapshotWriter.
+        """
+
+        if np is None:
+            raise ImportError("OrderSnapshot requires NumPy; install it with 'pip install numpy'")
+        self.directory = directory
+        self.manifest = None
+        self._columns = None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    """ @ref R34_0"""
+    def columns(self) -> SalesColumns:
+        """
+        @brief Returns the memory-mapped columns, mapping them again if an export appended to the snapshot since.
+        The arrays share the pages of the files; only the rows selected by a report are copied.
+        @return The columns; callers must not modify the arrays.
+        """
+
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        try:
+            status = os.stat(path)
+        except FileNotFoundError:
+            raise SnapshotError('No snapshot in %s; run: python -m Backend.snapshot export --directory %s' % (self.directory, self.directory))
+        with self._lock:
+            if self._stamp != (status.st_mtime_ns, status.st_size):
+                self._open()
+                self._stamp = (status.st_mtime_ns, status.st_size)
+            return self._columns
+
+    def _open(self) -> None:
+        """
+        @brief Reads the manifest and the reference data and maps the column files.
+        @pre The lock is held.
+        """
+
+        with open(os.path.join(self.directory, MANIFEST_FILE)) as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest.get('format') != FORMAT_VERSION:
+            raise SnapshotError('Snapshot %s has format %s, expected %d' % (self.directory, manifest.get('format'), FORMAT_VERSION))
+        with open(os.path.join(self.directory, REFERENCE_FILE)) as reference_file:
+            reference = json.load(reference_file)
+
+        def mapped(table: str, column: str, dtype: str, rows: int) -> Any:
+            if rows == 0:
+                # Empty files cannot be mapped
+                return np.empty(0, dtype=dtype)
+            return np.memmap(os.path.join(self.directory, column_file(table, column)), dtype=dtype, mode='r', shape=(rows,))
+
+        orders = {column: mapped('orders', column, dtype, manifest['rows']['orders']) for column, dtype in COLUMNS['orders'].items()}
+        details = {column: mapped('order_details', column, dtype, manifest['rows']['order_details'])
+                   for column, dtype in COLUMNS['order_details'].items()}
+        customer_names = StringColumn(mapped('orders', 'customer_name.offsets', '<i8', manifest['rows']['orders']),
+                                      mapped('orders', 'customer_name', 'u1', manifest['customer_name_bytes']))
+        product_names, product_categories, category_names = product_arrays(
+            reference['products'], reference['categories'], details['product_id'])
+        self._columns = SalesColumns(orders['order_id'], orders['datetime'], orders['total_amount'], customer_names,
+                                     details['order_id'], details['datetime'], details['product_id'], details['quantity'],
+                                     details['total_price'], product_names, product_categories, category_names)
+        self.manifest = manifest
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    @brief Command line entry point:
+    python -m Backend.snapshot export --directory D [--rebuild] [--backend B] [--database F]
+    python -m Backend.snapshot report {total_sales,top_selling_products,sales_by_category} --directory D --start-date S --end-date E
+    """
+
+    parser = argparse.ArgumentParser(description="Export the orders to a columnar snapshot, or run a sales report on one.")
+    parser.add_argument('command', choices=['export', 'report'], help="append the new orders to the snapshot, or print a report of it")
+    parser.add_argument('report_type', nargs='?', choices=['total_sales', 'top_selling_products', 'sales_by_category'],
+                        help="the report to print, for the report command")
+    parser.add_argument('--directory', required=True, help="snapshot directory")
+    parser.add_argument('--rebuild', action='store_true', help="export every order again, picking up deleted and changed orders")
+    parser.add_argument('--start-date', help="start of the report period, YYYY-MM-DD")
+    parser.add_argument('--end-date', help="end of the report period, YYYY-MM-DD")
+    add_backend_arguments(parser, "storage backend to export from")
+    args = parser.parse_args(argv)
+
+    if args.command == 'report':
+        if args.report_type is None or args.start_date is None or args.end_date is None:
+            parser.error("report needs a report type, --start-date and --end-date")
+        # The reports of Products run on the snapshot alone; no database connection is opened
+        products = Products(None, analytics=OrderSnapshot(args.directory))
+        report = getattr(products, args.report_type)(args.start_date, args.end_date)
+        print(json.dumps(report, indent=1, default=str))
+        return
+    connection = connection_from_arguments(parser, args)
+    appended = SnapshotWriter(connection, args.directory).export(args.rebuild)
+    print('Appended %d orders to %s' % (appended, args.directory))
+    connection.release()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,72 @@
+import threading
+import weakref
 from typing import Any
 import mysql.connector
+from Backend.connection_pool import ConnectionPool
+from Backend.retry import RETRYABLE_ERRORS
+from Backend.statement_cache import PreparedCursor, StatementCache, StatementStats
 #from contracts import contract, pre, post
 
 """ @ref R1_0"""
 # This Class is part of the @ref Model within the overall @ref ModelViewController Design.
 # This Class implements methods for managing a MySQL database connection, including connecting, closing, and retrieving a cursor object for executing SQL queries.
+# Physical connections come from a bounded ConnectionPool; each thread checks out its own connection and returns it with release().
 class SQLConnection:
-    def __init__(self) -> None:
-        self.connection = None
+    dialect = 'mysql'
+
+    def __init__(self, pool_size: int = 5, pool_timeout: float = 10.0, ping_interval: float = 30.0) -> None:
+        """
+        @brief Constructor for the SQLConnection class.
+        No connection is opened until a thread first calls connect() or cursor().
+        @param pool_size: The maximum number of MySQL connections shared by all threads.
+        @param pool_timeout: The number of seconds a thread waits for a free connection before PoolTimeoutError is raised.
+        @param ping_interval: Pooled connections idle for longer than this many seconds are pinged before reuse.
+        """
+
+        self.pool = ConnectionPool(self._create_connection, pool_size, pool_timeout,
+                                   validate=self._is_alive, ping_interval=ping_interval)
+        # Holds the connection checked out by the current thread
+        self._local = threading.local()
+        # Prepared statement caches per physical connection; entries vanish with their connection
+        self._statement_caches = weakref.WeakKeyDictionary()
+        self._statement_caches_lock = threading.Lock()
+        self.statement_stats = StatementStats()
+
+    @property
+    def connection(self) -> Any:
+        """
+        @brief The connection checked out by the calling thread, or None if the thread holds no connection.
+        """
+
+        return getattr(self._local, 'connection', None)
+
+    @connection.setter
+    def connection(self, value: Any) -> None:
+        self._local.connection = value
+
+    def _create_connection(self) -> Any:
+        """
+        @brief Opens a new physical MySQL connection using the configured credentials.
+        @return The MySQL connection object.
+        """
+
+        user = 'root'  # Set your MySQL username here
+        password = 'root'   # Set your MySQL password here
+        database = 'grocery_store'  # Set the name of your database here
+        return mysql.connector.connect(user=user, password=password, database=database)
+
+    def _is_alive(self, connection: Any) -> bool:
+        """
+        @brief Checks whether a pooled connection is still usable, reconnecting it in place if the server dropped it.
+        @param connection: The MySQL connection to check.
+        @return True if the connection answered the ping, False if it must be replaced.
+        """
+
+        try:
+            connection.ping(reconnect=True, attempts=1, delay=0)
+        except mysql.connector.Error:
+            return False
+        return True
 
     #@contract
     #@pre(lambda self: self.connection is None, "Connection must not be already established.")
@@ -15,40 +74,58 @@ class SQLConnection:
         # "Connection must be established and returned.")
     def connect(self) -> Any:
         """
-        @brief Establishes a connection to the MySQL database using the provided credentials.
-        @pre The database connection must not be established or must be closed.
+        @brief Checks a connection out of the pool for the calling thread.
+        @pre The calling thread must not hold a connection, or the held connection is returned unchanged.
         @return The MySQL connection object.
-        @post The database connection is established and open, and the returned connection object is valid.
+        @post The calling thread holds an open connection until release() or close() is called.
         """
 
-        user = 'root'  # Set your MySQL username here
-        password = 'root'   # Set your MySQL password here
-        database = 'grocery_store'  # Set the name of your database here
         if self.connection is None:
-            self.connection = mysql.connector.connect(user=user, password=password, database=database)
+            self.connection = self.pool.acquire()
         return self.connection
 
+    def release(self) -> None:
+        """
+        @brief Returns the calling thread's connection to the pool so other threads can reuse it.
+        Any uncommitted work on the connection is rolled back first so the next borrower starts clean.
+        @post The calling thread holds no connection.
+        """
+
+        connection = self.connection
+        if connection is not None:
+            self.connection = None
+            try:
+                connection.rollback()
+            except Exception:
+                # A connection that cannot roll back is broken, do not hand it to another thread
+                self.pool.discard(connection)
+                return
+            self.pool.release(connection)
+
     #@contract
     #@pre(lambda self: self.connection is not None, "Connection must be established.")
     #@post(lambda self: self.connection is None, "Connection must be closed.")
     def close(self) -> None:
         """
-        @brief Closes the existing MySQL connection if it is open. 
+        @brief Closes the calling thread's MySQL connection if it is open.
         @pre The database connection must be established and open.
-        @post The database connection is closed and set to None.
+        @post The database connection is closed, removed from the pool and set to None.
         """
 
-        if self.connection is not None:
-            self.connection.close()
+        connection = self.connection
+        if connection is not None:
             self.connection = None
+            self.pool.discard(connection)
 
     # @contract
     # @post(lambda result: isinstance(result, mysql.connector.cursor.MySQLCursor),
     #       "The return value must be a MySQLCursor object.")
-    def cursor(self) -> Any:
+    def cursor(self, prepared: bool = False) -> Any:
         """
         @brief Returns the cursor object to execute SQL queries.
-        If the connection is not established, this method first establishes the connection.
+        If the calling thread holds no connection, this method first checks one out of the pool.
+        If the held connection turns out to be lost, it is replaced by a fresh one once.
+        @param prepared: If True, the returned cursor runs each query through a server-side prepared statement cached per connection.
         @pre The database connection must be established or valid.
         @return The cursor object to execute SQL queries.
         @post The method returns a valid cursor object.
@@ -57,4 +134,75 @@ class SQLConnection:
 
         if self.connection is None:
             self.connect()
-        return self.connection.cursor()
+        if prepared:
+            return PreparedCursor(self._statement_cache(self.connection))
+        try:
+            return self.connection.cursor()
+        except RETRYABLE_ERRORS:
+            # The server dropped the connection (wait_timeout, failover); reconnect transparently
+            self.close()
+            return self.connect().cursor()
+
+    def _statement_cache(self, connection: Any) -> StatementCache:
+        """
+        @brief Returns the prepared statement cache of a physical connection, creating it on first use.
+        @param connection: The physical connection.
+        @return The connection's StatementCache.
+        """
+
+        with self._statement_caches_lock:
+            cache = self._statement_caches.get(connection)
+            if cache is None:
+                cache = StatementCache(connection, self.statement_stats)
+                self._statement_caches[connection] = cache
+            return cache
+
+    def commit(self) -> None:
+        """
+        @brief Commits the current transaction on the calling thread's connection.
+        @post Pending changes made through cursors of this thread are committed.
+        """
+
+        if self.connection is not None:
+            self.connection.commit()
+
+    def rollback(self) -> None:
+        """
+        @brief Rolls back the current transaction on the calling thread's connection.
+        @post Pending changes made through cursors of this thread are discarded.
+        """
+
+        if self.connection is not None:
+            self.connection.rollback()
+
+    def first_insert_id(self, cursor: Any, rows: int) -> int:
+        """
+        @brief Returns the id generated for the first row of the multi-row INSERT just executed on the cursor.
+        The rows of one INSERT get consecutive ids, so row k has the returned id + k. This holds for InnoDB as long as
+        auto_increment_increment is 1 and every row leaves its id to AUTO_INCREMENT; multi-row inserts must not be used otherwise.
+        @param cursor: The cursor that executed the INSERT.
+        @param rows: The number of rows the INSERT wrote.
+        @return The id of the first inserted row; MySQL reports it as lastrowid.
+        """
+
+        return cursor.lastrowid
+
+    def stats(self) -> dict[str, int]:
+        """
+        @brief Reports the usage counters of the underlying connection pool.
+        @return A dictionary of pool statistics, see ConnectionPool.stats().
+        """
+
+        return self.pool.stats()
+
+    def statement_cache_stats(self) -> dict[str, int]:
+        """
+        @brief Reports the prepared statement cache counters summed over all connections.
+        @return A dictionary with 'hits', 'misses', 'evictions' and 'prepared' (statements currently prepared).
+        """
+
+        with self._statement_caches_lock:
+            prepared = sum(len(cache) for cache in self._statement_caches.values())
+        stats = self.statement_stats.snapshot()
+        stats['prepared'] = prepared
+        return stats
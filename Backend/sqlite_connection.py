@@ -0,0 +1,268 @@
+import os
+import re
+import sqlite3
+import uuid
+from datetime import date, datetime
+from typing import Any, Iterable, Optional
+from Backend.sql_connection import SQLConnection
+
+# Default schema and seed data shared with the MySQL deployment
+DEFAULT_SCHEMA_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'database_files', 'Grocery_Store_DB_Schema.sql'))
+
+# Store datetimes in the same 'YYYY-MM-DD HH:MM:SS' text form MySQL uses, so string range comparisons keep working
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' ', 'seconds'))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+
+# MySQL-only statements and clauses rewritten before they reach SQLite
+_QUERY_REWRITES = [
+    (re.compile(r"^\s*SET FOREIGN_KEY_CHECKS\s*=\s*0\s*$", re.IGNORECASE), "PRAGMA foreign_keys = OFF"),
+    (re.compile(r"^\s*SET FOREIGN_KEY_CHECKS\s*=\s*1\s*$", re.IGNORECASE), "PRAGMA foreign_keys = ON"),
+    (re.compile(r"^(\s*DROP INDEX\s+\S+)\s+ON\s+\S+", re.IGNORECASE), r"\1"),
+]
+
+
+def translate_query(query: str) -> str:
+    """
+    @brief Translates a query written for mysql.connector into the SQLite dialect.
+    The '%s' parameter markers become '?', '%%' becomes '%' and MySQL-only statements are rewritten.
+    @param query: The SQL text as used with mysql.connector.
+    @return The equivalent SQL text for the sqlite3 module.
+    """
+
+    for pattern, replacement in _QUERY_REWRITES:
+        query = pattern.sub(replacement, query)
+    return re.sub(r"%[s%]", lambda match: '?' if match.group(0) == '%s' else '%', query)
+
+
+def mysql_dump_to_sqlite(dump: str) -> list[str]:
+    """
+    @brief Converts a MySQL dump such as Grocery_Store_DB_Schema.sql into SQLite statements.
+    Handles the subset of the dump format used by this project: table definitions, AUTO_INCREMENT keys and extended INSERTs.
+    @param dump: The text of the MySQL dump.
+    @return The list of SQLite statements creating the tables and loading the data.
+    """
+
+    statements = []
+    # Drop comments, version-specific hints and MySQL session statements
+    lines = [line for line in dump.splitlines()
+             if line.strip() and not line.lstrip().startswith(('--', '/*!', 'LOCK TABLES', 'UNLOCK TABLES', 'USE ', 'CREATE DATABASE'))]
+    for statement in '\n'.join(lines).split(';\n'):
+        statement = statement.strip().rstrip(';').replace('`', '')
+        if not statement:
+            continue
+        if statement.upper().startswith('CREATE TABLE'):
+            statement = _convert_create_table(statement)
+        else:
+            # MySQL escapes quotes inside strings with a backslash, SQLite doubles them
+            statement = statement.replace("\\'", "''")
+        statements.append(statement)
+    return statements
+
+
+def _convert_create_table(statement: str) -> str:
+    """
+    @brief Converts one MySQL CREATE TABLE statement into SQLite syntax.
+    @param statement: The CREATE TABLE statement without backticks.
+    @return The SQLite CREATE TABLE statement.
+    """
+
+    header, body = statement.split('(', 1)
+    # Cut the table options (ENGINE=..., CHARSET=...) that follow the closing parenthesis
+    body = body[:body.rindex(')')]
+    columns = []
+    auto_increment_column = None
+    for line in body.split('\n'):
+        line = line.strip().rstrip(',')
+        if not line or line.startswith(('KEY ', 'UNIQUE KEY ', 'FULLTEXT KEY ')):
+            continue
+        if 'AUTO_INCREMENT' in line:
+            auto_increment_column = line.split()[0]
+            line = auto_increment_column + ' INTEGER PRIMARY KEY AUTOINCREMENT'
+        elif line.startswith('PRIMARY KEY') and auto_increment_column is not None:
+            # The key is already declared on the AUTO_INCREMENT column
+            continue
+        columns.append('  ' + line)
+    return header.strip() + ' (\n' + ',\n'.join(columns) + '\n)'
+
+
+""" @ref R1_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class wraps a sqlite3 cursor so the model classes can keep using mysql.connector style queries.
+class SQLiteCursor:
+    def __init__(self, cursor: sqlite3.Cursor) -> None:
+        """
+        @brief Constructor for the SQLiteCursor class.
+        @param cursor: The sqlite3 cursor to wrap.
+        """
+
+        self._cursor = cursor
+
+    def execute(self, query: str, params: Iterable[Any] = ()) -> 'SQLiteCursor':
+        """
+        @brief Executes a mysql.connector style query on the SQLite database.
+        @param query: The SQL text using '%s' parameter markers.
+        @param params: The query parameters.
+        @return This cursor, so results can be iterated or fetched.
+        """
+
+        self._cursor.execute(translate_query(query), tuple(params))
+        return self
+
+    def executemany(self, query: str, seq_of_params: Iterable[Iterable[Any]]) -> 'SQLiteCursor':
+        """
+        @brief Executes a mysql.connector style query once for each parameter sequence.
+        @param query: The SQL text using '%s' parameter markers.
+        @param seq_of_params: The parameter sequences.
+        @return This cursor.
+        """
+
+        self._cursor.executemany(translate_query(query), [tuple(params) for params in seq_of_params])
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name: str) -> Any:
+        # fetchone, fetchall, fetchmany, rowcount, lastrowid, description and close behave like their MySQL counterparts
+        return getattr(self._cursor, name)
+
+
+""" @ref R1_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class wraps a sqlite3 connection so it exposes the mysql.connector connection interface used by SQLConnection.
+class SQLiteConnectionAdapter:
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        """
+        @brief Constructor for the SQLiteConnectionAdapter class.
+        @param connection: The sqlite3 connection to wrap.
+        """
+
+        self._connection = connection
+
+    def cursor(self, **kwargs: Any) -> SQLiteCursor:
+        """
+        @brief Returns a cursor accepting mysql.connector style queries.
+        mysql.connector cursor options such as buffered or prepared do not apply to SQLite and are ignored.
+        @return The wrapped cursor.
+        """
+
+        return SQLiteCursor(self._connection.cursor())
+
+    def commit(self) -> None:
+        self._connection.commit()
+
+    def rollback(self) -> None:
+        self._connection.rollback()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def ping(self, reconnect: bool = False, attempts: int = 1, delay: int = 0) -> None:
+        """
+        @brief Checks that the connection is usable; raises sqlite3.Error otherwise.
+        """
+
+        self._connection.execute("SELECT 1")
+
+
+""" @ref R1_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class implements the SQLConnection storage interface on top of a local SQLite database, so the server can be benchmarked without MySQL.
+class SQLiteConnection(SQLConnection):
+    dialect = 'sqlite'
+
+    def __init__(self, database: str = ':memory:', schema_path: Optional[str] = DEFAULT_SCHEMA_PATH,
+                 pool_size: int = 5, pool_timeout: float = 10.0) -> None:
+        """
+        @brief Constructor for the SQLiteConnection class.
+        The schema and seed data are loaded from schema_path when the database has no 'products' table yet.
+        @param database: The SQLite database file, or ':memory:' for a private in-memory database shared by all pooled connections.
+        @param schema_path: The MySQL dump used to create and seed the database; None skips loading.
+        @param pool_size: The maximum number of SQLite connections shared by all threads.
+        @param pool_timeout: The number of seconds a thread waits for a free connection or a database lock.
+        """
+
+        super().__init__(pool_size, pool_timeout)
+        if database == ':memory:':
+            # A named shared-cache database lets every pooled connection see the same in-memory tables
+            self.uri = 'file:grocery_store_%s?mode=memory&cache=shared' % uuid.uuid4().hex
+        else:
+            self.uri = 'file:%s' % os.path.abspath(database)
+        self.timeout = pool_timeout
+        # Keeps an in-memory database alive while the pool has no open connections
+        self._anchor = self._open()
+        if database != ':memory:':
+            self._anchor.execute("PRAGMA journal_mode = WAL")
+        if schema_path is not None and not self._has_table('products'):
+            self.load_schema(schema_path)
+
+    def first_insert_id(self, cursor: Any, rows: int) -> int:
+        """
+        @brief Returns the id generated for the first row of the multi-row INSERT just executed on the cursor, see SQLConnection.first_insert_id.
+        @return The id of the first inserted row; SQLite reports the last one as lastrowid.
+        """
+
+        return cursor.lastrowid - rows + 1
+
+    def _open(self) -> sqlite3.Connection:
+        """
+        @brief Opens a raw sqlite3 connection to the configured database.
+        @return The sqlite3 connection.
+        """
+
+        # Pooled connections move between request threads, never being used by two threads at once
+        return sqlite3.connect(self.uri, uri=True, timeout=self.timeout, check_same_thread=False)
+
+    def _create_connection(self) -> Any:
+        """
+        @brief Opens a new pooled SQLite connection.
+        @return The connection wrapped in an SQLiteConnectionAdapter.
+        """
+
+        return SQLiteConnectionAdapter(self._open())
+
+    def _is_alive(self, connection: Any) -> bool:
+        """
+        @brief Checks whether a pooled SQLite connection is still usable.
+        @param connection: The SQLiteConnectionAdapter to check.
+        @return True if the connection can run a query.
+        """
+
+        try:
+            connection.ping()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def _has_table(self, table_name: str) -> bool:
+        """
+        @brief Checks whether a table exists in the database.
+        @param table_name: The name of the table.
+        @return True if the table exists.
+        """
+
+        row = self._anchor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)).fetchone()
+        return row is not None
+
+    def load_schema(self, schema_path: str) -> None:
+        """
+        @brief Creates the tables and loads the seed data from a MySQL dump.
+        @param schema_path: The path of the MySQL dump file.
+        @post All tables of the dump exist in the SQLite database with their data.
+        """
+
+        with open(schema_path, encoding='utf-8') as schema_file:
+            statements = mysql_dump_to_sqlite(schema_file.read())
+        for statement in statements:
+            self._anchor.execute(statement)
+        self._anchor.commit()
+
+    def close_all(self) -> None:
+        """
+        @brief Closes every idle pooled connection and the anchor connection; an in-memory database is discarded.
+        """
+
+        self.pool.close_all()
+        self._anchor.close()
@@ -0,0 +1,135 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable
+
+
+""" @ref R1_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class counts prepared statement cache activity across all connections of a pool.
+class StatementStats:
+    def __init__(self) -> None:
+        """
+        @brief Constructor for the StatementStats class.
+        """
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def record(self, hits: int = 0, misses: int = 0, evictions: int = 0) -> None:
+        """
+        @brief Adds to the counters.
+        """
+
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+
+    def snapshot(self) -> dict[str, int]:
+        """
+        @brief Reports the counters.
+        @return A dictionary with 'hits', 'misses' and 'evictions'.
+        """
+
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+""" @ref R1_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class keeps one server-side prepared statement per distinct query text for a single database connection.
+class StatementCache:
+    def __init__(self, connection: Any, stats: StatementStats, max_size: int = 64) -> None:
+        """
+        @brief Constructor for the StatementCache class.
+        @param connection: The physical database connection owning the prepared statements.
+        @param stats: The shared counters updated on every lookup.
+        @param max_size: The maximum number of statements kept prepared; the least recently used one is closed beyond that.
+        """
+
+        self.connection = connection
+        self.stats = stats
+        self.max_size = max_size
+        # Maps the query text to (canonical query string, prepared cursor), least recently used first
+        self._statements = OrderedDict()
+        # The cursor that executed last, whose unread rows must be consumed before the connection can run anything else
+        self._last_cursor = None
+
+    def lookup(self, query: str) -> tuple[str, Any]:
+        """
+        @brief Returns the prepared cursor for a query, preparing it on first use.
+        mysql.connector only skips re-preparing when the very same string object is executed again, so the canonical string is returned too.
+        @param query: The SQL text using '%s' parameter markers.
+        @return A (query, cursor) pair to execute.
+        """
+
+        self._drain()
+        entry = self._statements.get(query)
+        if entry is not None:
+            self._statements.move_to_end(query)
+            self.stats.record(hits=1)
+        else:
+            entry = (query, self.connection.cursor(prepared=True))
+            self._statements[query] = entry
+            self.stats.record(misses=1)
+            if len(self._statements) > self.max_size:
+                _, (_, evicted) = self._statements.popitem(last=False)
+                # Closing the cursor deallocates the statement on the server
+                evicted.close()
+                self.stats.record(evictions=1)
+        self._last_cursor = entry[1]
+        return entry
+
+    def _drain(self) -> None:
+        """
+        @brief Consumes rows left unread by the previous statement, e.g. after a fetchone().
+        """
+
+        if self._last_cursor is not None and getattr(self.connection, 'unread_result', False) is True:
+            self._last_cursor.fetchall()
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+
+""" @ref R1_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class is the cursor handed to the model classes; it runs every query on the connection's cached prepared statement.
+class PreparedCursor:
+    def __init__(self, cache: StatementCache) -> None:
+        """
+        @brief Constructor for the PreparedCursor class.
+        @param cache: The statement cache of the connection the cursor belongs to.
+        """
+
+        self._cache = cache
+        self._cursor = None
+
+    def execute(self, query: str, params: Iterable[Any] = ()) -> None:
+        """
+        @brief Executes a query through its cached prepared statement.
+        @param query: The SQL text using '%s' parameter markers.
+        @param params: The query parameters.
+        """
+
+        query, self._cursor = self._cache.lookup(query)
+        self._cursor.execute(query, tuple(params))
+
+    def executemany(self, query: str, seq_of_params: Iterable[Iterable[Any]]) -> None:
+        """
+        @brief Executes a query once for each parameter sequence, preparing it only once.
+        @param query: The SQL text using '%s' parameter markers.
+        @param seq_of_params: The parameter sequences.
+        """
+
+        query, self._cursor = self._cache.lookup(query)
+        self._cursor.executemany(query, [tuple(params) for params in seq_of_params])
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name: str) -> Any:
+        # fetchone, fetchall, rowcount, lastrowid and description refer to the statement executed last
+        return getattr(self._cursor, name)
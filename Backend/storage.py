@@ -0,0 +1,59 @@
+import argparse
+from typing import Any
+from Backend.sql_connection import SQLConnection
+from Backend.sqlite_connection import SQLiteConnection
+
+# Storage backends selectable by name; each implements the SQLConnection interface
+BACKENDS = {
+    'mysql': SQLConnection,
+    'sqlite': SQLiteConnection,
+}
+
+
+""" @ref R1_0"""
+# This function is part of the @ref Model within the overall @ref ModelViewController Design.
+# This function creates the pooled database connection for the configured storage backend.
+def create_connection(backend: str = 'mysql', **options: Any) -> SQLConnection:
+    """
+    @brief Creates the pooled connection object for a storage backend.
+    @param backend: The name of the backend, 'mysql' or 'sqlite'.
+    @param options: Keyword arguments passed to the backend constructor, e.g. pool_size or database.
+    @return The connection object used by the model classes.
+    """
+
+    if backend not in BACKENDS:
+        raise ValueError("Unknown storage backend '%s', expected one of %s" % (backend, ', '.join(sorted(BACKENDS))))
+    return BACKENDS[backend](**options)
+
+
+""" @ref R1_0"""
+# This function is part of the @ref Model within the overall @ref ModelViewController Design.
+# This function adds the storage options shared by the command line tools.
+def add_backend_arguments(parser: argparse.ArgumentParser, backend_help: str = "storage backend") -> None:
+    """
+    @brief Adds the --backend and --database options to the parser of a command line tool.
+    @param parser: The parser of the tool.
+    @param backend_help: The help text of the --backend option.
+    """
+
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='mysql', help=backend_help)
+    parser.add_argument('--database', help="SQLite database file, required for the sqlite backend")
+
+
+""" @ref R1_0"""
+# This function is part of the @ref Model within the overall @ref ModelViewController Design.
+# This function opens the connection selected by the storage options of a command line tool.
+def connection_from_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace) -> SQLConnection:
+    """
+    @brief Creates the connection selected by the options of add_backend_arguments.
+    @param parser: The parser of the tool, which reports a missing --database.
+    @param args: The parsed arguments.
+    @return The connection object used by the model classes.
+    @post Exits through parser.error() if the sqlite backend has no --database; a private in-memory database would silently discard the tool's work.
+    """
+
+    if args.backend == 'sqlite':
+        if not args.database:
+            parser.error("--database is required for the sqlite backend")
+        return create_connection(args.backend, database=args.database)
+    return create_connection(args.backend)
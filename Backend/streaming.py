@@ -0,0 +1,82 @@
+import csv
+import io
+from typing import Any, Callable, Iterable, Iterator
+
+
+""" @ref R6_0"""
+# This function is part of the @ref Controller within the overall @ref ModelViewController Design.
+# This function encodes rows as a JSON array piece by piece so large result sets are sent without building the whole body in memory.
+def json_array_stream(rows: Iterable[Any], dumps: Callable[[Any], str], rows_per_chunk: int = 100) -> Iterator[str]:
+    """
+    @brief Yields a JSON array of the given rows in chunks of encoded text.
+    Memory use is bounded by one chunk regardless of the number of rows.
+    @param rows: The rows to encode, typically a generator reading from an unbuffered cursor.
+    @param dumps: The function encoding a list of rows as a JSON array, e.g. app.json.dumps so the output matches jsonify.
+    @param rows_per_chunk: The number of rows encoded into each yielded chunk.
+    @return An iterator of text chunks which concatenated form a valid JSON array.
+    """
+
+    yield '['
+    batch = []
+    separator = ''
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= rows_per_chunk:
+            # Encoding a whole batch at once is much cheaper than one dumps() call per row
+            yield separator + dumps(batch)[1:-1]
+            separator = ','
+            batch = []
+    if batch:
+        yield separator + dumps(batch)[1:-1]
+    yield ']'
+
+
+""" @ref R34_0"""
+# This function is part of the @ref Controller within the overall @ref ModelViewController Design.
+# This function encodes rows as CSV piece by piece so exports of any size are sent in constant memory.
+def csv_stream(rows: Iterable[dict[str, Any]], fieldnames: list[str], rows_per_chunk: int = 500) -> Iterator[str]:
+    """
+    @brief Yields a CSV document with a header line and one line per row, in chunks of encoded text.
+    Columns a row does not have are left empty, so rows of different shapes, such as a trailer with a total, share one header.
+    @param rows: The row dictionaries to encode, typically a generator reading from an unbuffered cursor.
+    @param fieldnames: The columns, in order.
+    @param rows_per_chunk: The number of rows encoded into each yielded chunk.
+    @return An iterator of text chunks which concatenated form the CSV document.
+    """
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames, restval='', extrasaction='ignore', lineterminator='\r\n')
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count >= rows_per_chunk:
+            yield buffer.getvalue()
+            # Reuse the buffer, so it never holds more than one chunk
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    yield buffer.getvalue()
+
+
+""" @ref R34_0"""
+# This function is part of the @ref Controller within the overall @ref ModelViewController Design.
+# This function encodes rows as newline-delimited JSON so clients can process an export while it downloads.
+def ndjson_stream(rows: Iterable[Any], dumps: Callable[[Any], str], rows_per_chunk: int = 500) -> Iterator[str]:
+    """
+    @brief Yields one JSON document per row, each on its own line, in chunks of encoded text.
+    @param rows: The rows to encode, typically a generator reading from an unbuffered cursor.
+    @param dumps: The function encoding one row as JSON, e.g. app.json.dumps so the output matches jsonify.
+    @param rows_per_chunk: The number of rows encoded into each yielded chunk.
+    @return An iterator of text chunks which concatenated form the NDJSON document.
+    """
+
+    lines = []
+    for row in rows:
+        lines.append(dumps(row))
+        if len(lines) >= rows_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
@@ -0,0 +1,147 @@
+import unittest
+from datetime import date, datetime, timedelta
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.analytics import SalesAnalytics, np
+from Backend.benchmark import seed_orders
+from Backend.sqlite_connection import SQLiteConnection
+from Backend.orders import Orders
+from Backend.products import Products
+
+
+""" \test @ref R34_0"""
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestSalesAnalytics(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up an in-memory database with synthetic orders and Products and Orders wired to the analytics engine.
+        """
+
+        self.connection = SQLiteConnection()
+        seed_orders(self.connection, 300)
+        self.now = [0.0]
+        self.analytics = SalesAnalytics(self.connection, refresh_interval=5.0, clock=lambda: self.now[0])
+        self.products = Products(self.connection, analytics=self.analytics)
+        self.raw_products = Products(self.connection)
+        self.orders = Orders(self.connection)
+        self.orders.subscribe(self.analytics.on_order_changed)
+        self.products.subscribe(self.analytics.on_product_changed)
+
+    def tearDown(self):
+        self.connection.release()
+        self.connection.close_all()
+
+    def assert_reports_match_sql(self, start_date, end_date):
+        """
+        Compare the analytics reports with the SQL reports of the same range.
+        """
+
+        total = self.products.total_sales(start_date, end_date)
+        raw_total = self.raw_products.total_sales(start_date, end_date)
+        self.assertEqual([row['order_id'] for row in total[:-1]], sorted(row['order_id'] for row in raw_total[:-1]))
+        self.assertAlmostEqual(total[-1]['total_sales'], raw_total[-1]['total_sales'], places=6)
+        top = self.products.top_selling_products(start_date, end_date)
+        raw_top = self.raw_products.top_selling_products(start_date, end_date)
+        # Products with equal quantities may be listed in either order, so compare the quantities
+        self.assertEqual([row['total_quantity'] for row in top], [row['total_quantity'] for row in raw_top])
+        self.assertEqual(self.products.sales_by_category(start_date, end_date),
+                         self.raw_products.sales_by_category(start_date, end_date))
+
+    """ \test @ref R34_0"""
+    def test_reports_match_sql(self):
+        """
+        Test that the vectorized reports equal the SQL reports over several ranges, including the fixture orders and an empty range.
+        """
+
+        now = datetime.now()
+        self.assert_reports_match_sql('2023-05-01', '2023-06-30')
+        self.assert_reports_match_sql(now - timedelta(days=365), now)
+        self.assert_reports_match_sql((now - timedelta(days=30)).strftime('%Y-%m-%d %H:%M:%S'), now.strftime('%Y-%m-%d'))
+        self.assert_reports_match_sql('2001-01-01', '2001-12-31')
+        self.assertEqual(self.products.total_sales('2001-01-01', '2001-12-31'), [{'total_sales': 0.0}])
+
+    """ \test @ref R34_0"""
+    def test_bad_dates_give_empty_reports(self):
+        """
+        Test that a missing or unparseable report bound gives the empty reports of the SQL path instead of an error.
+        """
+
+        for start_date, end_date in ((None, '2023-06-30'), ('2023-05-01', None), ('garbage', '2023-06-30')):
+            self.assertEqual(self.products.total_sales(start_date, end_date), [{'total_sales': 0.0}])
+            self.assertEqual(self.products.top_selling_products(start_date, end_date), [])
+            self.assertEqual(self.products.sales_by_category(start_date, end_date), [])
+            self.assert_reports_match_sql(start_date, end_date)
+
+    """ \test @ref R34_0"""
+    def test_report_formats(self):
+        """
+        Test that the reports have the value types of the SQL reports and that ties are broken by product_id.
+        """
+
+        report = self.products.total_sales('2023-05-01', '2023-06-30')
+        self.assertIsInstance(report[0]['order_id'], int)
+        self.assertIsInstance(report[0]['datetime'], datetime)
+        self.assertIsInstance(report[0]['total_amount'], float)
+        top = self.products.top_selling_products('2023-05-01', '2023-06-30')
+        self.assertLessEqual(len(top), SalesAnalytics.TOP_PRODUCTS)
+        for first, second in zip(top, top[1:]):
+            self.assertTrue((first['total_quantity'], -first['product_id']) > (second['total_quantity'], -second['product_id']))
+
+    """ \test @ref R34_0 R59_0 R69_0"""
+    def test_incremental_refresh(self):
+        """
+        Test that inserted and deleted orders are visible to the next report without reloading the other orders.
+        """
+
+        today = date.today().isoformat()
+        tomorrow = (date.today() + timedelta(days=1)).isoformat()
+        loaded = len(self.analytics.columns().order_ids)
+        order_id = self.orders.insert_new_order({'customer_name': 'Test', 'total_amount': 4.5, 'order_details': [
+            {'product_id': 3, 'quantity': 30, 'total_price': 1.5}, {'product_id': 17, 'quantity': 1, 'total_price': 3.0}]})
+        self.assertEqual(self.products.total_sales(today, tomorrow)[-1]['total_sales'],
+                         self.raw_products.total_sales(today, tomorrow)[-1]['total_sales'])
+        self.assertEqual(len(self.analytics.columns().order_ids), loaded + 1)
+        self.assertEqual(self.products.top_selling_products(today, tomorrow)[0]['product_id'], 3)
+
+        self.assertTrue(self.orders.delete_order(order_id))
+        self.assertEqual(len(self.analytics.columns().order_ids), loaded)
+        self.assert_reports_match_sql(today, tomorrow)
+
+    """ \test @ref R34_0"""
+    def test_refresh_interval(self):
+        """
+        Test that orders written around the listeners are loaded once the refresh interval passed, and deletions after reload().
+        """
+
+        loaded = len(self.analytics.columns().order_ids)
+        other_process = Orders(self.connection)
+        order_id = other_process.insert_new_order({'customer_name': 'Other', 'total_amount': 2.0, 'order_details': [
+            {'product_id': 3, 'quantity': 1, 'total_price': 2.0}]})
+        self.assertEqual(len(self.analytics.columns().order_ids), loaded)
+        self.now[0] = 5.0
+        self.assertEqual(len(self.analytics.columns().order_ids), loaded + 1)
+
+        other_process.delete_order(order_id)
+        self.analytics.reload()
+        self.assertEqual(len(self.analytics.columns().order_ids), loaded)
+
+    """ \test @ref R34_0"""
+    def test_deleted_product(self):
+        """
+        Test that a deleted product drops out of the reports as it does from the SQL joins.
+        """
+
+        top = self.products.top_selling_products('2023-05-01', '2023-06-30')
+        cursor = self.connection.cursor()
+        cursor.execute("DELETE FROM order_details WHERE product_id = %s", (top[0]['product_id'],))
+        self.connection.commit()
+        self.analytics.reload()
+        self.assertTrue(self.products.delete_product(top[0]['product_id']))
+        self.assert_reports_match_sql('2023-05-01', '2023-06-30')
+        self.assertNotIn(top[0]['product_id'], [row['product_id'] for row in self.products.top_selling_products('2023-05-01', '2023-06-30')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.connection_pool import ConnectionPool, PoolTimeoutError
+
+""" \test @ref R1_0"""
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test case with a pool whose factory returns a new mock connection per call.
+        """
+
+        self.factory = MagicMock(side_effect=lambda: MagicMock())
+        self.pool = ConnectionPool(self.factory, max_size=2, timeout=0.05)
+
+    """ \test @ref R1_0"""
+    def test_acquire_reuses_released_connection(self):
+        """
+        Test that a released connection is handed out again instead of opening a new one.
+        """
+
+        connection = self.pool.acquire()
+        self.pool.release(connection)
+        self.assertIs(self.pool.acquire(), connection)
+        self.factory.assert_called_once()
+
+    """ \test @ref R1_0"""
+    def test_acquire_times_out_when_exhausted(self):
+        """
+        Test that acquire() raises PoolTimeoutError once max_size connections are checked out.
+        """
+
+        self.pool.acquire()
+        self.pool.acquire()
+        with self.assertRaises(PoolTimeoutError):
+            self.pool.acquire()
+        self.assertEqual(self.pool.stats()['timeouts'], 1)
+
+    """ \test @ref R1_0"""
+    def test_waiter_is_woken_by_release(self):
+        """
+        Test that a thread blocked in acquire() receives the connection released by another thread.
+        """
+
+        first = self.pool.acquire()
+        self.pool.acquire()
+        received = []
+        waiter = threading.Thread(target=lambda: received.append(self.pool.acquire(timeout=2)))
+        waiter.start()
+        self.pool.release(first)
+        waiter.join()
+        self.assertEqual(received, [first])
+
+    """ \test @ref R1_0"""
+    def test_discard_closes_connection_and_frees_slot(self):
+        """
+        Test that discard() closes the connection and lets the pool create a replacement.
+        """
+
+        first = self.pool.acquire()
+        self.pool.acquire()
+        self.pool.discard(first)
+        first.close.assert_called_once()
+        self.assertIsNot(self.pool.acquire(), first)
+        self.assertEqual(self.factory.call_count, 3)
+
+    """ \test @ref R1_0"""
+    def test_stats(self):
+        """
+        Test that stats() reports the in-use and idle connection counts.
+        """
+
+        connection = self.pool.acquire()
+        self.pool.acquire()
+        self.pool.release(connection)
+        stats = self.pool.stats()
+        self.assertEqual(stats['max_size'], 2)
+        self.assertEqual(stats['in_use'], 1)
+        self.assertEqual(stats['idle'], 1)
+        self.assertEqual(stats['created'], 2)
+        self.assertEqual(stats['acquired'], 2)
+
+    """ \test @ref R1_0"""
+    def test_stale_idle_connection_is_replaced(self):
+        """
+        Test that an idle connection failing validation is closed and replaced by a new one.
+        """
+
+        validate = MagicMock(return_value=False)
+        pool = ConnectionPool(self.factory, max_size=1, timeout=0.05, validate=validate, ping_interval=0)
+        stale = pool.acquire()
+        pool.release(stale)
+        fresh = pool.acquire()
+        validate.assert_called_once_with(stale)
+        stale.close.assert_called_once()
+        self.assertIsNot(fresh, stale)
+        self.assertEqual(pool.stats()['replaced'], 1)
+
+    """ \test @ref R1_0"""
+    def test_recently_used_connection_is_not_pinged(self):
+        """
+        Test that connections returned within ping_interval are reused without validation.
+        """
+
+        validate = MagicMock(return_value=False)
+        pool = ConnectionPool(self.factory, max_size=1, validate=validate, ping_interval=60)
+        connection = pool.acquire()
+        pool.release(connection)
+        self.assertIs(pool.acquire(), connection)
+        validate.assert_not_called()
@@ -0,0 +1,141 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.customers import Customers
+from Backend.benchmark import seed_orders
+from Backend.migrations import Migrator
+from Backend.sqlite_connection import SQLiteConnection
+from Backend.orders import Orders
+
+
+""" \test @ref R57_0"""
+class TestCustomerStatements(unittest.TestCase):
+    """ \test @ref R57_0"""
+    def test_apply_order_mysql(self):
+        """
+        Test that an order is added with a MySQL upsert on the caller's cursor and subtracted again without committing.
+        """
+
+        connection = MagicMock(dialect='mysql')
+        cursor = MagicMock()
+        customers = Customers(connection, customer_stats=True)
+        order = {'customer_name': 'Ann', 'total_amount': 3.0, 'datetime': '2023-05-01 10:30:00'}
+
+        customers.apply_order(cursor, order)
+        self.assertIn("ON DUPLICATE KEY UPDATE", customers.stats_upsert)
+        cursor.execute.assert_called_once_with(customers.stats_upsert, ('Ann', 3.0, '2023-05-01 10:30:00', '2023-05-01 10:30:00'))
+
+        cursor.reset_mock()
+        customers.apply_order(cursor, order, -1)
+        cursor.execute.assert_any_call("DELETE FROM customer_stats WHERE customer_name = %s AND order_count <= 0", ('Ann',))
+        connection.commit.assert_not_called()
+
+
+""" \test @ref R57_0 R59_0 R69_0"""
+class TestCustomers(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a migrated in-memory database with synthetic orders and the customer aggregates wired into Orders.
+        """
+
+        self.connection = SQLiteConnection()
+        seed_orders(self.connection, 500)
+        Migrator(self.connection).migrate()
+        self.customers = Customers(self.connection, customer_stats=True)
+        self.raw_customers = Customers(self.connection)
+        self.orders = Orders(self.connection, [self.customers])
+
+    def tearDown(self):
+        self.connection.release()
+        self.connection.close_all()
+
+    def customer_names(self):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT DISTINCT customer_name FROM orders")
+        return [name for (name,) in cursor.fetchall()]
+
+    def assert_stats_match_orders(self, customer_name):
+        """
+        Compare the maintained aggregates of a customer with the aggregates of their orders.
+        """
+
+        self.assertEqual(self.customers.get_customer(customer_name), self.raw_customers.get_customer(customer_name))
+
+    """ \test @ref R57_0"""
+    def test_migration_fills_the_aggregates(self):
+        """
+        Test that migration 0004 computes the aggregates of the existing orders.
+        """
+
+        for customer_name in self.customer_names():
+            self.assert_stats_match_orders(customer_name)
+        self.assertIsNone(self.customers.get_customer('Nobody'))
+        self.assertIsNone(self.raw_customers.get_customer('Nobody'))
+
+    """ \test @ref R57_0 R59_0 R69_0"""
+    def test_inserts_and_deletes_update_the_aggregates(self):
+        """
+        Test that inserted and deleted orders keep the aggregates equal to the customer's orders, down to removing the customer.
+        """
+
+        order = {'customer_name': 'New Customer', 'total_amount': 4.5,
+                 'order_details': [{'product_id': 1, 'quantity': 3, 'total_price': 4.5}]}
+        first_id = self.orders.insert_new_order(order)
+        second_id = self.orders.insert_new_order(dict(order, total_amount=2.25))
+        customer = self.customers.get_customer('New Customer')
+        self.assertEqual(customer['order_count'], 2)
+        self.assertEqual(customer['total_spent'], 6.75)
+        self.assert_stats_match_orders('New Customer')
+
+        # Deleting the last order moves last_order_at back to the first one
+        self.orders.delete_order(second_id)
+        self.assert_stats_match_orders('New Customer')
+        self.orders.delete_order(first_id)
+        self.assertIsNone(self.customers.get_customer('New Customer'))
+
+        existing = self.customer_names()[0]
+        page = self.customers.get_customer_orders(existing, 1)
+        self.orders.delete_order(page['orders'][0]['order_id'])
+        self.assert_stats_match_orders(existing)
+
+    """ \test @ref R57_0"""
+    def test_order_history_pages(self):
+        """
+        Test that a customer's orders are paged newest first without gaps or repeats.
+        """
+
+        for _ in range(7):
+            self.orders.insert_new_order({'customer_name': 'Regular', 'total_amount': 1.0, 'order_details': []})
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT order_id FROM orders WHERE customer_name = %s ORDER BY order_id DESC", ('Regular',))
+        expected = [order_id for (order_id,) in cursor.fetchall()]
+
+        seen, after = [], None
+        while True:
+            page = self.customers.get_customer_orders('Regular', 3, after)
+            self.assertLessEqual(len(page['orders']), 3)
+            self.assertTrue(all(order['customer_name'] == 'Regular' for order in page['orders']))
+            seen.extend(order['order_id'] for order in page['orders'])
+            after = page['next_cursor']
+            if after is None:
+                break
+        self.assertEqual(seen, expected)
+        self.assertEqual(self.customers.get_customer_orders('Nobody', 3), {'orders': [], 'next_cursor': None})
+
+    """ \test @ref R57_0"""
+    def test_backfill(self):
+        """
+        Test that backfill recomputes the aggregates after orders were written around Orders.
+        """
+
+        seed_orders(self.connection, 50, seed=11)
+        self.assertEqual(self.customers.backfill(), len(self.customer_names()))
+        for customer_name in self.customer_names():
+            self.assert_stats_match_orders(customer_name)
+
+
+if __name__ == '__main__':
+    unittest.main()
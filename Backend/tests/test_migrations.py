@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import unittest
+import sys
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.migrations import Migrator, MigrationError, load_migrations, split_statements
+from Backend.sqlite_connection import SQLiteConnection
+
+
+""" \test @ref R1_0"""
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up an in-memory database and a scratch directory for migration files.
+        """
+
+        self.connection = SQLiteConnection()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Discard the database and the scratch directory.
+        """
+
+        self.connection.release()
+        self.connection.close_all()
+        shutil.rmtree(self.directory)
+
+    def write(self, file_name, sql):
+        with open(os.path.join(self.directory, file_name), 'w') as migration_file:
+            migration_file.write(sql)
+
+    def indexes(self):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx%%' ORDER BY name")
+        return [row[0] for row in cursor.fetchall()]
+
+    """ \test @ref R1_0"""
+    def test_split_statements(self):
+        """
+        Test that comments are dropped and statements are split on semicolons.
+        """
+
+        self.assertEqual(split_statements("-- comment\nCREATE INDEX a ON t (x);\n\nDROP INDEX b ON t;\n"),
+                         ["CREATE INDEX a ON t (x)", "DROP INDEX b ON t"])
+
+    """ \test @ref R1_0"""
+    def test_load_migrations(self):
+        """
+        Test that migrations are ordered by version and incomplete pairs are rejected.
+        """
+
+        self.write('0002_second.up.sql', "SELECT 2;")
+        self.write('0002_second.down.sql', "SELECT 2;")
+        self.write('0001_first.up.sql', "SELECT 1;")
+        self.write('0001_first.down.sql', "SELECT 1;")
+        self.write('README.txt', "not a migration")
+        self.assertEqual([(m.version, m.name) for m in load_migrations(self.directory)], [(1, 'first'), (2, 'second')])
+        self.write('0003_third.up.sql', "SELECT 3;")
+        with self.assertRaises(MigrationError):
+            load_migrations(self.directory)
+
+    """ \test @ref R1_0"""
+    def test_project_migrations_up_and_down(self):
+        """
+        Test that the shipped migrations apply and revert cleanly and are recorded in schema_migrations.
+        """
+
+        migrator = Migrator(self.connection)
+        versions = [migration.version for migration in load_migrations()]
+        self.assertTrue(all(not entry['applied'] for entry in migrator.status()))
+
+        # A dry run changes nothing
+        planned = migrator.migrate(dry_run=True)
+        self.assertEqual([m.version for m in planned], versions)
+        self.assertEqual(self.indexes(), [])
+
+        migrator.migrate(target=1)
+        self.assertEqual(migrator.applied_versions(), [1])
+        self.assertIn('idx_orders_datetime', self.indexes())
+
+        migrator.migrate(target=2)
+        self.assertEqual(migrator.applied_versions(), [1, 2])
+        self.assertEqual(self.indexes(), ['idx_order_details_product_sales', 'idx_orders_customer_name',
+                                          'idx_orders_datetime_covering', 'idx_products_category_id', 'idx_products_name'])
+        migrator.migrate()
+        self.assertEqual(migrator.applied_versions(), versions)
+        # Running again applies nothing
+        self.assertEqual(migrator.migrate(), [])
+
+        reverted = migrator.rollback(target=0)
+        self.assertEqual([m.version for m in reverted], versions[::-1])
+        self.assertEqual(migrator.applied_versions(), [])
+        self.assertEqual(self.indexes(), [])
+
+    """ \test @ref R1_0"""
+    def test_rollback_needs_migration_files(self):
+        """
+        Test that reverting a version without its files is refused.
+        """
+
+        Migrator(self.connection).migrate()
+        with self.assertRaises(MigrationError):
+            Migrator(self.connection, migrations=[]).rollback()
@@ -0,0 +1,185 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+import sys
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.order_queue import OrderQueue, QueueFull
+from Backend.migrations import Migrator
+from Backend.sqlite_connection import SQLiteConnection
+from Backend.orders import Orders
+
+
+def order(customer_name, product_id=1):
+    return {'customer_name': customer_name, 'total_amount': 2.0,
+            'order_details': [{'product_id': product_id, 'quantity': 1, 'total_price': 2.0}]}
+
+
+""" \test @ref R59_0"""
+class TestOrderQueue(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a migrated SQLite database file and a directory for the write-ahead log.
+        """
+
+        self.directory = tempfile.mkdtemp()
+        self.connection = SQLiteConnection(os.path.join(self.directory, 'store.db'))
+        Migrator(self.connection).migrate()
+        self.connection.release()
+        self.queues = []
+
+    def tearDown(self):
+        for queue in self.queues:
+            queue.shutdown()
+        self.connection.release()
+        self.connection.close_all()
+        shutil.rmtree(self.directory)
+
+    def start_queue(self, **options):
+        """
+        Create and start a queue writing its log to the test directory.
+        """
+
+        queue = OrderQueue(Orders(self.connection), os.path.join(self.directory, 'log'), **options)
+        self.queues.append(queue)
+        queue.start()
+        return queue
+
+    def count_orders(self, customer_name):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM orders WHERE customer_name = %s", (customer_name,))
+        count = cursor.fetchone()[0]
+        self.connection.release()
+        return count
+
+    def checkpoint(self):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT last_seq FROM order_queue_checkpoints WHERE queue_name = %s", ('orders',))
+        row = cursor.fetchone()
+        self.connection.release()
+        return row[0] if row is not None else None
+
+    """ \test @ref R59_0"""
+    def test_orders_are_committed_in_batches(self):
+        """
+        Test that enqueued orders are committed with their checkpoint, notify the listeners and report their order_id.
+        """
+
+        queue = self.start_queue()
+        events = []
+        queue.orders.subscribe(lambda event, inserted: events.append(inserted['order_id']))
+        seqs = [queue.enqueue(order('Queued %d' % number)) for number in range(20)]
+        rejected = queue.enqueue({'customer_name': 'Broken', 'total_amount': 'free', 'order_details': []})
+        self.assertTrue(queue.flush(5))
+
+        self.assertEqual(seqs, list(range(1, 21)))
+        statuses = [queue.status(seq) for seq in seqs]
+        self.assertTrue(all(status['status'] == 'committed' for status in statuses))
+        self.assertEqual(sorted(events), sorted(status['order_id'] for status in statuses))
+        self.assertEqual(queue.status(rejected)['status'], 'rejected')
+        self.assertIsNone(queue.status(99))
+        self.assertEqual(self.count_orders('Queued 7'), 1)
+        self.assertEqual(self.checkpoint(), 21)  # The rejected last entry is done too
+        stats = queue.stats()
+        self.assertEqual((stats['enqueued'], stats['committed'], stats['rejected'], stats['pending']), (21, 20, 1, 0))
+        self.assertLessEqual(stats['batches'], 21)
+
+    """ \test @ref R59_0"""
+    def test_recovery_replays_uncommitted_orders_once(self):
+        """
+        Test that a restart replays exactly the logged orders that were not committed and drops a partly written entry.
+        """
+
+        queue = self.start_queue()
+        queue.enqueue(order('Before'))
+        self.assertTrue(queue.flush(5))
+        # The database becomes unreachable, so the next orders stay in the log
+        queue.orders.insert_new_orders = MagicMock(side_effect=RuntimeError('database unreachable'))
+        queue.enqueue(order('During'))
+        queue.enqueue(order('During'))
+        queue.shutdown()
+        with open(queue.path, 'a', encoding='utf-8') as log:
+            log.write('{"seq":4,"order":{"customer')
+
+        restarted = self.start_queue()
+        self.assertEqual(restarted.stats()['replayed'], 2)
+        self.assertTrue(restarted.flush(5))
+        self.assertEqual((self.count_orders('Before'), self.count_orders('During')), (1, 2))
+        self.assertEqual(restarted.enqueue(order('After')), 4)
+        with open(queue.path, encoding='utf-8') as log:
+            self.assertTrue(all(line.endswith('\n') for line in log))
+
+    """ \test @ref R59_0"""
+    def test_backpressure(self):
+        """
+        Test that orders beyond max_pending are refused while the database is unreachable.
+        """
+
+        queue = OrderQueue(Orders(self.connection), os.path.join(self.directory, 'log'), max_pending=2, retry_delay=60.0)
+        self.queues.append(queue)
+        queue.orders.insert_new_orders = MagicMock(side_effect=RuntimeError('database unreachable'))
+        queue.start()
+        queue.enqueue(order('First'))
+        queue.enqueue(order('Second'))
+        with self.assertRaises(QueueFull):
+            queue.enqueue(order('Third'))
+        self.assertEqual(queue.status(2), {'queue_seq': 2, 'status': 'queued'})
+        self.assertEqual((queue.stats()['pending'], queue.stats()['refused']), (2, 1))
+
+    """ \test @ref R59_0"""
+    def test_compaction_and_foreign_orders(self):
+        """
+        Test that a fully committed log is emptied and that orders inserted outside the worker do not move the checkpoint.
+        """
+
+        queue = self.start_queue(compact_bytes=1)
+        queue.enqueue(order('Compacted'))
+        self.assertTrue(queue.flush(5))
+        self.assertEqual(queue.stats()['log_bytes'], 0)
+        queue.orders.insert_new_order(dict(order('Direct'), queue_seq=1000))
+        self.assertEqual(self.checkpoint(), 1)
+        queue.shutdown()
+
+        restarted = self.start_queue()
+        self.assertEqual(restarted.stats()['replayed'], 0)
+        self.assertEqual(restarted.enqueue(order('Next')), 2)
+
+
+    """ \test @ref R59_0"""
+    def test_bad_entries_are_rejected_without_blocking_the_queue(self):
+        """
+        Test that entries failing their whole batch, e.g. a non-dictionary order or one hitting a constraint, are rejected alone,
+        the orders around them are committed, nothing is retried, and a restart does not replay them.
+        """
+
+        queue = self.start_queue()
+        insert_new_orders = queue.orders.insert_new_orders
+
+        def violate_constraint(orders):
+            if any(order['customer_name'] == 'Poison' for order in orders):
+                raise sqlite3.IntegrityError('UNIQUE constraint failed: order_details.order_id, order_details.product_id')
+            return insert_new_orders(orders)
+
+        queue.orders.insert_new_orders = violate_constraint
+        with queue._condition:  # Holds the worker back so the entries form one batch
+            seqs = [queue.enqueue(order('First')), queue.enqueue([1, 2]), queue.enqueue(order('Poison')), queue.enqueue(order('Last'))]
+        self.assertTrue(queue.flush(5))
+
+        self.assertEqual([queue.status(seq)['status'] for seq in seqs], ['committed', 'rejected', 'rejected', 'committed'])
+        self.assertIn('IntegrityError', queue.status(seqs[2])['message'])
+        self.assertEqual((self.count_orders('First'), self.count_orders('Last')), (1, 1))
+        stats = queue.stats()
+        self.assertEqual((stats['committed'], stats['rejected'], stats['failures']), (2, 2, 0))
+
+        queue.enqueue(order('Poison'))
+        self.assertTrue(queue.flush(5))
+        self.assertEqual(self.checkpoint(), 5)
+        queue.shutdown()
+        self.assertEqual(self.start_queue().stats()['replayed'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,9 @@ import os
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(parent_dir)
 from Backend.orders import Orders
+from Backend.sales_rollup import SalesRollup
+from Backend.migrations import Migrator
+from Backend.sqlite_connection import SQLiteConnection
 
 """ \test @ref R57_0 R59_0 R58_0 R69_0 R73_0"""
 class OrdersTestCase(unittest.TestCase):
@@ -135,10 +138,248 @@ class OrdersTestCase(unittest.TestCase):
         self.mock_cursor.execute.assert_called_once_with(expected_query, (100, 1))
         self.mock_connection.commit.assert_called_once()
 
+    """ \test @ref R57_0"""
+    def test_iter_all_orders(self):
+        """
+        Test case for the 'iter_all_orders' method of the 'Orders' class.
+        """
+
+        # Mock the result set returned by the query
+        order_datetime = datetime.now()
+        self.mock_cursor.__iter__.return_value = iter([(1, 'John Doe', 100.0, order_datetime)])
+
+        # Call the method under test and consume the iterator
+        result = list(self.orders.iter_all_orders())
+
+        # Assert the expected SQL query was executed and the row was converted
+        self.mock_cursor.execute.assert_called_once_with("SELECT * FROM orders")
+        self.assertEqual(result, [{'order_id': 1, 'customer_name': 'John Doe', 'total_amount': 100.0, 'datetime': order_datetime}])
+
+    """ \test @ref R57_0"""
+    def test_get_orders_page(self):
+        """
+        Test case for the 'get_orders_page' method of the 'Orders' class.
+        """
+
+        # The first page is requested without a cursor and another page follows
+        order_datetime = datetime.now()
+        self.mock_cursor.fetchall.return_value = [
+            (1, 'John Doe', 100.0, order_datetime),
+            (2, 'Jane Smith', 200.0, order_datetime)
+        ]
+
+        # Call the method under test
+        result = self.orders.get_orders_page(1)
+
+        # Assert the keyset query parameters and the page
+        self.mock_cursor.execute.assert_called_once_with(
+            "SELECT order_id, customer_name, total_amount, datetime FROM orders "
+            "WHERE order_id > %s ORDER BY order_id LIMIT %s", (0, 2))
+        self.assertEqual(result, {
+            'orders': [{'order_id': 1, 'customer_name': 'John Doe', 'total_amount': 100.0, 'datetime': order_datetime}],
+            'next_cursor': 1
+        })
+
+    """ \test @ref R59_0 R69_0"""
+    def test_aggregates_follow_order_writes(self):
+        """
+        Test that aggregates are applied in the inserting and deleting transactions, before the commit.
+        """
+
+        aggregate = MagicMock()
+        aggregate.apply_order.side_effect = lambda cursor, order, sign: self.mock_connection.commit.assert_not_called()
+        orders = Orders(self.mock_connection, [aggregate])
+        self.mock_cursor.lastrowid = 5
+
+        # Insert an order
+        order_id = orders.insert_new_order({'customer_name': 'John Doe', 'total_amount': 3.0,
+                                            'order_details': [{'product_id': 1, 'quantity': 2, 'total_price': 3.0}]})
+        self.assertEqual(order_id, 5)
+        applied_order, sign = aggregate.apply_order.call_args[0][1:]
+        self.assertEqual((applied_order['order_id'], applied_order['total_amount'], sign), (5, 3.0, 1))
+
+        # Delete the order; it is read first so the aggregate can subtract it
+        self.mock_connection.commit.reset_mock()
+        self.mock_cursor.fetchone.return_value = ('John Doe', 3.0, '2023-05-01 10:00:00')
+        self.mock_cursor.fetchall.return_value = [(1, 2.0, 3.0)]
+        self.mock_cursor.rowcount = 1
+        self.assertTrue(orders.delete_order(5))
+        applied_order, sign = aggregate.apply_order.call_args[0][1:]
+        self.assertEqual(sign, -1)
+        self.assertEqual(applied_order['order_details'], [{'product_id': 1, 'quantity': 2.0, 'total_price': 3.0}])
+        self.mock_connection.commit.assert_called_once()
+
+    """ \test @ref R59_0 R69_0"""
+    def test_listeners_are_notified_after_commit(self):
+        """
+        Test that subscribed listeners receive committed inserts and deletes.
+        """
 
+        events = []
+        self.orders.subscribe(lambda event, order: events.append((event, order['order_id'], self.mock_connection.commit.called)))
+        self.mock_cursor.lastrowid = 5
+        self.orders.insert_new_order({'customer_name': 'John Doe', 'total_amount': 3.0, 'order_details': []})
+        self.mock_cursor.fetchone.return_value = ('John Doe', 3.0, '2023-05-01 10:00:00')
+        self.mock_cursor.fetchall.return_value = []
+        self.mock_cursor.rowcount = 1
+        self.orders.delete_order(5)
+        self.assertEqual(events, [('inserted', 5, True), ('deleted', 5, True)])
 
+    """ \test @ref R59_0"""
+    def test_insert_new_orders_mysql(self):
+        """
+        Test that a batch is written with one multi-row INSERT per table and one commit, numbering the orders from the connection's first insert id.
+        """
 
+        self.mock_connection.dialect = 'mysql'
+        self.mock_cursor.fetchall.return_value = [(1,), (2,)]
+        self.mock_connection.first_insert_id.return_value = 10
+        events = []
+        self.orders.subscribe(lambda event, order: events.append((event, order['order_id'])))
+        results = self.orders.insert_new_orders([
+            {'customer_name': 'Ann', 'total_amount': '3.0', 'order_details': [{'product_id': '1', 'quantity': '2', 'total_price': '3.0'}]},
+            {'customer_name': 'Bob', 'total_amount': 1.0, 'order_details': [{'product_id': 9, 'quantity': 1, 'total_price': 1.0}]},
+            {'customer_name': '', 'total_amount': 1.0, 'order_details': []},
+            {'customer_name': 'Cid', 'total_amount': 2.5, 'order_details': [{'product_id': 2, 'quantity': 1, 'total_price': 2.5},
+                                                                             {'product_id': 1, 'quantity': 1, 'total_price': 0.0}]},
+        ])
 
+        self.assertEqual([result['success'] for result in results], [True, False, False, True])
+        self.assertEqual((results[0]['order_id'], results[3]['order_id']), (10, 11))
+        self.assertEqual(results[1]['message'], 'Unknown product_id 9.')
+        statements = [call[0][0] for call in self.mock_cursor.execute.call_args_list]
+        self.assertEqual(statements[1], "INSERT INTO orders (customer_name, total_amount, datetime) VALUES (%s, %s, %s), (%s, %s, %s)")
+        self.assertEqual(statements[2], "INSERT INTO order_details (order_id, product_id, quantity, total_price) VALUES "
+                                        "(%s, %s, %s, %s), (%s, %s, %s, %s), (%s, %s, %s, %s)")
+        self.assertEqual(self.mock_cursor.execute.call_args_list[2][0][1], (10, 1, 2.0, 3.0, 11, 2, 1.0, 2.5, 11, 1, 1.0, 0.0))
+        self.mock_connection.commit.assert_called_once()
+        self.mock_connection.first_insert_id.assert_called_once_with(self.mock_cursor, 2)
+        self.assertEqual(events, [('inserted', 10), ('inserted', 11)])
 
+    """ \test @ref R59_0"""
+    def test_insert_new_orders_rolls_back(self):
+        """
+        Test that a failing statement rolls the whole batch back and notifies no listener.
+        """
 
+        self.mock_cursor.fetchall.return_value = [(1,)]
+        self.mock_cursor.execute.side_effect = [None, None, RuntimeError('connection lost')]
+        listener = MagicMock()
+        self.orders.subscribe(listener)
+        with self.assertRaises(RuntimeError):
+            self.orders.insert_new_orders([{'customer_name': 'Ann', 'total_amount': 1.0,
+                                            'order_details': [{'product_id': 1, 'quantity': 1, 'total_price': 1.0}]}])
+        self.mock_connection.rollback.assert_called_once()
+        self.mock_connection.commit.assert_not_called()
+        listener.assert_not_called()
+
+
+""" \test @ref R59_0"""
+class TestInsertNewOrdersSQLite(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a migrated in-memory database with the sales rollups wired into Orders.
+        """
+
+        self.connection = SQLiteConnection()
+        Migrator(self.connection).migrate()
+        self.orders = Orders(self.connection, [SalesRollup(self.connection)])
+
+    def tearDown(self):
+        self.connection.release()
+        self.connection.close_all()
+
+    """ \test @ref R59_0"""
+    def test_batch_matches_single_inserts(self):
+        """
+        Test that a batch spanning several statements stores the same rows and rollups as inserting the orders one by one.
+        """
+
+        batch = [{'customer_name': 'Customer %d' % number, 'total_amount': 1.5 * number,
+                  'order_details': [{'product_id': 1 + number % 3, 'quantity': number, 'total_price': 1.5 * number}]}
+                 for number in range(1, 701)]
+        results = self.orders.insert_new_orders(batch)
+        self.assertTrue(all(result['success'] for result in results))
+        cursor = self.connection.cursor()
+        for result, order in zip(results, batch):
+            cursor.execute("SELECT orders.customer_name, order_details.quantity FROM orders "
+                           "JOIN order_details ON orders.order_id = order_details.order_id WHERE orders.order_id = %s", (result['order_id'],))
+            self.assertEqual(cursor.fetchall(), [(order['customer_name'], order['order_details'][0]['quantity'])])
+        cursor.execute("SELECT SUM(order_count) FROM sales_daily")
+        before = cursor.fetchone()[0]
+
+        single_id = self.orders.insert_new_order(batch[0])
+        self.assertEqual(single_id, results[-1]['order_id'] + 1)
+        cursor.execute("SELECT SUM(order_count) FROM sales_daily")
+        self.assertEqual(cursor.fetchone()[0], before + 1)
+
+    """ \test @ref R59_0"""
+    def test_orders_the_database_would_refuse_are_rejected_individually(self):
+        """
+        Test that a repeated product_id, an overlong customer_name and non-finite numbers reject only their own order of a mixed batch.
+        """
+
+        def order(customer_name, *details, total_amount=1.0):
+            return {'customer_name': customer_name, 'total_amount': total_amount,
+                    'order_details': [{'product_id': product_id, 'quantity': 1, 'total_price': total_price} for product_id, total_price in details]}
+
+        batch = [order('Good', (1, 1.0)), order('Duplicate', (3, 0.5), (3, 0.5)), order('x' * 101, (1, 1.0)),
+                 order('NaN', (1, float('nan'))), order('Infinity', (1, 1.0), total_amount=float('inf')), order('Also good', (3, 0.5), (4, 0.2))]
+        results = self.orders.insert_new_orders(batch)
+        self.assertEqual([result['success'] for result in results], [True, False, False, False, False, True])
+        self.assertEqual(results[1]['message'], 'Invalid order: each product_id may appear only once per order')
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT customer_name FROM orders WHERE order_id IN (%s, %s)", (results[0]['order_id'], results[5]['order_id']))
+        self.assertEqual(sorted(row[0] for row in cursor.fetchall()), ['Also good', 'Good'])
+
+
+""" \test @ref R58_0"""
+class TestOrdersWithDetailsSQLite(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up an in-memory database with a few orders of the fixture products.
+        """
+
+        self.connection = SQLiteConnection()
+        self.orders = Orders(self.connection)
+        results = self.orders.insert_new_orders([
+            {'customer_name': 'Ann', 'total_amount': 2.5, 'order_details': [
+                {'product_id': 3, 'quantity': 3, 'total_price': 1.5}, {'product_id': 1, 'quantity': 1, 'total_price': 1.0}]},
+            {'customer_name': 'Bob', 'total_amount': 0.0, 'order_details': []},
+            {'customer_name': 'Cy', 'total_amount': 1.5, 'order_details': [{'product_id': 17, 'quantity': 1, 'total_price': 1.5}]},
+        ])
+        self.order_ids = [result['order_id'] for result in results]
+
+    def tearDown(self):
+        self.connection.release()
+        self.connection.close_all()
+
+    """ \test @ref R58_0"""
+    def test_get_order_with_details(self):
+        """
+        Test that an order is returned with its order details and product names, an order without details with an empty list, and an unknown order as None.
+        """
+
+        order = self.orders.get_order_with_details(self.order_ids[0])
+        self.assertEqual((order['order_id'], order['customer_name'], order['total_amount']), (self.order_ids[0], 'Ann', 2.5))
+        self.assertEqual(order['order_details'], [
+            {'product_id': 1, 'product_name': 'Toothpaste', 'quantity': 1.0, 'total_price': 1.0},
+            {'product_id': 3, 'product_name': 'Apple', 'quantity': 3.0, 'total_price': 1.5},
+        ])
+        self.assertEqual(self.orders.get_order_with_details(self.order_ids[1])['order_details'], [])
+        self.assertIsNone(self.orders.get_order_with_details(self.order_ids[-1] + 1))
+
+    """ \test @ref R58_0"""
+    def test_get_orders_by_ids(self):
+        """
+        Test that many orders are read in the requested order across several IN (...) statements, once per ID, skipping unknown IDs.
+        """
 
+        self.orders.MAX_INSERT_PARAMS = 2
+        first, second, third = self.order_ids
+        orders = self.orders.get_orders_by_ids([third, 999, first, third, second])
+        self.assertEqual([order['order_id'] for order in orders], [third, first, second])
+        self.assertEqual([order['order_details'] for order in orders],
+                         [self.orders.get_order_with_details(order_id)['order_details'] for order_id in (third, first, second)])
+        self.assertEqual(orders[0]['order_details'][0]['product_name'], 'Milk')
+        self.assertEqual(self.orders.get_orders_by_ids([]), [])
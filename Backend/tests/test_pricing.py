@@ -0,0 +1,146 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.pricing import PriceTable
+from Backend.sqlite_connection import SQLiteConnection
+from Backend.products import Products
+from Backend.orders import Orders
+
+
+def basket(*lines):
+    return {'customer_name': 'Ann', 'order_details': [{'product_id': product_id, 'quantity': quantity} for product_id, quantity in lines]}
+
+
+""" \test @ref R59_0"""
+class TestPriceTable(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a price table over a mocked connection with a controllable clock.
+        """
+
+        self.now = 0.0
+        self.connection = MagicMock()
+        self.cursor = self.connection.cursor.return_value
+        self.cursor.fetchall.return_value = [(1, 30.0), (3, 0.5), (4, 0.2)]
+        self.prices = PriceTable(self.connection, ttl=10.0, clock=lambda: self.now)
+
+    def check_pricing(self):
+        """
+        Check line totals, order total, listener updates and rejections; run with and without NumPy.
+        """
+
+        priced = self.prices.price_order(basket((3, 3), (1, 1.5), (3, 0.333)))
+        self.assertEqual([detail['total_price'] for detail in priced['order_details']], [1.5, 45.0, 0.17])
+        self.assertEqual(priced['total_amount'], 46.67)
+        self.assertEqual(priced['customer_name'], 'Ann')
+
+        self.prices.on_product_changed('updated', {'product_id': 3, 'price_per_unit': 0.75})
+        self.prices.on_product_changed('inserted', {'product_id': 500, 'name': 'Kiwi', 'price_per_unit': 0.4})
+        self.prices.on_product_changed('deleted', {'product_id': 4})
+        self.prices.on_product_changed('updated', {'product_id': 1, 'category_id': 2})  # Carries no price
+        self.assertEqual(self.prices.price_order(basket((3, 2), (500, 5), (1, 1)))['total_amount'], 33.5)
+        with self.assertRaises(ValueError) as context:
+            self.prices.price_order(basket((4, 1), (2, 1), (-1, 1), (3, 1)))
+        self.assertEqual(str(context.exception), 'Unknown product_id -1, 2, 4.')
+        for quantity in (0, -1, float('nan')):
+            with self.assertRaises(ValueError):
+                self.prices.price_order(basket((3, quantity)))
+        with self.assertRaises(KeyError):
+            self.prices.price_order({'customer_name': 'Ann'})
+        with self.assertRaises(TypeError):
+            self.prices.price_order({'order_details': 'Apple'})
+        self.assertEqual(self.prices.stats()['products'], 3)
+        self.assertEqual(self.prices.stats()['updates'], 3)
+
+    """ \test @ref R59_0"""
+    def test_vectorized_pricing(self):
+        """
+        Test pricing with the NumPy price array.
+        """
+
+        if self.prices.stats()['vectorized'] is False:
+            self.skipTest("NumPy is not installed")
+        self.check_pricing()
+
+    """ \test @ref R59_0"""
+    def test_pricing_without_numpy(self):
+        """
+        Test pricing with the dictionary used when NumPy is missing.
+        """
+
+        with patch('Backend.pricing.np', None):
+            self.check_pricing()
+            self.assertFalse(self.prices.stats()['vectorized'])
+
+    """ \test @ref R59_0"""
+    def test_prices_are_loaded_lazily_and_reloaded(self):
+        """
+        Test that the prices are read on first use, changes before that are left to the load, and the table is reloaded after the ttl or invalidate().
+        """
+
+        self.prices.on_product_changed('updated', {'product_id': 3, 'price_per_unit': 9.0})
+        self.connection.cursor.assert_not_called()
+        self.assertEqual(self.prices.price_order(basket((3, 1)))['total_amount'], 0.5)
+        self.now = 5.0
+        self.prices.price_order(basket((3, 1)))
+        self.assertEqual(self.prices.stats()['loads'], 1)
+
+        self.cursor.fetchall.return_value = [(3, 0.6)]
+        self.now = 10.0
+        self.assertEqual(self.prices.price_order(basket((3, 1)))['total_amount'], 0.6)
+        self.cursor.fetchall.return_value = [(3, 0.7)]
+        self.prices.invalidate()
+        self.assertEqual(self.prices.price_order(basket((3, 1)))['total_amount'], 0.7)
+        self.assertEqual(self.prices.stats()['loads'], 3)
+
+
+""" \test @ref R59_0"""
+class TestServerSidePricing(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up an in-memory database with Orders priced by a price table that follows the Products model.
+        """
+
+        self.connection = SQLiteConnection()
+        self.prices = PriceTable(self.connection)
+        self.products = Products(self.connection)
+        self.products.subscribe(self.prices.on_product_changed)
+        self.orders = Orders(self.connection, pricing=self.prices)
+
+    def tearDown(self):
+        self.connection.release()
+        self.connection.close_all()
+
+    def details(self, order_id):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT total_amount FROM orders WHERE order_id = %s", (order_id,))
+        total_amount = cursor.fetchone()[0]
+        cursor.execute("SELECT product_id, quantity, total_price FROM order_details WHERE order_id = %s ORDER BY product_id", (order_id,))
+        return total_amount, cursor.fetchall()
+
+    """ \test @ref R59_0"""
+    def test_orders_are_priced_on_insert(self):
+        """
+        Test that inserted orders store the server's totals, ignore the client's, and follow price updates.
+        """
+
+        order = dict(basket((3, 4), (17, 2)), total_amount=0.01)
+        order['order_details'][0]['total_price'] = 0.01
+        order_id = self.orders.insert_new_order(order)
+        self.assertEqual(self.details(order_id), (5.0, [(3, 4.0, 2.0), (17, 2.0, 3.0)]))
+
+        self.assertTrue(self.products.update_product_details(3, 0.55))
+        results = self.orders.insert_new_orders([basket((3, 10)), basket((999, 1)), basket((17, 0))])
+        self.assertTrue(results[0]['success'])
+        self.assertEqual(self.details(results[0]['order_id']), (5.5, [(3, 10.0, 5.5)]))
+        self.assertEqual(results[1]['message'], 'Invalid order: Unknown product_id 999.')
+        self.assertFalse(results[2]['success'])
+        with self.assertRaises(ValueError):
+            self.orders.insert_new_order(basket((999, 1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.product_catalog import ProductCatalog
+from Backend.products import Products
+from Backend.sqlite_connection import SQLiteConnection
+
+
+def product(product_id, name, price=1.0):
+    return {'product_id': product_id, 'name': name, 'unit_of_measure_id': 1,
+            'price_per_unit': price, 'unit_of_measure_name': 'Each'}
+
+
+""" \test @ref R6_0"""
+class TestProductCatalog(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a catalog with a controllable clock and a loader counting its calls.
+        """
+
+        self.now = 0.0
+        self.rows = [product(3, 'Apple'), product(1, 'Milk'), product(2, 'Apple')]
+        self.loader = MagicMock(side_effect=lambda: list(self.rows))
+        self.catalog = ProductCatalog(ttl=10.0, clock=lambda: self.now)
+
+    """ \test @ref R6_0"""
+    def test_snapshot_indexes_products(self):
+        """
+        Test that the loaded catalog is ordered by id and indexed by id and name.
+        """
+
+        self.assertIsNone(self.catalog.etag())
+        snapshot = self.catalog.snapshot(self.loader)
+        self.assertEqual([p['product_id'] for p in snapshot.products], [1, 2, 3])
+        self.assertEqual(snapshot.by_id[3]['name'], 'Apple')
+        # A name shared by several products resolves to the lowest id
+        self.assertEqual(snapshot.by_name['Apple']['product_id'], 2)
+        self.assertIs(self.catalog.snapshot(self.loader), snapshot)
+        self.loader.assert_called_once()
+        self.assertEqual(self.catalog.etag(), '%s-1' % self.catalog.epoch)
+
+    """ \test @ref R6_0"""
+    def test_page(self):
+        """
+        Test that keyset pages are cut from the ordered catalog.
+        """
+
+        snapshot = self.catalog.snapshot(self.loader)
+        self.assertEqual(snapshot.page(2), {'products': snapshot.products[:2], 'next_cursor': 2})
+        self.assertEqual(snapshot.page(2, after=2), {'products': snapshot.products[2:], 'next_cursor': None})
+        self.assertEqual(snapshot.page(5, after=9), {'products': [], 'next_cursor': None})
+
+    """ \test @ref R6_0"""
+    def test_writes_increment_version(self):
+        """
+        Test that writes are applied in memory and every write increments the version.
+        """
+
+        old = self.catalog.snapshot(self.loader)
+        self.catalog.put(product(4, 'Bread'))
+        self.catalog.update_price(1, 2.5)
+        self.catalog.remove(3)
+        snapshot = self.catalog.snapshot(self.loader)
+        self.assertEqual(snapshot.version, 4)
+        self.assertEqual([p['product_id'] for p in snapshot.products], [1, 2, 4])
+        self.assertEqual(snapshot.by_id[1]['price_per_unit'], 2.5)
+        # Readers of the previous snapshot are unaffected
+        self.assertEqual(old.by_id[1]['price_per_unit'], 1.0)
+        self.assertEqual(len(old.products), 3)
+        self.loader.assert_called_once()
+
+    """ \test @ref R6_0"""
+    def test_expiry_and_invalidate(self):
+        """
+        Test that an expired catalog is reloaded, keeping its version when nothing changed, and that invalidate() forces a reload.
+        """
+
+        self.catalog.snapshot(self.loader)
+        self.now = 10.0
+        self.assertIsNone(self.catalog.etag())
+        self.assertEqual(self.catalog.snapshot(self.loader).version, 1)
+        self.catalog.invalidate()
+        self.rows.append(product(5, 'Eggs'))
+        snapshot = self.catalog.snapshot(self.loader)
+        self.assertEqual(snapshot.version, 3)
+        self.assertEqual(len(snapshot.products), 4)
+        self.assertEqual(self.catalog.stats(), {'version': 3, 'products': 4, 'hits': 0, 'loads': 3})
+
+    """ \test @ref R6_0"""
+    def test_load_racing_a_write_is_not_kept(self):
+        """
+        Test that rows loaded while a write happened are served once but not cached.
+        """
+
+        def loader():
+            # A product write completes while the database is being read
+            self.catalog.remove(1)
+            return list(self.rows)
+
+        snapshot = self.catalog.snapshot(loader)
+        self.assertEqual(len(snapshot.products), 3)
+        self.assertIsNone(self.catalog.etag())
+
+
+""" \test @ref R6_0 R7_0 R8_0 R9_0 R10_0"""
+class TestProductsWithCatalog(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up Products with a catalog on an in-memory SQLite database.
+        """
+
+        self.connection = SQLiteConnection()
+        self.catalog = ProductCatalog()
+        self.products = Products(self.connection, catalog=self.catalog)
+
+    def tearDown(self):
+        self.connection.release()
+        self.connection.close_all()
+
+    """ \test @ref R6_0 R7_0 R8_0 R9_0 R10_0"""
+    def test_writes_go_through_to_catalog(self):
+        """
+        Test that reads come from the catalog and product writes keep it consistent with the database.
+        """
+
+        self.assertEqual(self.products.get_all_products(), self.products._catalog_snapshot().products)
+        version = self.catalog.version
+        self.assertEqual(self.products.search_products('Apple')['product_id'], 3)
+        self.assertEqual(self.products.get_products_page(2, after=3)['next_cursor'], 5)
+
+        self.assertTrue(self.products.update_product_details(3, 0.75))
+        self.assertEqual(self.products.search_products('Apple')['price_per_unit'], 0.75)
+        self.assertTrue(self.products.delete_product(3))
+        self.assertIsNone(self.products.search_products('Apple'))
+        # Without a cached unit of measure name the insert invalidates the catalog, which then reloads
+        product_id = self.products.insert_new_product({'name': 'Kiwi', 'unit_of_measure_id': 1, 'price_per_unit': 0.3})
+        self.assertEqual(self.products.search_products('Kiwi')['product_id'], product_id)
+        self.assertGreater(self.catalog.version, version)
+        self.assertEqual(self.products.get_all_products(), list(self.products._iter_products_from_database()))
+
+    """ \test @ref R10_0"""
+    def test_search_follows_writes(self):
+        """
+        Test that ranked search reflects product inserts, updates and deletes.
+        """
+
+        self.assertEqual(self.products.search_products_ranked('xyz'), [])
+        self.assertEqual(self.products.search_products_ranked('appl')[0]['name'], 'Apple')
+        self.catalog.put({'product_id': 99, 'name': 'Apple Cider', 'unit_of_measure_id': 1,
+                          'price_per_unit': 3.0, 'unit_of_measure_name': 'Each'})
+        self.assertEqual([p['name'] for p in self.products.search_products_ranked('apple c')], ['Apple Cider'])
+        self.assertTrue(self.products.delete_product(3))
+        self.assertNotIn('Apple', [p['name'] for p in self.products.search_products_ranked('apple')])
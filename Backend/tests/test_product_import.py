@@ -0,0 +1,206 @@
+import io
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.product_import import ProductImport
+from Backend.product_catalog import ProductCatalog
+from Backend.reference_cache import ReferenceCache
+from Backend.sqlite_connection import SQLiteConnection
+from Backend.products import Products
+from Backend.unit_of_measures import UnitOfMeasures
+
+
+""" \test @ref R7_0"""
+class TestProductImport(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up an in-memory database with the fixture products and a catalog-backed Products model.
+        """
+
+        self.connection = SQLiteConnection()
+        self.unit_of_measures = UnitOfMeasures(self.connection, ReferenceCache())
+        self.products = Products(self.connection, self.unit_of_measures, ProductCatalog())
+        self.importer = ProductImport(self.products, self.unit_of_measures, chunk_size=2)
+
+    def tearDown(self):
+        self.connection.release()
+        self.connection.close_all()
+
+    def product(self, name):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT product_id, unit_of_measure_id, price_per_unit, category_id FROM products WHERE name = %s", (name,))
+        return cursor.fetchall()
+
+    """ \test @ref R7_0"""
+    def test_import_validates_and_upserts(self):
+        """
+        Test that valid rows are inserted or update the product of the same name and invalid rows are reported with their line.
+        """
+
+        events = []
+        self.products.subscribe(lambda event, product: events.append((event, product['name'])))
+        self.products.get_all_products()  # Loads the catalog, which the import must refresh
+        lines = io.StringIO(
+            "name,unit_of_measure_id,price_per_unit,category_id\r\n"
+            "Toothpaste,1,32.5,8\r\n"
+            "Oat Milk,2,2.25,\r\n"
+            ",1,1.0,\r\n"
+            "Kiwi,99,1.0,\r\n"
+            "Mango,1,cheap,\r\n"
+            "Pear,1,-1,\r\n"
+            "Plum,1,1.0,42\r\n"
+            "Oat Milk,2,2.5,\r\n"
+            "Fig,3,4.0,1,extra\r\n"
+            "Lime,1,0.4,1\r\n")
+
+        report = self.importer.import_csv(lines)
+
+        self.assertEqual((report['rows'], report['inserted'], report['updated'], report['rejected']), (10, 2, 1, 7))
+        self.assertEqual([error['line'] for error in report['errors']], [4, 5, 6, 7, 8, 9, 10])
+        self.assertEqual(report['errors'][1]['message'], 'Unknown unit_of_measure_id 99.')
+        self.assertEqual(report['errors'][5]['message'], 'Duplicate of the product on line 3.')
+        self.assertEqual(self.product('Toothpaste'), [(1, 1, 32.5, 8)])
+        self.assertEqual([row[1:] for row in self.product('Oat Milk')], [(2, 2.25, None)])
+        self.assertEqual([row[1:] for row in self.product('Lime')], [(1, 0.4, 1)])
+        # The catalog serves the imported products and the listeners learned of every change
+        names = {product['name']: product for product in self.products.get_all_products()}
+        self.assertEqual(names['Toothpaste']['price_per_unit'], 32.5)
+        self.assertEqual(names['Lime']['product_id'], self.product('Lime')[0][0])
+        self.assertEqual(events, [('updated', 'Toothpaste'), ('inserted', 'Oat Milk'), ('inserted', 'Lime')])
+
+    """ \test @ref R7_0"""
+    def test_missing_category_keeps_the_existing_one(self):
+        """
+        Test that updating a product without the category_id column or with an empty category leaves its category unchanged.
+        """
+
+        events = []
+        self.products.subscribe(lambda event, product: events.append(product))
+        report = self.importer.import_csv(io.StringIO("name,unit_of_measure_id,price_per_unit\r\nToothpaste,1,9.99\r\n"))
+        self.assertEqual(report['updated'], 1)
+        self.assertEqual(self.product('Toothpaste'), [(1, 1, 9.99, 8)])
+        self.importer.import_csv(io.StringIO("name,unit_of_measure_id,price_per_unit,category_id\r\nToothpaste,1,8.99,\r\n"))
+        self.assertEqual(self.product('Toothpaste'), [(1, 1, 8.99, 8)])
+        self.assertTrue(all('category_id' not in product for product in events))
+
+    """ \test @ref R7_0"""
+    def test_duplicates_ignore_case_and_accents(self):
+        """
+        Test that names differing only in case or accents are duplicates within a file, as they are for the MySQL collation.
+        """
+
+        report = self.importer.import_csv(io.StringIO("name,unit_of_measure_id,price_per_unit\r\nCrème,1,1.0\r\nCREME,1,2.0\r\n"))
+        self.assertEqual((report['inserted'], report['rejected']), (1, 1))
+        self.assertEqual(report['errors'][0]['message'], 'Duplicate of the product on line 2.')
+
+    """ \test @ref R7_0"""
+    def test_missing_column(self):
+        """
+        Test that a file without a required column is refused before any row is written.
+        """
+
+        with self.assertRaises(ValueError):
+            self.importer.import_csv(io.StringIO("name,price_per_unit\r\nKiwi,1.0\r\n"))
+        self.assertEqual(self.product('Kiwi'), [])
+
+    """ \test @ref R7_0"""
+    def test_failed_chunk_is_reported(self):
+        """
+        Test that the rows of a chunk whose transaction failed are reported while the other chunks are imported.
+        """
+
+        upsert_products = self.products.upsert_products
+        calls = []
+
+        def fail_second_chunk(products):
+            calls.append(products)
+            if len(calls) == 2:
+                raise RuntimeError('lock wait timeout')
+            return upsert_products(products)
+
+        self.products.upsert_products = fail_second_chunk
+        rows = ''.join('Item %d,1,1.0\r\n' % number for number in range(5))
+        report = self.importer.import_csv(io.StringIO('name,unit_of_measure_id,price_per_unit\r\n' + rows))
+        self.assertEqual((report['inserted'], report['rejected']), (3, 2))
+        self.assertEqual([error['line'] for error in report['errors']], [4, 5])
+        self.assertEqual(report['errors'][0]['message'], 'Not imported: RuntimeError: lock wait timeout')
+        self.assertEqual(self.product('Item 2'), [])
+        self.assertEqual(len(self.product('Item 4')), 1)
+
+    """ \test @ref R7_0"""
+    def test_large_catalog(self):
+        """
+        Test that a catalog spanning many multi-row statements is imported completely and re-imported as updates.
+        """
+
+        importer = ProductImport(self.products, self.unit_of_measures)
+        rows = ''.join('Bulk %d,%d,%d.5\r\n' % (number, 1 + number % 6, number) for number in range(5000))
+        lines = 'name,unit_of_measure_id,price_per_unit\r\n' + rows
+        self.assertEqual(importer.import_csv(io.StringIO(lines))['inserted'], 5000)
+        report = importer.import_csv(io.StringIO(lines))
+        self.assertEqual((report['inserted'], report['updated']), (0, 5000))
+        self.assertEqual([row[1:] for row in self.product('Bulk 4999')], [(2, 4999.5, None)])
+
+
+""" \test @ref R7_0"""
+class TestUpsertProductsStatements(unittest.TestCase):
+    """ \test @ref R7_0"""
+    def test_mysql_upsert(self):
+        """
+        Test that existing products are updated by primary key with ON DUPLICATE KEY UPDATE and new ones numbered from the connection's first insert id.
+        """
+
+        connection = MagicMock(dialect='mysql')
+        cursor = connection.cursor.return_value
+        cursor.fetchall.return_value = [(4, 'Apple', 2)]
+        connection.first_insert_id.return_value = 40
+        products = Products(connection)
+        results = products.upsert_products([
+            {'name': 'Apple', 'unit_of_measure_id': 1, 'price_per_unit': 0.6, 'category_id': 1},
+            {'name': 'Kiwi', 'unit_of_measure_id': 1, 'price_per_unit': 0.3},
+        ])
+        self.assertEqual(results, [{'product_id': 4, 'action': 'updated'}, {'product_id': 40, 'action': 'inserted'}])
+        statement, params = cursor.execute.call_args[0]
+        self.assertTrue(statement.endswith("ON DUPLICATE KEY UPDATE unit_of_measure_id = VALUES(unit_of_measure_id), "
+                                           "price_per_unit = VALUES(price_per_unit), category_id = COALESCE(VALUES(category_id), category_id)"))
+        self.assertEqual(params, (4, 'Apple', 1, 0.6, 1))
+        connection.commit.assert_called_once()
+
+    """ \test @ref R7_0"""
+    def test_names_match_like_the_mysql_collation(self):
+        """
+        Test that a product stored as 'apple' or 'Crème' is updated, not duplicated, by a batch spelling it 'Apple' or 'CREME'.
+        """
+
+        connection = MagicMock(dialect='mysql')
+        cursor = connection.cursor.return_value
+        cursor.fetchall.return_value = [(4, 'apple', 1), (9, 'Crème', None)]
+        products = Products(connection)
+        results = products.upsert_products([
+            {'name': 'Apple', 'unit_of_measure_id': 1, 'price_per_unit': 0.6},
+            {'name': 'CREME', 'unit_of_measure_id': 2, 'price_per_unit': 3.0},
+        ])
+        self.assertEqual(results, [{'product_id': 4, 'action': 'updated'}, {'product_id': 9, 'action': 'updated'}])
+        self.assertTrue(all(not call[0][0].startswith('INSERT INTO products (name') for call in cursor.execute.call_args_list))
+
+        # SQLite ignores the case of the stored names as well
+        connection = SQLiteConnection()
+        try:
+            results = Products(connection).upsert_products([
+                {'name': 'APPLE', 'unit_of_measure_id': 1, 'price_per_unit': 0.6},
+                {'name': 'milk', 'unit_of_measure_id': 2, 'price_per_unit': 1.2},
+            ])
+            self.assertEqual(results, [{'product_id': 3, 'action': 'updated'}, {'product_id': 17, 'action': 'updated'}])
+            cursor = connection.cursor()
+            cursor.execute("SELECT COUNT(*) FROM products WHERE name = %s COLLATE NOCASE", ('apple',))
+            self.assertEqual(cursor.fetchall(), [(1,)])
+        finally:
+            connection.release()
+            connection.close_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
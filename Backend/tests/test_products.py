@@ -168,6 +168,58 @@ class TestProducts(unittest.TestCase):
                 "WHERE datetime BETWEEN %s AND %s GROUP BY order_id, customer_name")
         self.mock_cursor.execute.assert_called_once_with(expected_query, ('2023-05-20', '2023-05-25'))
 
+    """ \test @ref R34_0"""
+    def test_sales_by_bucket(self):
+        """
+        Test that sales_by_bucket() merges the grouped daily rows into weeks with the top selling products of each week.
+        """
+
+        self.mock_cursor.fetchall.side_effect = [
+            [('2023-05-22', 0, 2, 30.0), ('2023-05-24', 0, 1, 10.0), ('2023-05-29', 0, 1, 5.0)],
+            [('2023-05-22', 0, 3, 'Apple', 4.0), ('2023-05-24', 0, 3, 'Apple', 1.0), ('2023-05-24', 0, 4, 'Banana', 5.0),
+             ('2023-05-24', 0, 1, 'Toothpaste', 2.0), ('2023-05-29', 0, 4, 'Banana', 1.0)]
+        ]
+        result = self.products.sales_by_bucket('2023-05-20', '2023-06-01', 'week', 2)
+        self.assertEqual(result, [
+            {'bucket': '2023-05-22', 'order_count': 3, 'total_sales': 40.0, 'top_products': [
+                {'product_id': 3, 'products_name': 'Apple', 'total_quantity': 5.0},
+                {'product_id': 4, 'products_name': 'Banana', 'total_quantity': 5.0}]},
+            {'bucket': '2023-05-29', 'order_count': 1, 'total_sales': 5.0, 'top_products': [
+                {'product_id': 4, 'products_name': 'Banana', 'total_quantity': 1.0}]}
+        ])
+        # The whole range is read by two grouped queries, not one query per week
+        self.assertEqual(self.mock_cursor.execute.call_count, 2)
+        self.assertIn("GROUP BY DATE(orders.datetime)", self.mock_cursor.execute.call_args_list[0][0][0])
+
+        # Hours are grouped in SQL as well
+        self.mock_cursor.fetchall.side_effect = [[('2023-05-22', 9, 1, 3.0)], []]
+        self.assertEqual(self.products.sales_by_bucket('2023-05-22', '2023-05-23', 'hour', 5),
+                         [{'bucket': '2023-05-22 09:00:00', 'order_count': 1, 'total_sales': 3.0, 'top_products': []}])
+        self.assertIn("GROUP BY DATE(orders.datetime), HOUR(orders.datetime)", self.mock_cursor.execute.call_args_list[-1][0][0])
+
+    """ \test @ref R34_0"""
+    def test_iter_total_sales(self):
+        """
+        Test that iter_total_sales() yields the orders as they are read from the cursor, followed by their running total.
+        """
+
+        self.mock_cursor.__iter__.return_value = iter([
+            (1, 'Person A', '2023-05-20', 20.00),
+            (2, 'Person B', '2023-05-24', 40.00)
+        ])
+        rows = self.products.iter_total_sales('2023-05-20', '2023-05-25')
+        # Nothing is queried before the first row is requested
+        self.mock_cursor.execute.assert_not_called()
+        self.assertEqual(list(rows), [
+            {'order_id': 1, 'customer_name': 'Person A', 'datetime': '2023-05-20', 'total_amount': 20.00},
+            {'order_id': 2, 'customer_name': 'Person B', 'datetime': '2023-05-24', 'total_amount': 40.00},
+            {'total_sales': 60.00}
+        ])
+        self.mock_cursor.fetchall.assert_not_called()
+        self.mock_cursor.execute.assert_called_once_with(
+            "SELECT order_id, customer_name, datetime, total_amount FROM orders WHERE datetime BETWEEN %s AND %s ORDER BY order_id",
+            ('2023-05-20', '2023-05-25'))
+
     """ \test @ref R34_0"""
     def test_top_selling_products(self):
         """
@@ -233,7 +285,7 @@ class TestProducts(unittest.TestCase):
         # Assert that the cursor and execute methods were called
         self.mock_connection.cursor.assert_called_once()
         expected_query = (
-                "SELECT categories.category_name, SUM(order_details.total_price) AS total_sales" +
+                "SELECT categories.category_name, SUM(order_details.total_price) AS total_sales " +
                 "FROM categories " +
                 "JOIN products ON categories.category_id = products.category_id " +
                 "JOIN order_details ON products.product_id = order_details.product_id " +
@@ -279,4 +331,132 @@ class TestProducts(unittest.TestCase):
             "INNER JOIN unit_of_measures ON products.unit_of_measure_id = unit_of_measures.unit_of_measure_id "
             "WHERE products.name = %s",
             ('Product 1',)
-        )
\ No newline at end of file
+        )
+    """ \test @ref R6_0"""
+    def test_iter_all_products(self):
+        """
+        Test that iter_all_products() yields product dictionaries while reading the cursor.
+        """
+
+        # Set up the mock cursor with two rows
+        self.mock_cursor.__iter__.return_value = iter([
+            (1, 'Product 1', 1, 10.0, 'Unit 1'),
+            (2, 'Product 2', 2, 20.0, 'Unit 2')
+        ])
+
+        # Read only the first product from the iterator
+        products = self.products.iter_all_products()
+        first = next(products)
+
+        # Assert the first product and that the rest is still pending
+        self.assertEqual(first['product_id'], 1)
+        self.assertEqual(next(products)['name'], 'Product 2')
+        self.assertEqual(list(products), [])
+        self.mock_connection.cursor.assert_called_once_with(prepared=True)
+
+    """ \test @ref R6_0"""
+    def test_get_products_page(self):
+        """
+        Test that get_products_page() seeks past the cursor and reports the next cursor.
+        """
+
+        # The query returns limit + 1 rows when another page follows
+        self.mock_cursor.fetchall.return_value = [
+            (11, 'Product 11', 1, 10.0, 'Unit 1'),
+            (12, 'Product 12', 1, 12.0, 'Unit 1'),
+            (13, 'Product 13', 1, 13.0, 'Unit 1')
+        ]
+
+        # Call the method under test
+        result = self.products.get_products_page(2, after=10)
+
+        # Assert the page content and the keyset query parameters
+        self.assertEqual([product['product_id'] for product in result['products']], [11, 12])
+        self.assertEqual(result['next_cursor'], 12)
+        self.assertEqual(self.mock_cursor.execute.call_args[0][1], (10, 3))
+
+        # Assert that the last page has no next cursor
+        self.mock_cursor.fetchall.return_value = [(13, 'Product 13', 1, 13.0, 'Unit 1')]
+        self.assertIsNone(self.products.get_products_page(2, after=12)['next_cursor'])
+
+    """ \test @ref R71_0"""
+    def test_get_all_products_with_cached_units(self):
+        """
+        Test that product queries skip the unit_of_measures join when a cached UnitOfMeasures is configured.
+        """
+
+        # Create an instance resolving names through a mocked UnitOfMeasures
+        unit_of_measures = MagicMock()
+        unit_of_measures.get_unit_of_measure_names.return_value = {1: 'Each'}
+        products = Products(self.mock_connection, unit_of_measures)
+        self.mock_cursor.__iter__.return_value = iter([(1, 'Apple', 1, 0.5), (2, 'Rice', 9, 50.0)])
+
+        # Call the method under test
+        result = products.get_all_products()
+
+        # Assert that only the products table was queried and names came from the cache
+        self.mock_cursor.execute.assert_called_once_with(
+            "SELECT product_id, name, unit_of_measure_id, price_per_unit FROM products", ())
+        self.assertEqual(result[0]['unit_of_measure_name'], 'Each')
+        # An unknown unit of measure is reported as None and triggers a reload of the cache
+        self.assertIsNone(result[1]['unit_of_measure_name'])
+        unit_of_measures.invalidate.assert_called_once()
+
+    """ \test @ref R10_0"""
+    def test_search_products_not_found(self):
+        """
+        Test that search_products() returns None when no product has the given name.
+        """
+
+        self.mock_cursor.fetchone.return_value = None
+        self.assertIsNone(self.products.search_products('Missing'))
+
+    """ \test @ref R10_0"""
+    def test_search_products_ranked_without_catalog(self):
+        """
+        Test that search_products_ranked() falls back to a LIKE query with the wildcards of the query escaped.
+        """
+
+        self.mock_cursor.fetchall.return_value = [(1, 'Product 1', 1, 10.0, 'Unit 1')]
+
+        result = self.products.search_products_ranked('1_0%', 5)
+
+        self.assertEqual(result[0]['name'], 'Product 1')
+        self.mock_cursor.execute.assert_called_once_with(
+            "SELECT products.product_id, products.name, products.unit_of_measure_id, products.price_per_unit, unit_of_measures.unit_of_measure_name "
+            "FROM products "
+            "INNER JOIN unit_of_measures ON products.unit_of_measure_id = unit_of_measures.unit_of_measure_id "
+            "WHERE products.name LIKE %s ESCAPE '!' "
+            "ORDER BY LENGTH(products.name), products.product_id "
+            "LIMIT %s",
+            ('%1!_0!%%', 5)
+        )
+
+    """ \test @ref R6_0"""
+    def test_get_product_names(self):
+        """
+        Test that the names of several products are read with one IN (...) query outside the prepared statement cache.
+        """
+
+        self.mock_cursor.fetchall.return_value = [(1, 'Apple'), (3, 'Milk')]
+        self.assertEqual(self.products.get_product_names([1, 2, 3]), {1: 'Apple', 3: 'Milk'})
+        self.mock_connection.cursor.assert_called_once_with()
+        self.mock_cursor.execute.assert_called_once_with("SELECT product_id, name FROM products WHERE product_id IN (%s, %s, %s)", (1, 2, 3))
+        self.assertEqual(self.products.get_product_names([]), {})
+
+    """ \test @ref R7_0 R8_0 R9_0"""
+    def test_listeners_are_notified(self):
+        """
+        Test that subscribed listeners receive committed product changes.
+        """
+
+        events = []
+        self.products.subscribe(lambda event, product: events.append((event, product['product_id'])))
+        self.mock_cursor.lastrowid = 4
+        self.mock_cursor.rowcount = 1
+        self.products.insert_new_product({'name': 'Kiwi', 'unit_of_measure_id': 1, 'price_per_unit': 0.3})
+        self.products.update_product_details(4, 0.4)
+        self.products.delete_product(4)
+        self.mock_cursor.rowcount = 0
+        self.products.delete_product(4)
+        self.assertEqual(events, [('inserted', 4), ('updated', 4), ('deleted', 4)])
@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.reference_cache import ReferenceCache
+
+""" \test @ref R71_0"""
+class TestReferenceCache(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a cache with a controllable clock and a loader counting its calls.
+        """
+
+        self.now = 0.0
+        self.cache = ReferenceCache(ttl=10.0, clock=lambda: self.now)
+        self.loader = MagicMock(side_effect=lambda: ['kg', 'lbs'])
+
+    """ \test @ref R71_0"""
+    def test_value_is_loaded_once_within_ttl(self):
+        """
+        Test that repeated reads within the time to live are served from memory.
+        """
+
+        self.assertEqual(self.cache.get('units', self.loader), ['kg', 'lbs'])
+        self.now = 9.0
+        self.assertEqual(self.cache.get('units', self.loader), ['kg', 'lbs'])
+        self.loader.assert_called_once()
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 1, 'invalidations': 0, 'entries': 1})
+
+    """ \test @ref R71_0"""
+    def test_value_is_reloaded_after_ttl(self):
+        """
+        Test that an expired value is loaded again.
+        """
+
+        self.cache.get('units', self.loader)
+        self.now = 10.0
+        self.cache.get('units', self.loader)
+        self.assertEqual(self.loader.call_count, 2)
+
+    """ \test @ref R71_0"""
+    def test_invalidate(self):
+        """
+        Test that invalidating one key or all keys forces a reload.
+        """
+
+        self.cache.get('units', self.loader)
+        self.cache.get('other', self.loader)
+        self.cache.invalidate('units')
+        self.assertEqual(self.cache.stats()['entries'], 1)
+        self.cache.get('units', self.loader)
+        self.cache.invalidate()
+        self.assertEqual(self.cache.stats()['entries'], 0)
+        self.assertEqual(self.loader.call_count, 3)
@@ -0,0 +1,81 @@
+import unittest
+from datetime import date
+from unittest.mock import MagicMock
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.report_cache import ReportCache
+
+MAY_1, MAY_31, JUNE_15 = date(2023, 5, 1), date(2023, 5, 31), date(2023, 6, 15)
+
+
+""" \test @ref R34_0"""
+class TestReportCache(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a small cache with controllable clock and calendar; 'today' is June 15th 2023.
+        """
+
+        self.now = 0.0
+        self.cache = ReportCache(max_entries=2, ttl=10.0, clock=lambda: self.now, today=lambda: JUNE_15)
+        self.loader = MagicMock(side_effect=lambda: ['report'])
+
+    """ \test @ref R34_0"""
+    def test_hit_and_lru_eviction(self):
+        """
+        Test that reports are reused and the least recently used one is evicted.
+        """
+
+        self.cache.get('may', MAY_1, MAY_31, self.loader)
+        self.cache.get('may', MAY_1, MAY_31, self.loader)
+        self.cache.get('june', JUNE_15, JUNE_15, self.loader)
+        self.cache.get('may', MAY_1, MAY_31, self.loader)
+        self.cache.get('april', date(2023, 4, 1), date(2023, 4, 30), self.loader)
+        # 'june' was the least recently used report
+        self.cache.get('may', MAY_1, MAY_31, self.loader)
+        self.assertEqual(self.loader.call_count, 3)
+        self.assertEqual(self.cache.stats(), {'hits': 3, 'misses': 3, 'evictions': 1, 'expirations': 0,
+                                              'invalidations': 0, 'entries': 2})
+
+    """ \test @ref R34_0"""
+    def test_ttl_only_for_current_ranges(self):
+        """
+        Test that a range reaching today expires while a historical range stays cached.
+        """
+
+        self.cache.get('may', MAY_1, MAY_31, self.loader)
+        self.cache.get('june', JUNE_15, JUNE_15, self.loader)
+        self.now = 100.0
+        self.cache.get('may', MAY_1, MAY_31, self.loader)
+        self.cache.get('june', JUNE_15, JUNE_15, self.loader)
+        self.assertEqual(self.loader.call_count, 3)
+        self.assertEqual(self.cache.stats()['expirations'], 1)
+
+    """ \test @ref R34_0"""
+    def test_date_aware_invalidation(self):
+        """
+        Test that only the reports whose range includes the changed day are dropped.
+        """
+
+        self.cache.get('may', MAY_1, MAY_31, self.loader)
+        self.cache.get('june', JUNE_15, JUNE_15, self.loader)
+        self.assertEqual(self.cache.invalidate_day(JUNE_15), 1)
+        self.assertEqual(self.cache.invalidate_day(date(2023, 1, 1)), 0)
+        self.cache.get('may', MAY_1, MAY_31, self.loader)
+        self.assertEqual(self.loader.call_count, 2)
+        self.cache.invalidate()
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    """ \test @ref R34_0"""
+    def test_report_computed_during_change_is_not_cached(self):
+        """
+        Test that a report whose computation raced an order change is served but not kept.
+        """
+
+        def loader():
+            self.cache.invalidate_day(MAY_1)
+            return ['report']
+
+        self.assertEqual(self.cache.get('may', MAY_1, MAY_31, loader), ['report'])
+        self.assertEqual(self.cache.stats()['entries'], 0)
@@ -0,0 +1,125 @@
+import threading
+import time
+import unittest
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.report_jobs import JobQueueFull, ReportJob, ReportJobs
+
+
+def wait_until(condition, timeout=5.0):
+    """
+    Poll a condition until it holds or the timeout passes.
+    """
+
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not reached')
+        time.sleep(0.005)
+
+
+""" \test @ref R34_0"""
+class TestReportJobs(unittest.TestCase):
+    def setUp(self):
+        self.now = [0.0]
+        self.jobs = ReportJobs(workers=2, max_heavy=1, max_queued=3, retention=60.0, clock=lambda: self.now[0])
+
+    def tearDown(self):
+        self.jobs.shutdown()
+
+    """ \test @ref R34_0"""
+    def test_job_result_and_progress(self):
+        """
+        Test that a job runs in the background, reports its progress and keeps its result.
+        """
+
+        release = threading.Event()
+
+        def task(progress):
+            progress(0.5)
+            release.wait(5)
+            return [{'total_sales': 5.0}]
+
+        job = self.jobs.submit('total_sales', task)
+        wait_until(lambda: job.progress == 0.5)
+        status = self.jobs.describe(job)
+        self.assertEqual((status['status'], status['progress'], status['queue_position']), ('running', 0.5, None))
+        release.set()
+        wait_until(lambda: job.finished)
+        self.assertEqual(self.jobs.get(job.job_id).result, [{'total_sales': 5.0}])
+        self.assertEqual(self.jobs.describe(job)['progress'], 1.0)
+        self.assertEqual(self.jobs.describe(job)['expires_in'], 60.0)
+
+        # A job without intermediate steps reports no progress, even when done
+        job = self.jobs.submit('total_sales', lambda progress: progress(0.5) or [], tracks_progress=False)
+        wait_until(lambda: job.finished)
+        self.assertIsNone(self.jobs.describe(job)['progress'])
+
+    """ \test @ref R34_0"""
+    def test_failed_job(self):
+        """
+        Test that an exception of a job is reported as its error.
+        """
+
+        def task(progress):
+            raise ValueError('bad date')
+
+        job = self.jobs.submit('total_sales', task)
+        wait_until(lambda: job.finished)
+        self.assertEqual(job.status, ReportJob.FAILED)
+        self.assertEqual(self.jobs.describe(job)['error'], 'ValueError: bad date')
+        self.assertEqual(self.jobs.stats()['failed'], 1)
+
+    """ \test @ref R34_0"""
+    def test_heavy_jobs_are_capped(self):
+        """
+        Test that only max_heavy heavy jobs run at once while light jobs overtake the queued heavy ones.
+        """
+
+        release = threading.Event()
+        heavy = [self.jobs.submit('heavy %d' % i, lambda progress: release.wait(5), heavy=True) for i in range(2)]
+        wait_until(lambda: heavy[0].status == ReportJob.RUNNING)
+        light = self.jobs.submit('light', lambda progress: 'done')
+        wait_until(lambda: light.finished)
+        self.assertEqual(heavy[1].status, ReportJob.QUEUED)
+        self.assertEqual(self.jobs.describe(heavy[1])['queue_position'], 0)
+        self.assertEqual(self.jobs.stats()['heavy_running'], 1)
+        release.set()
+        wait_until(lambda: heavy[1].finished)
+
+    """ \test @ref R34_0"""
+    def test_queue_is_bounded(self):
+        """
+        Test that submissions beyond max_queued waiting jobs are rejected.
+        """
+
+        release = threading.Event()
+        for _ in range(2):
+            self.jobs.submit('running', lambda progress: release.wait(5))
+        wait_until(lambda: self.jobs.stats()['running'] == 2)
+        for _ in range(3):
+            self.jobs.submit('queued', lambda progress: None)
+        with self.assertRaises(JobQueueFull):
+            self.jobs.submit('rejected', lambda progress: None)
+        self.assertEqual(self.jobs.stats()['rejected'], 1)
+        release.set()
+
+    """ \test @ref R34_0"""
+    def test_results_expire(self):
+        """
+        Test that finished jobs are dropped once their retention passed.
+        """
+
+        job = self.jobs.submit('total_sales', lambda progress: [])
+        wait_until(lambda: job.finished)
+        self.now[0] = 59.0
+        self.assertIs(self.jobs.get(job.job_id), job)
+        self.now[0] = 60.0
+        self.assertIsNone(self.jobs.get(job.job_id))
+        self.assertEqual(self.jobs.stats()['expired'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import mysql.connector
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.retry import retry_on_disconnect
+
+
+class _Reader:
+    """
+    Minimal model class whose read method fails a configurable number of times.
+    """
+
+    def __init__(self, failures):
+        self.connection = MagicMock()
+        self.failures = failures
+        self.calls = 0
+
+    @retry_on_disconnect(attempts=3, base_delay=0.01)
+    def read(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise mysql.connector.errors.OperationalError("Lost connection to MySQL server")
+        return 'rows'
+
+
+""" \test @ref R1_0"""
+class TestRetryOnDisconnect(unittest.TestCase):
+    """ \test @ref R1_0"""
+    @patch('Backend.retry.time.sleep')
+    def test_retries_until_success(self, mock_sleep):
+        """
+        Test that a dropped connection is closed and the read is retried with a bounded backoff.
+        """
+
+        reader = _Reader(failures=2)
+        self.assertEqual(reader.read(), 'rows')
+        self.assertEqual(reader.calls, 3)
+        self.assertEqual(reader.connection.close.call_count, 2)
+        self.assertEqual(mock_sleep.call_count, 2)
+        # The jittered delay never exceeds the exponential ceiling
+        self.assertLessEqual(mock_sleep.call_args_list[1][0][0], 0.02)
+
+    """ \test @ref R1_0"""
+    @patch('Backend.retry.time.sleep')
+    def test_gives_up_after_attempts(self, mock_sleep):
+        """
+        Test that the last error is raised once every attempt has failed.
+        """
+
+        reader = _Reader(failures=5)
+        with self.assertRaises(mysql.connector.errors.OperationalError):
+            reader.read()
+        self.assertEqual(reader.calls, 3)
+
+    """ \test @ref R1_0"""
+    def test_other_errors_are_not_retried(self):
+        """
+        Test that errors unrelated to the connection propagate immediately.
+        """
+
+        reader = _Reader(failures=0)
+        failing = retry_on_disconnect()(MagicMock(side_effect=ValueError("bad")))
+        with self.assertRaises(ValueError):
+            failing(reader)
+        failing.__wrapped__.assert_called_once()
+        reader.connection.close.assert_not_called()
@@ -0,0 +1,159 @@
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.sales_rollup import SalesRollup, day_bounds, sales_date
+from Backend.migrations import Migrator
+from Backend.sqlite_connection import SQLiteConnection
+from Backend.orders import Orders
+from Backend.products import Products
+
+
+""" \test @ref R34_0"""
+class TestSalesRollupStatements(unittest.TestCase):
+    """ \test @ref R34_0"""
+    def test_day_helpers(self):
+        """
+        Test that report bounds are converted to whole days.
+        """
+
+        self.assertEqual(sales_date('2023-05-01 10:30:00'), date(2023, 5, 1))
+        self.assertEqual(sales_date(datetime(2023, 5, 1, 10, 30)), date(2023, 5, 1))
+        self.assertEqual(day_bounds('2023-05-01', '2023-05-31'), (date(2023, 5, 1), date(2023, 6, 1)))
+
+    """ \test @ref R34_0"""
+    def test_apply_order_mysql(self):
+        """
+        Test that an order is added with MySQL upserts on the caller's cursor and subtracted again with negative values.
+        """
+
+        connection = MagicMock(dialect='mysql')
+        cursor = MagicMock()
+        rollup = SalesRollup(connection)
+        order = {'datetime': datetime(2023, 5, 1, 10, 30), 'total_amount': 3.0,
+                 'order_details': [{'product_id': 7, 'quantity': 2, 'total_price': 3.0}]}
+
+        rollup.apply_order(cursor, order)
+        self.assertIn("ON DUPLICATE KEY UPDATE", rollup.daily_upsert)
+        cursor.execute.assert_called_once_with(rollup.daily_upsert, (date(2023, 5, 1), 1, 3.0))
+        cursor.executemany.assert_any_call(rollup.product_upsert, [(date(2023, 5, 1), 7, 2.0, 3.0, 1)])
+        cursor.executemany.assert_any_call(rollup.category_upsert, [(date(2023, 5, 1), 3.0, 1, 7)])
+        connection.commit.assert_not_called()
+
+        cursor.reset_mock()
+        rollup.apply_order(cursor, order, -1)
+        cursor.execute.assert_any_call(rollup.daily_upsert, (date(2023, 5, 1), -1, -3.0))
+        cursor.execute.assert_any_call("DELETE FROM sales_daily WHERE sales_date = %s AND order_count = 0", (date(2023, 5, 1),))
+
+
+""" \test @ref R34_0 R59_0 R69_0"""
+class TestSalesRollup(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a migrated in-memory database with rollups wired into Orders and Products.
+        """
+
+        self.connection = SQLiteConnection()
+        Migrator(self.connection).migrate()
+        self.rollup = SalesRollup(self.connection)
+        self.orders = Orders(self.connection, [self.rollup])
+        self.products = Products(self.connection, sales_rollup=self.rollup)
+        self.raw_products = Products(self.connection)
+
+    def tearDown(self):
+        self.connection.release()
+        self.connection.close_all()
+
+    def assert_reports_match_raw(self, start_date, end_date, raw_end_date):
+        """
+        Compare the rollup reports with the raw reports; the raw queries end at midnight of raw_end_date.
+        """
+
+        self.assertEqual(self.products.top_selling_products(start_date, end_date),
+                         self.raw_products.top_selling_products(start_date, raw_end_date))
+        self.assertEqual(self.products.sales_by_category(start_date, end_date),
+                         self.raw_products.sales_by_category(start_date, raw_end_date))
+        rollup_total = self.products.total_sales(start_date, end_date)
+        raw_total = self.raw_products.total_sales(start_date, raw_end_date)
+        self.assertEqual(len(rollup_total), len(raw_total))
+        self.assertAlmostEqual(rollup_total[-1]['total_sales'], raw_total[-1]['total_sales'])
+
+    """ \test @ref R34_0"""
+    def test_migration_fills_rollups(self):
+        """
+        Test that the reports read from the migrated rollups equal the raw reports.
+        """
+
+        self.assert_reports_match_raw('2023-05-01', '2023-06-30', '2023-07-01')
+
+    """ \test @ref R34_0 R59_0 R69_0"""
+    def test_orders_maintain_rollups(self):
+        """
+        Test that inserting and deleting an order updates the rollups in the same transaction.
+        """
+
+        today = date.today().isoformat()
+        order_id = self.orders.insert_new_order({'customer_name': 'Test', 'total_amount': 4.5, 'order_details': [
+            {'product_id': 3, 'quantity': 3, 'total_price': 1.5}, {'product_id': 17, 'quantity': 1, 'total_price': 3.0}]})
+        self.assertEqual(self.products.total_sales(today, today)[-1], {'total_sales': 4.5})
+        self.assertEqual(self.products.top_selling_products(today, today)[0]['total_quantity'], 3.0)
+        self.assertEqual(self.orders.get_order_by_id(order_id)['order_id'], order_id)
+
+        self.assertTrue(self.orders.delete_order(order_id))
+        self.assertFalse(self.orders.delete_order(order_id))
+        self.assertEqual(self.products.total_sales(today, today), [{'total_sales': 0.0}])
+        self.assertEqual(self.products.top_selling_products(today, today), [])
+        self.assertEqual(self.products.sales_by_category(today, today), [])
+
+    """ \test @ref R34_0 R7_0"""
+    def test_category_change_moves_the_sales(self):
+        """
+        Test that importing a product under another category moves its sales in the category rollups, so deleting its order later leaves no negative rows.
+        """
+
+        today = date.today().isoformat()
+        order_id = self.orders.insert_new_order({'customer_name': 'Test', 'total_amount': 10.0, 'order_details': [
+            {'product_id': 1, 'quantity': 2, 'total_price': 10.0}]})
+        self.products.upsert_products([{'name': 'Toothpaste', 'unit_of_measure_id': 1, 'price_per_unit': 5.0, 'category_id': 2}])
+        self.assert_reports_match_raw('2023-05-01', '2023-06-30', '2023-07-01')
+        self.assertEqual(self.products.sales_by_category(today, today),
+                         self.raw_products.sales_by_category(today, (date.today() + timedelta(days=1)).isoformat()))
+
+        self.assertTrue(self.orders.delete_order(order_id))
+        self.assertEqual(self.products.sales_by_category(today, today), [])
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM sales_daily_category WHERE total_price < 0 OR line_count <= 0")
+        self.assertEqual(cursor.fetchall(), [(0,)])
+
+    """ \test @ref R34_0"""
+    def test_sales_by_bucket(self):
+        """
+        Test that the bucketed report read from the rollups equals the one grouped from the raw orders, for every bucket but hours.
+        """
+
+        for bucket in ('day', 'week', 'month'):
+            report = self.products.sales_by_bucket('2023-05-01', '2023-06-30', bucket, 3)
+            self.assertEqual(report, self.raw_products.sales_by_bucket('2023-05-01', '2023-07-01', bucket, 3))
+            self.assertAlmostEqual(sum(entry['total_sales'] for entry in report),
+                                   self.raw_products.total_sales('2023-05-01', '2023-07-01')[-1]['total_sales'])
+        self.assertEqual([entry['bucket'] for entry in self.products.sales_by_bucket('2023-05-01', '2023-06-30', 'month')],
+                         ['2023-05-01', '2023-06-01'])
+        hours = self.products.sales_by_bucket('2023-05-01', '2023-06-30', 'hour', 1)
+        self.assertTrue(all(len(entry['top_products']) == 1 and entry['bucket'].endswith(':00:00') for entry in hours))
+
+    """ \test @ref R34_0"""
+    def test_backfill(self):
+        """
+        Test that backfill() repairs rollups after orders were written around the Orders class.
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute("DELETE FROM sales_daily_product")
+        self.connection.commit()
+        self.assertEqual(self.products.top_selling_products('2023-05-01', '2023-06-30'), [])
+        self.assertEqual(self.rollup.backfill('2023-05-01', '2023-06-30'), 6)
+        self.assertEqual(self.rollup.backfill(), 6)
+        self.assert_reports_match_raw('2023-05-01', '2023-06-30', '2023-07-01')
@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.search_index import ProductSearchIndex, normalize, trigrams
+
+
+def names(products):
+    return [product['name'] for product in products]
+
+
+""" \test @ref R10_0"""
+class TestProductSearchIndex(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up an index over a small catalog.
+        """
+
+        catalog = ['Apple', 'Golden Pineapple', 'Apple Juice', 'Honey Mango', 'Banana', 'Chicken Breast', 'Crab Apple']
+        self.index = ProductSearchIndex(
+            [{'product_id': product_id, 'name': name} for product_id, name in enumerate(catalog, start=1)])
+
+    """ \test @ref R10_0"""
+    def test_helpers(self):
+        """
+        Test the normalization and trigram helpers.
+        """
+
+        self.assertEqual(normalize('  Honey   MANGO '), 'honey mango')
+        self.assertEqual(trigrams('$ab$'), {'$ab', 'ab$'})
+        self.assertEqual(trigrams('ab'), set())
+
+    """ \test @ref R10_0"""
+    def test_ranking(self):
+        """
+        Test that exact names rank before name prefixes, word prefixes and substrings.
+        """
+
+        self.assertEqual(names(self.index.search('apple')), ['Apple', 'Apple Juice', 'Crab Apple', 'Golden Pineapple'])
+        self.assertEqual(names(self.index.search('APP', limit=2)), ['Apple', 'Apple Juice'])
+
+    """ \test @ref R10_0"""
+    def test_multi_word_prefix(self):
+        """
+        Test that every query word must prefix a word of the name, in any order.
+        """
+
+        self.assertEqual(names(self.index.search('ho man')), ['Honey Mango'])
+        self.assertEqual(names(self.index.search('br chick')), ['Chicken Breast'])
+
+    """ \test @ref R10_0"""
+    def test_substring(self):
+        """
+        Test that a query inside a word is found through the trigram index.
+        """
+
+        self.assertEqual(names(self.index.search('ango')), ['Honey Mango'])
+
+    """ \test @ref R10_0"""
+    def test_typo_tolerance(self):
+        """
+        Test that misspelled words still find the product.
+        """
+
+        self.assertEqual(names(self.index.search('bananna')), ['Banana'])
+        self.assertEqual(names(self.index.search('chiken')), ['Chicken Breast'])
+
+    """ \test @ref R10_0"""
+    def test_no_match(self):
+        """
+        Test that an unmatched or empty query returns an empty list.
+        """
+
+        self.assertEqual(self.index.search('xyz'), [])
+        self.assertEqual(self.index.search('   '), [])
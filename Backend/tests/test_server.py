@@ -3,7 +3,11 @@ from unittest import mock
 from unittest.mock import MagicMock, patch
 import pytest
 from flask import Flask, jsonify
+import io
 import json
+import threading
+import time
+from datetime import datetime
 import sys
 import os
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -11,6 +15,7 @@ sys.path.append(parent_dir)
 from Backend.server import Server
 from Backend.products import Products
 from Backend.orders import Orders
+from Backend.order_queue import QueueFull
 from Backend.unit_of_measures import UnitOfMeasures
 
 
@@ -72,6 +77,8 @@ class ServerTestCase(unittest.TestCase):
         self.assertIn('/insertOrder', routes)
         # Asserting that the '/salesReport' route is present in the 'routes' list.
         self.assertIn('/salesReport', routes)
+        # Asserting that the '/salesDashboard' route is present in the 'routes' list.
+        self.assertIn('/salesDashboard', routes)
         # Asserting that the '/searchProduct' route is present in the 'route' list.
         self.assertIn('/searchProduct', routes)
         # Asserting that the '/updateProductInformation/<int:product_id>' route is present in the
@@ -419,3 +426,521 @@ class ServerTestCase(unittest.TestCase):
 
 
 
+    """ \test @ref R1_0"""
+    def test_get_metrics(self):
+        """
+        Test the get_metrics() method of the server.
+
+        This test case verifies that the connection pool and cache statistics are returned as JSON.
+        """
+
+        # Mock the pool statistics returned by the SQL connection
+        mock_stats = {'max_size': 5, 'in_use': 1, 'idle': 0, 'created': 1, 'acquired': 3, 'waits': 0, 'timeouts': 0}
+        self.server.connection.stats = MagicMock(return_value=mock_stats)
+        mock_statement_stats = {'hits': 10, 'misses': 2, 'evictions': 0, 'prepared': 2}
+        self.server.connection.statement_cache_stats = MagicMock(return_value=mock_statement_stats)
+        mock_reference_stats = {'hits': 4, 'misses': 1, 'invalidations': 0, 'entries': 1}
+        self.server.reference_cache.stats = MagicMock(return_value=mock_reference_stats)
+        mock_catalog_stats = {'version': 1, 'products': 30, 'hits': 9, 'loads': 1}
+        self.server.product_catalog.stats = MagicMock(return_value=mock_catalog_stats)
+        mock_report_stats = {'hits': 2, 'misses': 1, 'evictions': 0, 'expirations': 0, 'invalidations': 0, 'entries': 1}
+        self.server.report_cache.stats = MagicMock(return_value=mock_report_stats)
+        mock_job_stats = {'queued': 0, 'running': 1, 'heavy_running': 1, 'retained': 2, 'submitted': 3, 'succeeded': 1,
+                          'failed': 0, 'rejected': 0, 'expired': 0}
+        self.server.report_jobs.stats = MagicMock(return_value=mock_job_stats)
+        mock_trending_stats = {'hour': 3, 'day': 3}
+        self.server.trending.stats = MagicMock(return_value=mock_trending_stats)
+
+        # Execute the route function
+        with self.server.app.test_request_context('/getMetrics', method='GET'):
+            response = self.server.get_metrics()
+
+            # Assert that the response is correct
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json(), {'connection_pool': mock_stats, 'statement_cache': mock_statement_stats,
+                                                   'reference_cache': mock_reference_stats,
+                                                   'product_catalog': mock_catalog_stats,
+                                                   'report_cache': mock_report_stats,
+                                                   'report_jobs': mock_job_stats,
+                                                   'trending_products': mock_trending_stats})
+            self.assertEqual(response.headers.get('Access-Control-Allow-Origin'), '*')
+
+    """ \test @ref R1_0"""
+    def test_release_connection_after_request(self):
+        """
+        Test that the connection used by a request is returned to the pool when the request ends.
+        """
+
+        # Mock the release method and a route that uses the database
+        self.server.connection.release = MagicMock()
+        self.server.unit_of_measures.get_unit_of_measures = MagicMock(return_value=[])
+        self.server.setup_routes()
+
+        # Issue a request through the test client
+        response = self.client.get('/getUnitOfMeasures')
+
+        # Assert that the request succeeded and released its connection
+        self.assertEqual(response.status_code, 200)
+        self.server.connection.release.assert_called_once()
+
+    """ \test @ref R6_0 R57_0"""
+    def test_streamed_listings(self):
+        """
+        Test that the product and order listings are streamed as chunked JSON when 'stream=true' is requested.
+        """
+
+        # Mock the row iterators of the model classes
+        products = [{'product_id': i, 'name': 'Product %d' % i} for i in range(250)]
+        orders = [{'order_id': 1, 'customer_name': 'Customer 1'}]
+        self.server.products.iter_all_products = MagicMock(return_value=iter(products))
+        self.server.orders.iter_all_orders = MagicMock(return_value=iter(orders))
+        self.server.products.get_all_products = MagicMock()
+        self.server.setup_routes()
+
+        # Request the product listing in streaming mode and read the whole body
+        products_response = self.client.get('/getProducts?stream=true')
+        self.assertTrue(products_response.is_streamed)
+        self.assertEqual(products_response.mimetype, 'application/json')
+        self.assertEqual(json.loads(products_response.get_data(as_text=True)), products)
+        self.assertEqual(products_response.headers.get('Access-Control-Allow-Origin'), '*')
+
+        # Request the order listing in streaming mode
+        orders_response = self.client.get('/getOrders?stream=1')
+        self.assertEqual(json.loads(orders_response.get_data(as_text=True)), orders)
+
+        # Assert that the list building method was not used
+        self.server.products.get_all_products.assert_not_called()
+
+    """ \test @ref R6_0 R57_0"""
+    def test_paginated_listings(self):
+        """
+        Test that 'limit' and 'after' select a keyset page of products or orders.
+        """
+
+        # Mock the page methods of the model classes
+        products_page = {'products': [{'product_id': 11}, {'product_id': 12}], 'next_cursor': 12}
+        orders_page = {'orders': [{'order_id': 3}], 'next_cursor': None}
+        self.server.products.get_products_page = MagicMock(return_value=products_page)
+        self.server.orders.get_orders_page = MagicMock(return_value=orders_page)
+
+        # Request the second page of products and the first page of orders
+        with self.server.app.test_request_context('/getProducts', query_string={'limit': '2', 'after': '10'}):
+            products_response = self.server.get_all_products()
+        with self.server.app.test_request_context('/getOrders', query_string={'limit': '5'}):
+            orders_response = self.server.get_all_orders()
+
+        # Assert that the pages were requested with the parsed parameters
+        self.server.products.get_products_page.assert_called_once_with(2, 10)
+        self.server.orders.get_orders_page.assert_called_once_with(5, None)
+        self.assertEqual(products_response.get_json(), products_page)
+        self.assertEqual(orders_response.get_json(), orders_page)
+
+    """ \test @ref R6_0"""
+    def test_paginated_listing_rejects_bad_limit(self):
+        """
+        Test that an invalid or too large 'limit' is answered with 400.
+        """
+
+        self.server.products.get_products_page = MagicMock()
+        for limit in ('abc', '0', str(Server.MAX_PAGE_SIZE + 1)):
+            with self.server.app.test_request_context('/getProducts', query_string={'limit': limit}):
+                response = self.server.get_all_products()
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.get_json()['success'])
+        self.server.products.get_products_page.assert_not_called()
+
+    """ \test @ref R71_0"""
+    def test_refresh_reference_data(self):
+        """
+        Test that refresh_reference_data() empties the reference data cache.
+        """
+
+        # Fill the cache with a value
+        self.server.reference_cache.get('unit_of_measures', lambda: [{'unit_of_measure_id': 1}])
+
+        # Execute the route function
+        with self.server.app.test_request_context('/refreshReferenceData', method='POST'):
+            response = self.server.refresh_reference_data()
+
+            # Assert that the response is correct and the cache is empty
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()['success'], True)
+            self.assertEqual(self.server.reference_cache.stats()['entries'], 0)
+
+    """ \test @ref R6_0"""
+    def test_get_all_products_revalidation(self):
+        """
+        Test that /getProducts carries the catalog version as ETag and answers a matching If-None-Match with 304.
+        """
+
+        # Mock a loaded catalog
+        mock_response = [{'product_id': 1, 'name': 'Product 1'}]
+        self.server.products.get_all_products = MagicMock(return_value=mock_response)
+        self.server.products.catalog_etag = MagicMock(return_value='abc-3')
+
+        # A request without a tag receives the products and the tag
+        with self.server.app.test_request_context('/getProducts', method='GET'):
+            response = self.server.get_all_products()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json(), mock_response)
+            self.assertEqual(response.headers.get('ETag'), '"abc-3"')
+
+        # A request with the current tag is answered without reading the products
+        self.server.products.get_all_products.reset_mock()
+        with self.server.app.test_request_context('/getProducts', method='GET', headers={'If-None-Match': '"abc-3"'}):
+            response = self.server.get_all_products()
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.headers.get('Access-Control-Allow-Origin'), '*')
+            self.server.products.get_all_products.assert_not_called()
+
+        # A request with an outdated tag receives the products again
+        with self.server.app.test_request_context('/getProducts', method='GET', headers={'If-None-Match': '"abc-2"'}):
+            response = self.server.get_all_products()
+            self.assertEqual(response.status_code, 200)
+
+    """ \test @ref R10_0"""
+    def test_search_products_ranked(self):
+        """
+        Test that /searchProduct with a 'query' parameter returns the ranked matches.
+        """
+
+        mock_response = [{'product_id': 1, 'name': 'Apple'}, {'product_id': 2, 'name': 'Apple Juice'}]
+        self.server.products.search_products_ranked = MagicMock(return_value=mock_response)
+
+        with self.server.app.test_request_context('/searchProduct?query=app&limit=2', method='GET'):
+            response = self.server.search_products()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json(), mock_response)
+            self.server.products.search_products_ranked.assert_called_once_with('app', 2)
+
+        with self.server.app.test_request_context('/searchProduct?query=app&limit=0', method='GET'):
+            self.assertEqual(self.server.search_products().status_code, 400)
+
+    """ \test @ref R34_0"""
+    def test_get_sales_report_is_cached(self):
+        """
+        Test that a repeated sales report is served from the cache until an order of its range changes.
+        """
+
+        self.server.products.sales_by_category = MagicMock(return_value=[{'category_name': 'Fruits', 'total_sales': 5.0}])
+        path = '/salesReport?report_type=sales_by_category&start_date=2023-05-01&end_date=2023-05-31'
+
+        for _ in range(2):
+            with self.server.app.test_request_context(path, method='GET'):
+                self.assertEqual(self.server.get_sales_report().status_code, 200)
+        self.server.products.sales_by_category.assert_called_once()
+
+        # An order outside the range keeps the report, one inside drops it
+        self.server.orders._notify('inserted', {'datetime': '2023-06-02 10:00:00'})
+        with self.server.app.test_request_context(path, method='GET'):
+            self.server.get_sales_report()
+        self.assertEqual(self.server.products.sales_by_category.call_count, 1)
+        self.server.orders._notify('deleted', {'datetime': '2023-05-31 23:59:00'})
+        with self.server.app.test_request_context(path, method='GET'):
+            self.server.get_sales_report()
+        self.assertEqual(self.server.products.sales_by_category.call_count, 2)
+
+        # An unknown report type is rejected
+        with self.server.app.test_request_context('/salesReport?report_type=unknown', method='GET'):
+            self.assertEqual(self.server.get_sales_report().status_code, 400)
+
+    """ \test @ref R34_0"""
+    def test_export_total_sales(self):
+        """
+        Test that format=csv and format=ndjson stream the total sales report as a download with its total as the last line.
+        """
+
+        rows = [{'order_id': 1, 'customer_name': 'Person A', 'datetime': '2023-05-20 10:00:00', 'total_amount': 20.0},
+                {'total_sales': 20.0}]
+        self.server.products.iter_total_sales = MagicMock(side_effect=lambda start_date, end_date: iter(rows))
+        self.server.products.total_sales = MagicMock()
+        self.server.setup_routes()
+
+        response = self.client.get('/salesReport?report_type=total_sales&start_date=2023-05-01&end_date=2023-05-31&format=csv')
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, 'text/csv')
+        self.assertIn('attachment', response.headers['Content-Disposition'])
+        self.assertEqual(response.get_data(as_text=True).splitlines(), [
+            'order_id,customer_name,datetime,total_amount,total_sales', '1,Person A,2023-05-20 10:00:00,20.0,', ',,,,20.0'])
+
+        response = self.client.get('/salesReport?report_type=total_sales&start_date=2023-05-01&end_date=2023-05-31&format=ndjson')
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual([json.loads(line) for line in response.get_data(as_text=True).splitlines()], rows)
+        self.assertEqual(response.headers.get('Access-Control-Allow-Origin'), '*')
+        self.server.products.iter_total_sales.assert_called_with('2023-05-01', '2023-05-31')
+        self.server.products.total_sales.assert_not_called()
+
+        # Unknown formats, and exports of the other reports, are rejected
+        self.assertEqual(self.client.get('/salesReport?report_type=total_sales&format=xml').status_code, 400)
+        self.assertEqual(self.client.get('/salesReport?report_type=sales_by_category&format=csv').status_code, 400)
+
+    """ \test @ref R34_0"""
+    def test_get_sales_trend(self):
+        """
+        Test that /salesTrend validates bucket and top_n and caches the bucketed report.
+        """
+
+        report = [{'bucket': '2023-05-01', 'order_count': 1, 'total_sales': 5.0, 'top_products': []}]
+        self.server.products.sales_by_bucket = MagicMock(return_value=report)
+        self.server.setup_routes()
+
+        path = '/salesTrend?start_date=2023-05-01&end_date=2023-05-31&bucket=week&top_n=3'
+        for _ in range(2):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json(), report)
+        self.server.products.sales_by_bucket.assert_called_once_with('2023-05-01', '2023-05-31', 'week', 3)
+        self.assertEqual(response.headers.get('Access-Control-Allow-Origin'), '*')
+
+        self.assertEqual(self.client.get('/salesTrend?start_date=2023-05-01&end_date=2023-05-31&bucket=year').status_code, 400)
+        self.assertEqual(self.client.get('/salesTrend?start_date=2023-05-01&end_date=2023-05-31&top_n=many').status_code, 400)
+        self.assertEqual(self.client.get('/salesTrend?start_date=2023-05-01&end_date=2023-05-31&top_n=101').status_code, 400)
+
+    """ \test @ref R7_0"""
+    def test_import_products(self):
+        """
+        Test that /importProducts passes the uploaded CSV to the importer and answers 400 for a file it refuses.
+        """
+
+        report = {'rows': 1, 'inserted': 1, 'updated': 0, 'rejected': 0, 'errors': []}
+        received = []
+        self.server.product_import.import_csv = MagicMock(side_effect=lambda lines: received.append(lines.read()) or report)
+        self.server.setup_routes()
+
+        csv_file = (io.BytesIO(b'name,unit_of_measure_id,price_per_unit\r\nKiwi,1,0.3\r\n'), 'catalog.csv')
+        response = self.client.post('/importProducts', data={'file': csv_file}, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), report)
+        self.assertEqual(received, ['name,unit_of_measure_id,price_per_unit\r\nKiwi,1,0.3\r\n'])
+        self.assertEqual(response.headers.get('Access-Control-Allow-Origin'), '*')
+
+        self.server.product_import.import_csv = MagicMock(side_effect=ValueError('The CSV header lacks the column(s) name.'))
+        response = self.client.post('/importProducts', data=b'price_per_unit\r\n1.0\r\n', content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['message'], 'The CSV header lacks the column(s) name.')
+
+    """ \test @ref R59_0"""
+    def test_write_behind_order_queue(self):
+        """
+        Test that with an order queue /insertOrder answers 202 with a queue ticket, 503 when the queue is full, and /orderQueue reports the outcome.
+        """
+
+        self.server.order_queue = MagicMock()
+        self.server.order_queue.enqueue.side_effect = [7, QueueFull('10000 orders are waiting to be committed')]
+        self.server.order_queue.status.side_effect = lambda seq: {'queue_seq': 7, 'status': 'committed', 'order_id': 42} if seq == 7 else None
+        self.server.orders.insert_new_order = MagicMock()
+        self.server.setup_routes()
+        payload = {'data': json.dumps({'customer_name': 'Ann', 'total_amount': 1.0, 'order_details': []})}
+
+        response = self.client.post('/insertOrder', data=payload)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.get_json(), {'queue_seq': 7, 'status': 'queued'})
+        self.assertEqual(response.headers['Location'], '/orderQueue/7')
+        response = self.client.post('/insertOrder', data=payload)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+        self.server.orders.insert_new_order.assert_not_called()
+        # Orders the worker could never commit are refused before they are logged
+        duplicate_line = {'customer_name': 'Ann', 'total_amount': 1.0,
+                          'order_details': [{'product_id': 3, 'quantity': 1, 'total_price': 0.5}] * 2}
+        for data in ('[1, 2]', json.dumps(duplicate_line), '{"customer_name": "Ann", "total_amount": NaN, "order_details": []}'):
+            response = self.client.post('/insertOrder', data={'data': data})
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(response.get_json()['success'])
+        self.assertEqual(self.server.order_queue.enqueue.call_count, 2)
+
+        self.assertEqual(self.client.get('/orderQueue/7').get_json()['order_id'], 42)
+        self.assertEqual(self.client.get('/orderQueue/8').status_code, 404)
+
+    """ \test @ref R58_0"""
+    def test_orders_with_details(self):
+        """
+        Test that /getOrderWithDetails returns the order or 404 and /getOrdersByIds reads the valid IDs at once and lists the missing ones.
+        """
+
+        order = {'order_id': 7, 'customer_name': 'Ann', 'total_amount': 1.5, 'datetime': None,
+                 'order_details': [{'product_id': 3, 'product_name': 'Apple', 'quantity': 3.0, 'total_price': 1.5}]}
+        self.server.orders.get_order_with_details = MagicMock(side_effect=lambda order_id: order if order_id == 7 else None)
+        self.server.orders.get_orders_by_ids = MagicMock(return_value=[order])
+        self.server.setup_routes()
+
+        self.assertEqual(self.client.get('/getOrderWithDetails/7').get_json(), order)
+        self.assertEqual(self.client.get('/getOrderWithDetails/8').status_code, 404)
+        response = self.client.get('/getOrdersByIds?ids=7,8,7')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'orders': [order], 'missing': [8]})
+        self.server.orders.get_orders_by_ids.assert_called_once_with([7, 8, 7])
+        self.assertEqual(response.headers['Access-Control-Allow-Origin'], '*')
+        for query in ('', '?ids=', '?ids=7,x', '?ids=' + ','.join(['1'] * (Server.MAX_BATCH_ORDERS + 1))):
+            self.assertEqual(self.client.get('/getOrdersByIds' + query).status_code, 400)
+
+    """ \test @ref R59_0"""
+    def test_insert_new_order_rejected_by_pricing(self):
+        """
+        Test that /insertOrder answers 400 when server-side pricing rejects the order.
+        """
+
+        self.server.orders.insert_new_order = MagicMock(side_effect=ValueError('Unknown product_id 99.'))
+        self.server.setup_routes()
+        payload = {'data': json.dumps({'customer_name': 'Ann', 'order_details': [{'product_id': 99, 'quantity': 1}]})}
+
+        response = self.client.post('/insertOrder', data=payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(), {'success': False, 'message': 'Unknown product_id 99.'})
+        self.assertEqual(response.headers['Access-Control-Allow-Origin'], '*')
+
+    """ \test @ref R59_0"""
+    def test_insert_new_orders(self):
+        """
+        Test that /insertOrders passes the batch to Orders.insert_new_orders and rejects payloads that are not a bounded list.
+        """
+
+        results = [{'index': 0, 'success': True, 'order_id': 7}, {'index': 1, 'success': False, 'message': 'Unknown product_id 9.'}]
+        self.server.orders.insert_new_orders = MagicMock(return_value=results)
+        self.server.setup_routes()
+        batch = [{'customer_name': 'Ann', 'total_amount': 1.0, 'order_details': []}] * 2
+
+        response = self.client.post('/insertOrders', data={'data': json.dumps(batch)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'inserted': 1, 'results': results})
+        self.server.orders.insert_new_orders.assert_called_once_with(batch)
+        self.assertEqual(response.headers.get('Access-Control-Allow-Origin'), '*')
+
+        self.assertEqual(self.client.post('/insertOrders', data={'data': '{"customer_name": "Ann"}'}).status_code, 400)
+        self.assertEqual(self.client.post('/insertOrders', data={'data': 'not json'}).status_code, 400)
+        self.assertEqual(self.client.post('/insertOrders', data={'data': json.dumps(batch * 501)}).status_code, 400)
+
+    """ \test @ref R57_0"""
+    def test_customer_routes(self):
+        """
+        Test that /customers/<name> returns the aggregates or 404 and /customers/<name>/orders pages the history.
+        """
+
+        customer = {'customer_name': 'Ann', 'order_count': 2, 'total_spent': 6.75,
+                    'first_order_at': '2023-05-01 10:00:00', 'last_order_at': '2023-05-02 10:00:00'}
+        self.server.customers.get_customer = MagicMock(side_effect=lambda name: customer if name == 'Ann' else None)
+        page = {'orders': [{'order_id': 9, 'customer_name': 'Ann', 'total_amount': 2.25, 'datetime': '2023-05-02 10:00:00'}],
+                'next_cursor': 9}
+        self.server.customers.get_customer_orders = MagicMock(return_value=page)
+        self.server.setup_routes()
+
+        response = self.client.get('/customers/Ann')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), customer)
+        self.assertEqual(response.headers.get('Access-Control-Allow-Origin'), '*')
+        self.assertEqual(self.client.get('/customers/Bob').status_code, 404)
+
+        response = self.client.get('/customers/Ann/orders?limit=1&after=12')
+        self.assertEqual(response.get_json(), page)
+        self.server.customers.get_customer_orders.assert_called_once_with('Ann', 1, 12)
+        self.assertEqual(self.client.get('/customers/Ann/orders').status_code, 400)
+        self.assertEqual(self.client.get('/customers/Ann/orders?limit=0').status_code, 400)
+
+    """ \test @ref R34_0"""
+    def test_get_trending_products(self):
+        """
+        Test that /trendingProducts ranks the products of inserted orders, labels them and validates window and limit.
+        """
+
+        # Warm up from an empty database, then count two inserted orders
+        self.mock_cursor.fetchone.return_value = (None,)
+        self.server.trending.warm(self.mock_connection)
+        now = datetime.now()
+        self.server.trending.on_order_changed('inserted', {'order_id': 1, 'datetime': now, 'order_details': [
+            {'product_id': 1, 'quantity': 2}, {'product_id': 2, 'quantity': 5}]})
+        self.server.trending.on_order_changed('inserted', {'order_id': 2, 'datetime': now, 'order_details': [
+            {'product_id': 3, 'quantity': 1}]})
+        self.server.products.get_product_names = MagicMock(return_value={1: 'Apple', 2: 'Milk'})
+        self.server.setup_routes()
+
+        response = self.client.get('/trendingProducts?window=day&limit=3')
+        self.assertEqual(response.status_code, 200)
+        # Product 3 was deleted in the meantime, so it is left out
+        self.assertEqual(response.get_json(), {
+            'window': 'day',
+            'products': [{'product_id': 2, 'product_name': 'Milk', 'estimated_quantity': 5.0, 'max_error': 0.0},
+                         {'product_id': 1, 'product_name': 'Apple', 'estimated_quantity': 2.0, 'max_error': 0.0}],
+            'total_quantity': 8.0,
+            'error_bound': 0.08})
+        self.server.products.get_product_names.assert_called_once_with([2, 1, 3])
+        self.assertEqual(response.headers.get('Access-Control-Allow-Origin'), '*')
+
+        self.assertEqual(self.client.get('/trendingProducts?window=week').status_code, 400)
+        self.assertEqual(self.client.get('/trendingProducts?limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/trendingProducts?limit=101').status_code, 400)
+        self.assertEqual(self.client.get('/trendingProducts?limit=many').status_code, 400)
+
+    """ \test @ref R34_0"""
+    def test_report_jobs(self):
+        """
+        Test that a report job is submitted, polled and its result fetched, releasing the worker's connection.
+        """
+
+        self.server.connection = MagicMock()
+        finished = threading.Event()
+        self.server.products.total_sales = MagicMock(return_value=[{'total_sales': 5.0}])
+        self.server.products.sales_by_category = MagicMock(side_effect=lambda start_date, end_date: finished.wait(5) and [])
+        self.server.products.top_selling_products = MagicMock(return_value=[])
+        self.server.setup_routes()
+
+        response = self.client.post('/reportJobs', data={'report_type': 'total_sales', 'start_date': '2023-05-01', 'end_date': '2023-05-31'})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['job_id']
+        self.assertEqual(response.headers['Location'], '/reportJobs/%s' % job_id)
+        for _ in range(500):
+            if self.client.get('/reportJobs/%s' % job_id).get_json()['status'] == 'succeeded':
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.client.get('/reportJobs/%s/result' % job_id).get_json(), [{'total_sales': 5.0}])
+        self.assertIsNone(self.client.get('/reportJobs/%s' % job_id).get_json()['progress'])  # A single report has no progress
+        self.server.connection.release.assert_called()
+
+        # A dashboard job reports its progress per report and answers 202 until it is done
+        response = self.client.post('/reportJobs?report_type=sales_dashboard&start_date=2020-01-01&end_date=2023-05-31')
+        job_id = response.get_json()['job_id']
+        self.assertEqual(self.client.get('/reportJobs/%s/result' % job_id).status_code, 202)
+        finished.set()
+        for _ in range(500):
+            status = self.client.get('/reportJobs/%s' % job_id).get_json()
+            if status['status'] == 'succeeded':
+                break
+            time.sleep(0.01)
+        self.assertEqual(status['progress'], 1.0)
+        self.assertEqual(set(self.client.get('/reportJobs/%s/result' % job_id).get_json()), set(self.server.SALES_REPORT_TYPES))
+
+        self.assertEqual(self.client.get('/reportJobs/unknown').status_code, 404)
+        self.assertEqual(self.client.get('/reportJobs/unknown/result').status_code, 404)
+        self.assertEqual(self.client.post('/reportJobs?report_type=unknown').status_code, 400)
+
+    """ \test @ref R34_0"""
+    def test_get_sales_dashboard(self):
+        """
+        Test that /salesDashboard runs the three reports concurrently and releases each worker's connection.
+        """
+
+        # Every report waits until all three run at the same time, which fails unless they run in parallel
+        barrier = threading.Barrier(3, timeout=5)
+        threads = set()
+
+        def report(name):
+            def generate(start_date, end_date):
+                threads.add(threading.current_thread().name)
+                barrier.wait()
+                return [{'report': name, 'start_date': start_date}]
+            return generate
+
+        for report_type in self.server.SALES_REPORT_TYPES:
+            setattr(self.server.products, report_type, MagicMock(side_effect=report(report_type)))
+        self.server.connection.release = MagicMock()
+
+        with self.server.app.test_request_context('/salesDashboard?start_date=2023-05-01&end_date=2023-05-31', method='GET'):
+            response = self.server.get_sales_dashboard()
+
+        # Assert that the combined document holds every report and its timing
+        body = response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers.get('Access-Control-Allow-Origin'), '*')
+        self.assertEqual(body['reports']['sales_by_category'], [{'report': 'sales_by_category', 'start_date': '2023-05-01'}])
+        self.assertEqual(set(body['timings_ms']), {'total_sales', 'top_selling_products', 'sales_by_category', 'total'})
+        self.assertEqual(len(threads), 3)
+        self.assertEqual(self.server.connection.release.call_count, 3)
@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import sys
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.analytics import np
+from Backend.benchmark import seed_orders
+from Backend.orders import Orders
+from Backend.products import Products
+from Backend.snapshot import MANIFEST_FILE, OrderSnapshot, SnapshotError, SnapshotWriter, StringColumn, column_file
+from Backend.sqlite_connection import SQLiteConnection
+
+
+""" \test @ref R34_0"""
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestOrderSnapshot(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up an in-memory database with synthetic orders and an empty snapshot directory.
+        """
+
+        self.connection = SQLiteConnection()
+        seed_orders(self.connection, 200)
+        self.directory = tempfile.mkdtemp()
+        self.writer = SnapshotWriter(self.connection, self.directory, batch_size=64)
+        self.raw_products = Products(self.connection)
+
+    def tearDown(self):
+        self.connection.release()
+        self.connection.close_all()
+        shutil.rmtree(self.directory)
+
+    def assert_reports_match_sql(self, products, start_date, end_date):
+        """
+        Compare the reports computed from the snapshot with the SQL reports of the same range.
+        """
+
+        total = products.total_sales(start_date, end_date)
+        raw_total = self.raw_products.total_sales(start_date, end_date)
+        self.assertEqual([(row['order_id'], row['customer_name']) for row in total[:-1]],
+                         sorted((row['order_id'], row['customer_name']) for row in raw_total[:-1]))
+        self.assertAlmostEqual(total[-1]['total_sales'], raw_total[-1]['total_sales'], places=6)
+        self.assertEqual([row['total_quantity'] for row in products.top_selling_products(start_date, end_date)],
+                         [row['total_quantity'] for row in self.raw_products.top_selling_products(start_date, end_date)])
+        self.assertEqual(products.sales_by_category(start_date, end_date), self.raw_products.sales_by_category(start_date, end_date))
+
+    """ \test @ref R34_0"""
+    def test_reports_run_on_snapshot(self):
+        """
+        Test that the Products reports run on a snapshot without a database connection and equal the SQL reports.
+        """
+
+        self.assertEqual(self.writer.export(), 210)
+        products = Products(None, analytics=OrderSnapshot(self.directory))
+        self.assert_reports_match_sql(products, '2023-05-01', '2023-06-30')
+        self.assert_reports_match_sql(products, '2000-01-01', '2100-01-01')
+        columns = products.analytics.columns()
+        self.assertIsInstance(columns.order_ids, np.memmap)
+        self.assertIsInstance(columns.detail_times, np.memmap)
+
+    """ \test @ref R34_0"""
+    def test_export_appends(self):
+        """
+        Test that an export appends only the new orders and that an open snapshot maps them on its next report.
+        """
+
+        self.writer.export()
+        snapshot = OrderSnapshot(self.directory)
+        products = Products(None, analytics=snapshot)
+        self.assertEqual(len(snapshot.columns().order_ids), 210)
+        size = os.path.getsize(os.path.join(self.directory, column_file('orders', 'order_id')))
+
+        order_id = Orders(self.connection).insert_new_order({'customer_name': 'Zoë', 'total_amount': 4.5, 'order_details': [
+            {'product_id': 3, 'quantity': 3, 'total_price': 4.5}]})
+        self.assertEqual(self.writer.export(), 1)
+        self.assertEqual(self.writer.export(), 0)
+        self.assertEqual(os.path.getsize(os.path.join(self.directory, column_file('orders', 'order_id'))), size + 8)
+        self.assertEqual(snapshot.manifest['last_order_id'], order_id - 1)
+        self.assertEqual(len(snapshot.columns().order_ids), 211)
+        self.assertEqual(snapshot.manifest['last_order_id'], order_id)
+        self.assertEqual(products.total_sales('2000-01-01', '2100-01-01')[-2]['customer_name'], 'Zoë')
+        self.assert_reports_match_sql(products, '2000-01-01', '2100-01-01')
+
+    """ \test @ref R34_0"""
+    def test_interrupted_export_is_truncated(self):
+        """
+        Test that rows written after the last manifest update are ignored by readers and cut by the next export.
+        """
+
+        self.writer.export()
+        path = os.path.join(self.directory, column_file('order_details', 'quantity'))
+        size = os.path.getsize(path)
+        with open(path, 'ab') as column:
+            column.write(b'\0' * 24)
+        products = Products(None, analytics=OrderSnapshot(self.directory))
+        self.assert_reports_match_sql(products, '2000-01-01', '2100-01-01')
+        self.writer.export()
+        self.assertEqual(os.path.getsize(path), size)
+
+        # A rebuild exports everything again
+        self.assertEqual(self.writer.export(rebuild=True), 210)
+        self.assertEqual(os.path.getsize(path), size)
+
+    """ \test @ref R34_0"""
+    def test_snapshot_errors(self):
+        """
+        Test that a missing snapshot and a snapshot of another format are reported.
+        """
+
+        with self.assertRaises(SnapshotError):
+            OrderSnapshot(self.directory).columns()
+        self.writer.export()
+        with open(os.path.join(self.directory, MANIFEST_FILE)) as manifest_file:
+            manifest = json.load(manifest_file)
+        manifest['format'] = 99
+        with open(os.path.join(self.directory, MANIFEST_FILE), 'w') as manifest_file:
+            json.dump(manifest, manifest_file)
+        with self.assertRaises(SnapshotError):
+            OrderSnapshot(self.directory).columns()
+        with self.assertRaises(SnapshotError):
+            self.writer.export()
+
+    """ \test @ref R34_0"""
+    def test_string_column(self):
+        """
+        Test that strings are decoded by index, boolean mask and index array.
+        """
+
+        data = 'AnnaZoëBob'.encode('utf-8')
+        column = StringColumn(np.array([4, 8, 11]), np.frombuffer(data, dtype='u1'))
+        self.assertEqual(len(column), 3)
+        self.assertEqual(column[1], 'Zoë')
+        self.assertEqual(list(column[np.array([True, False, True])]), ['Anna', 'Bob'])
+        self.assertEqual(list(column[np.array([2, 0])]), ['Bob', 'Anna'])
+
+
+if __name__ == '__main__':
+    unittest.main()
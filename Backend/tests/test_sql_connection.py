@@ -1,3 +1,4 @@
+import threading
 import unittest
 from unittest import mock
 import mysql.connector
@@ -111,3 +112,115 @@ class TestSQLConnection(unittest.TestCase):
 
         # Assert that the cursor method of the mock connection is called once
         mock_connection.cursor.assert_called_once()
+
+    """ \test @ref R1_0"""
+    def test_release(self):
+        """
+        Test the release() method of SQLConnection.
+
+        This test case verifies that release() returns the thread's connection to the pool
+        so the next connect() reuses it without opening a new MySQL connection.
+        """
+
+        # Create an instance of SQLConnection
+        sql_connection = SQLConnection()
+        # Configure the mock connect method to return a mock connection
+        mock_connection = mock.Mock(spec=mysql.connector.MySQLConnection)
+        self.mock_connect.return_value = mock_connection
+
+        # Check out a connection and give it back to the pool
+        sql_connection.connect()
+        sql_connection.release()
+
+        # Assert that the thread no longer holds the connection and pending work was rolled back
+        self.assertIsNone(sql_connection.connection)
+        mock_connection.rollback.assert_called_once()
+        # Assert that the next connect reuses the pooled connection
+        self.assertEqual(sql_connection.connect(), mock_connection)
+        self.mock_connect.assert_called_once()
+        self.assertEqual(sql_connection.stats()['in_use'], 1)
+
+    """ \test @ref R1_0"""
+    def test_connection_is_per_thread(self):
+        """
+        Test that each thread checks out its own connection from the pool.
+        """
+
+        # Create an instance of SQLConnection and give every connect call a distinct mock connection
+        sql_connection = SQLConnection()
+        self.mock_connect.side_effect = lambda **kwargs: mock.Mock(spec=mysql.connector.MySQLConnection)
+
+        # Check out a connection in the main thread and in a worker thread
+        main_connection = sql_connection.connect()
+        worker_connections = []
+        worker = threading.Thread(target=lambda: worker_connections.append(sql_connection.connect()))
+        worker.start()
+        worker.join()
+
+        # Assert that both threads received different connections
+        self.assertIsNot(worker_connections[0], main_connection)
+        self.assertEqual(sql_connection.connection, main_connection)
+        self.assertEqual(sql_connection.stats()['in_use'], 2)
+
+    """ \test @ref R1_0"""
+    def test_cursor_reconnects_lost_connection(self):
+        """
+        Test that cursor() replaces a connection the server has dropped.
+        """
+
+        # Create an instance of SQLConnection holding a connection that lost its socket
+        sql_connection = SQLConnection()
+        lost_connection = mock.Mock(spec=mysql.connector.MySQLConnection)
+        lost_connection.cursor.side_effect = mysql.connector.errors.OperationalError("MySQL Connection not available")
+        fresh_connection = mock.Mock(spec=mysql.connector.MySQLConnection)
+        self.mock_connect.side_effect = [lost_connection, fresh_connection]
+
+        # Call the cursor method
+        cursor = sql_connection.cursor()
+
+        # Assert that the lost connection was closed and the cursor comes from the fresh connection
+        lost_connection.close.assert_called_once()
+        self.assertEqual(cursor, fresh_connection.cursor.return_value)
+        self.assertEqual(sql_connection.connection, fresh_connection)
+
+    """ \test @ref R1_0"""
+    def test_is_alive(self):
+        """
+        Test that _is_alive() pings the connection and reports a failed ping as dead.
+        """
+
+        sql_connection = SQLConnection()
+        healthy = mock.Mock(spec=mysql.connector.MySQLConnection)
+        dead = mock.Mock(spec=mysql.connector.MySQLConnection)
+        dead.ping.side_effect = mysql.connector.errors.InterfaceError("Connection lost")
+
+        self.assertTrue(sql_connection._is_alive(healthy))
+        healthy.ping.assert_called_once_with(reconnect=True, attempts=1, delay=0)
+        self.assertFalse(sql_connection._is_alive(dead))
+
+    """ \test @ref R1_0"""
+    def test_prepared_cursor(self):
+        """
+        Test that cursor(prepared=True) runs queries through the connection's prepared statement cache.
+        """
+
+        # Create an instance of SQLConnection over a mock connection
+        sql_connection = SQLConnection()
+        mock_connection = mock.MagicMock(unread_result=False)
+        self.mock_connect.return_value = mock_connection
+
+        # Execute the same query twice through two prepared cursors
+        for order_id in (1, 2):
+            sql_connection.cursor(prepared=True).execute("SELECT * FROM orders WHERE order_id = %s", (order_id,))
+
+        # Assert that the statement was prepared once and reused
+        mock_connection.cursor.assert_called_once_with(prepared=True)
+        self.assertEqual(sql_connection.statement_cache_stats(), {'hits': 1, 'misses': 1, 'evictions': 0, 'prepared': 1})
+
+    """ \test @ref R6_0"""
+    def test_first_insert_id(self):
+        """
+        Test that the first id of a multi-row insert is MySQL's lastrowid.
+        """
+
+        self.assertEqual(SQLConnection().first_insert_id(mock.MagicMock(lastrowid=40), 3), 40)
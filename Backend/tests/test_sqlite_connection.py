@@ -0,0 +1,155 @@
+import contextlib
+import io
+import shutil
+import tempfile
+import threading
+import unittest
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.sqlite_connection import SQLiteConnection, translate_query, mysql_dump_to_sqlite
+from Backend.storage import create_connection
+from Backend.migrations import main as migrations_main
+from Backend.sql_connection import SQLConnection
+from Backend.products import Products
+from Backend.orders import Orders
+
+""" \test @ref R1_0"""
+class TestSQLiteConnection(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a private in-memory database loaded from the project schema.
+        """
+
+        self.connection = SQLiteConnection()
+
+    def tearDown(self):
+        """
+        Release the test thread's connection and discard the in-memory database.
+        """
+
+        self.connection.release()
+        self.connection.close_all()
+
+    """ \test @ref R1_0"""
+    def test_translate_query(self):
+        """
+        Test that mysql.connector placeholders and MySQL-only statements are rewritten for SQLite.
+        """
+
+        self.assertEqual(translate_query("SELECT * FROM orders WHERE order_id = %s"),
+                         "SELECT * FROM orders WHERE order_id = ?")
+        self.assertEqual(translate_query("SELECT strftime('%%Y', datetime) FROM orders"),
+                         "SELECT strftime('%Y', datetime) FROM orders")
+        self.assertEqual(translate_query("SET FOREIGN_KEY_CHECKS = 0"), "PRAGMA foreign_keys = OFF")
+        self.assertEqual(translate_query("DROP INDEX idx_orders_datetime ON orders"), "DROP INDEX idx_orders_datetime")
+
+    """ \test @ref R1_0"""
+    def test_mysql_dump_to_sqlite(self):
+        """
+        Test that a MySQL table definition is converted to SQLite syntax.
+        """
+
+        dump = (
+            "-- comment\n"
+            "/*!40101 SET NAMES utf8 */;\n"
+            "CREATE TABLE `orders` (\n"
+            "  `order_id` int NOT NULL AUTO_INCREMENT,\n"
+            "  `customer_name` varchar(100) NOT NULL,\n"
+            "  PRIMARY KEY (`order_id`),\n"
+            "  KEY `idx_name` (`customer_name`)\n"
+            ") ENGINE=InnoDB AUTO_INCREMENT=11 DEFAULT CHARSET=utf8mb4;\n"
+            "LOCK TABLES `orders` WRITE;\n"
+            "INSERT INTO `orders` VALUES (1,'O\\'Brien');\n"
+            "UNLOCK TABLES;\n"
+        )
+        self.assertEqual(mysql_dump_to_sqlite(dump), [
+            "CREATE TABLE orders (\n"
+            "  order_id INTEGER PRIMARY KEY AUTOINCREMENT,\n"
+            "  customer_name varchar(100) NOT NULL\n"
+            ")",
+            "INSERT INTO orders VALUES (1,'O''Brien')",
+        ])
+
+    """ \test @ref R1_0"""
+    def test_schema_is_loaded(self):
+        """
+        Test that the seed data of Grocery_Store_DB_Schema.sql is available through the model classes.
+        """
+
+        products = Products(self.connection).get_all_products()
+        self.assertEqual(len(products), 30)
+        self.assertEqual(products[0]['unit_of_measure_name'], 'Each')
+        self.assertEqual(len(Orders(self.connection).get_all_orders()), 10)
+
+    """ \test @ref R1_0"""
+    def test_reports_run_on_sqlite(self):
+        """
+        Test that the sales report queries run unchanged on SQLite.
+        """
+
+        products = Products(self.connection)
+        self.assertEqual(round(products.total_sales('2023-05-01', '2023-06-30')[-1]['total_sales'], 2), 182.67)
+        self.assertEqual(len(products.top_selling_products('2023-05-01', '2023-06-30')), 5)
+        self.assertEqual(products.sales_by_category('2023-05-01', '2023-06-30')[0]['category_name'], 'Personal Care')
+
+    """ \test @ref R1_0"""
+    def test_writes_are_visible_to_other_threads(self):
+        """
+        Test that every pooled connection shares the same in-memory database.
+        """
+
+        orders = Orders(self.connection)
+        orders.insert_new_order({'customer_name': 'Test', 'total_amount': 1.5,
+                                 'order_details': [{'product_id': 17, 'quantity': 1, 'total_price': 1.5}]})
+        self.connection.release()
+        seen = []
+        worker = threading.Thread(target=lambda: (seen.append(len(orders.get_all_orders())), self.connection.release()))
+        worker.start()
+        worker.join()
+        self.assertEqual(seen, [11])
+
+    """ \test @ref R1_0"""
+    def test_first_insert_id(self):
+        """
+        Test that the first id of a multi-row insert is derived from the last one SQLite reports.
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute("INSERT INTO orders (customer_name, total_amount, datetime) VALUES (%s, %s, %s), (%s, %s, %s), (%s, %s, %s)",
+                       ('A', 1.0, '2024-01-01', 'B', 1.0, '2024-01-01', 'C', 1.0, '2024-01-01'))
+        first_id = self.connection.first_insert_id(cursor, 3)
+        cursor.execute("SELECT customer_name FROM orders WHERE order_id = %s", (first_id,))
+        self.assertEqual(cursor.fetchone(), ('A',))
+
+    """ \test @ref R1_0"""
+    def test_create_connection(self):
+        """
+        Test that create_connection() selects the backend by name.
+        """
+
+        self.assertIsInstance(create_connection('mysql'), SQLConnection)
+        sqlite_connection = create_connection('sqlite', schema_path=None)
+        self.assertEqual(sqlite_connection.dialect, 'sqlite')
+        sqlite_connection.close_all()
+        with self.assertRaises(ValueError):
+            create_connection('oracle')
+
+    """ \test @ref R1_0"""
+    def test_command_line_sqlite_needs_a_database(self):
+        """
+        Test that the command line tools refuse the sqlite backend without --database instead of working on a throwaway in-memory database.
+        """
+
+        with contextlib.redirect_stderr(io.StringIO()) as stderr, self.assertRaises(SystemExit):
+            migrations_main(['up', '--backend', 'sqlite'])
+        self.assertIn('--database is required for the sqlite backend', stderr.getvalue())
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        database = os.path.join(directory, 'store.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            migrations_main(['up', '--backend', 'sqlite', '--database', database])
+        migrated = SQLiteConnection(database)
+        self.assertTrue(migrated._has_table('schema_migrations'))
+        migrated.close_all()
@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.statement_cache import PreparedCursor, StatementCache, StatementStats
+from Backend.sqlite_connection import SQLiteConnection
+from Backend.products import Products
+
+""" \test @ref R1_0"""
+class TestStatementCache(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a statement cache over a mock connection handing out a new mock cursor per statement.
+        """
+
+        self.mock_connection = MagicMock(unread_result=False)
+        self.mock_connection.cursor.side_effect = lambda **kwargs: MagicMock()
+        self.stats = StatementStats()
+        self.cache = StatementCache(self.mock_connection, self.stats, max_size=2)
+
+    """ \test @ref R1_0"""
+    def test_statement_is_prepared_once(self):
+        """
+        Test that executing the same query twice reuses the prepared cursor and the canonical query string.
+        """
+
+        cursor = PreparedCursor(self.cache)
+        cursor.execute("SELECT * FROM orders WHERE order_id = %s", (1,))
+        first = cursor._cursor
+        cursor.execute("".join(["SELECT * FROM orders ", "WHERE order_id = %s"]), (2,))
+
+        self.assertIs(cursor._cursor, first)
+        self.mock_connection.cursor.assert_called_once_with(prepared=True)
+        # Both executions pass the same string object so mysql.connector does not re-prepare
+        self.assertIs(first.execute.call_args_list[0][0][0], first.execute.call_args_list[1][0][0])
+        self.assertEqual(self.stats.snapshot(), {'hits': 1, 'misses': 1, 'evictions': 0})
+
+    """ \test @ref R1_0"""
+    def test_least_recently_used_statement_is_closed(self):
+        """
+        Test that the cache closes the least recently used statement once it exceeds max_size.
+        """
+
+        oldest = self.cache.lookup("SELECT 1")[1]
+        self.cache.lookup("SELECT 2")
+        self.cache.lookup("SELECT 3")
+
+        oldest.close.assert_called_once()
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.stats.snapshot()['evictions'], 1)
+
+    """ \test @ref R1_0"""
+    def test_unread_rows_are_drained(self):
+        """
+        Test that rows left by a fetchone() are consumed before the next statement runs.
+        """
+
+        first = self.cache.lookup("SELECT * FROM products")[1]
+        self.mock_connection.unread_result = True
+        self.cache.lookup("SELECT * FROM orders")
+        first.fetchall.assert_called_once()
+
+    """ \test @ref R1_0"""
+    def test_prepared_cursors_on_sqlite(self):
+        """
+        Test that the model classes hit the statement cache on repeated calls through SQLConnection.
+        """
+
+        connection = SQLiteConnection()
+        products = Products(connection)
+        products.get_all_products()
+        products.get_all_products()
+        stats = connection.statement_cache_stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['prepared'], 1)
+        connection.release()
+        connection.close_all()
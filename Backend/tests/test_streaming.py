@@ -0,0 +1,82 @@
+import json
+import unittest
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.streaming import csv_stream, json_array_stream, ndjson_stream
+
+""" \test @ref R6_0"""
+class TestJsonArrayStream(unittest.TestCase):
+    """ \test @ref R6_0"""
+    def test_empty(self):
+        """
+        Test that no rows produce an empty JSON array.
+        """
+
+        self.assertEqual(''.join(json_array_stream(iter([]), json.dumps)), '[]')
+
+    """ \test @ref R6_0"""
+    def test_rows_are_chunked(self):
+        """
+        Test that rows are yielded in chunks that together form a valid JSON array.
+        """
+
+        rows = [{'order_id': i} for i in range(5)]
+        chunks = list(json_array_stream(iter(rows), json.dumps, rows_per_chunk=2))
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(json.loads(''.join(chunks)), rows)
+
+    """ \test @ref R6_0"""
+    def test_rows_are_consumed_lazily(self):
+        """
+        Test that the first chunk is produced before the row source is exhausted.
+        """
+
+        consumed = []
+
+        def rows():
+            for i in range(10):
+                consumed.append(i)
+                yield i
+
+        stream = json_array_stream(rows(), json.dumps, rows_per_chunk=2)
+        self.assertEqual(next(stream), '[')
+        self.assertEqual(next(stream), '0, 1')
+        self.assertEqual(consumed, [0, 1])
+
+
+""" \test @ref R34_0"""
+class TestExportStreams(unittest.TestCase):
+    """ \test @ref R34_0"""
+    def test_csv_stream(self):
+        """
+        Test that rows are written as CSV chunks under one header, with missing columns left empty and values quoted as needed.
+        """
+
+        rows = [{'order_id': 1, 'customer_name': 'Doe, Jane', 'total_amount': 2.5}, {'order_id': 2, 'customer_name': 'Bob', 'total_amount': 1.0},
+                {'total_sales': 3.5}]
+        chunks = list(csv_stream(iter(rows), ['order_id', 'customer_name', 'total_amount', 'total_sales'], rows_per_chunk=2))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(''.join(chunks), 'order_id,customer_name,total_amount,total_sales\r\n'
+                                          '1,"Doe, Jane",2.5,\r\n2,Bob,1.0,\r\n,,,3.5\r\n')
+        self.assertEqual(''.join(csv_stream(iter([]), ['order_id'])), 'order_id\r\n')
+
+    """ \test @ref R34_0"""
+    def test_ndjson_stream(self):
+        """
+        Test that every row becomes one JSON line and that rows are consumed lazily.
+        """
+
+        consumed = []
+
+        def rows():
+            for i in range(5):
+                consumed.append(i)
+                yield {'order_id': i}
+
+        stream = ndjson_stream(rows(), json.dumps, rows_per_chunk=2)
+        self.assertEqual(next(stream), '{"order_id": 0}\n{"order_id": 1}\n')
+        self.assertEqual(consumed, [0, 1])
+        self.assertEqual([json.loads(line) for line in ''.join(stream).splitlines()], [{'order_id': i} for i in range(2, 5)])
+        self.assertEqual(list(ndjson_stream(iter([]), json.dumps)), [])
@@ -0,0 +1,190 @@
+import math
+import random
+import time
+import unittest
+from collections import Counter
+from datetime import datetime
+import sys
+import os
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+from Backend.trending import SlidingTopK, SpaceSaving, TrendingProducts
+from Backend.benchmark import seed_orders
+from Backend.sqlite_connection import SQLiteConnection
+from Backend.orders import Orders
+
+
+def skewed_stream(count, items, seed=3):
+    """
+    Generate a reproducible stream of (item, weight) pairs in which a few items dominate.
+    """
+
+    rng = random.Random(seed)
+    return [(min(int(rng.paretovariate(1.2)), items), rng.randint(1, 5)) for _ in range(count)]
+
+
+""" \test @ref R34_0"""
+class TestSpaceSaving(unittest.TestCase):
+    """ \test @ref R34_0"""
+    def test_error_bound(self):
+        """
+        Test that every estimate overstates by at most its error, the errors stay within total / capacity and heavy items are tracked.
+        """
+
+        summary = SpaceSaving(10)
+        exact = Counter()
+        for item, weight in skewed_stream(5000, 200):
+            summary.add(item, weight)
+            exact[item] += weight
+        self.assertEqual(len(summary.counters), 10)
+        self.assertEqual(summary.total, sum(exact.values()))
+        bound = summary.total / 10
+        for item, (estimate, error) in summary.counters.items():
+            self.assertGreaterEqual(estimate, exact[item])
+            self.assertLessEqual(estimate - error, exact[item])
+            self.assertLessEqual(error, bound)
+        for item, weight in exact.items():
+            if weight > bound:
+                self.assertIn(item, summary.counters)
+        # The heap stays proportional to the counters
+        self.assertLessEqual(len(summary._heap), 4 * 10 + 1)
+
+
+""" \test @ref R34_0"""
+class TestSlidingTopK(unittest.TestCase):
+    def setUp(self):
+        self.now = [1000.0]
+        self.window = SlidingTopK(window=100.0, panes=10, capacity=5, refresh=0.0, clock=lambda: self.now[0])
+
+    """ \test @ref R34_0"""
+    def test_merged_error_bound(self):
+        """
+        Test that the estimates merged over the panes never understate and overstate by at most total / capacity.
+        """
+
+        exact = Counter()
+        for index, (item, weight) in enumerate(skewed_stream(3000, 50)):
+            if index % 300 == 0:
+                self.now[0] += 10.0
+            self.window.add(item, weight)
+            exact[item] += weight
+        # The first pane leaves the window
+        self.now[0] += 10.0
+        dropped = Counter()
+        for item, weight in skewed_stream(3000, 50)[:300]:
+            dropped[item] += weight
+        exact.subtract(dropped)
+        ranking, total = self.window.top(5)
+        self.assertEqual(total, sum(exact.values()))
+        self.assertEqual(len(ranking), 5)
+        for item, estimate, error in ranking:
+            self.assertGreaterEqual(estimate, exact[item])
+            self.assertLessEqual(estimate - error, exact[item])
+            self.assertLessEqual(error, total / 5)
+        self.assertLessEqual(self.window.counters(), 10 * 5)
+
+    """ \test @ref R34_0"""
+    def test_window_expiry(self):
+        """
+        Test that events leave the window with their pane and that events older than the window are ignored.
+        """
+
+        self.window.add('a', 3.0)
+        self.now[0] += 50.0
+        self.window.add('b', 2.0)
+        self.window.add('c', 9.0, timestamp=self.now[0] - 200.0)
+        self.assertEqual(self.window.top(5), ([('a', 3.0, 0.0), ('b', 2.0, 0.0)], 5.0))
+        self.now[0] += 60.0
+        self.assertEqual(self.window.top(5), ([('b', 2.0, 0.0)], 2.0))
+        self.now[0] += 60.0
+        self.assertEqual(self.window.top(5), ([], 0.0))
+        self.assertEqual(self.window.counters(), 0)
+
+    """ \test @ref R34_0"""
+    def test_ranking_is_reused(self):
+        """
+        Test that a ranking is reused for refresh seconds, so repeated queries do not merge the panes again.
+        """
+
+        window = SlidingTopK(window=100.0, panes=10, capacity=5, refresh=1.0, clock=lambda: self.now[0])
+        window.add('a', 1.0)
+        self.assertEqual(window.top(1), ([('a', 1.0, 0.0)], 1.0))
+        window.add('b', 4.0)
+        self.assertEqual(window.top(1), ([('a', 1.0, 0.0)], 1.0))
+        self.now[0] += 1.0
+        self.assertEqual(window.top(1), ([('b', 4.0, 0.0)], 5.0))
+
+
+""" \test @ref R34_0"""
+class TestTrendingProducts(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up an in-memory database with synthetic orders and Orders wired to the trending products.
+        """
+
+        self.connection = SQLiteConnection()
+        seed_orders(self.connection, 2000)
+        self.trending = TrendingProducts(capacity=100, refresh=0.0)
+        self.orders = Orders(self.connection)
+        self.orders.subscribe(self.trending.on_order_changed)
+
+    def tearDown(self):
+        self.connection.release()
+        self.connection.close_all()
+
+    def quantities_in(self, window):
+        """
+        Read the exact quantities sold per product since the start of the oldest pane of a window.
+        """
+
+        length, panes = TrendingProducts.WINDOWS[window]
+        pane_length = length / panes
+        since = datetime.fromtimestamp((math.floor(time.time() / pane_length) - panes + 1) * pane_length)
+
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT order_details.product_id, SUM(order_details.quantity) FROM order_details "
+                       "JOIN orders ON order_details.order_id = orders.order_id "
+                       "WHERE orders.datetime >= %s GROUP BY order_details.product_id", (since.replace(microsecond=0),))
+        return {product_id: float(quantity) for product_id, quantity in cursor.fetchall()}
+
+    """ \test @ref R34_0"""
+    def test_warm_and_count_inserted_orders(self):
+        """
+        Test that warm() loads the last day and that only orders inserted after it are counted, once.
+        """
+
+        order = {'customer_name': 'Trend', 'total_amount': 6.0, 'order_details': [{'product_id': 1, 'quantity': 4, 'total_price': 6.0}]}
+        self.orders.insert_new_order(order)  # Committed before warm(), which reads it
+        self.trending.warm(self.connection)
+        exact = self.quantities_in('day')
+        self.assertGreaterEqual(exact[1], 4)
+        report = self.trending.top('day', 100)
+        # With more counters than products the summaries are exact
+        self.assertEqual({product['product_id']: product['estimated_quantity'] for product in report['products']}, exact)
+        self.assertEqual(report['total_quantity'], sum(exact.values()))
+        self.assertEqual(report['error_bound'], round(sum(exact.values()) / 100, 3))
+
+        order_id = self.orders.insert_new_order(order)
+        self.trending.warm(self.connection)  # Runs only once
+        self.trending.on_order_changed('deleted', {'order_id': order_id, 'datetime': datetime.now(), 'order_details': order['order_details']})
+        report = self.trending.top('hour', 1)
+        self.assertEqual(report['products'][0]['product_id'], 1)
+        self.assertEqual(report['products'][0]['estimated_quantity'], self.quantities_in('hour')[1])
+        self.assertLessEqual(self.trending.stats()['day'], 24 * 100)
+
+    """ \test @ref R34_0"""
+    def test_orders_before_warm_up_are_not_counted_twice(self):
+        """
+        Test that orders inserted before warm() are only counted by warm().
+        """
+
+        order = {'customer_name': 'Trend', 'total_amount': 1.5, 'order_details': [{'product_id': 2, 'quantity': 1, 'total_price': 1.5}]}
+        self.orders.insert_new_order(order)
+        self.assertEqual(self.trending.stats(), {'hour': 0, 'day': 0})
+        self.trending.warm(self.connection)
+        report = self.trending.top('hour', 100)
+        self.assertEqual(report['total_quantity'], sum(self.quantities_in('hour').values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
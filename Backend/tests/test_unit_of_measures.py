@@ -5,6 +5,7 @@ import os
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(parent_dir)
 from Backend.unit_of_measures import UnitOfMeasures
+from Backend.reference_cache import ReferenceCache
 
 """ \test @ref R71_0"""
 class Unit_Of_MeasuresTestCase(unittest.TestCase):
@@ -43,3 +44,26 @@ class Unit_Of_MeasuresTestCase(unittest.TestCase):
             {'unit_of_measure_id': 2, 'unit_of_measure_name': 'lbs'}
         ]
         self.assertEqual(result, expected_response)
+
+    """ \test @ref R71_0"""
+    def test_get_unit_of_measures_uses_cache(self):
+        """
+        Test that unit of measures are read from the database once when a reference cache is configured.
+        """
+
+        # Create an instance backed by a reference cache
+        unit_of_measures = UnitOfMeasures(self.mock_connection, ReferenceCache(ttl=60))
+        self.mock_cursor.__iter__.side_effect = lambda: iter([(1, 'kg'), (2, 'lbs')])
+
+        # Read the list and the name map several times
+        self.assertEqual(len(unit_of_measures.get_unit_of_measures()), 2)
+        self.assertEqual(unit_of_measures.get_unit_of_measure_names(), {1: 'kg', 2: 'lbs'})
+        self.assertEqual(unit_of_measures.get_unit_of_measure_names(), {1: 'kg', 2: 'lbs'})
+
+        # Assert that the database was queried once
+        self.mock_cursor.execute.assert_called_once_with("SELECT * FROM unit_of_measures")
+
+        # Assert that invalidation forces another query
+        unit_of_measures.invalidate()
+        unit_of_measures.get_unit_of_measures()
+        self.assertEqual(self.mock_cursor.execute.call_count, 2)
@@ -0,0 +1,300 @@
+import heapq
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Hashable, Optional, Union
+
+
+""" @ref R34_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class is a weighted Space-Saving summary: it tracks the heaviest items of a stream with a fixed number of counters.
+class SpaceSaving:
+    def __init__(self, capacity: int) -> None:
+        """
+        @brief Constructor for the SpaceSaving class.
+        With m = capacity counters and a total weight N, every estimate overstates the true weight of its item by at most N / m,
+        and every item heavier than N / m is tracked.
+        @param capacity: The number of counters m.
+        """
+
+        self.capacity = capacity
+        self.total = 0.0
+        # Maps each tracked item to its [estimate, error] pair; the true weight lies in [estimate - error, estimate]
+        self.counters = {}
+        # Lazy min-heap of (estimate, item); entries whose estimate is outdated are skipped
+        self._heap = []
+
+    def add(self, item: Hashable, weight: float = 1.0) -> None:
+        """
+        @brief Adds weight to an item, evicting the item with the smallest estimate when every counter is in use.
+        @param item: The item, e.g. a product_id.
+        @param weight: The positive weight, e.g. the quantity sold.
+        """
+
+        self.total += weight
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self.counters) < self.capacity:
+            counter = self.counters[item] = [weight, 0.0]
+        else:
+            minimum, evicted = self._pop_minimum()
+            del self.counters[evicted]
+            # The new item may have had up to the evicted estimate before
+            counter = self.counters[item] = [minimum + weight, minimum]
+        heapq.heappush(self._heap, (counter[0], item))
+        if len(self._heap) > 4 * self.capacity:
+            # Drop the outdated entries, so the heap stays proportional to the counters
+            self._heap = [(counter[0], key) for key, counter in self.counters.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_minimum(self) -> tuple[float, Hashable]:
+        """
+        @brief Removes the current entry of the item with the smallest estimate from the heap.
+        @return The (estimate, item) pair.
+        """
+
+        while True:
+            estimate, item = heapq.heappop(self._heap)
+            counter = self.counters.get(item)
+            if counter is not None and counter[0] == estimate:
+                return estimate, item
+
+    def minimum(self) -> float:
+        """
+        @brief Returns the largest weight an untracked item may have had.
+        @return The smallest estimate when every counter is in use, 0 otherwise.
+        """
+
+        if len(self.counters) < self.capacity:
+            return 0.0
+        estimate, item = self._pop_minimum()
+        heapq.heappush(self._heap, (estimate, item))
+        return estimate
+
+
+""" @ref R34_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class estimates the heaviest items of a sliding time window from one Space-Saving summary per pane of the window.
+class SlidingTopK:
+    def __init__(self, window: float, panes: int, capacity: int, refresh: float = 1.0,
+                 clock: Callable[[], float] = time.time) -> None:
+        """
+        @brief Constructor for the SlidingTopK class.
+        The window advances one pane at a time, so it covers between window - window / panes and window seconds.
+        Memory is bounded by panes * capacity counters regardless of the number of items.
+        @param window: The window length in seconds.
+        @param panes: The number of panes the window is divided into.
+        @param capacity: The number of counters of each pane.
+        @param refresh: The number of seconds a computed ranking is reused, so repeated queries cost O(k).
+        @param clock: The time source in seconds since the epoch, replaceable in tests.
+        """
+
+        self.window = window
+        self.pane_length = window / panes
+        self.panes = panes
+        self.capacity = capacity
+        self.refresh = refresh
+        self.clock = clock
+        # Maps each pane number, i.e. time // pane_length, to its summary
+        self._panes = {}
+        # The merged (estimate, error, item) triples ranked by estimate, and when and up to which update they were computed
+        self._ranking = []
+        self._ranking_total = 0.0
+        self._ranked_at = None
+        self._updates = 0
+        self._ranked_updates = -1
+
+    def add(self, item: Hashable, weight: float, timestamp: Optional[float] = None) -> None:
+        """
+        @brief Adds weight to an item at a point in time.
+        @param item: The item.
+        @param weight: The positive weight.
+        @param timestamp: The time of the event in seconds since the epoch; defaults to now. Events older than the window are ignored and future ones count as now.
+        """
+
+        current = self._expire()
+        pane = current if timestamp is None else min(math.floor(timestamp / self.pane_length), current)
+        if pane <= current - self.panes:
+            return
+        summary = self._panes.get(pane)
+        if summary is None:
+            summary = self._panes[pane] = SpaceSaving(self.capacity)
+        summary.add(item, weight)
+        self._updates += 1
+
+    def top(self, k: int) -> tuple[list[tuple[Hashable, float, float]], float]:
+        """
+        @brief Returns the estimated heaviest items of the window.
+        Each estimate overstates the true weight by at most its error, and the errors are at most total / capacity.
+        @param k: The number of items.
+        @return A pair of the (item, estimate, error) triples, heaviest first, and the total weight of the window.
+        """
+
+        now = self.clock()
+        self._expire()
+        if self._ranked_updates != self._updates and (self._ranked_at is None or now - self._ranked_at >= self.refresh):
+            self._rank()
+            self._ranked_at = now
+        return [(item, estimate, error) for estimate, error, item in self._ranking[:k]], self._ranking_total
+
+    def _rank(self) -> None:
+        """
+        @brief Merges the pane summaries into one ranking.
+        An item missing from a full pane may have had up to that pane's minimum there, which is added to its error.
+        """
+
+        merged = {}
+        total = 0.0
+        minimums = {pane: summary.minimum() for pane, summary in self._panes.items()}
+        for pane, summary in self._panes.items():
+            total += summary.total
+            for item, (estimate, error) in summary.counters.items():
+                entry = merged.setdefault(item, [0.0, 0.0, set()])
+                entry[0] += estimate
+                entry[1] += error
+                entry[2].add(pane)
+        ranking = []
+        for item, (estimate, error, panes) in merged.items():
+            missing = sum(minimum for pane, minimum in minimums.items() if pane not in panes)
+            # Count the possible weight of the panes missing the item in the estimate, so estimates never understate
+            ranking.append((estimate + missing, error + missing, item))
+        ranking.sort(key=lambda entry: (-entry[0], entry[2]))
+        self._ranking = ranking[:self.capacity]
+        self._ranking_total = total
+        self._ranked_updates = self._updates
+
+    def _expire(self) -> int:
+        """
+        @brief Drops the panes that left the window.
+        @return The number of the current pane.
+        """
+
+        current = math.floor(self.clock() / self.pane_length)
+        for pane in [pane for pane in self._panes if pane <= current - self.panes]:
+            del self._panes[pane]
+            self._updates += 1
+        return current
+
+    def counters(self) -> int:
+        """
+        @brief Counts the counters in use, for the metrics.
+        @return The number of counters of all panes.
+        """
+
+        return sum(len(summary.counters) for summary in self._panes.values())
+
+
+""" @ref R34_0"""
+# This Class is part of the @ref Model within the overall @ref ModelViewController Design.
+# This Class keeps the products selling most in the last hour and day, updated by every inserted order.
+class TrendingProducts:
+    # Window lengths in seconds and the number of panes each is divided into
+    WINDOWS = {'hour': (3600.0, 12), 'day': (86400.0, 24)}
+
+    def __init__(self, capacity: int = 100, refresh: float = 1.0, clock: Callable[[], float] = time.time) -> None:
+        """
+        @brief Constructor for the TrendingProducts class.
+        @param capacity: The number of counters per pane; estimates overstate the quantity sold by at most the window's total quantity / capacity.
+        @param refresh: The number of seconds a ranking is reused before inserted orders are ranked again.
+        @param clock: The time source in seconds since the epoch, replaceable in tests.
+        """
+
+        self.capacity = capacity
+        self.clock = clock
+        self.windows = {name: SlidingTopK(length, panes, capacity, refresh, clock) for name, (length, panes) in self.WINDOWS.items()}
+        self._lock = threading.Lock()
+        # The highest order_id loaded by warm(); None until it ran, while inserted orders are not counted yet
+        self._warmed_up_to = None
+
+    """ @ref R34_0"""
+    def on_order_changed(self, event: str, order: dict[str, Any]) -> None:
+        """
+        @brief Listener for Orders.subscribe(): counts the quantities of an inserted order.
+        Deleted orders are not subtracted, as the summaries only grow; they drop out when their window passes.
+        @param event: 'inserted' or 'deleted'.
+        @param order: The order with 'order_id', 'datetime' and its 'order_details'.
+        """
+
+        if event != 'inserted':
+            return
+        with self._lock:
+            if self._warmed_up_to is None or order['order_id'] <= self._warmed_up_to:
+                # Orders committed before warm() are read by it
+                return
+            timestamp = self._timestamp(order['datetime'])
+            for detail in order['order_details']:
+                self._add(int(detail['product_id']), float(detail['quantity']), timestamp)
+
+    """ @ref R34_0"""
+    def warm(self, connection: Any) -> None:
+        """
+        @brief Loads the order lines of the last day once, so the windows are filled after a restart.
+        @param connection: The database connection to read with.
+        @post Later calls do nothing.
+        """
+
+        with self._lock:
+            if self._warmed_up_to is not None:
+                return
+            since = datetime.fromtimestamp(self.clock()) - timedelta(seconds=max(length for length, _ in self.WINDOWS.values()))
+            cursor = connection.cursor(prepared=True)
+            cursor.execute(
+                "SELECT orders.order_id, orders.datetime, order_details.product_id, order_details.quantity "
+                "FROM order_details JOIN orders ON order_details.order_id = orders.order_id "
+                "WHERE orders.datetime >= %s", (since.replace(microsecond=0),))
+            highest = 0
+            for order_id, order_datetime, product_id, quantity in cursor:
+                self._add(int(product_id), float(quantity), self._timestamp(order_datetime))
+                highest = max(highest, order_id)
+            cursor.execute("SELECT MAX(order_id) FROM orders")
+            self._warmed_up_to = max(highest, cursor.fetchone()[0] or 0)
+
+    """ @ref R34_0"""
+    def top(self, window: str, k: int) -> dict[str, Any]:
+        """
+        @brief Returns the products estimated to sell most in a window; costs O(k) while a ranking is reused.
+        @param window: 'hour' or 'day'.
+        @param k: The number of products, at most capacity.
+        @return A dictionary with 'products', a list of dictionaries with 'product_id', 'estimated_quantity' and 'max_error', heaviest first;
+        'total_quantity' sold in the window; and 'error_bound', the largest possible overstatement of any estimate.
+        """
+
+        with self._lock:
+            ranking, total = self.windows[window].top(k)
+        return {
+            'products': [{'product_id': product_id, 'estimated_quantity': round(estimate, 3), 'max_error': round(error, 3)}
+                         for product_id, estimate, error in ranking],
+            'total_quantity': round(total, 3),
+            'error_bound': round(total / self.capacity, 3),
+        }
+
+    def stats(self) -> dict[str, int]:
+        """
+        @brief Reports the counters in use per window, bounded by capacity * panes.
+        @return A dictionary mapping each window to its number of counters.
+        """
+
+        with self._lock:
+            return {name: window.counters() for name, window in self.windows.items()}
+
+    def _add(self, product_id: int, quantity: float, timestamp: float) -> None:
+        """
+        @brief Adds a sold quantity to every window.
+        @pre The lock is held.
+        """
+
+        if quantity > 0:
+            for window in self.windows.values():
+                window.add(product_id, quantity, timestamp)
+
+    @staticmethod
+    def _timestamp(value: Union[str, datetime]) -> float:
+        """
+        @brief Converts an order time, a datetime or SQLite text, into seconds since the epoch.
+        """
+
+        if not isinstance(value, datetime):
+            value = datetime.fromisoformat(str(value))
+        return value.timestamp()
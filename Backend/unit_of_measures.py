@@ -1,22 +1,67 @@
+from typing import Optional
+from Backend.reference_cache import ReferenceCache
+from Backend.retry import retry_on_disconnect
 #from contracts import contract, post
 
 """ @ref R71_0"""
 # This Class is part of the @ref Model within the overall @ref ModelViewController Design.
 # This class implements the methods related to unit of measures.
 class UnitOfMeasures:
-    def __init__(self, connection) -> None:
+    def __init__(self, connection, cache: Optional[ReferenceCache] = None) -> None:
         """
         @brief Constructor for the UnitOfMeasures class.   
         Initializes an instance of the UnitOfMeasures class with the provided database connection object.
         @param connection: The database connection object.
+        @param cache: An optional reference data cache; without it every call queries the database.
         """
 
         self.connection = connection
+        self.cache = cache
 
     #@contract
     #@post(lambda result: isinstance(result, list), "The return value must be a list.")
     """ @ref R71_0"""
     def get_unit_of_measures(self) -> list:
+        """
+        @brief Retrieves a list of unit of measures, from the reference data cache when one is configured.
+        @return A list of dictionaries containing unit_of_measure_id and unit_of_measure_name for each unit of measure.
+        @post The returned list must not be modified by the caller, it may be shared through the cache.
+        """
+
+        if self.cache is None:
+            return self.load_unit_of_measures()
+        return self.cache.get('unit_of_measures', self.load_unit_of_measures)
+
+    """ @ref R71_0"""
+    def get_unit_of_measure_names(self) -> dict[int, str]:
+        """
+        @brief Retrieves the unit_of_measure_name of every unit of measure keyed by unit_of_measure_id.
+        This lets product queries resolve the name in memory instead of joining the unit_of_measures table.
+        @return A dictionary mapping unit_of_measure_id to unit_of_measure_name.
+        """
+
+        def load_names() -> dict[int, str]:
+            return {unit['unit_of_measure_id']: unit['unit_of_measure_name'] for unit in self.get_unit_of_measures()}
+
+        if self.cache is None:
+            return load_names()
+        return self.cache.get('unit_of_measure_names', load_names)
+
+    """ @ref R71_0"""
+    def invalidate(self) -> None:
+        """
+        @brief Drops the cached unit of measures so the next read queries the database.
+        """
+
+        if self.cache is not None:
+            self.cache.invalidate('unit_of_measures')
+            self.cache.invalidate('unit_of_measure_names')
+
+    #@contract
+    #@post(lambda result: isinstance(result, list), "The return value must be a list.")
+    """ @ref R71_0"""
+    @retry_on_disconnect()
+    def load_unit_of_measures(self) -> list:
         """
         @brief Retrieves a list of unit of measures from the database.
         This method executes an SQL query to retrieve all unit of measures from the database table "unit_of_measures".
@@ -24,8 +69,8 @@ class UnitOfMeasures:
         @post The response list is populated with dictionaries representing unit of measures, each containing 'unit_of_measure_id' and 'unit_of_measure_name'.
         """
 
-        # Create a cursor object to execute SQL queries
-        cursor = self.connection.cursor() 
+        # Create a cursor object that runs the SQL queries as cached prepared statements
+        cursor = self.connection.cursor(prepared=True) 
         # SQL query to retrieve unit of measures 
         query = ("SELECT * FROM unit_of_measures") 
         # Execute the query using the cursor
@@ -0,0 +1,4 @@
+DROP INDEX idx_products_category_id ON products;
+DROP INDEX idx_products_name ON products;
+DROP INDEX idx_orders_customer_name ON orders;
+DROP INDEX idx_orders_datetime ON orders;
@@ -0,0 +1,6 @@
+-- Indexes for the lookups that scanned whole tables:
+-- the /salesReport date range, search_products by name, the category join and orders by customer.
+CREATE INDEX idx_orders_datetime ON orders (datetime);
+CREATE INDEX idx_orders_customer_name ON orders (customer_name, order_id);
+CREATE INDEX idx_products_name ON products (name);
+CREATE INDEX idx_products_category_id ON products (category_id);
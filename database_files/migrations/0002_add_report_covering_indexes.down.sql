@@ -0,0 +1,3 @@
+DROP INDEX idx_order_details_product_sales ON order_details;
+CREATE INDEX idx_orders_datetime ON orders (datetime);
+DROP INDEX idx_orders_datetime_covering ON orders;
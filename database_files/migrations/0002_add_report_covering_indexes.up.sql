@@ -0,0 +1,6 @@
+-- Covering indexes for the report queries, so they are answered from the index without reading the table rows.
+-- total_sales reads customer_name and total_amount of every order in the date range; it replaces idx_orders_datetime.
+CREATE INDEX idx_orders_datetime_covering ON orders (datetime, customer_name, total_amount);
+DROP INDEX idx_orders_datetime ON orders;
+-- top_selling_products and sales_by_category join order_details by product and sum quantity and total_price.
+CREATE INDEX idx_order_details_product_sales ON order_details (product_id, order_id, quantity, total_price);
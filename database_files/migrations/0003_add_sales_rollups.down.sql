@@ -0,0 +1,3 @@
+DROP TABLE sales_daily_category;
+DROP TABLE sales_daily_product;
+DROP TABLE sales_daily;
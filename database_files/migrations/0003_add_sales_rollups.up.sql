@@ -0,0 +1,37 @@
+-- Daily sales aggregates maintained by every order insert and delete, so reports read one row per day
+-- instead of re-aggregating the raw orders and order_details.
+-- line_count counts the order lines behind a row, so rows emptied by deleted orders can be removed exactly.
+CREATE TABLE sales_daily (
+  sales_date DATE NOT NULL,
+  order_count INT NOT NULL,
+  total_amount DOUBLE NOT NULL,
+  PRIMARY KEY (sales_date)
+);
+CREATE TABLE sales_daily_product (
+  sales_date DATE NOT NULL,
+  product_id INT NOT NULL,
+  quantity DOUBLE NOT NULL,
+  total_price DOUBLE NOT NULL,
+  line_count INT NOT NULL,
+  PRIMARY KEY (sales_date, product_id)
+);
+CREATE TABLE sales_daily_category (
+  sales_date DATE NOT NULL,
+  category_id INT NOT NULL,
+  total_price DOUBLE NOT NULL,
+  line_count INT NOT NULL,
+  PRIMARY KEY (sales_date, category_id)
+);
+-- Fill the rollups from the existing orders
+INSERT INTO sales_daily (sales_date, order_count, total_amount)
+SELECT DATE(datetime), COUNT(*), SUM(total_amount) FROM orders GROUP BY DATE(datetime);
+INSERT INTO sales_daily_product (sales_date, product_id, quantity, total_price, line_count)
+SELECT DATE(orders.datetime), order_details.product_id, SUM(order_details.quantity), SUM(order_details.total_price), COUNT(*)
+FROM order_details JOIN orders ON order_details.order_id = orders.order_id
+GROUP BY DATE(orders.datetime), order_details.product_id;
+INSERT INTO sales_daily_category (sales_date, category_id, total_price, line_count)
+SELECT DATE(orders.datetime), products.category_id, SUM(order_details.total_price), COUNT(*)
+FROM order_details JOIN orders ON order_details.order_id = orders.order_id
+JOIN products ON order_details.product_id = products.product_id
+WHERE products.category_id IS NOT NULL
+GROUP BY DATE(orders.datetime), products.category_id;
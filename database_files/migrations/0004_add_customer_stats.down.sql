@@ -0,0 +1 @@
+DROP TABLE customer_stats;
@@ -0,0 +1,13 @@
+-- Per-customer aggregates maintained by every order insert and delete, so a customer's lifetime value is one primary key lookup
+-- instead of aggregating all of their orders. The customer's order history is read through idx_orders_customer_name of migration 0001.
+CREATE TABLE customer_stats (
+  customer_name VARCHAR(100) NOT NULL,
+  order_count INT NOT NULL,
+  total_spent DOUBLE NOT NULL,
+  first_order_at DATETIME NOT NULL,
+  last_order_at DATETIME NOT NULL,
+  PRIMARY KEY (customer_name)
+);
+-- Fill the aggregates from the existing orders
+INSERT INTO customer_stats (customer_name, order_count, total_spent, first_order_at, last_order_at)
+SELECT customer_name, COUNT(*), SUM(total_amount), MIN(datetime), MAX(datetime) FROM orders GROUP BY customer_name;
@@ -0,0 +1 @@
+DROP TABLE order_queue_checkpoints;
@@ -0,0 +1,7 @@
+-- The last write-ahead log entry of each write-behind order queue that was committed to orders.
+-- It is written in the same transaction as the orders, so replaying the log after a crash skips exactly the committed entries.
+CREATE TABLE order_queue_checkpoints (
+  queue_name VARCHAR(100) NOT NULL,
+  last_seq BIGINT NOT NULL,
+  PRIMARY KEY (queue_name)
+);